@@ -0,0 +1,26 @@
+"""add_jd_analysis_cache_columns
+
+Revision ID: 2fe2a813f213
+Revises: 147142e552b6
+Create Date: 2026-10-17 09:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2fe2a813f213'
+down_revision = '147142e552b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('jobs', sa.Column('analyzed_description_hash', sa.String(length=64), nullable=True))
+    op.add_column('jobs', sa.Column('analyzed_description_version', sa.String(length=100), nullable=True))
+
+
+def downgrade():
+    op.drop_column('jobs', 'analyzed_description_version')
+    op.drop_column('jobs', 'analyzed_description_hash')
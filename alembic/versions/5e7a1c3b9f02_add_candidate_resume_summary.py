@@ -0,0 +1,75 @@
+"""add_candidate_resume_summary
+
+Revision ID: 5e7a1c3b9f02
+Revises: d3b8e5f0a2c4
+Create Date: 2026-10-17 16:24:05.317842
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e7a1c3b9f02'
+down_revision = 'd3b8e5f0a2c4'
+branch_labels = None
+depends_on = None
+
+
+candidates = sa.table(
+    'candidates',
+    sa.column('id', sa.Integer),
+    sa.column('resume_summary', sa.Text),
+    sa.column('structured_resume_info', sa.JSON),
+)
+
+
+def _load(value):
+    # Depending on the driver the JSON column comes back as a dict or as its serialized string
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return None
+    return value
+
+
+def upgrade():
+    op.add_column('candidates', sa.Column('resume_summary', sa.Text(), nullable=True))
+
+    # Move the summary out of the structured_resume_info envelope. Candidates created by the
+    # resume upload keep the summary in resume_text as well: the raw file text of those rows was
+    # never stored and cannot be recovered, their envelope hash still matches resume_text.
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(candidates.c.id, candidates.c.structured_resume_info)).fetchall()
+    for candidate_id, info in rows:
+        entry = _load(info)
+        if not isinstance(entry, dict) or not entry.get('summary'):
+            continue
+        envelope = {key: value for key, value in entry.items() if key != 'summary'}
+        bind.execute(
+            candidates.update()
+            .where(candidates.c.id == candidate_id)
+            .values(resume_summary=entry['summary'], structured_resume_info=envelope)
+        )
+
+
+def downgrade():
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(candidates.c.id, candidates.c.resume_summary, candidates.c.structured_resume_info)
+        .where(candidates.c.resume_summary.isnot(None))
+    ).fetchall()
+    for candidate_id, summary, info in rows:
+        entry = _load(info)
+        if not isinstance(entry, dict):
+            continue
+        bind.execute(
+            candidates.update()
+            .where(candidates.c.id == candidate_id)
+            .values(structured_resume_info={**entry, 'summary': summary})
+        )
+
+    op.drop_column('candidates', 'resume_summary')
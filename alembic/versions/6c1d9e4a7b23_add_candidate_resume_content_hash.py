@@ -0,0 +1,26 @@
+"""add_candidate_resume_content_hash
+
+Revision ID: 6c1d9e4a7b23
+Revises: 2fe2a813f213
+Create Date: 2026-10-17 11:02:17.540913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c1d9e4a7b23'
+down_revision = '2fe2a813f213'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('candidates', sa.Column('resume_content_hash', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_candidates_resume_content_hash'), 'candidates', ['resume_content_hash'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_candidates_resume_content_hash'), table_name='candidates')
+    op.drop_column('candidates', 'resume_content_hash')
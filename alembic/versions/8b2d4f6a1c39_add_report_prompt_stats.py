@@ -0,0 +1,24 @@
+"""add_report_prompt_stats
+
+Revision ID: 8b2d4f6a1c39
+Revises: 5e7a1c3b9f02
+Create Date: 2026-10-17 17:41:52.906114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2d4f6a1c39'
+down_revision = '5e7a1c3b9f02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('reports', sa.Column('prompt_stats', sa.JSON(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('reports', 'prompt_stats')
@@ -0,0 +1,48 @@
+"""add_background_tasks_table
+
+Revision ID: 9a4f2c8e1d57
+Revises: 6c1d9e4a7b23
+Create Date: 2026-10-17 13:26:48.102655
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4f2c8e1d57'
+down_revision = '6c1d9e4a7b23'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('background_tasks',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('task_uuid', sa.String(length=36), nullable=False),
+    sa.Column('task_type', sa.String(length=50), nullable=False),
+    sa.Column('interview_id', sa.Integer(), nullable=True),
+    sa.Column('idempotency_key', sa.String(length=100), nullable=True),
+    sa.Column('status', sa.Enum('PENDING', 'RUNNING', 'SUCCEEDED', 'FAILED', name='taskstatus'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+    sa.Column('started_at', sa.TIMESTAMP(), nullable=True),
+    sa.Column('finished_at', sa.TIMESTAMP(), nullable=True),
+    sa.ForeignKeyConstraint(['interview_id'], ['interviews.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('idempotency_key')
+    )
+    op.create_index(op.f('ix_background_tasks_id'), 'background_tasks', ['id'], unique=False)
+    op.create_index(op.f('ix_background_tasks_interview_id'), 'background_tasks', ['interview_id'], unique=False)
+    op.create_index(op.f('ix_background_tasks_task_uuid'), 'background_tasks', ['task_uuid'], unique=True)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_background_tasks_task_uuid'), table_name='background_tasks')
+    op.drop_index(op.f('ix_background_tasks_interview_id'), table_name='background_tasks')
+    op.drop_index(op.f('ix_background_tasks_id'), table_name='background_tasks')
+    op.drop_table('background_tasks')
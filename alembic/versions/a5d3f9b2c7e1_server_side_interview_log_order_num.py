@@ -0,0 +1,42 @@
+"""server_side_interview_log_order_num
+
+Revision ID: a5d3f9b2c7e1
+Revises: f2a8c6e4d1b7
+Create Date: 2026-10-17 20:12:37.650418
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a5d3f9b2c7e1'
+down_revision = 'f2a8c6e4d1b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('interviews', sa.Column('last_log_order_num', sa.Integer(), server_default='0', nullable=False))
+    # Client-supplied numbers may be missing or duplicated: renumber every interview's entries
+    # 1..n in the order they are currently listed in (NULLs first, ties by id)
+    op.execute(
+        "UPDATE interview_logs AS l "
+        "JOIN (SELECT id, ROW_NUMBER() OVER (PARTITION BY interview_id ORDER BY order_num, id) AS position FROM interview_logs) AS r "
+        "ON r.id = l.id SET l.order_num = r.position"
+    )
+    op.execute(
+        "UPDATE interviews AS i SET last_log_order_num = "
+        "(SELECT COALESCE(MAX(l.order_num), 0) FROM interview_logs AS l WHERE l.interview_id = i.id)"
+    )
+    op.alter_column('interview_logs', 'order_num', existing_type=sa.Integer(), nullable=False)
+    # Created before the old index is dropped, so interview_id stays indexed for its foreign key
+    op.create_unique_constraint('uq_interview_logs_interview_id_order_num', 'interview_logs', ['interview_id', 'order_num'])
+    op.drop_index('ix_interview_logs_interview_id_order_num', table_name='interview_logs')
+
+
+def downgrade():
+    op.create_index('ix_interview_logs_interview_id_order_num', 'interview_logs', ['interview_id', 'order_num'], unique=False)
+    op.drop_constraint('uq_interview_logs_interview_id_order_num', 'interview_logs', type_='unique')
+    op.alter_column('interview_logs', 'order_num', existing_type=sa.Integer(), nullable=True)
+    op.drop_column('interviews', 'last_log_order_num')
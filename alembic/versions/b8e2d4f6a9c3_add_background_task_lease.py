@@ -0,0 +1,25 @@
+"""add_background_task_lease
+
+Revision ID: b8e2d4f6a9c3
+Revises: a5d3f9b2c7e1
+Create Date: 2026-10-17 21:40:12.318904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8e2d4f6a9c3'
+down_revision = 'a5d3f9b2c7e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # NULL for the existing rows: a RUNNING task without a lease is treated as abandoned
+    op.add_column('background_tasks', sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('background_tasks', 'lease_expires_at')
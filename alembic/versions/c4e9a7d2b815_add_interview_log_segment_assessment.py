@@ -0,0 +1,26 @@
+"""add_interview_log_segment_assessment
+
+Revision ID: c4e9a7d2b815
+Revises: 8b2d4f6a1c39
+Create Date: 2026-10-17 18:52:30.114702
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4e9a7d2b815'
+down_revision = '8b2d4f6a1c39'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('interview_logs', sa.Column('segment_assessment', sa.JSON(), nullable=True))
+    op.add_column('interview_logs', sa.Column('segment_assessment_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    op.drop_column('interview_logs', 'segment_assessment_hash')
+    op.drop_column('interview_logs', 'segment_assessment')
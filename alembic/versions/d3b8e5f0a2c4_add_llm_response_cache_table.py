@@ -0,0 +1,40 @@
+"""add_llm_response_cache_table
+
+Revision ID: d3b8e5f0a2c4
+Revises: 9a4f2c8e1d57
+Create Date: 2026-10-17 15:02:11.480193
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3b8e5f0a2c4'
+down_revision = '9a4f2c8e1d57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('llm_response_cache',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('task', sa.String(length=50), nullable=False),
+    sa.Column('model', sa.String(length=100), nullable=False),
+    sa.Column('response', sa.Text(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.TIMESTAMP(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_llm_response_cache_cache_key'), 'llm_response_cache', ['cache_key'], unique=True)
+    op.create_index(op.f('ix_llm_response_cache_expires_at'), 'llm_response_cache', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_llm_response_cache_id'), 'llm_response_cache', ['id'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_llm_response_cache_id'), table_name='llm_response_cache')
+    op.drop_index(op.f('ix_llm_response_cache_expires_at'), table_name='llm_response_cache')
+    op.drop_index(op.f('ix_llm_response_cache_cache_key'), table_name='llm_response_cache')
+    op.drop_table('llm_response_cache')
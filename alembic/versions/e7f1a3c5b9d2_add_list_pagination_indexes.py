@@ -0,0 +1,32 @@
+"""add_list_pagination_indexes
+
+Revision ID: e7f1a3c5b9d2
+Revises: c4e9a7d2b815
+Create Date: 2026-10-17 18:41:05.227310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7f1a3c5b9d2'
+down_revision = 'c4e9a7d2b815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_jobs_created_at_id', 'jobs', ['created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_jobs_title'), 'jobs', ['title'], unique=False)
+    op.create_index('ix_candidates_created_at_id', 'candidates', ['created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_candidates_name'), 'candidates', ['name'], unique=False)
+    op.create_index('ix_interviews_created_at_id', 'interviews', ['created_at', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_interviews_created_at_id', table_name='interviews')
+    op.drop_index(op.f('ix_candidates_name'), table_name='candidates')
+    op.drop_index('ix_candidates_created_at_id', table_name='candidates')
+    op.drop_index(op.f('ix_jobs_title'), table_name='jobs')
+    op.drop_index('ix_jobs_created_at_id', table_name='jobs')
@@ -0,0 +1,36 @@
+"""add_interview_composite_indexes
+
+Revision ID: f2a8c6e4d1b7
+Revises: e7f1a3c5b9d2
+Create Date: 2026-10-17 19:26:48.913052
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a8c6e4d1b7'
+down_revision = 'e7f1a3c5b9d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_interview_logs_interview_id_order_num', 'interview_logs', ['interview_id', 'order_num'], unique=False)
+    op.create_index('ix_questions_interview_id_order_num', 'questions', ['interview_id', 'order_num'], unique=False)
+    op.create_index('ix_interviews_job_id_status_created_at', 'interviews', ['job_id', 'status', 'created_at'], unique=False)
+    op.create_index('ix_interviews_candidate_id_created_at', 'interviews', ['candidate_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    # MySQL drops the implicit foreign key indexes once these composite indexes can serve the
+    # constraints, and refuses to drop an index a foreign key still needs: recreate them first
+    op.create_index('ix_interview_logs_interview_id', 'interview_logs', ['interview_id'], unique=False)
+    op.create_index('ix_questions_interview_id', 'questions', ['interview_id'], unique=False)
+    op.create_index('ix_interviews_job_id', 'interviews', ['job_id'], unique=False)
+    op.create_index('ix_interviews_candidate_id', 'interviews', ['candidate_id'], unique=False)
+    op.drop_index('ix_interviews_candidate_id_created_at', table_name='interviews')
+    op.drop_index('ix_interviews_job_id_status_created_at', table_name='interviews')
+    op.drop_index('ix_questions_interview_id_order_num', table_name='questions')
+    op.drop_index('ix_interview_logs_interview_id_order_num', table_name='interview_logs')
@@ -1,35 +1,49 @@
-from typing import List, Any
-import shutil # Potentially for saving temp file, though parse_resume might take bytes directly
-import io # For creating in-memory file-like objects for docx
+from typing import List, Any, Optional
+import json
 import logging # Add this import
 
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form # Added File, UploadFile, Form
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form, Request, Response # Added File, UploadFile, Form
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sse_starlette.sse import EventSourceResponse
+from sqlalchemy.orm import selectinload
 from pydantic import EmailStr # To use EmailStr directly for Form parameters
 
-import docx # For .docx parsing
-import fitz  # PyMuPDF for .pdf parsing
-
 from app.api.v1 import schemas # Import schemas
+from app.api.v1.pagination import PageParams, paginate, prefix_filter
+from app.core.config import settings
 from app.db import models     # Import models
-from app.db.session import get_db
+from app.db.session import get_async_db, get_async_session_factory
 from app.services.ai_services import parse_resume # Import the AI service
+from app.services.analysis_cache import set_resume_summary, invalidate_resume_summary, compute_content_hash
+from app.services import bulk_ingestion
+from app.services.bulk_ingestion import BulkIngestionError
+from app.services.resume_extraction import (
+    extract_resume_text,
+    ResumeExtractionError,
+    UnsupportedResumeFormatError,
+    ResumeTooLargeError,
+    ResumeExtractionBusyError,
+    ResumeExtractionTimeoutError,
+)
 
 logger = logging.getLogger(__name__) # Add this line to get a logger instance
 
 router = APIRouter()
 
 @router.post("/", response_model=schemas.Candidate, status_code=status.HTTP_201_CREATED)
-def create_candidate(
+async def create_candidate(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     candidate_in: schemas.CandidateCreate
 ) -> models.Candidate:
     """
     Create new candidate.
     """
     # Check if candidate with this email already exists
-    existing_candidate = db.query(models.Candidate).filter(models.Candidate.email == candidate_in.email).first()
+    result = await db.execute(select(models.Candidate).where(models.Candidate.email == candidate_in.email))
+    existing_candidate = result.scalar_one_or_none()
     if existing_candidate:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -39,88 +53,103 @@ def create_candidate(
     db_candidate = models.Candidate(
         name=candidate_in.name,
         email=candidate_in.email,
-        resume_text=candidate_in.resume_text
+        resume_text=candidate_in.resume_text,
+        resume_content_hash=compute_content_hash(candidate_in.resume_text)
     )
     db.add(db_candidate)
-    db.commit()
-    db.refresh(db_candidate)
+    await db.commit()
+    await db.refresh(db_candidate)
     return db_candidate
 
 @router.get("/{candidate_id}", response_model=schemas.Candidate)
-def read_candidate_by_id(
+async def read_candidate_by_id(
     candidate_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> models.Candidate:
     """
     Get a specific candidate by their ID.
     """
-    db_candidate = db.query(models.Candidate).filter(models.Candidate.id == candidate_id).first()
+    db_candidate = await db.get(models.Candidate, candidate_id)
     if db_candidate is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Candidate not found")
     return db_candidate
 
 @router.get("/", response_model=List[schemas.Candidate])
-def read_candidates(
-    db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100
+async def read_candidates(
+    request: Request,
+    response: Response,
+    name_prefix: Optional[str] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db)
 ) -> List[models.Candidate]:
     """
-    Retrieve all candidates with pagination.
+    Retrieve candidates, optionally filtered by name prefix and creation date.
+    Cursor-paginated on (created_at, id), see app/api/v1/pagination.py.
     """
-    candidates = db.query(models.Candidate).offset(skip).limit(limit).all()
-    return candidates
+    filters = [prefix_filter(models.Candidate.name, name_prefix)] if name_prefix else []
+    result = await paginate(db, models.Candidate, filters, page)
+    response.headers.update(result.headers(request.url))
+    return result.items
 
 @router.put("/{candidate_id}", response_model=schemas.Candidate)
-def update_candidate(
+async def update_candidate(
     candidate_id: int,
     candidate_in: schemas.CandidateUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> models.Candidate:
     """
     Update an existing candidate. Email cannot be updated via this endpoint.
     """
-    db_candidate = db.query(models.Candidate).filter(models.Candidate.id == candidate_id).first()
+    db_candidate = await db.get(models.Candidate, candidate_id)
     if db_candidate is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Candidate not found")
 
     update_data = candidate_in.model_dump(exclude_unset=True)
+    resume_changed = "resume_text" in update_data and update_data["resume_text"] != db_candidate.resume_text
     
     for key, value in update_data.items():
         setattr(db_candidate, key, value)
+
+    # New resume content invalidates the cached structured resume; it is re-parsed lazily on next use.
+    if resume_changed:
+        invalidate_resume_summary(db_candidate)
+        db_candidate.resume_content_hash = compute_content_hash(db_candidate.resume_text)
     
     db.add(db_candidate)
-    db.commit()
-    db.refresh(db_candidate)
+    await db.commit()
+    await db.refresh(db_candidate)
     return db_candidate
 
 @router.delete("/{candidate_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_candidate(
+async def delete_candidate(
     candidate_id: int, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    logger.info(f"Attempting to delete candidate with ID: {candidate_id}")
-    db_candidate = db.query(models.Candidate).filter(models.Candidate.id == candidate_id).first()
+    logger.info("Attempting to delete candidate with ID: %s", candidate_id)
+    # The ORM delete touches Candidate.interviews, so load it up front (no lazy loading on AsyncSession)
+    result = await db.execute(select(models.Candidate).options(selectinload(models.Candidate.interviews)).where(models.Candidate.id == candidate_id))
+    db_candidate = result.scalar_one_or_none()
     if db_candidate is None:
-        logger.warning(f"Candidate with ID {candidate_id} not found for deletion.")
+        logger.warning("Candidate with ID %s not found for deletion.", candidate_id)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Candidate not found")
 
     # Check for associated interviews
-    associated_interviews_count = db.query(models.Interview).filter(models.Interview.candidate_id == candidate_id).count()
+    count_result = await db.execute(select(func.count()).select_from(models.Interview).where(models.Interview.candidate_id == candidate_id))
+    associated_interviews_count = count_result.scalar_one()
     if associated_interviews_count > 0:
-        logger.warning(f"Attempt to delete candidate ID {candidate_id} failed: Candidate has {associated_interviews_count} associated interviews.")
+        logger.warning("Attempt to delete candidate ID %s failed: Candidate has %s associated interviews.", candidate_id, associated_interviews_count)
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, 
             detail=f"Cannot delete candidate: Candidate is associated with {associated_interviews_count} interview(s). Please delete or reassign them first."
         )
 
     try:
-        db.delete(db_candidate)
-        db.commit()
-        logger.info(f"Successfully deleted candidate with ID: {candidate_id}")
+        await db.delete(db_candidate)
+        await db.commit()
+        logger.info("Successfully deleted candidate with ID: %s", candidate_id)
     except Exception as e: # Catch potential commit errors, though the main one was caught by the check above
-        db.rollback()
-        logger.error(f"Error during deleting candidate ID {candidate_id} after checks: {e}", exc_info=True)
+        await db.rollback()
+        logger.error("Error during deleting candidate ID %s after checks: %s", candidate_id, e, exc_info=True)
         # This might indicate other integrity issues or a race condition if checks passed but commit failed.
         # For now, a generic 500 is okay, but could be more specific if other constraints are known.
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Could not delete candidate due to a database error: {str(e)}")
@@ -130,7 +159,7 @@ def delete_candidate(
 # New endpoint for creating candidate with resume upload
 @router.post("/upload-resume/", response_model=schemas.Candidate, status_code=status.HTTP_201_CREATED)
 async def create_candidate_with_resume_upload( # Made async to handle await for file.read()
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     name: str = Form(...),
     email: EmailStr = Form(...), # Use EmailStr for validation
     resume_file: UploadFile = File(...)
@@ -140,73 +169,52 @@ async def create_candidate_with_resume_upload( # Made async to handle await for
     The resume file will be parsed by an AI service to extract text.
     For .docx and .pdf, content will be extracted before sending to AI.
     """
-    existing_candidate = db.query(models.Candidate).filter(models.Candidate.email == email).first()
+    result = await db.execute(select(models.Candidate).where(models.Candidate.email == email))
+    existing_candidate = result.scalar_one_or_none()
     if existing_candidate:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A candidate with this email already exists."
         )
 
-    extracted_text_for_ai = ""
-    filename_lower = resume_file.filename.lower()
-
     try:
         await resume_file.seek(0) # Ensure file pointer is at the beginning
-        resume_content_bytes = await resume_file.read()
-        await resume_file.seek(0) # Reset pointer again in case it's needed by a library using the file object directly
-
-        if filename_lower.endswith(".txt"):
-            try:
-                extracted_text_for_ai = resume_content_bytes.decode('utf-8')
-            except UnicodeDecodeError:
-                try:
-                    extracted_text_for_ai = resume_content_bytes.decode('latin-1')
-                except UnicodeDecodeError as e:
-                    # logger.error(f"Unicode decode error for {resume_file.filename}: {e}")
-                    logger.error(f"Unicode decode error for {resume_file.filename}: {e}", exc_info=True)
-                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Could not decode .txt file '{resume_file.filename}\'. Please ensure it's UTF-8 or a common Western encoding.")
-        
-        elif filename_lower.endswith(".docx"):
-            try:
-                # python-docx needs a file-like object that supports seek, so use io.BytesIO
-                file_stream = io.BytesIO(resume_content_bytes)
-                doc = docx.Document(file_stream)
-                extracted_text_for_ai = "\n".join([para.text for para in doc.paragraphs])
-            except Exception as e:
-                # logger.error(f"Error parsing DOCX file {resume_file.filename}: {e}", exc_info=True)
-                logger.error(f"Error parsing DOCX file {resume_file.filename}: {e}", exc_info=True)
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error processing .docx file '{resume_file.filename}': {str(e)}")
-
-        elif filename_lower.endswith(".pdf"):
-            try:
-                # PyMuPDF (fitz) can open from bytes
-                pdf_document = fitz.open(stream=resume_content_bytes, filetype="pdf")
-                text_parts = []
-                for page_num in range(len(pdf_document)):
-                    page = pdf_document.load_page(page_num)
-                    text_parts.append(page.get_text())
-                extracted_text_for_ai = "\n".join(text_parts)
-                pdf_document.close()
-            except Exception as e:
-                # logger.error(f"Error parsing PDF file {resume_file.filename}: {e}", exc_info=True)
-                logger.error(f"Error parsing PDF file {resume_file.filename}: {e}", exc_info=True)
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error processing .pdf file '{resume_file.filename}': {str(e)}")
-        else:
-            # Fallback for unsupported types, or if you want to specifically disallow .doc
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported file type: {resume_file.filename}. Please upload .txt, .pdf, or .docx.")
+        # Read at most one byte past the limit: enough to reject oversized files without buffering them whole
+        resume_content_bytes = await resume_file.read(settings.RESUME_MAX_FILE_BYTES + 1)
+
+        # PDF/DOCX parsing is CPU-bound and runs in the resume extraction process pool,
+        # so large files do not block other requests on this worker.
+        try:
+            extracted_text_for_ai = await extract_resume_text(resume_content_bytes, resume_file.filename)
+        except UnsupportedResumeFormatError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except ResumeTooLargeError as e:
+            raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+        except ResumeExtractionBusyError as e:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+        except ResumeExtractionTimeoutError as e:
+            raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+        except ResumeExtractionError as e:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
         # Now, send the extracted text to the AI service if any text was extracted
+        parsed_resume_text = None
         if extracted_text_for_ai:
+            resume_text = extracted_text_for_ai
             parsed_resume_text = await parse_resume(resume_text=extracted_text_for_ai)
+            if parsed_resume_text.startswith("Error:"):
+                # Keep the raw text; the summary is produced lazily on first use (analysis_cache)
+                logger.warning("parse_resume failed for '%s', storing raw text only. %s", resume_file.filename, parsed_resume_text)
+                parsed_resume_text = None
         else:
             # This case might happen if a .txt was empty, or if a docx/pdf was empty or unparseable before exception
-            parsed_resume_text = f"[File: {resume_file.filename}, Type: {resume_file.content_type} - No content extracted or file was empty.]"
+            resume_text = f"[File: {resume_file.filename}, Type: {resume_file.content_type} - No content extracted or file was empty.]"
             
     except HTTPException: # Re-raise HTTPExceptions directly that were raised above
         raise
     except Exception as e:
         # logger.error(f"General error processing resume file {resume_file.filename}: {e}", exc_info=True)
-        logger.error(f"General error processing resume file {resume_file.filename}: {e}", exc_info=True)
+        logger.error("General error processing resume file %s: %s", resume_file.filename, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred while processing the resume file '{resume_file.filename}': {str(e)}"
@@ -217,9 +225,75 @@ async def create_candidate_with_resume_upload( # Made async to handle await for
     db_candidate = models.Candidate(
         name=name,
         email=email,
-        resume_text=parsed_resume_text # Store the AI parsed text
+        resume_text=resume_text, # Raw extracted text; the structured summary goes to resume_summary
+        resume_content_hash=compute_content_hash(extracted_text_for_ai) if extracted_text_for_ai else None
     )
+    if parsed_resume_text:
+        set_resume_summary(db_candidate, parsed_resume_text)
     db.add(db_candidate)
-    db.commit()
-    db.refresh(db_candidate)
-    return db_candidate 
\ No newline at end of file
+    await db.commit()
+    await db.refresh(db_candidate)
+    return db_candidate
+
+# --- Bulk resume ingestion ---
+@router.post("/bulk-upload/", response_model=schemas.BulkIngestionJobSummary, status_code=status.HTTP_202_ACCEPTED)
+async def start_bulk_resume_ingestion(
+    response: Response,
+    files: List[UploadFile] = File(...),
+    session_factory: async_sessionmaker = Depends(get_async_session_factory)
+) -> Any:
+    """
+    Starts creating candidates from many resumes at once: .zip archives and/or .txt/.pdf/.docx files.
+    Name and email are taken from each resume's text; files whose email or content already exists are
+    reported as duplicates. Returns immediately with the job id; progress is available at
+    GET /bulk-upload/{job_id} (polling) or GET /bulk-upload/{job_id}/events (SSE).
+    """
+    uploads = []
+    total_bytes = 0
+    try:
+        for upload in files:
+            # Upload files are closed when the request ends, so read them now (bounded by the total limit)
+            content = await upload.read(settings.BULK_INGEST_MAX_UPLOAD_BYTES - total_bytes + 1)
+            total_bytes += len(content)
+            if total_bytes > settings.BULK_INGEST_MAX_UPLOAD_BYTES:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Upload exceeds {settings.BULK_INGEST_MAX_UPLOAD_BYTES} bytes."
+                )
+            uploads.append((upload.filename, content))
+    finally:
+        for upload in files:
+            await upload.close()
+
+    try:
+        job = bulk_ingestion.start_job(uploads, session_factory)
+    except BulkIngestionError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    logger.info("Started bulk ingestion job %s with %s file(s).", job.id, len(job.items))
+    response.headers["Location"] = f"/api/v1/candidates/bulk-upload/{job.id}"
+    return job.summary()
+
+@router.get("/bulk-upload/{job_id}", response_model=schemas.BulkIngestionJobStatus)
+async def read_bulk_ingestion_job(job_id: str) -> Any:
+    """Current status of a bulk ingestion job, including the outcome of every file."""
+    job = bulk_ingestion.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bulk ingestion job not found")
+    return job.snapshot()
+
+@router.get("/bulk-upload/{job_id}/events")
+async def stream_bulk_ingestion_events(job_id: str):
+    """
+    SSE progress stream: a "progress" event per file state change (with the running counts),
+    then a final "complete" event with the job summary.
+    """
+    job = bulk_ingestion.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bulk ingestion job not found")
+
+    async def event_stream():
+        async for event, data in bulk_ingestion.subscribe(job):
+            yield {"event": event, "data": json.dumps(jsonable_encoder(data))}
+
+    return EventSourceResponse(event_stream())
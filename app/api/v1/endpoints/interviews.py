@@ -1,303 +1,430 @@
-print("DEBUG_INTERVIEWS: interviews.py MODULE EXECUTION STARTED") # THIS IS A VERY TOP LEVEL PRINT
 import logging
 from typing import List, Any, Optional
 import re # Added for robust question parsing
 import json # Added for JSON parsing
 import asyncio # For SSE streaming
 import uuid # For generating unique task IDs
+import hashlib
 import time # Added for the minimal test SSE stream
+from contextlib import aclosing
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sse_starlette.sse import EventSourceResponse # ADDED
-from sqlalchemy.orm import Session, joinedload # Import joinedload
-from sqlalchemy.ext.asyncio import AsyncSession # For async db sessions
+from pydantic import BaseModel
+from sqlalchemy.orm import selectinload
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker # For async db sessions
 
 from app.api.v1 import schemas # This now correctly refers to the schemas package
+from app.api.v1.pagination import PageParams, created_range_filters, paginate
+from app.core.config import settings
 # from ..schemas import ag_ui_events # No longer needed, ag_ui_events are part of 'schemas' package
 from app.db import models     # Import models
-from app.db.session import get_db, get_async_db # <<< ENSURE get_async_db IS IMPORTED HERE
+from app.db.session import get_async_db, get_async_session_factory
+from app.services import log_ingestion, task_queue
+from app.services.llm_cache import bypass_llm_cache
 # We might need AI services later for question generation
-from app.services.ai_services import generate_interview_questions, analyze_jd, parse_resume, generate_followup_questions_service, AIJsonParsingError # <<< ADDED generate_followup_questions_service
-from app.utils.json_parser import extract_capability_assessment_json # Import the new parser
-from app.services.ai_report_generator import generate_interview_report
-from sqlalchemy import select # For SQLAlchemy 2.0 style queries if you use them
+from app.services.ai_services import generate_interview_questions, stream_interview_questions, generate_followup_questions_service, AIJsonParsingError # <<< ADDED generate_followup_questions_service
+from app.services.analysis_cache import is_jd_analysis_fresh, is_resume_summary_fresh
+from app.services.question_pipeline import iter_preprocessing_stages, run_preprocessing_stages, STAGE_JD_ANALYSIS, STAGE_RESUME_PARSING
+from app.utils.json_parser import find_json_object, split_capability_assessment, StreamingJsonStringArrayParser, StreamingReportSplitter # Import the new parser
+from app.services.ai_report_generator import (
+    generate_interview_report,
+    stream_interview_report,
+    generate_report_from_assessments,
+    stream_report_from_assessments,
+    update_interview_report,
+    stream_updated_interview_report,
+    ReportGenerationError,
+)
+from app.services.segmented_report import prepare_segmented_report
+from app.services.report_refresh import REFRESH_INCREMENTAL, REFRESH_UNCHANGED, plan_report_refresh
+from app.services.report_prompt import COMPACTION_NONE, TranscriptEntry, build_report_prompt_inputs, format_transcript
+from sqlalchemy import select, delete, exists # SQLAlchemy 2.0 style queries (AsyncSession)
 from sqlalchemy.sql import func # Added for SQLAlchemy functions
-from jsonschema import validate, ValidationError
+from app.core.schema_registry import SCHEMA_CAPABILITY_ASSESSMENT, validate_payload
+from app.core.structured_output import SCHEMA_INTERVIEW_QUESTIONS, parse_structured_output
 
 router = APIRouter()
 logger = logging.getLogger(__name__) # Get logger early for use anywhere
 
+# Relationships serialized by schemas.Interview. AsyncSession cannot lazy-load, so every
+# endpoint returning an Interview loads them eagerly with these options.
+INTERVIEW_RESPONSE_OPTIONS = (
+    selectinload(models.Interview.job),
+    selectinload(models.Interview.candidate),
+    selectinload(models.Interview.questions),
+    selectinload(models.Interview.logs),
+    selectinload(models.Interview.generated_report),
+)
+
+async def _get_interview(db: AsyncSession, interview_id: int, *options, refresh: bool = False) -> Optional[models.Interview]:
+    """
+    Loads one interview with the given loader options.
+    refresh=True overwrites already-loaded state (e.g. server-side updated_at after a commit).
+    """
+    stmt = select(models.Interview).options(*options).where(models.Interview.id == interview_id)
+    if refresh:
+        stmt = stmt.execution_options(populate_existing=True)
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
 # Keep only this one route for now to test if the module loads completely
 @router.get("/{interview_id}/questions", response_model=List[schemas.Question])
-def get_questions_for_interview(
+async def get_questions_for_interview(
     interview_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> List[models.Question]:
     """
     Retrieves all questions associated with a specific interview.
     """
-    logger.debug(f"get_questions_for_interview called for interview_id: {interview_id}")
-    db_interview = db.query(models.Interview).filter(models.Interview.id == interview_id).first()
+    logger.debug("get_questions_for_interview called for interview_id: %s", interview_id)
+    db_interview = await _get_interview(db, interview_id, selectinload(models.Interview.questions))
     if not db_interview:
-        logger.warning(f"Interview not found for id: {interview_id} in get_questions_for_interview")
+        logger.warning("Interview not found for id: %s in get_questions_for_interview", interview_id)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Interview not found")
-    logger.debug(f"Returning {len(db_interview.questions)} questions for interview_id: {interview_id}")
+    logger.debug("Returning %s questions for interview_id: %s", len(db_interview.questions), interview_id)
     questions = db_interview.questions
     
     # Add any additional logic like filtering or pagination if needed
-    logger.debug(f"Interview {interview_id}: Fetched {len(questions)} questions from DB.")
+    logger.debug("Interview %s: Fetched %s questions from DB.", interview_id, len(questions))
     
     # Log the raw question data being returned
-    logger.info(f"Interview {interview_id}: Returning {len(questions)} questions to frontend. Raw data: {questions}")
+    logger.info("Interview %s: Returning %s questions to frontend.", interview_id, len(questions))
+    logger.debug("Interview %s: Raw data: %s", interview_id, questions)
     
     return questions
 
 # logger.debug("Temporarily commenting out other routes to isolate the issue...")
 
 @router.post("/", response_model=schemas.Interview, status_code=status.HTTP_201_CREATED)
-def create_interview(
+async def create_interview(
     interview_in: schemas.InterviewCreate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> models.Interview:
     # Placeholder implementation - replace with actual logic
     # Ensure job_id and candidate_id exist
-    job = db.query(models.Job).filter(models.Job.id == interview_in.job_id).first()
+    job = await db.get(models.Job, interview_in.job_id)
     if not job:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Job with id {interview_in.job_id} not found")
     
-    candidate = db.query(models.Candidate).filter(models.Candidate.id == interview_in.candidate_id).first()
+    candidate = await db.get(models.Candidate, interview_in.candidate_id)
     if not candidate:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Candidate with id {interview_in.candidate_id} not found")
         
     db_interview = models.Interview(**interview_in.model_dump())
     db.add(db_interview)
-    db.commit()
-    db.refresh(db_interview)
-    logger.info(f"Interview created with id {db_interview.id}")
+    await db.commit()
+    db_interview = await _get_interview(db, db_interview.id, *INTERVIEW_RESPONSE_OPTIONS, refresh=True)
+    logger.info("Interview created with id %s", db_interview.id)
     return db_interview
 
+def _interview_filters(job_id: Optional[int], candidate_id: Optional[int], status_filter: Optional[models.InterviewStatus]) -> list:
+    filters = []
+    if job_id is not None:
+        filters.append(models.Interview.job_id == job_id)
+    if candidate_id is not None:
+        filters.append(models.Interview.candidate_id == candidate_id)
+    if status_filter is not None:
+        filters.append(models.Interview.status == status_filter)
+    return filters
+
+def _summary_statement():
+    """Interviews with job title, candidate name, question/log counts and report presence, in one query."""
+    interview = models.Interview
+    # Correlated, so they are only evaluated for the rows of the page (index lookups on interview_id)
+    question_count = select(func.count(models.Question.id)).where(models.Question.interview_id == interview.id).correlate(interview).scalar_subquery()
+    log_count = select(func.count(models.InterviewLog.id)).where(models.InterviewLog.interview_id == interview.id).correlate(interview).scalar_subquery()
+    has_report = exists().where(models.Report.interview_id == interview.id).correlate(interview)
+    return (
+        select(
+            interview.id, interview.job_id, interview.candidate_id, interview.scheduled_at, interview.status,
+            interview.created_at, interview.updated_at,
+            models.Job.title.label("job_title"),
+            models.Candidate.name.label("candidate_name"),
+            question_count.label("question_count"),
+            log_count.label("log_count"),
+            has_report.label("has_report"),
+        )
+        .join(models.Job, models.Job.id == interview.job_id)
+        .join(models.Candidate, models.Candidate.id == interview.candidate_id)
+    )
+
+async def _summary_version(db: AsyncSession, filters: list) -> list:
+    """
+    Aggregates that change whenever a summary row of the filtered interviews can: their count and
+    latest update (status, schedule and log appends bump updated_at), the newest question, log and
+    report ids, and the latest job / candidate edit. One query, far cheaper than the page itself.
+    """
+    interview = models.Interview
+    stmt = select(
+        func.count(interview.id),
+        func.max(interview.updated_at),
+        select(func.max(models.Question.id)).scalar_subquery(),
+        select(func.max(models.InterviewLog.id)).scalar_subquery(),
+        select(func.max(models.Report.id)).scalar_subquery(),
+        select(func.max(models.Job.updated_at)).scalar_subquery(),
+        select(func.max(models.Candidate.updated_at)).scalar_subquery(),
+    ).where(*filters)
+    return list((await db.execute(stmt)).one())
+
+# Declared before /{interview_id}, which would otherwise match "summary"
+@router.get("/summary", response_model=List[schemas.InterviewSummary])
+async def read_interview_summaries(
+    request: Request,
+    job_id: Optional[int] = None,
+    candidate_id: Optional[int] = None,
+    status_filter: Optional[models.InterviewStatus] = Query(None, alias="status"),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db)
+) -> Response:
+    """
+    Interview list for display: each interview with its job title, candidate name, question and
+    log counts and whether it has a report, without loading the children. Same filters and
+    cursor pagination as GET /interviews/.
+
+    The ETag is derived from the query parameters and a few aggregates of the filtered interviews
+    (see _summary_version), so a request with a matching If-None-Match gets 304 Not Modified
+    without running the page query. Any change in the filtered set invalidates all its pages.
+    The timestamps have second precision: two edits of one interview within the same second, with
+    a revalidation in between, can go unnoticed until the next change.
+    """
+    filters = _interview_filters(job_id, candidate_id, status_filter)
+    version = await _summary_version(db, filters + created_range_filters(models.Interview, page.created_after, page.created_before))
+    etag_source = json.dumps([version, sorted(request.query_params.multi_items())], default=str)
+    etag = '"' + hashlib.sha256(etag_source.encode("utf-8")).hexdigest()[:32] + '"'
+    if_none_match = _if_none_match_tags(request)
+    if etag in if_none_match or "*" in if_none_match:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    result = await paginate(db, models.Interview, filters, page, stmt=_summary_statement())
+    body = jsonable_encoder([
+        schemas.InterviewSummary(**{**row, "status": row["status"].value, "has_report": bool(row["has_report"])})
+        for row in result.items
+    ])
+    headers = result.headers(request.url)
+    headers["ETag"] = etag
+    return JSONResponse(content=body, headers=headers)
+
+def _if_none_match_tags(request: Request) -> set:
+    header = request.headers.get("if-none-match", "")
+    if header.strip() == "*":
+        return {"*"}
+    # Weak comparison (RFC 9110): a W/ prefix added by a proxy does not prevent the match
+    return {tag.strip().removeprefix("W/") for tag in header.split(",") if tag.strip()}
+
 @router.get("/{interview_id}", response_model=schemas.Interview)
-def read_interview_by_id(
+async def read_interview_by_id(
     interview_id: int, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> models.Interview:
-    db_interview = (
-        db.query(models.Interview)
-        .options(joinedload(models.Interview.job), joinedload(models.Interview.candidate))
-        .filter(models.Interview.id == interview_id)
-        .first()
-    )
+    db_interview = await _get_interview(db, interview_id, *INTERVIEW_RESPONSE_OPTIONS)
     if db_interview is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Interview not found")
     return db_interview
 
 @router.get("/", response_model=List[schemas.Interview])
-def read_interviews(
-    skip: int = 0, 
-    limit: int = 100, 
+async def read_interviews(
+    request: Request,
+    response: Response,
     job_id: Optional[int] = None,
     candidate_id: Optional[int] = None,
-    db: Session = Depends(get_db)
+    status_filter: Optional[models.InterviewStatus] = Query(None, alias="status"),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db)
 ) -> List[models.Interview]:
-    # Placeholder implementation - replace with actual logic
-    query = db.query(models.Interview)
-    if job_id is not None:
-        query = query.filter(models.Interview.job_id == job_id)
-    if candidate_id is not None:
-        query = query.filter(models.Interview.candidate_id == candidate_id)
-    
-    interviews = query.offset(skip).limit(limit).all()
-    return interviews
+    """
+    Retrieve interviews, optionally filtered by job, candidate, status and creation date.
+    Cursor-paginated on (created_at, id), see app/api/v1/pagination.py.
+    """
+    filters = _interview_filters(job_id, candidate_id, status_filter)
+    result = await paginate(db, models.Interview, filters, page, options=INTERVIEW_RESPONSE_OPTIONS)
+    response.headers.update(result.headers(request.url))
+    return result.items
 
 @router.put("/{interview_id}", response_model=schemas.Interview)
-def update_interview(
+async def update_interview(
     interview_id: int, 
     interview_in: schemas.InterviewUpdate, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> models.Interview:
-    logger.info(f"Update_interview called for ID: {interview_id} with input data: {interview_in.model_dump()}")
+    logger.info("Update_interview called for ID: %s with input data: %s", interview_id, interview_in.model_dump())
 
-    db_interview = db.query(models.Interview).filter(models.Interview.id == interview_id).first()
+    db_interview = await _get_interview(db, interview_id)
     if db_interview is None:
-        logger.warning(f"Interview not found for ID: {interview_id} during update attempt.")
+        logger.warning("Interview not found for ID: %s during update attempt.", interview_id)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Interview not found")
     
-    logger.debug(f"Interview ID {interview_id} - Before update: status='{db_interview.status}'")
+    logger.debug("Interview ID %s - Before update: status='%s'", interview_id, db_interview.status)
 
     update_data = interview_in.model_dump(exclude_unset=True)
-    logger.info(f"Interview ID {interview_id} - Parsed update_data: {update_data}")
+    logger.info("Interview ID %s - Parsed update_data: %s", interview_id, update_data)
 
     for field, value in update_data.items():
-        logger.debug(f"Interview ID {interview_id} - Setting field '{field}' to '{value}'")
+        logger.debug("Interview ID %s - Setting field '%s' to '%s'", interview_id, field, value)
         setattr(db_interview, field, value)
     
-    logger.debug(f"Interview ID {interview_id} - After setattr, before commit: status='{db_interview.status}'")
+    logger.debug("Interview ID %s - After setattr, before commit: status='%s'", interview_id, db_interview.status)
         
     try:
         db.add(db_interview)
-        db.commit()
-        logger.info(f"Interview ID {interview_id} - db.commit() executed successfully.")
+        await db.commit()
+        logger.info("Interview ID %s - db.commit() executed successfully.", interview_id)
     except Exception as e:
-        logger.error(f"Interview ID {interview_id} - Error during db.commit(): {str(e)} --- repr(e): {repr(e)}", exc_info=True)
-        db.rollback()
+        logger.error("Interview ID %s - Error during db.commit(): %s --- repr(e): %s", interview_id, str(e), repr(e), exc_info=True)
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Database commit error: {str(e)}")
 
     try:
-        db.refresh(db_interview)
-        logger.info(f"Interview ID {interview_id} - db.refresh() executed successfully.")
+        db_interview = await _get_interview(db, interview_id, *INTERVIEW_RESPONSE_OPTIONS, refresh=True)
+        logger.info("Interview ID %s - db.refresh() executed successfully.", interview_id)
     except Exception as e:
-        logger.error(f"Interview ID {interview_id} - Error during db.refresh(): {e}", exc_info=True)
+        logger.error("Interview ID %s - Error during db.refresh(): %s", interview_id, e, exc_info=True)
         # If refresh fails, the commit likely succeeded.
 
-    logger.info(f"Interview ID {interview_id} - After refresh: status='{db_interview.status}'")
-    logger.info(f"Update_interview for ID: {interview_id} completed. Returning updated interview.")
+    logger.info("Interview ID %s - After refresh: status='%s'", interview_id, db_interview.status)
+    logger.info("Update_interview for ID: %s completed. Returning updated interview.", interview_id)
     return db_interview
 
 @router.delete("/{interview_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_interview(
+async def delete_interview(
     interview_id: int, 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Placeholder implementation - replace with actual logic
-    db_interview = db.query(models.Interview).filter(models.Interview.id == interview_id).first()
+    # The delete-orphan cascades need the child collections loaded (no lazy loading on AsyncSession)
+    db_interview = await _get_interview(
+        db, interview_id,
+        selectinload(models.Interview.questions),
+        selectinload(models.Interview.logs),
+        selectinload(models.Interview.generated_report)
+    )
     if db_interview is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Interview not found")
-    db.delete(db_interview)
-    db.commit()
+    await db.delete(db_interview)
+    await db.commit()
     return
 
-@router.post("/{interview_id}/generate-questions", response_model=schemas.InterviewWithQuestions, status_code=status.HTTP_201_CREATED)
+def _parse_question_texts(generated_questions_text: str, log_prefix: str) -> List[str]:
+    """
+    Parses the LLM question-generation output into a list of question strings.
+    Expects {"questions": [...]} (whole output, or in a ```json block / prose); falls back to line splitting.
+    """
+    logger.debug("%s: ---- RAW LLM OUTPUT START ----\n%s", log_prefix, generated_questions_text)
+    logger.info("%s: ---- RAW LLM OUTPUT END ---- (Length: %s)", log_prefix, len(generated_questions_text) )
+
+    # Structured output returns the object itself; free text has it located (fenced or plain)
+    parse_result = parse_structured_output(SCHEMA_INTERVIEW_QUESTIONS, generated_questions_text)
+    question_texts = []
+    if parse_result.value is not None:
+        question_texts = [q.strip() for q in parse_result.value["questions"] if q.strip()]
+        logger.info("%s: Parsed %s questions from JSON object.", log_prefix, len(question_texts))
+    else:
+        match = find_json_object(generated_questions_text, "questions")
+        json_to_parse = generated_questions_text[match.start:match.end] if match else generated_questions_text
+        logger.warning("%s: JSON解析或schema校验失败, falling back to line splitting.", log_prefix, extra={"schema_errors": [violation.as_dict() for violation in parse_result.errors], "raw_output_type": type(generated_questions_text), "raw_output_len": len(generated_questions_text), "parsed_attempt_type": type(json_to_parse), "parsed_attempt_len": len(json_to_parse), "parsed_attempt_content": json_to_parse[:500] + "..." if len(json_to_parse) > 500 else json_to_parse})
+
+        # Fallback logic: split the content that was attempted for JSON parsing (json_to_parse)
+        raw_question_lines = [q.strip() for q in json_to_parse.split('\n') if q.strip()]
+
+        # Filter out common JSON structural lines or markdown remnants from fallback
+        for line in raw_question_lines:
+            temp_line = line.strip()
+            # More robustly skip JSON structural lines and markdown
+            if temp_line in ["{", "}", "[", "]", "],", "```json", "```"] or temp_line.lower().startswith(('"questions":', 'questions:')):
+                continue
+
+            # Remove typical list item prefixes (numbers, bullets) more carefully
+            cleaned_line = re.sub(r"^\\s*([\\d\\.\\-\\\* 、>]+\\s*)+", "", line).strip()
+
+            # Remove surrounding quotes if they are likely from JSON string representation
+            if cleaned_line.startswith('"') and cleaned_line.endswith('"'):
+                cleaned_line = cleaned_line[1:-1].strip()
+            # Remove trailing comma if it's likely from JSON array
+            if cleaned_line.endswith(','):
+                cleaned_line = cleaned_line[:-1].strip()
+
+            if cleaned_line: # Add if not empty after cleaning
+                question_texts.append(cleaned_line)
+        logger.info("%s: Fallback模式获得%s个问题 after cleaning. Original lines: %s", log_prefix, len(question_texts), len(raw_question_lines), extra={"cleaned_questions": question_texts})
+
+    return question_texts
+
+@router.post(
+    "/{interview_id}/generate-questions",
+    response_model=schemas.InterviewWithQuestions,
+    status_code=status.HTTP_201_CREATED,
+    responses={status.HTTP_202_ACCEPTED: {"model": schemas.BackgroundTaskRead, "description": "Queued (background=true)"}}
+)
 async def generate_questions_for_interview_endpoint(
     interview_id: int, 
-    db: Session = Depends(get_db)
-) -> models.Interview:
+    background: bool = False,
+    regenerate: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    session_factory: async_sessionmaker = Depends(get_async_session_factory)
+) -> Any:
     """
     Generates interview questions for a specific interview based on job description and candidate resume.
+    With background=true the work is queued instead: 202 + task resource (poll /api/v1/tasks/{task_id}).
+    regenerate=true skips the LLM response cache and asks the model for a fresh set.
     """
-    logger.info(f"Starting question generation for interview {interview_id}")
+    if background:
+        return await _submit_interview_task(db, session_factory, TASK_GENERATE_QUESTIONS, interview_id)
+    return await _generate_questions(db, interview_id, regenerate=regenerate)
+
+async def _generate_questions(db: AsyncSession, interview_id: int, regenerate: bool = False) -> models.Interview:
+    """Question generation shared by the endpoint and the background task. Raises HTTPException."""
+    logger.info("Starting question generation for interview %s", interview_id)
     
-    # Get interview and validate
-    db_interview = db.query(models.Interview).filter(models.Interview.id == interview_id).first()
+    # Get interview (with job and candidate) and validate
+    db_interview = await _get_interview(db, interview_id, selectinload(models.Interview.job), selectinload(models.Interview.candidate))
     if not db_interview:
-        logger.warning(f"Interview {interview_id} not found")
+        logger.warning("Interview %s not found", interview_id)
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Interview not found")
 
-    # Ensure job and candidate are loaded
-    if not db_interview.job: 
-        logger.debug(f"Lazy loading job for interview {interview_id}")
-        db.refresh(db_interview, attribute_names=['job']) 
-    if not db_interview.candidate:
-        logger.debug(f"Lazy loading candidate for interview {interview_id}")
-        db.refresh(db_interview, attribute_names=['candidate'])
-
     # Validate required data
     if not db_interview.job or not db_interview.job.description:
-        logger.warning(f"Job description missing for interview {interview_id}")
+        logger.warning("Job description missing for interview %s", interview_id)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Job description (JD) not found for this interview.")
     if not db_interview.candidate or not db_interview.candidate.resume_text: 
-        logger.warning(f"Candidate resume missing for interview {interview_id}")
+        logger.warning("Candidate resume missing for interview %s", interview_id)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Candidate resume text not found for this interview.")
 
     try:
-        # Step 1: Analyze JD
-        logger.info(f"Interview {interview_id}: Starting JD analysis")
-        analyzed_jd_text = await analyze_jd(jd_text=db_interview.job.description)
+        # Steps 1 & 2: Analyze JD and parse resume concurrently (both persisted, see analysis_cache)
+        logger.info("Interview %s: Starting JD analysis and resume parsing", interview_id)
+        stage_results = await run_preprocessing_stages(db, db_interview.job, db_interview.candidate)
+        analyzed_jd_text = stage_results[STAGE_JD_ANALYSIS]
+        parsed_resume_text = stage_results[STAGE_RESUME_PARSING]
+        await db.commit() # Persist whichever analyses succeeded, even if a later step fails
         if analyzed_jd_text.startswith("Error:"):
-            logger.error(f"AI service error analyzing JD for interview {interview_id}: {analyzed_jd_text}")
+            logger.error("AI service error analyzing JD for interview %s: %s", interview_id, analyzed_jd_text)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"AI service failed to analyze JD: {analyzed_jd_text}")
-        logger.info(f"Interview {interview_id}: JD analysis completed successfully")
-        
-        # Step 2: Parse Resume
-        logger.info(f"Interview {interview_id}: Starting resume parsing")
-        parsed_resume_text = await parse_resume(resume_text=db_interview.candidate.resume_text)
         if parsed_resume_text.startswith("Error:"):
-            logger.error(f"AI service error parsing resume for interview {interview_id}: {parsed_resume_text}")
+            logger.error("AI service error parsing resume for interview %s: %s", interview_id, parsed_resume_text)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"AI service failed to parse resume: {parsed_resume_text}")
-        logger.info(f"Interview {interview_id}: Resume parsing completed successfully")
+        logger.info("Interview %s: JD analysis and resume parsing completed successfully", interview_id)
 
         # Step 3: Generate Questions
-        logger.info(f"Interview {interview_id}: Starting question generation")
-        generated_questions_text = await generate_interview_questions(
-            analyzed_jd_info=analyzed_jd_text,
-            structured_resume_info=parsed_resume_text
-        )
-        
-        logger.info(f"Interview {interview_id}: ---- RAW LLM OUTPUT START ----")
-        logger.info(generated_questions_text)
-        logger.info(f"Interview {interview_id}: ---- RAW LLM OUTPUT END ---- (Length: {len(generated_questions_text)})" )
-
-        # Attempt to extract JSON from markdown code block
-        json_to_parse = generated_questions_text
-        logger.info(f"Interview {interview_id}: Initial json_to_parse: '''{json_to_parse}''' (Length: {len(json_to_parse)})" )
-
-        match = re.search(r"```json\s*(\{[\s\S]*?\})\s*```", generated_questions_text, re.DOTALL)
-        if match:
-            json_to_parse = match.group(1)
-            logger.info(f"Interview {interview_id}: Extracted JSON from markdown: '''{json_to_parse}''' (Length: {len(json_to_parse)})" )
-        else:
-            logger.info(f"Interview {interview_id}: Regex did NOT match markdown block.")
-            stripped_text = generated_questions_text.strip()
-            if stripped_text.startswith("{") and stripped_text.endswith("}"):
-                 json_to_parse = stripped_text
-                 logger.info(f"Interview {interview_id}: Detected plain JSON: '''{json_to_parse}''' (Length: {len(json_to_parse)})" )
-            else:
-                logger.info(f"Interview {interview_id}: No markdown or plain JSON detected, json_to_parse remains raw: '''{json_to_parse}''' (Length: {len(json_to_parse)})" )
+        logger.info("Interview %s: Starting question generation", interview_id)
+        with bypass_llm_cache(regenerate):
+            generated_questions_text = await generate_interview_questions(
+                analyzed_jd_info=analyzed_jd_text,
+                structured_resume_info=parsed_resume_text
+            )
         
-        # Process generated questions
-        SCHEMA = {
-            "type": "object",
-            "properties": {
-                "questions": {
-                    "type": "array",
-                    "items": {"type": "string"}
-                }
-            },
-            "required": ["questions"]
-        }
-        question_texts = []
-        try:
-            logger.info(f"Interview {interview_id}: Attempting json.loads on: '''{json_to_parse}'''")
-            parsed = json.loads(json_to_parse) # Use json_to_parse here
-            validate(instance=parsed, schema=SCHEMA)
-            question_texts = [q.strip() for q in parsed["questions"] if isinstance(q, str) and q.strip()]
-            logger.info(f"Interview {interview_id}: Parsed {len(question_texts)} questions from JSON object.")
-        except Exception as e:
-            logger.warning(f"Interview {interview_id}: JSON解析或schema校验失败. Reason: {e}", extra={"raw_output_type": type(generated_questions_text), "raw_output_len": len(generated_questions_text), "parsed_attempt_type": type(json_to_parse), "parsed_attempt_len": len(json_to_parse), "parsed_attempt_content": json_to_parse[:500] + "..." if len(json_to_parse) > 500 else json_to_parse})
-            
-            question_texts = [] # Ensure it's empty before fallback
-            # Fallback logic: split the content that was attempted for JSON parsing (json_to_parse)
-            raw_question_lines = [q.strip() for q in json_to_parse.split('\n') if q.strip()]
-            
-            # Filter out common JSON structural lines or markdown remnants from fallback
-            for line in raw_question_lines:
-                temp_line = line.strip()
-                # More robustly skip JSON structural lines and markdown
-                if temp_line in ["{", "}", "[", "]", "],", "```json", "```"] or temp_line.lower().startswith(('"questions":', 'questions:')):
-                    continue
-                
-                # Remove typical list item prefixes (numbers, bullets) more carefully
-                cleaned_line = re.sub(r"^\\s*([\\d\\.\\-\\\* 、>]+\\s*)+", "", line).strip()
-
-                # Remove surrounding quotes if they are likely from JSON string representation
-                if cleaned_line.startswith('"') and cleaned_line.endswith('"'):
-                    cleaned_line = cleaned_line[1:-1].strip()
-                # Remove trailing comma if it's likely from JSON array
-                if cleaned_line.endswith(','):
-                    cleaned_line = cleaned_line[:-1].strip()
-                
-                if cleaned_line: # Add if not empty after cleaning
-                    question_texts.append(cleaned_line)
-            logger.info(f"Interview {interview_id}: Fallback模式获得{len(question_texts)}个问题 after cleaning. Original lines: {len(raw_question_lines)}", extra={"cleaned_questions": question_texts})
+        question_texts = _parse_question_texts(generated_questions_text, log_prefix=f"Interview {interview_id}")
 
         # Delete existing questions
-        logger.debug(f"Interview {interview_id}: Deleting existing questions")
-        db.query(models.Question).filter(models.Question.interview_id == interview_id).delete(synchronize_session=False)
+        logger.debug("Interview %s: Deleting existing questions", interview_id)
+        await db.execute(delete(models.Question).where(models.Question.interview_id == interview_id))
 
         if not question_texts:
-            logger.warning(f"Interview {interview_id}: AI generated an empty list of questions")
+            logger.warning("Interview %s: AI generated an empty list of questions", interview_id)
         else:
             # Add new questions
-            logger.debug(f"Interview {interview_id}: Adding {len(question_texts)} new questions")
+            logger.debug("Interview %s: Adding %s new questions", interview_id, len(question_texts))
             for i, q_text in enumerate(question_texts):
                 db_question = models.Question(
                     question_text=q_text, 
@@ -307,163 +434,187 @@ async def generate_questions_for_interview_endpoint(
                 db.add(db_question)
         
         # Update interview status
-        logger.debug(f"Interview {interview_id}: Updating status to QUESTIONS_GENERATED")
+        logger.debug("Interview %s: Updating status to QUESTIONS_GENERATED", interview_id)
         db_interview.status = "QUESTIONS_GENERATED"
         db.add(db_interview)
 
         # Commit changes
-        logger.debug(f"Interview {interview_id}: Committing changes to database")
-        db.commit()
-        db.refresh(db_interview)
-        logger.info(f"Interview {interview_id}: Successfully generated {len(question_texts)} questions. Status updated to QUESTIONS_GENERATED")
+        logger.debug("Interview %s: Committing changes to database", interview_id)
+        await db.commit()
+        db_interview = await _get_interview(db, interview_id, *INTERVIEW_RESPONSE_OPTIONS, refresh=True)
+        logger.info("Interview %s: Successfully generated %s questions. Status updated to QUESTIONS_GENERATED", interview_id, len(question_texts))
 
     except HTTPException:
-        logger.error(f"Interview {interview_id}: HTTP exception occurred", exc_info=True)
+        logger.error("Interview %s: HTTP exception occurred", interview_id, exc_info=True)
         raise
     except Exception as e:
-        logger.error(f"Interview {interview_id}: Unexpected error during question generation: {e}", exc_info=True)
-        db.rollback()
+        logger.error("Interview %s: Unexpected error during question generation: %s", interview_id, e, exc_info=True)
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"An unexpected error occurred: {str(e)}")
 
     return db_interview
 
 @router.post("/{interview_id}/logs", response_model=schemas.InterviewLog, status_code=status.HTTP_201_CREATED)
-def create_interview_log_entry(
+async def create_interview_log_entry(
     interview_id: int,
     log_in: schemas.InterviewLogCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> models.InterviewLog:
-    db_interview = db.query(models.Interview).filter(models.Interview.id == interview_id).first()
-    if not db_interview:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Interview not found")
-
-    # Potentially validate question_id if provided
-    if log_in.question_id:
-        db_question = db.query(models.Question).filter(models.Question.id == log_in.question_id, models.Question.interview_id == interview_id).first()
-        if not db_question:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, 
-                                detail=f"Question with id {log_in.question_id} not found for this interview.")
-        # If question_text_snapshot is not provided but question_id is, populate it from the question
-        if not log_in.question_text_snapshot and db_question:
-            log_in.question_text_snapshot = db_question.question_text
-
+    """
+    Appends one log entry. Its order_num is assigned by the server (the next position in the
+    interview), any order_num sent by the client is ignored. See app/services/log_ingestion.py.
+    """
     if not log_in.question_text_snapshot and not log_in.question_id:
          # Or decide if question_text_snapshot can be truly optional
-        logger.warning(f"Creating InterviewLog for interview {interview_id} without explicit question text or ID.")
+        logger.warning("Creating InterviewLog for interview %s without explicit question text or ID.", interview_id)
 
+    try:
+        ingested = await log_ingestion.ingest_log_entries(db, interview_id, [log_in])
+    except log_ingestion.InterviewNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Interview not found")
+    except log_ingestion.UnknownQuestionsError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail=f"Question with id {log_in.question_id} not found for this interview.")
 
-    db_log = models.InterviewLog(**log_in.model_dump(), interview_id=interview_id)
-    db.add(db_log)
-    db.commit()
-    db.refresh(db_log)
-    logger.info(f"InterviewLog entry created with id {db_log.id} for interview {interview_id}")
+    db_log = await db.get(models.InterviewLog, ingested.ids[0])
+    logger.info("InterviewLog entry created with id %s (order_num %s) for interview %s", db_log.id, db_log.order_num, interview_id)
     return db_log
 
+@router.post(
+    "/{interview_id}/logs/bulk",
+    response_model=schemas.InterviewLogBulkResult,
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra={"requestBody": {"required": True, "content": {
+        "application/json": {"schema": {"type": "array", "items": schemas.InterviewLogCreate.model_json_schema()}},
+        "application/x-ndjson": {"schema": {"type": "string", "description": "One InterviewLogCreate JSON object per line."}},
+    }}},
+)
+async def create_interview_log_entries_bulk(
+    interview_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+) -> schemas.InterviewLogBulkResult:
+    """
+    Creates many log entries in one request and one transaction: a JSON array, or NDJSON
+    (Content-Type: application/x-ndjson) parsed as it streams in. order_num is assigned in body
+    order after the interview's last entry. See app/services/log_ingestion.py.
+    """
+    try:
+        chunks = log_ingestion.read_limited(request.stream())
+        if log_ingestion.is_ndjson(request.headers.get("content-type")):
+            entries = await log_ingestion.parse_ndjson_entries(chunks)
+        else:
+            entries = log_ingestion.parse_json_entries(b"".join([chunk async for chunk in chunks]))
+        ingested = await log_ingestion.ingest_log_entries(db, interview_id, entries)
+    except log_ingestion.InvalidLogEntriesError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=e.errors)
+    except log_ingestion.LogBatchTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except (log_ingestion.InterviewNotFoundError, log_ingestion.UnknownQuestionsError) as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return schemas.InterviewLogBulkResult(
+        created_ids=ingested.ids, first_order_num=ingested.first_order_num, last_order_num=ingested.last_order_num
+    )
+
 @router.get("/{interview_id}/logs", response_model=List[schemas.InterviewLog])
-def get_interview_log_entries(
+async def get_interview_log_entries(
     interview_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> List[models.InterviewLog]:
-    db_interview = db.query(models.Interview).options(joinedload(models.Interview.logs)).filter(models.Interview.id == interview_id).first()
+    db_interview = await _get_interview(db, interview_id, selectinload(models.Interview.logs))
     if not db_interview:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Interview not found")
     
     # Logs are already ordered by order_num due to the relationship's order_by config
     return db_interview.logs
 
-@router.post("/{interview_id}/generate-report", response_model=schemas.Report)
-async def trigger_generate_interview_report(
-    interview_id: int,
-    db: Session = Depends(get_db)
-) -> Any: # Changed to Any temporarily as db_report is a SQLAlchemy model
-    logger.info(f"Triggering report generation for interview ID: {interview_id}")
-    # Use joinedload to fetch related job, candidate, and logs efficiently
-    db_interview = (
-        db.query(models.Interview)
-        .options(
-            joinedload(models.Interview.job),
-            joinedload(models.Interview.candidate),
-            joinedload(models.Interview.logs) # Eagerly load logs
-        )
-        .filter(models.Interview.id == interview_id)
-        .first()
-    )
-
-    if not db_interview:
-        logger.warning(f"Interview not found for ID: {interview_id} when generating report.")
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Interview not found")
-
-    if not db_interview.job or not db_interview.job.description:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Job description not available for this interview.")
-    if not db_interview.candidate or not db_interview.candidate.resume_text:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Candidate resume not available for this interview.")
+# Relationships read while building a report
+REPORT_INPUT_OPTIONS = (
+    selectinload(models.Interview.job),
+    selectinload(models.Interview.candidate),
+    selectinload(models.Interview.logs),
+    selectinload(models.Interview.generated_report),
+)
 
-    # --- Construct dialogue string from structured logs ---
-    dialogue_parts = []
+def _build_report_transcript(db_interview: models.Interview, interview_id: int) -> List[TranscriptEntry]:
+    """
+    Builds the Q/A transcript the report is generated from.
+    Raises HTTPException(400) when the interview has no usable conversation.
+    """
+    # --- Construct transcript from structured logs ---
     if db_interview.logs: # Check if logs exist and are loaded
         # Logs should be ordered by order_num due to relationship config
-        for i, log_entry in enumerate(db_interview.logs):
-            question_text = log_entry.question_text_snapshot or "(Ad-hoc Question)" 
-            answer_text = log_entry.full_dialogue_text or "(No answer recorded)"
-            dialogue_parts.append(f"Q{i+1}: {question_text}\nA{i+1}: {answer_text}")
-        dialogue_for_report = "\n\n".join(dialogue_parts) # Assign to dialogue_for_report
-        logger.info(f"Using structured logs for report generation for interview {interview_id}. Dialogue length: {len(dialogue_for_report)}")
+        transcript = [
+            TranscriptEntry(
+                question=log_entry.question_text_snapshot or "(Ad-hoc Question)",
+                answer=log_entry.full_dialogue_text or "(No answer recorded)"
+            )
+            for log_entry in db_interview.logs
+        ]
+        logger.info("Using structured logs for report generation for interview %s. Entries: %s", interview_id, len(transcript))
     elif db_interview.conversation_log: # Fallback to old field if no structured logs (should be phased out)
-        logger.warning(f"Interview {interview_id}: No structured logs found. Falling back to conversation_log field for report generation.")
+        logger.warning("Interview %s: No structured logs found. Falling back to conversation_log field for report generation.", interview_id)
         # Ensure conversation_log is not None or empty before assigning
         if not db_interview.conversation_log.strip(): # Check if it's empty or just whitespace
-            logger.error(f"Interview {interview_id}: Fallback conversation_log is empty. Cannot generate report.")
+            logger.error("Interview %s: Fallback conversation_log is empty. Cannot generate report.", interview_id)
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No valid interview conversation log found (fallback is empty) to generate a report.")
-        dialogue_for_report = db_interview.conversation_log
+        transcript = [TranscriptEntry(question=None, answer=db_interview.conversation_log)]
     else:
-        logger.error(f"Interview {interview_id}: No interview logs (structured or fallback) found. Cannot generate report.")
-        # Initialize dialogue_for_report to an empty string or handle appropriately if this path means error
-        dialogue_for_report = "" # Initialize to prevent UnboundLocalError before raising
+        logger.error("Interview %s: No interview logs (structured or fallback) found. Cannot generate report.", interview_id)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No valid interview conversation log found to generate report.")
     # ---
 
-    if not dialogue_for_report.strip():
-        logger.error(f"Interview {interview_id}: Final dialogue content for report is empty or whitespace. Cannot generate report.")
+    if not format_transcript(transcript).strip():
+        logger.error("Interview %s: Final dialogue content for report is empty or whitespace. Cannot generate report.", interview_id)
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Interview dialogue content is empty. Cannot generate report.")
 
-    logger.info(f"Calling AI service to generate report for interview ID: {interview_id} using processed dialogue input.")
-    try:
-        # generate_interview_report is now an async function, so await is needed.
-        generated_report_text = await generate_interview_report(
-            conversation_log_str=dialogue_for_report,
-            job_description=db_interview.job.description,
-            candidate_resume=db_interview.candidate.resume_text
-            # llm_model_name and temperature will use defaults from the service
-        )
-        logger.info(f"Successfully generated interview report text for interview {interview_id}.")
-
-    except Exception as e:
-        logger.error(f"AI service failed to generate report for interview {interview_id}: {e}", exc_info=True)
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"AI service failed: {str(e)}")
+    return transcript
+
+
+async def _prepare_report_context(db: AsyncSession, db_interview: models.Interview, interview_id: int):
+    """Returns (analyzed_jd_text, structured_resume_text) for the report prompt."""
+    # The report prompt expects the analyzed JD and structured resume; reuse the cached ones
+    # (computed concurrently on a miss) and fall back to the raw texts if the AI service fails.
+    stage_results = await run_preprocessing_stages(db, db_interview.job, db_interview.candidate)
+    await db.commit()
+    analyzed_jd_text = stage_results[STAGE_JD_ANALYSIS]
+    if analyzed_jd_text.startswith("Error:"):
+        logger.warning("Interview %s: JD analysis unavailable (%s). Using raw job description for the report.", interview_id, analyzed_jd_text)
+        analyzed_jd_text = db_interview.job.description
+
+    structured_resume_text = stage_results[STAGE_RESUME_PARSING]
+    if structured_resume_text.startswith("Error:"):
+        logger.warning("Interview %s: Structured resume unavailable (%s). Using raw resume text for the report.", interview_id, structured_resume_text)
+        structured_resume_text = db_interview.candidate.resume_text
+
+    return analyzed_jd_text, structured_resume_text
+
+
+def _checked_radar_data(radar_data: Optional[dict], log_prefix: str) -> Optional[dict]:
+    """radar_data if it matches the capability assessment schema (numeric 1-5 scores), else None."""
+    if radar_data is None:
+        return None
+    violations = validate_payload(SCHEMA_CAPABILITY_ASSESSMENT, radar_data)
+    if violations:
+        logger.warning("%s: Discarding invalid CANDIDATE_CAPABILITY_ASSESSMENT_JSON: %s", log_prefix, [violation.as_dict() for violation in violations])
+        return None
+    return radar_data
+
+def _split_report_text(generated_report_text: str, interview_id: int):
+    """Splits the raw LLM report into (text_report_content, radar_scores_json)."""
+    # One pass locates the ```json block (or bare object) and cuts it out of the text for cleaner display
+    text_report_content, radar_scores_json = split_capability_assessment(generated_report_text)
+    radar_scores_json = _checked_radar_data(radar_scores_json, f"Interview {interview_id}")
+    if radar_scores_json:
+        logger.info("Successfully parsed radar_data for interview %s: %s", interview_id, radar_scores_json)
+    else:
+        logger.warning("Could not extract CANDIDATE_CAPABILITY_ASSESSMENT_JSON from report for interview %s. Radar data will be empty.", interview_id)
 
-    # --- Process and save the report --- 
-    radar_scores_json = None
-    text_report_content = generated_report_text
+    return text_report_content, radar_scores_json
 
-    # Attempt to extract JSON and then remove it from the text report
-    try:
-        extracted_json_data = extract_capability_assessment_json(generated_report_text)
-        if extracted_json_data:
-            radar_scores_json = extracted_json_data # This is already a dict
-            # Remove the JSON block from the text report for cleaner display
-            # This regex should match the ```json ... ``` block
-            json_block_pattern = r"```json\s*\{\s*\"CANDIDATE_CAPABILITY_ASSESSMENT_JSON\"\s*:\s*\{.*?\}\s*\}\s*```"
-            text_report_content = re.sub(json_block_pattern, "", generated_report_text, flags=re.DOTALL).strip()
-            logger.info(f"Successfully parsed radar_data for interview {interview_id}: {radar_scores_json}")
-            logger.info(f"Removed JSON block from text_report_content for interview {interview_id}.")
-        else:
-            logger.warning(f"Could not extract CANDIDATE_CAPABILITY_ASSESSMENT_JSON from report for interview {interview_id}. Radar data will be empty.")
-    except json.JSONDecodeError as e:
-        logger.error(f"JSONDecodeError parsing radar_data for interview {interview_id}: {e}. Raw text was: {generated_report_text[:500]}...", exc_info=True)
-        # Keep text_report_content as is, radar_scores_json remains None
-    except Exception as e: # Catch any other unexpected error during extraction/removal
-        logger.error(f"Unexpected error extracting/removing JSON for interview {interview_id}: {e}. Raw text was: {generated_report_text[:500]}...", exc_info=True)
 
+async def _stage_report(db: AsyncSession, db_interview: models.Interview, interview_id: int, text_report_content: str, radar_scores_json: Optional[dict], dialogue_for_report: str, prompt_stats: Optional[dict] = None) -> models.Report:
+    """Creates or updates the Report row and the interview's radar_data/status. The caller commits."""
     # Update the Interview model with the radar_data
     if radar_scores_json:
         db_interview.radar_data = radar_scores_json # SQLAlchemy handles JSON conversion
@@ -471,55 +622,393 @@ async def trigger_generate_interview_report(
         db_interview.radar_data = None # Ensure it's cleared if not found
 
     # Check if a report already exists for this interview
-    db_report = db.query(models.Report).filter(models.Report.interview_id == interview_id).first()
+    report_result = await db.execute(select(models.Report).where(models.Report.interview_id == interview_id))
+    db_report = report_result.scalar_one_or_none()
 
     if db_report:
-        logger.info(f"Updating existing report for interview ID: {interview_id}")
+        logger.info("Updating existing report for interview ID: %s", interview_id)
         db_report.generated_text = text_report_content # Save the cleaned text
         db_report.source_dialogue = dialogue_for_report # ADDED
+        db_report.prompt_stats = prompt_stats
         db_report.updated_at = func.now() # Explicitly set for MariaDB/older MySQL if onupdate not reliable via ORM only on Base
     else:
-        logger.info(f"Creating new report for interview ID: {interview_id}")
+        logger.info("Creating new report for interview ID: %s", interview_id)
         db_report = models.Report(
             interview_id=interview_id, 
             generated_text=text_report_content, # Save the cleaned text
-            source_dialogue=dialogue_for_report # ADDED
+            source_dialogue=dialogue_for_report, # ADDED
+            prompt_stats=prompt_stats
         )
         db.add(db_report)
     
     db_interview.status = models.InterviewStatus.REPORT_GENERATED
     db.add(db_interview) # Ensure interview is also updated (status and radar_data)
 
+    return db_report
+
+
+@router.post(
+    "/{interview_id}/generate-report",
+    response_model=schemas.Report,
+    responses={status.HTTP_202_ACCEPTED: {"model": schemas.BackgroundTaskRead, "description": "Queued (background=true)"}}
+)
+async def trigger_generate_interview_report(
+    interview_id: int,
+    background: bool = False,
+    regenerate: bool = False,
+    engine: Optional[schemas.ReportEngine] = None,
+    incremental: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    session_factory: async_sessionmaker = Depends(get_async_session_factory)
+) -> Any: # Changed to Any temporarily as db_report is a SQLAlchemy model
+    """
+    Generates (or regenerates) the assessment report of an interview.
+    With background=true the work is queued instead: 202 + task resource (poll /api/v1/tasks/{task_id}).
+    A report over unchanged logs comes from the LLM response cache unless regenerate=true.
+    engine=segmented scores every answer separately (re-scoring only new or edited log entries) and
+    writes the report from those scores; the default is settings.REPORT_ENGINE (also used by background tasks).
+    incremental=true updates the existing report from the log entries added, edited or removed since
+    it was written (app/services/report_refresh.py); the existing report is returned as is when no
+    entry changed, and the full report is regenerated when too much did. Ignored with regenerate=true.
+    """
+    if background:
+        return await _submit_interview_task(db, session_factory, TASK_GENERATE_REPORT, interview_id)
+    return await _generate_report(db, interview_id, regenerate=regenerate, engine=engine, incremental=incremental)
+
+def _resolve_report_engine(engine: Optional[schemas.ReportEngine], db_interview: models.Interview) -> schemas.ReportEngine:
+    engine = engine or schemas.ReportEngine(settings.REPORT_ENGINE)
+    if engine == schemas.ReportEngine.SEGMENTED and not db_interview.logs:
+        # Segments are log entries; a legacy free-form conversation_log can only be reported on as a whole
+        logger.info("Interview %s: no structured logs, using the single-prompt report engine.", db_interview.id)
+        return schemas.ReportEngine.SINGLE
+    return engine
+
+def _plan_report_refresh(db_interview: models.Interview, transcript: List[TranscriptEntry], incremental: bool, regenerate: bool):
+    """The refresh plan for incremental=true (None otherwise, or when the caller forces a regeneration)."""
+    if not incremental or regenerate:
+        return None
+    refresh_plan = plan_report_refresh(db_interview.generated_report, transcript)
+    logger.info("Interview %s: incremental report refresh planned as '%s' (%s)", db_interview.id, refresh_plan.mode, refresh_plan.reason)
+    return refresh_plan
+
+def _previous_report_inputs(db_interview: models.Interview) -> dict:
+    return {
+        "previous_report": db_interview.generated_report.generated_text,
+        "previous_scores": json.dumps(db_interview.radar_data, ensure_ascii=False) if db_interview.radar_data else "",
+    }
+
+async def _generate_report(db: AsyncSession, interview_id: int, regenerate: bool = False, engine: Optional[schemas.ReportEngine] = None, incremental: bool = False) -> models.Report:
+    """Report generation shared by the endpoint and the background task. Raises HTTPException."""
+    logger.info("Triggering report generation for interview ID: %s", interview_id)
+    # Eagerly load related job, candidate and logs (no lazy loading on AsyncSession)
+    db_interview = await _get_interview(db, interview_id, *REPORT_INPUT_OPTIONS)
+
+    if not db_interview:
+        logger.warning("Interview not found for ID: %s when generating report.", interview_id)
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Interview not found")
+
+    if not db_interview.job or not db_interview.job.description:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Job description not available for this interview.")
+    if not db_interview.candidate or not db_interview.candidate.resume_text:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Candidate resume not available for this interview.")
+
+    transcript = _build_report_transcript(db_interview, interview_id)
+    dialogue_for_report = format_transcript(transcript)
+
+    refresh_plan = _plan_report_refresh(db_interview, transcript, incremental, regenerate)
+    if refresh_plan and refresh_plan.mode == REFRESH_UNCHANGED:
+        logger.info("Interview %s: no log entry changed since the report was generated, returning it.", interview_id)
+        return db_interview.generated_report
+
+    analyzed_jd_text, structured_resume_text = await _prepare_report_context(db, db_interview, interview_id)
+
+    engine = _resolve_report_engine(engine, db_interview)
+    segmented_inputs = None
+    logger.info("Calling AI service to generate report for interview ID: %s using processed dialogue input (engine: %s).", interview_id, engine.value)
+    try:
+        # generate_interview_report is now an async function, so await is needed.
+        with bypass_llm_cache(regenerate):
+            if refresh_plan and refresh_plan.mode == REFRESH_INCREMENTAL:
+                generated_report_text = await update_interview_report(
+                    transcript_delta=refresh_plan.delta_text,
+                    job_description=analyzed_jd_text,
+                    **_previous_report_inputs(db_interview)
+                )
+                prompt_stats = {"engine": REFRESH_INCREMENTAL, **refresh_plan.stats}
+            elif engine == schemas.ReportEngine.SEGMENTED:
+                segmented_inputs = await prepare_segmented_report(db_interview.logs, analyzed_jd_text, force=regenerate)
+                generated_report_text = await generate_report_from_assessments(
+                    segment_assessments=segmented_inputs.segment_assessments,
+                    aggregated_scores=json.dumps(segmented_inputs.aggregated_scores, ensure_ascii=False),
+                    job_description=analyzed_jd_text,
+                    candidate_resume=structured_resume_text
+                )
+                prompt_stats = segmented_inputs.stats
+            else:
+                # Long transcripts are compacted to fit the report prompt token budget
+                prompt_inputs = await build_report_prompt_inputs(analyzed_jd_text, structured_resume_text, transcript)
+                generated_report_text = await generate_interview_report(
+                    conversation_log_str=prompt_inputs.conversation_log,
+                    job_description=prompt_inputs.job_description,
+                    candidate_resume=prompt_inputs.candidate_resume
+                    # llm_model_name and temperature will use defaults from the service
+                )
+                prompt_stats = {"engine": engine.value, **prompt_inputs.stats}
+            if refresh_plan and refresh_plan.mode != REFRESH_INCREMENTAL:
+                prompt_stats["refresh"] = refresh_plan.stats
+        logger.info("Successfully generated interview report text for interview %s.", interview_id)
+
+    except Exception as e:
+        logger.error("AI service failed to generate report for interview %s: %s", interview_id, e, exc_info=True)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"AI service failed: {str(e)}")
+    # The blocking report services return their failures as "Error: ..." text: never save it as a report
+    if generated_report_text.startswith("Error:"):
+        logger.error("AI service failed to generate report for interview %s: %s", interview_id, generated_report_text)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"AI service failed: {generated_report_text}")
+
+    # --- Process and save the report --- 
+    text_report_content, radar_scores_json = _split_report_text(generated_report_text, interview_id)
+    if radar_scores_json is None and segmented_inputs and segmented_inputs.aggregated_scores:
+        logger.info("Interview %s: using the mean segment scores as radar data.", interview_id)
+        radar_scores_json = segmented_inputs.aggregated_scores
+    elif radar_scores_json is None and refresh_plan and refresh_plan.mode == REFRESH_INCREMENTAL:
+        logger.info("Interview %s: no scores in the incremental update, keeping the previous radar data.", interview_id)
+        radar_scores_json = db_interview.radar_data
+
+    db_report = await _stage_report(db, db_interview, interview_id, text_report_content, radar_scores_json, dialogue_for_report, prompt_stats)
+
     try:
-        db.commit()
-        db.refresh(db_report) # Refresh to get ID, created_at, updated_at
-        db.refresh(db_interview) # Refresh interview to get updated status and radar data in the object
+        await db.commit()
+        await db.refresh(db_report) # Refresh to get ID, created_at, updated_at
     except Exception as e:
-        db.rollback()
-        logger.error(f"Error committing report or interview update for interview {interview_id}: {e}", exc_info=True)
+        await db.rollback()
+        logger.error("Error committing report or interview update for interview %s: %s", interview_id, e, exc_info=True)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to save report to database.")
 
-    logger.info(f"Report generated and saved successfully for interview ID: {interview_id}")
+    logger.info("Report generated and saved successfully for interview ID: %s", interview_id)
     return db_report
 
+# --- Background execution (app/services/task_queue.py) ---
+TASK_GENERATE_QUESTIONS = "generate_questions"
+TASK_GENERATE_REPORT = "generate_report"
+
+async def _submit_interview_task(db: AsyncSession, session_factory: async_sessionmaker, task_type: str, interview_id: int) -> JSONResponse:
+    """Queues task_type for the interview (or returns the one already queued) as a 202 response."""
+    if await db.get(models.Interview, interview_id) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Interview not found")
+    task, created = await task_queue.submit_task(db, session_factory, task_type, interview_id)
+    if not created:
+        logger.info("Interview %s: %s already queued as task %s, returning it", interview_id, task_type, task.task_uuid)
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=jsonable_encoder(schemas.BackgroundTaskRead.model_validate(task)),
+        headers={"Location": f"/api/v1/tasks/{task.task_uuid}"}
+    )
+
+async def _run_interview_task(func, db: AsyncSession, task: models.BackgroundTask):
+    # HTTP 4xx (missing interview, JD, resume, logs...) cannot be fixed by retrying
+    try:
+        return await func(db, task.interview_id)
+    except HTTPException as e:
+        if e.status_code < 500:
+            raise task_queue.PermanentTaskError(str(e.detail)) from e
+        raise RuntimeError(str(e.detail)) from e
+
+async def _generate_questions_task(db: AsyncSession, task: models.BackgroundTask) -> dict:
+    db_interview = await _run_interview_task(_generate_questions, db, task)
+    return {
+        "interview_id": db_interview.id,
+        "status": db_interview.status.value,
+        "questions": [{"id": q.id, "question_text": q.question_text, "order_num": q.order_num} for q in sorted(db_interview.questions, key=lambda q: q.order_num or 0)],
+    }
+
+async def _generate_report_task(db: AsyncSession, task: models.BackgroundTask) -> dict:
+    db_report = await _run_interview_task(_generate_report, db, task)
+    return {"interview_id": db_report.interview_id, "report_id": db_report.id}
+
+task_queue.register_handler(TASK_GENERATE_QUESTIONS, _generate_questions_task)
+task_queue.register_handler(TASK_GENERATE_REPORT, _generate_report_task)
+
+async def _generate_report_events_stream_impl(
+    interview_id: int,
+    db: AsyncSession,
+    logger_instance: logging.Logger,
+    regenerate: bool = False,
+    engine: Optional[schemas.ReportEngine] = None,
+    incremental: bool = False
+):
+    """
+    Async generator for the report SSE stream.
+    Report markdown is forwarded as REPORT_CHUNK events while the LLM writes it; the trailing
+    CANDIDATE_CAPABILITY_ASSESSMENT_JSON block is held back and sent as one RADAR_DATA event.
+    The Report row and radar_data are written once, after the stream completes.
+    """
+    task_id = str(uuid.uuid4())
+    logger_instance.info("Task %s: Starting report generation stream for interview %s", task_id, interview_id)
+
+    def _event(event_type: schemas.AgUiEventType, data: BaseModel) -> dict:
+        return {"event": event_type.value, "data": json.dumps(data.model_dump())}
+
+    yield _event(schemas.AgUiEventType.TASK_START, schemas.AgUiTaskStartData(task_id=task_id, task_name="generate_interview_report", message="评估报告生成已开始。"))
+
+    try:
+        db_interview = await _get_interview(db, interview_id, *REPORT_INPUT_OPTIONS)
+        if not db_interview:
+            logger_instance.warning("Task %s: Interview %s not found", task_id, interview_id)
+            yield _event(schemas.AgUiEventType.ERROR, schemas.AgUiErrorData(task_id=task_id, error_message="Interview not found", error_code="404"))
+            return
+        if not db_interview.job or not db_interview.job.description:
+            yield _event(schemas.AgUiEventType.ERROR, schemas.AgUiErrorData(task_id=task_id, error_message="Job description not available for this interview.", error_code="400"))
+            return
+        if not db_interview.candidate or not db_interview.candidate.resume_text:
+            yield _event(schemas.AgUiEventType.ERROR, schemas.AgUiErrorData(task_id=task_id, error_message="Candidate resume not available for this interview.", error_code="400"))
+            return
+
+        try:
+            transcript = _build_report_transcript(db_interview, interview_id)
+        except HTTPException as e:
+            yield _event(schemas.AgUiEventType.ERROR, schemas.AgUiErrorData(task_id=task_id, error_message=e.detail, error_code=str(e.status_code)))
+            return
+
+        refresh_plan = _plan_report_refresh(db_interview, transcript, incremental, regenerate)
+        if refresh_plan and refresh_plan.mode == REFRESH_UNCHANGED:
+            # Nothing to write: replay the stored report
+            db_report = db_interview.generated_report
+            yield _event(schemas.AgUiEventType.THOUGHT, schemas.AgUiThoughtData(task_id=task_id, thought="No new interview log entries since the last report."))
+            yield _event(schemas.AgUiEventType.REPORT_CHUNK, schemas.AgUiReportChunkData(task_id=task_id, chunk_text=db_report.generated_text))
+            if db_interview.radar_data:
+                yield _event(schemas.AgUiEventType.RADAR_DATA, schemas.AgUiRadarData(task_id=task_id, radar_data=db_interview.radar_data))
+            yield _event(schemas.AgUiEventType.TASK_END, schemas.AgUiTaskEndData(task_id=task_id, status="success", message=f"Report for interview {interview_id} is up to date.", report_id=db_report.id))
+            return
+
+        yield _event(schemas.AgUiEventType.THOUGHT, schemas.AgUiThoughtData(task_id=task_id, thought="Preparing job analysis and candidate profile..."))
+        analyzed_jd_text, structured_resume_text = await _prepare_report_context(db, db_interview, interview_id)
+
+        splitter = StreamingReportSplitter()
+        radar_data = None
+        engine = _resolve_report_engine(engine, db_interview)
+        segmented_inputs = None
+        with bypass_llm_cache(regenerate):
+            if refresh_plan and refresh_plan.mode == REFRESH_INCREMENTAL:
+                yield _event(schemas.AgUiEventType.THOUGHT, schemas.AgUiThoughtData(task_id=task_id, thought=f"Updating the report with {refresh_plan.stats['entries_added']} new and {refresh_plan.stats['entries_changed']} edited answer(s)..."))
+                prompt_stats = {"engine": REFRESH_INCREMENTAL, **refresh_plan.stats}
+                report_stream_source = stream_updated_interview_report(
+                    transcript_delta=refresh_plan.delta_text,
+                    job_description=analyzed_jd_text,
+                    **_previous_report_inputs(db_interview)
+                )
+            elif engine == schemas.ReportEngine.SEGMENTED:
+                yield _event(schemas.AgUiEventType.THOUGHT, schemas.AgUiThoughtData(task_id=task_id, thought=f"Scoring {len(db_interview.logs)} answer(s)..."))
+                segmented_inputs = await prepare_segmented_report(db_interview.logs, analyzed_jd_text, force=regenerate)
+                prompt_stats = segmented_inputs.stats
+                report_stream_source = stream_report_from_assessments(
+                    segment_assessments=segmented_inputs.segment_assessments,
+                    aggregated_scores=json.dumps(segmented_inputs.aggregated_scores, ensure_ascii=False),
+                    job_description=analyzed_jd_text,
+                    candidate_resume=structured_resume_text
+                )
+            else:
+                prompt_inputs = await build_report_prompt_inputs(analyzed_jd_text, structured_resume_text, transcript)
+                if prompt_inputs.stats["compaction"] != COMPACTION_NONE:
+                    yield _event(schemas.AgUiEventType.THOUGHT, schemas.AgUiThoughtData(task_id=task_id, thought="Long interview: condensed the transcript to fit the report prompt."))
+                prompt_stats = {"engine": engine.value, **prompt_inputs.stats}
+                report_stream_source = stream_interview_report(
+                    conversation_log_str=prompt_inputs.conversation_log,
+                    job_description=prompt_inputs.job_description,
+                    candidate_resume=prompt_inputs.candidate_resume
+                )
+            if refresh_plan and refresh_plan.mode != REFRESH_INCREMENTAL:
+                prompt_stats["refresh"] = refresh_plan.stats
+            yield _event(schemas.AgUiEventType.THOUGHT, schemas.AgUiThoughtData(task_id=task_id, thought="Writing the assessment report..."))
+            async with aclosing(report_stream_source) as report_stream:
+                async for token_text in report_stream:
+                    for event_kind, event_value in splitter.feed(token_text):
+                        if event_kind == "markdown":
+                            yield _event(schemas.AgUiEventType.REPORT_CHUNK, schemas.AgUiReportChunkData(task_id=task_id, chunk_text=event_value))
+                        else:
+                            radar_data = _checked_radar_data(event_value, f"Task {task_id}")
+                            if radar_data is not None:
+                                yield _event(schemas.AgUiEventType.RADAR_DATA, schemas.AgUiRadarData(task_id=task_id, radar_data=radar_data))
+        for event_kind, event_value in splitter.finish():
+            if event_kind == "markdown":
+                yield _event(schemas.AgUiEventType.REPORT_CHUNK, schemas.AgUiReportChunkData(task_id=task_id, chunk_text=event_value))
+            else:
+                radar_data = _checked_radar_data(event_value, f"Task {task_id}")
+                if radar_data is not None:
+                    yield _event(schemas.AgUiEventType.RADAR_DATA, schemas.AgUiRadarData(task_id=task_id, radar_data=radar_data))
+
+        if radar_data is None and segmented_inputs and segmented_inputs.aggregated_scores:
+            radar_data = segmented_inputs.aggregated_scores
+            logger_instance.info("Task %s: No CANDIDATE_CAPABILITY_ASSESSMENT_JSON block in streamed report for interview %s; using the mean segment scores.", task_id, interview_id)
+            yield _event(schemas.AgUiEventType.RADAR_DATA, schemas.AgUiRadarData(task_id=task_id, radar_data=radar_data))
+        elif radar_data is None and refresh_plan and refresh_plan.mode == REFRESH_INCREMENTAL and db_interview.radar_data:
+            radar_data = db_interview.radar_data
+            logger_instance.info("Task %s: No scores in the incremental update for interview %s; keeping the previous radar data.", task_id, interview_id)
+            yield _event(schemas.AgUiEventType.RADAR_DATA, schemas.AgUiRadarData(task_id=task_id, radar_data=radar_data))
+        elif radar_data is None:
+            logger_instance.warning("Task %s: No CANDIDATE_CAPABILITY_ASSESSMENT_JSON block found in streamed report for interview %s. Radar data will be empty.", task_id, interview_id)
+
+        # Persist once, now that the full report is known
+        db_report = await _stage_report(db, db_interview, interview_id, splitter.markdown.strip(), radar_data, format_transcript(transcript), prompt_stats)
+        try:
+            await db.commit()
+            await db.refresh(db_report)
+        except Exception as commit_exc:
+            await db.rollback()
+            logger_instance.error("Task %s: Error committing report for interview %s: %s", task_id, interview_id, commit_exc, exc_info=True)
+            yield _event(schemas.AgUiEventType.ERROR, schemas.AgUiErrorData(task_id=task_id, error_message="Failed to save report to database."))
+            return
+
+        logger_instance.info("Task %s: Report streamed and saved for interview %s (report id %s)", task_id, interview_id, db_report.id)
+        yield _event(schemas.AgUiEventType.TASK_END, schemas.AgUiTaskEndData(task_id=task_id, status="success", message=f"Report generated for interview {interview_id}.", report_id=db_report.id))
+
+    except ReportGenerationError as e:
+        logger_instance.error("Task %s: AI service failed to generate report for interview %s: %s", task_id, interview_id, e)
+        await db.rollback()
+        yield _event(schemas.AgUiEventType.ERROR, schemas.AgUiErrorData(task_id=task_id, error_message=f"AI service failed: {str(e)}"))
+    except Exception as e:
+        logger_instance.error("Task %s: Error during report generation stream for interview %s: %s", task_id, interview_id, e, exc_info=True)
+        await db.rollback()
+        yield _event(schemas.AgUiEventType.ERROR, schemas.AgUiErrorData(task_id=task_id, error_message=f"An unexpected error occurred: {str(e)}"))
+    finally:
+        logger_instance.debug("Task %s: Closing report stream for interview %s", task_id, interview_id)
+
+
+@router.post("/{interview_id}/generate-report-stream", name="generate_report_streaming")
+async def generate_interview_report_stream_endpoint(
+    interview_id: int,
+    regenerate: bool = False,
+    engine: Optional[schemas.ReportEngine] = None,
+    incremental: bool = False,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Streams report generation as AG-UI events (report_chunk, radar_data, task_end) instead of
+    holding the request open until the whole report is written.
+    regenerate=true skips the LLM response cache; engine and incremental as for /generate-report.
+    """
+    return EventSourceResponse(
+        _generate_report_events_stream_impl(interview_id=interview_id, db=db, logger_instance=logger, regenerate=regenerate, engine=engine, incremental=incremental)
+    )
+
 # Diagnostic log: To be executed when this module is imported.
 logger.debug("---- Routes registered in app.api.v1.endpoints.interviews.py router (minimal) ----")
 if "router" in locals() and hasattr(router, "routes"):
     for r_idx, r in enumerate(router.routes):
         if hasattr(r, "path"):
-            logger.debug(f"  [{r_idx}] Path: {r.path}, Name: {r.name}, Methods: {getattr(r, 'methods', 'N/A')}")
+            logger.debug("  [%s] Path: %s, Name: %s, Methods: %s", r_idx, r.path, r.name, getattr(r, 'methods', 'N/A'))
         else:
-            logger.debug(f"  [{r_idx}] Route object: {r}")
+            logger.debug("  [%s] Route object: %s", r_idx, r)
 else:
     logger.warning("  'router' object not found or has no 'routes' attribute at the time of printing in (minimal) interviews.py.")
 logger.debug("------------------------------------------------------------------------------------") 
 
-async def generate_question_events_stream(interview_id: int, db: Session, logger_instance: logging.Logger):
+async def generate_question_events_stream(interview_id: int, db: AsyncSession, logger_instance: logging.Logger, regenerate: bool = False):
     """
     Async generator function that yields AG-UI events during the question generation process.
     """
     task_id = str(uuid.uuid4())
-    logger_instance.info(f"Task {task_id}: Starting question generation stream for interview {interview_id}")
+    logger_instance.info("Task %s: Starting question generation stream for interview %s", task_id, interview_id)
     await asyncio.sleep(0.01) # Ensure message is sent
     yield {
         "event": schemas.AgUiEventType.TASK_START.value,
@@ -531,14 +1020,11 @@ async def generate_question_events_stream(interview_id: int, db: Session, logger
         await asyncio.sleep(0.1)
 
         # Load interview with related data
-        logger_instance.debug(f"Task {task_id}: Loading interview {interview_id} with related data")
-        db_interview = db.query(models.Interview).options(
-            joinedload(models.Interview.job),
-            joinedload(models.Interview.candidate)
-        ).filter(models.Interview.id == interview_id).first()
+        logger_instance.debug("Task %s: Loading interview %s with related data", task_id, interview_id)
+        db_interview = await _get_interview(db, interview_id, selectinload(models.Interview.job), selectinload(models.Interview.candidate))
 
         if not db_interview:
-            logger_instance.error(f"Task {task_id}: Interview {interview_id} not found")
+            logger_instance.error("Task %s: Interview %s not found", task_id, interview_id)
             yield schemas.AgUiSsePayload(event_type=schemas.AgUiEventType.ERROR, payload=schemas.AgUiErrorData(task_id=task_id, error_message=f"Interview {interview_id} not found.").model_dump()).to_sse_format()
             return
 
@@ -546,134 +1032,107 @@ async def generate_question_events_stream(interview_id: int, db: Session, logger
 
         # Validate required data
         if not db_interview.job or not db_interview.job.description:
-            logger_instance.error(f"Task {task_id}: Job description not found for interview {interview_id}")
+            logger_instance.error("Task %s: Job description not found for interview %s", task_id, interview_id)
             yield schemas.AgUiSsePayload(event_type=schemas.AgUiEventType.ERROR, payload=schemas.AgUiErrorData(task_id=task_id, error_message="Job description not found.").model_dump()).to_sse_format()
             return
         if not db_interview.candidate or not db_interview.candidate.resume_text:
-            logger_instance.error(f"Task {task_id}: Candidate resume not found for interview {interview_id}")
+            logger_instance.error("Task %s: Candidate resume not found for interview %s", task_id, interview_id)
             yield schemas.AgUiSsePayload(event_type=schemas.AgUiEventType.ERROR, payload=schemas.AgUiErrorData(task_id=task_id, error_message="Candidate resume not found.").model_dump()).to_sse_format()
             return
 
-        # Stage 1: Analyze JD
-        logger_instance.info(f"Task {task_id}: Starting JD analysis for interview {interview_id}")
-        yield schemas.AgUiSsePayload(event_type=schemas.AgUiEventType.THOUGHT, payload=schemas.AgUiThoughtData(task_id=task_id, thought="Analyzing job description...").model_dump()).to_sse_format()
-        
-        analyzed_jd_text = await analyze_jd(jd_text=db_interview.job.description)
-        if analyzed_jd_text.startswith("Error:"):
-            logger_instance.error(f"Task {task_id}: AI service failed to analyze JD for interview {interview_id}: {analyzed_jd_text}")
-            yield schemas.AgUiSsePayload(event_type=schemas.AgUiEventType.ERROR, payload=schemas.AgUiErrorData(task_id=task_id, error_message=f"AI service failed to analyze JD: {analyzed_jd_text}").model_dump()).to_sse_format()
-            return
-            
-        # Yield thought with JD analysis preview
-        jd_preview = (analyzed_jd_text[:100] + '...') if len(analyzed_jd_text) > 100 else analyzed_jd_text
-        logger_instance.info(f"Task {task_id}: JD analysis completed for interview {interview_id}")
-        yield schemas.AgUiSsePayload(event_type=schemas.AgUiEventType.THOUGHT, payload=schemas.AgUiThoughtData(task_id=task_id, thought=f"JD analysis complete. Preview: {jd_preview}").model_dump()).to_sse_format()
-
-        # Stage 2: Parse Resume
-        logger_instance.info(f"Task {task_id}: Starting resume parsing for interview {interview_id}")
-        yield schemas.AgUiSsePayload(event_type=schemas.AgUiEventType.THOUGHT, payload=schemas.AgUiThoughtData(task_id=task_id, thought="Parsing candidate resume...").model_dump()).to_sse_format()
-        
-        parsed_resume_text = await parse_resume(resume_text=db_interview.candidate.resume_text)
-        if parsed_resume_text.startswith("Error:"):
-            logger_instance.error(f"Task {task_id}: AI service failed to parse resume for interview {interview_id}: {parsed_resume_text}")
-            yield schemas.AgUiSsePayload(event_type=schemas.AgUiEventType.ERROR, payload=schemas.AgUiErrorData(task_id=task_id, error_message=f"AI service failed to parse resume: {parsed_resume_text}").model_dump()).to_sse_format()
-            return
-            
-        # Yield thought with resume parsing preview
-        resume_preview = (parsed_resume_text[:100] + '...') if len(parsed_resume_text) > 100 else parsed_resume_text
-        logger_instance.info(f"Task {task_id}: Resume parsing completed for interview {interview_id}")
-        yield schemas.AgUiSsePayload(event_type=schemas.AgUiEventType.THOUGHT, payload=schemas.AgUiThoughtData(task_id=task_id, thought=f"Resume parsing complete. Preview: {resume_preview}").model_dump()).to_sse_format()
-
-        # Stage 3: Generate Questions
-        logger_instance.info(f"Task {task_id}: Starting question generation for interview {interview_id}")
-        generated_questions_text = await generate_interview_questions(
-            analyzed_jd_info=analyzed_jd_text,
-            structured_resume_info=parsed_resume_text
-        )
-
-        logger_instance.info(f"Task {task_id}: ---- RAW LLM OUTPUT START ----")
-        logger_instance.info(generated_questions_text)
-        logger.info(f"Task {task_id}: ---- RAW LLM OUTPUT END ---- (Length: {len(generated_questions_text)})" )
-
-        # Attempt to extract JSON from markdown code block
-        json_to_parse = generated_questions_text
-        logger.info(f"Task {task_id}: Initial json_to_parse: '''{json_to_parse}''' (Length: {len(json_to_parse)})" )
-
-        match = re.search(r"```json\s*(\{[\s\S]*?\})\s*```", generated_questions_text, re.DOTALL)
-        if match:
-            json_to_parse = match.group(1)
-            logger.info(f"Task {task_id}: Extracted JSON from markdown: '''{json_to_parse}''' (Length: {len(json_to_parse)})" )
-        else:
-            logger.info(f"Task {task_id}: Regex did NOT match markdown block.")
-            stripped_text = generated_questions_text.strip()
-            if stripped_text.startswith("{") and stripped_text.endswith("}"):
-                 json_to_parse = stripped_text
-                 logger.info(f"Task {task_id}: Detected plain JSON: '''{json_to_parse}''' (Length: {len(json_to_parse)})" )
-            else:
-                logger.info(f"Task {task_id}: No markdown or plain JSON detected, using raw output for parsing/fallback: '''{json_to_parse}''' (Length: {len(json_to_parse)})" )
-        
-        # Process generated questions
-        SCHEMA = {
-            "type": "object",
-            "properties": {
-                "questions": {
-                    "type": "array",
-                    "items": {"type": "string"}
-                }
-            },
-            "required": ["questions"]
-        }
-        question_texts = []
-        try:
-            logger.info(f"Task {task_id}: Attempting json.loads on: '''{json_to_parse}''' for interview {interview_id}.")
-            parsed = json.loads(json_to_parse) # Use json_to_parse here
-            validate(instance=parsed, schema=SCHEMA)
-            question_texts = [q.strip() for q in parsed["questions"] if isinstance(q, str) and q.strip()]
-            logger.info(f"Task {task_id}: Parsed {len(question_texts)} questions from JSON object for interview {interview_id}.")
-        except Exception as e:
-            logger.warning(f"Task {task_id}: JSON解析或schema校验失败 for interview {interview_id}. Reason: {e}", extra={"raw_output_type": type(generated_questions_text), "raw_output_len": len(generated_questions_text), "parsed_attempt_type": type(json_to_parse), "parsed_attempt_len": len(json_to_parse), "parsed_attempt_content": json_to_parse[:500] + "..." if len(json_to_parse) > 500 else json_to_parse})
-            
-            question_texts = [] # Ensure it's empty before fallback
-            # Fallback logic: split the content that was attempted for JSON parsing (json_to_parse)
-            raw_question_lines = [q.strip() for q in json_to_parse.split('\n') if q.strip()]
-            
-            # Filter out common JSON structural lines or markdown remnants from fallback
-            for line in raw_question_lines:
-                temp_line = line.strip()
-                # More robustly skip JSON structural lines and markdown
-                if temp_line in ["{", "}", "[", "]", "],", "```json", "```"] or temp_line.lower().startswith(('"questions":', 'questions:')):
+        # Stages 1 & 2: Analyze JD and parse resume concurrently; report each as it finishes
+        logger_instance.info("Task %s: Starting JD analysis and resume parsing for interview %s", task_id, interview_id)
+        yield schemas.AgUiSsePayload(event_type=schemas.AgUiEventType.THOUGHT, payload=schemas.AgUiThoughtData(task_id=task_id, thought="Analyzing job description and parsing candidate resume...").model_dump()).to_sse_format()
+
+        stage_results = {}
+        async with aclosing(iter_preprocessing_stages(db, db_interview.job, db_interview.candidate)) as stages:
+            async for stage_name, stage_result in stages:
+                stage_label = "JD analysis" if stage_name == STAGE_JD_ANALYSIS else "Resume parsing"
+                if stage_result.startswith("Error:"):
+                    error_prefix = "AI service failed to analyze JD" if stage_name == STAGE_JD_ANALYSIS else "AI service failed to parse resume"
+                    logger_instance.error("Task %s: %s for interview %s: %s", task_id, error_prefix, interview_id, stage_result)
+                    await db.commit() # Keep whichever analysis already succeeded
+                    yield schemas.AgUiSsePayload(event_type=schemas.AgUiEventType.ERROR, payload=schemas.AgUiErrorData(task_id=task_id, error_message=f"{error_prefix}: {stage_result}").model_dump()).to_sse_format()
+                    return
+                stage_results[stage_name] = stage_result
+
+                # Yield thought with stage preview
+                stage_preview = (stage_result[:100] + '...') if len(stage_result) > 100 else stage_result
+                logger_instance.info("Task %s: %s completed for interview %s", task_id, stage_label, interview_id)
+                yield schemas.AgUiSsePayload(event_type=schemas.AgUiEventType.THOUGHT, payload=schemas.AgUiThoughtData(task_id=task_id, thought=f"{stage_label} complete. Preview: {stage_preview}").model_dump()).to_sse_format()
+
+        await db.commit() # Persist the cached analyses before the (longer) question generation call
+        analyzed_jd_text = stage_results[STAGE_JD_ANALYSIS]
+        parsed_resume_text = stage_results[STAGE_RESUME_PARSING]
+
+        # Stage 3: Generate Questions (token-level streaming)
+        # Tokens are forwarded as QUESTION_CHUNK events as soon as they arrive, and a
+        # QUESTION_GENERATED event is emitted the moment each question string closes,
+        # instead of waiting for the whole completion.
+        logger_instance.info("Task %s: Starting question generation for interview %s", task_id, interview_id)
+        question_parser = StreamingJsonStringArrayParser("questions")
+        streamed_question_orders = set()
+        generated_chunks = []
+        with bypass_llm_cache(regenerate):
+            async with aclosing(stream_interview_questions(
+                analyzed_jd_info=analyzed_jd_text,
+                structured_resume_info=parsed_resume_text
+            )) as token_stream:
+                async for token_text in token_stream:
+                    generated_chunks.append(token_text)
+                    for event_kind, item_index, item_text in question_parser.feed(token_text):
+                        if event_kind == "chunk":
+                            yield schemas.AgUiSsePayload(
+                                event_type=schemas.AgUiEventType.QUESTION_CHUNK,
+                                payload=schemas.AgUiQuestionChunkData(
+                                    task_id=task_id,
+                                    chunk_text=item_text,
+                                    question_order=item_index + 1
+                                ).model_dump()
+                            ).to_sse_format()
+                        elif item_text.strip():
+                            streamed_question_orders.add(item_index + 1)
+                            yield schemas.AgUiSsePayload(
+                                event_type=schemas.AgUiEventType.QUESTION_GENERATED,
+                                payload=schemas.AgUiQuestionGeneratedData(
+                                    task_id=task_id,
+                                    question_text=item_text.strip(),
+                                    question_order=item_index + 1
+                                ).model_dump()
+                            ).to_sse_format()
+        generated_questions_text = "".join(generated_chunks)
+
+        # The full completion is still parsed (and schema-validated) once at the end; this
+        # is the source of truth for what gets persisted and covers non-JSON output.
+        question_texts = _parse_question_texts(generated_questions_text, log_prefix=f"Task {task_id}")
+        if [q.strip() for q in question_parser.items if q.strip()] != question_texts:
+            # The incremental parse disagreed with the final one (e.g. fallback line splitting):
+            # announce the authoritative questions that were not streamed yet.
+            for i, q_text in enumerate(question_texts):
+                if i + 1 in streamed_question_orders:
                     continue
-                
-                # Remove typical list item prefixes (numbers, bullets) more carefully
-                cleaned_line = re.sub(r"^\\s*([\\d\\.\\-\\\* 、>]+\\s*)+", "", line).strip()
-
-                # Remove surrounding quotes if they are likely from JSON string representation
-                if cleaned_line.startswith('"') and cleaned_line.endswith('"'):
-                    cleaned_line = cleaned_line[1:-1].strip()
-                # Remove trailing comma if it's likely from JSON array
-                if cleaned_line.endswith(','):
-                    cleaned_line = cleaned_line[:-1].strip()
-                
-                if cleaned_line: # Add if not empty after cleaning
-                    question_texts.append(cleaned_line)
-            logger.info(f"Task {task_id}: Fallback模式获得{len(question_texts)}个问题 for interview {interview_id} after cleaning. Original lines: {len(raw_question_lines)}", extra={"cleaned_questions": question_texts})
-            
-        # Proceed with DB operations and yielding events
-        # Note: Using db.begin_nested() in an async function with a sync db session can be tricky.
-        # FastAPI handles db session per request. If this causes issues, direct commit/rollback might be needed or pass an async session.
-        # For now, assuming the existing structure with sync session in async endpoint handler context is managed by FastAPI.
+                yield schemas.AgUiSsePayload(
+                    event_type=schemas.AgUiEventType.QUESTION_GENERATED,
+                    payload=schemas.AgUiQuestionGeneratedData(
+                        task_id=task_id,
+                        question_text=q_text,
+                        question_order=i + 1,
+                        total_questions=len(question_texts)
+                    ).model_dump()
+                ).to_sse_format()
+
+        # Proceed with DB operations (the AsyncSession autobegins the transaction)
         try: # Added try-finally for commit/rollback safety
-            db.begin() # Explicit transaction start
             # Delete existing questions
-            logger_instance.debug(f"Task {task_id}: Deleting existing questions for interview {interview_id}")
-            db.query(models.Question).filter(models.Question.interview_id == interview_id).delete(synchronize_session=False)
+            logger_instance.debug("Task %s: Deleting existing questions for interview %s", task_id, interview_id)
+            await db.execute(delete(models.Question).where(models.Question.interview_id == interview_id))
 
             if not question_texts:
-                logger_instance.warning(f"Task {task_id}: AI generated an empty list of questions for interview {interview_id}")
+                logger_instance.warning("Task %s: AI generated an empty list of questions for interview %s", task_id, interview_id)
                 db_interview.status = models.InterviewStatus.QUESTIONS_FAILED
             else:
                 # Add new questions
-                logger_instance.debug(f"Task {task_id}: Adding {len(question_texts)} new questions for interview {interview_id}")
+                logger_instance.debug("Task %s: Adding %s new questions for interview %s", task_id, len(question_texts), interview_id)
                 for i, q_text in enumerate(question_texts):
                     db_question = models.Question(
                         question_text=q_text,
@@ -681,33 +1140,23 @@ async def generate_question_events_stream(interview_id: int, db: Session, logger
                         order_num=i + 1
                     )
                     db.add(db_question)
-                    # Yield question generated event
-                    yield schemas.AgUiSsePayload(
-                        event_type=schemas.AgUiEventType.QUESTION_GENERATED,
-                        payload=schemas.AgUiQuestionGeneratedData(
-                            task_id=task_id,
-                            question_text=q_text,
-                            question_order=i+1,
-                            total_questions=len(question_texts)
-                        ).model_dump()
-                    ).to_sse_format()
                 db_interview.status = models.InterviewStatus.QUESTIONS_GENERATED
             
             # Update interview status
-            logger_instance.debug(f"Task {task_id}: Updating interview status to {db_interview.status}")
+            logger_instance.debug("Task %s: Updating interview status to %s", task_id, db_interview.status)
             db.add(db_interview)
-            db.commit()
+            await db.commit()
         except Exception as commit_exc:
-            logger_instance.error(f"Task {task_id}: Error during DB commit for interview {interview_id}: {commit_exc}", exc_info=True)
-            db.rollback()
+            logger_instance.error("Task %s: Error during DB commit for interview %s: %s", task_id, interview_id, commit_exc, exc_info=True)
+            await db.rollback()
             raise # Re-raise the exception to be caught by the main try-except block
         finally:
             # The outer try/except handles the final rollback if necessary.
             # No specific db.close() here as FastAPI manages session lifecycle.
             pass
         
-        db.refresh(db_interview)
-        logger_instance.info(f"Task {task_id}: Successfully committed changes for interview {interview_id}. Final status: {db_interview.status}")
+        await db.refresh(db_interview)
+        logger_instance.info("Task %s: Successfully committed changes for interview %s. Final status: %s", task_id, interview_id, db_interview.status)
 
         # Prepare final questions list for task end event
         final_question_list_for_event = [{"text": q, "order": i+1} for i, q in enumerate(question_texts)]
@@ -722,11 +1171,11 @@ async def generate_question_events_stream(interview_id: int, db: Session, logger
                 final_questions=final_question_list_for_event
             ).model_dump()
         ).to_sse_format()
-        logger_instance.info(f"Task {task_id}: Question generation stream for interview {interview_id} completed successfully")
+        logger_instance.info("Task %s: Question generation stream for interview %s completed successfully", task_id, interview_id)
 
     except Exception as e:
-        logger_instance.error(f"Task {task_id}: Error during question generation stream for interview {interview_id}: {e}", exc_info=True)
-        db.rollback()
+        logger_instance.error("Task %s: Error during question generation stream for interview %s: %s", task_id, interview_id, e, exc_info=True)
+        await db.rollback()
         yield schemas.AgUiSsePayload(
             event_type=schemas.AgUiEventType.ERROR,
             payload=schemas.AgUiErrorData(
@@ -735,20 +1184,21 @@ async def generate_question_events_stream(interview_id: int, db: Session, logger
             ).model_dump()
         ).to_sse_format()
     finally:
-        logger_instance.debug(f"Task {task_id}: Closing stream for interview {interview_id}")
+        logger_instance.debug("Task %s: Closing stream for interview %s", task_id, interview_id)
 
 
 @router.post("/{interview_id}/generate-questions-stream", name="generate_questions_streaming")
 async def generate_questions_for_interview_stream_endpoint( # Renamed to avoid conflict with the async generator
     interview_id: int,
-    db: Session = Depends(get_db),
+    regenerate: bool = False, # Skip the LLM response cache
+    db: AsyncSession = Depends(get_async_db),
     # It's good practice to inject logger if it's used extensively inside the stream generator
     # logger_instance: logging.Logger = Depends(lambda: logging.getLogger(__name__)) # Example of logger injection
 ):
     # Use the module-level logger for the endpoint itself, pass to generator if needed.
     # The logger instance will be the one from the interviews.py module.
     return EventSourceResponse(
-        generate_question_events_stream(interview_id=interview_id, db=db, logger_instance=logger)
+        generate_question_events_stream(interview_id=interview_id, db=db, logger_instance=logger, regenerate=regenerate)
     ) 
 
 async def _minimal_test_sse_stream_impl(logger_instance: logging.Logger):
@@ -766,7 +1216,7 @@ async def _minimal_test_sse_stream_impl(logger_instance: logging.Logger):
             )
             sse_formatted_event = sse_event_payload.to_sse_format()
             
-            logger_instance.info(f"Minimal Test SSE Stream: Yielding event: {sse_formatted_event.strip()}")
+            logger_instance.info("Minimal Test SSE Stream: Yielding event: %s", sse_formatted_event.strip())
             yield sse_formatted_event.encode('utf-8')
             
             # Add a small sleep to allow event loop to breathe and send data
@@ -777,7 +1227,7 @@ async def _minimal_test_sse_stream_impl(logger_instance: logging.Logger):
         logger_instance.info("Minimal Test SSE Stream: Generator was cancelled (client disconnected).")
         raise
     except Exception as e:
-        logger_instance.error(f"Minimal Test SSE Stream: Error in generator: {e}", exc_info=True)
+        logger_instance.error("Minimal Test SSE Stream: Error in generator: %s", e, exc_info=True)
         # Attempt to yield a final error to the client if possible
         try:
             error_payload = schemas.AgUiSsePayload(
@@ -787,7 +1237,7 @@ async def _minimal_test_sse_stream_impl(logger_instance: logging.Logger):
             yield error_payload.to_sse_format().encode('utf-8')
             await asyncio.sleep(0.001)
         except Exception as final_e:
-            logger_instance.error(f"Minimal Test SSE Stream: Failed to yield final error event: {final_e}", exc_info=True)
+            logger_instance.error("Minimal Test SSE Stream: Failed to yield final error event: %s", final_e, exc_info=True)
         raise # Re-raise the original error
     finally:
         logger_instance.info("Minimal Test SSE Stream: Generator finishing.")
@@ -813,14 +1263,15 @@ async def _generate_followup_events_stream_impl(
     interview_id: int,
     log_id: int,
     db: AsyncSession,
-    logger_instance: logging.Logger
+    logger_instance: logging.Logger,
+    regenerate: bool = False
 ):
     """
     Core asynchronous generator implementation for followup questions SSE stream.
     Yields events for task start, thoughts, question chunks, full questions, and task end.
     """
     task_id = str(uuid.uuid4())
-    logger_instance.info(f"Task {task_id}: Starting followup generation for interview_id={interview_id}, log_id={log_id}")
+    logger_instance.info("Task %s: Starting followup generation for interview_id=%s, log_id=%s", task_id, interview_id, log_id)
 
     try:
         # Yield task_start event
@@ -835,7 +1286,7 @@ async def _generate_followup_events_stream_impl(
         db_log_entry = log_entry_result.scalar_one_or_none()
 
         if not db_log_entry:
-            logger_instance.warning(f"Task {task_id}: InterviewLog with id {log_id} for interview {interview_id} not found.")
+            logger_instance.warning("Task %s: InterviewLog with id %s for interview %s not found.", task_id, log_id, interview_id)
             yield {
                 "event": schemas.AgUiEventType.ERROR.value,
                 "data": json.dumps({"error": "Log entry not found", "details": f"InterviewLog id {log_id} not found."})
@@ -850,7 +1301,7 @@ async def _generate_followup_events_stream_impl(
 
         # Corrected: Use speaker_role and compare with models.SpeakerRole enum member
         if not db_log_entry.speaker_role or db_log_entry.speaker_role != models.SpeakerRole.CANDIDATE:
-            logger_instance.info(f"Task {task_id}: Log entry {log_id} is not a candidate utterance (speaker_role: {db_log_entry.speaker_role}). No followup needed.")
+            logger_instance.info("Task %s: Log entry %s is not a candidate utterance (speaker_role: %s). No followup needed.", task_id, log_id, db_log_entry.speaker_role)
             yield {
                 "event": schemas.AgUiEventType.TASK_END.value,
                 "data": json.dumps({"task_id": task_id, "success": True, "message": "No followup needed for non-candidate utterance."})
@@ -861,7 +1312,7 @@ async def _generate_followup_events_stream_impl(
         # Corrected: Use full_dialogue_text instead of utterance_text
         candidate_answer = db_log_entry.full_dialogue_text 
         if not candidate_answer or not candidate_answer.strip():
-            logger_instance.info(f"Task {task_id}: Candidate answer in log {log_id} is empty (full_dialogue_text). No followup needed.")
+            logger_instance.info("Task %s: Candidate answer in log %s is empty (full_dialogue_text). No followup needed.", task_id, log_id)
             yield {
                 "event": schemas.AgUiEventType.TASK_END.value,
                 "data": json.dumps({"task_id": task_id, "success": True, "message": "No followup needed for empty candidate answer."})
@@ -881,27 +1332,34 @@ async def _generate_followup_events_stream_impl(
             if db_question:
                 original_question_text = db_question.question_text
             else:
-                logger_instance.warning(f"Task {task_id}: Original question with ID {db_log_entry.question_id} not found for log {log_id}.")
+                logger_instance.warning("Task %s: Original question with ID %s not found for log %s.", task_id, db_log_entry.question_id, log_id)
         else:
-            logger_instance.info(f"Task {task_id}: Log entry {log_id} does not have an associated question_id. Context might be limited.")
+            logger_instance.info("Task %s: Log entry %s does not have an associated question_id. Context might be limited.", task_id, log_id)
+
+        # Reuse the persisted JD analysis / structured resume when they are current. Followups are
+        # interactive, so stale or missing entries are skipped rather than recomputed here.
+        job_stmt = select(models.Job).join(models.Interview, models.Interview.job_id == models.Job.id).where(models.Interview.id == interview_id)
+        db_job = (await db.execute(job_stmt)).scalar_one_or_none()
+        analyzed_jd_info = db_job.analyzed_description if db_job and is_jd_analysis_fresh(db_job) else ""
+        candidate_stmt = select(models.Candidate).join(models.Interview, models.Interview.candidate_id == models.Candidate.id).where(models.Interview.id == interview_id)
+        db_candidate = (await db.execute(candidate_stmt)).scalar_one_or_none()
+        structured_resume_info = db_candidate.resume_summary if db_candidate and is_resume_summary_fresh(db_candidate) else ""
 
         # Call the refactored service, ensuring all required arguments are passed.
-        # analyzed_jd_info and structured_resume_info are not fetched here, passing empty strings.
-        # These could be fetched from db_interview.job.analyzed_description and 
-        # db_interview.candidate.structured_resume_info if the full interview object was loaded.
-        async for event_data_dict in generate_followup_questions_service(
-            original_question=original_question_text,
-            candidate_answer=candidate_answer,
-            task_id=task_id,
-            logger_instance=logger_instance,
-            analyzed_jd_info="", # Placeholder - fetch if needed for better followups
-            structured_resume_info="" # Placeholder - fetch if needed for better followups
-        ):
-            # The service now yields dictionaries ready for EventSourceResponse
-            yield event_data_dict 
+        with bypass_llm_cache(regenerate):
+            async for event_data_dict in generate_followup_questions_service(
+                original_question=original_question_text,
+                candidate_answer=candidate_answer,
+                task_id=task_id,
+                logger_instance=logger_instance,
+                analyzed_jd_info=analyzed_jd_info,
+                structured_resume_info=structured_resume_info
+            ):
+                # The service now yields dictionaries ready for EventSourceResponse
+                yield event_data_dict 
 
         # After the service stream is exhausted, yield task_end
-        logger_instance.info(f"Task {task_id}: Followup generation service stream completed.")
+        logger_instance.info("Task %s: Followup generation service stream completed.", task_id)
         yield {
             "event": schemas.AgUiEventType.TASK_END.value,
             "data": json.dumps({"task_id": task_id, "success": True, "message": "Followup question generation completed."})
@@ -909,7 +1367,7 @@ async def _generate_followup_events_stream_impl(
         await asyncio.sleep(0.1) # Recommended delay before the generator actually returns
 
     except AIJsonParsingError as e: # Specific error from the service
-        logger_instance.error(f"Task {task_id}: AIJsonParsingError in followup generation: {e.message} - Invalid JSON: {e.invalid_json_string}", exc_info=True)
+        logger_instance.error("Task %s: AIJsonParsingError in followup generation: %s - Invalid JSON: %s", task_id, e.message, e.invalid_json_string, exc_info=True)
         yield {
             "event": schemas.AgUiEventType.ERROR.value,
             "data": json.dumps({"error": "AI Parsing Error", "details": e.message, "raw_ai_output": e.invalid_json_string})
@@ -920,7 +1378,7 @@ async def _generate_followup_events_stream_impl(
         }
         await asyncio.sleep(0.1) # Recommended delay
     except Exception as e:
-        logger_instance.error(f"Task {task_id}: Unexpected error in followup generation stream: {str(e)}", exc_info=True)
+        logger_instance.error("Task %s: Unexpected error in followup generation stream: %s", task_id, e, exc_info=True)
         # Yield a general error event
         yield {
             "event": schemas.AgUiEventType.ERROR.value,
@@ -933,7 +1391,7 @@ async def _generate_followup_events_stream_impl(
         }
         await asyncio.sleep(0.1) # Recommended delay
     finally:
-        logger_instance.info(f"Task {task_id}: _generate_followup_events_stream_impl finished execution (reached finally block).")
+        logger_instance.info("Task %s: _generate_followup_events_stream_impl finished execution (reached finally block).", task_id)
         # Any final cleanup if necessary, though EventSourceResponse handles connection closing.
 
 
@@ -946,12 +1404,11 @@ async def _generate_followup_events_stream_impl(
 async def stream_followup_questions_events_endpoint(
     interview_id: int,
     log_id: int,
+    regenerate: bool = False, # Skip the LLM response cache ("suggest different follow-ups")
     db: AsyncSession = Depends(get_async_db),
     logger_instance: logging.Logger = Depends(lambda: logging.getLogger(__name__))
 ):
-    logger_instance.info(f"Endpoint stream_followup_questions_events_endpoint called for interview {interview_id}, log {log_id} - USING EventSourceResponse") # Log change
+    logger_instance.info("Endpoint stream_followup_questions_events_endpoint called for interview %s, log %s - USING EventSourceResponse", interview_id, log_id) # Log change
     return EventSourceResponse( # MODIFIED
-        _generate_followup_events_stream_impl(interview_id=interview_id, log_id=log_id, db=db, logger_instance=logger_instance)
+        _generate_followup_events_stream_impl(interview_id=interview_id, log_id=log_id, db=db, logger_instance=logger_instance, regenerate=regenerate)
     )
-
-print("DEBUG_INTERVIEWS: interviews.py MODULE EXECUTION COMPLETED (if no errors before this)")
\ No newline at end of file
@@ -1,18 +1,22 @@
-from typing import List, Any
+from typing import List, Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from app.api.v1 import schemas # This now correctly refers to the schemas package
+from app.api.v1.pagination import PageParams, paginate, prefix_filter
 from app.db import models # Updated import
-from app.db.session import get_db
+from app.db.session import get_async_db
+from app.services.analysis_cache import invalidate_jd_analysis
 
 router = APIRouter()
 
 @router.post("/", response_model=schemas.JobRead, status_code=status.HTTP_201_CREATED)
-def create_job(
+async def create_job(
     *,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     job_in: schemas.JobCreate
 ) -> models.Job: # Return type should be the ORM model for FastAPI to convert using response_model
     """
@@ -21,74 +25,84 @@ def create_job(
     # Create an instance of the SQLAlchemy model from the Pydantic model
     db_job = models.Job(title=job_in.title, description=job_in.description)
     db.add(db_job)
-    db.commit()
-    db.refresh(db_job)
+    await db.commit()
+    await db.refresh(db_job)
     return db_job
 
 @router.get("/", response_model=List[schemas.JobRead])
-def read_jobs(
-    db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100
+async def read_jobs(
+    request: Request,
+    response: Response,
+    title_prefix: Optional[str] = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_async_db)
 ) -> List[models.Job]: # Return type is a list of ORM models
     """
-    Retrieve all jobs with pagination.
+    Retrieve jobs, optionally filtered by title prefix and creation date.
+    Cursor-paginated on (created_at, id), see app/api/v1/pagination.py.
     """
-    jobs = db.query(models.Job).offset(skip).limit(limit).all()
-    return jobs
+    filters = [prefix_filter(models.Job.title, title_prefix)] if title_prefix else []
+    result = await paginate(db, models.Job, filters, page)
+    response.headers.update(result.headers(request.url))
+    return result.items
 
 # Get a specific job by ID
 @router.get("/{job_id}", response_model=schemas.JobRead)
-def read_job_by_id(
+async def read_job_by_id(
     job_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> models.Job:
     """
     Get a specific job by its ID.
     """
-    db_job = db.query(models.Job).filter(models.Job.id == job_id).first()
+    db_job = await db.get(models.Job, job_id)
     if db_job is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
     return db_job
 
 @router.put("/{job_id}", response_model=schemas.JobRead)
-def update_job(
+async def update_job(
     job_id: int,
     job_in: schemas.JobUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> models.Job:
     """
     Update an existing job.
     """
-    db_job = db.query(models.Job).filter(models.Job.id == job_id).first()
+    db_job = await db.get(models.Job, job_id)
     if db_job is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
 
     # Update fields from job_in if they are provided (not None)
     update_data = job_in.model_dump(exclude_unset=True) # Pydantic v2
+    description_changed = "description" in update_data and update_data["description"] != db_job.description
     for key, value in update_data.items():
         setattr(db_job, key, value)
+
+    # A new JD version invalidates the cached analysis; it is recomputed lazily on next use.
+    if description_changed:
+        invalidate_jd_analysis(db_job)
     
     db.add(db_job) # or db.merge(db_job) if you prefer
-    db.commit()
-    db.refresh(db_job)
+    await db.commit()
+    await db.refresh(db_job)
     return db_job
 
 @router.delete("/{job_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_job(
+async def delete_job(
     job_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Delete an existing job.
     """
-    db_job = db.query(models.Job).filter(models.Job.id == job_id).first()
+    # The ORM delete touches Job.interviews, so load it up front (no lazy loading on AsyncSession)
+    result = await db.execute(select(models.Job).options(selectinload(models.Job.interviews)).where(models.Job.id == job_id))
+    db_job = result.scalar_one_or_none()
     if db_job is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
     
-    db.delete(db_job)
-    db.commit()
+    await db.delete(db_job)
+    await db.commit()
     # No need to return anything for 204 response
     return None # Or can just be empty if function has no explicit return type annotation
-
-# TODO: Add tests for pagination (skip, limit) for read_jobs in test_jobs.py 
\ No newline at end of file
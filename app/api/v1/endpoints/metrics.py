@@ -0,0 +1,22 @@
+from typing import Any, Dict
+
+from fastapi import APIRouter
+
+from app.core import llm_scheduler, schema_registry
+from app.services import llm_cache, resume_extraction, task_queue
+
+router = APIRouter()
+
+@router.get("/", response_model=Dict[str, Any])
+async def read_metrics() -> Dict[str, Any]:
+    """
+    In-process runtime metrics of this API worker (queue depths, timings, counters).
+    Values are per process and reset on restart.
+    """
+    return {
+        "resume_extraction": resume_extraction.get_metrics(),
+        "task_queue": task_queue.get_metrics(),
+        "llm_cache": llm_cache.get_metrics(),
+        "llm_scheduler": llm_scheduler.get_metrics(),
+        "schema_validation": schema_registry.get_metrics(),
+    }
@@ -0,0 +1,46 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1 import schemas
+from app.db import models
+from app.db.session import get_async_db
+from app.services import task_queue
+
+router = APIRouter()
+
+async def _get_task_or_404(db: AsyncSession, task_id: str) -> models.BackgroundTask:
+    task = await task_queue.get_task(db, task_id)
+    if task is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found")
+    return task
+
+@router.get("/{task_id}", response_model=schemas.BackgroundTaskWithResult)
+async def read_task(
+    task_id: str,
+    db: AsyncSession = Depends(get_async_db)
+) -> models.BackgroundTask:
+    """Status of a background task (result included once it succeeded)."""
+    return await _get_task_or_404(db, task_id)
+
+@router.get("/{task_id}/result", response_model=dict)
+async def read_task_result(
+    task_id: str,
+    db: AsyncSession = Depends(get_async_db)
+) -> Any:
+    """
+    The task result: 200 once SUCCEEDED, 202 (with the task status) while PENDING/RUNNING,
+    409 with the error if the task FAILED.
+    """
+    task = await _get_task_or_404(db, task_id)
+    if task.status == models.TaskStatus.SUCCEEDED:
+        return task.result or {}
+    if task.status == models.TaskStatus.FAILED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Task failed: {task.error}")
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content=jsonable_encoder(schemas.BackgroundTaskRead.model_validate(task))
+    )
@@ -0,0 +1,201 @@
+# app/api/v1/pagination.py
+
+"""
+Keyset (cursor) pagination for the list endpoints (jobs, candidates, interviews).
+
+* Rows are ordered by ``(created_at, id)``, ascending by default (``order=desc`` for newest
+  first). The next page is selected with ``WHERE (created_at, id) > (last created_at, last id)``
+  instead of ``OFFSET``, so every page costs one index range scan (see the ``(created_at, id)``
+  indexes in app/db/models.py), however deep it is, and concurrent inserts cannot shift rows
+  between pages.
+* The cursor is opaque to clients: base64url of the last row's sort key and the sort order. It is
+  returned in the ``X-Next-Cursor`` header (and as a ``Link: rel="next"`` URL); the response body
+  stays a plain list, so existing clients are unaffected. No header means there is no next page.
+* ``skip`` (offset pagination) is still accepted when no cursor is given, for older clients.
+* ``count=exact`` adds ``X-Total-Count``; ``count=estimate`` returns the table statistics for an
+  unfiltered MySQL listing and otherwise counts at most ``PAGINATION_COUNT_ESTIMATE_CAP`` rows
+  (``X-Total-Count-Estimated: true`` when the value is not exact).
+
+``tests/benchmarks/bench_pagination.py`` compares both pagination styles at 1M rows.
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import and_, func, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+from starlette.datastructures import URL
+
+from app.core.config import settings
+
+
+class SortOrder(str, Enum):
+    ASC = "asc"
+    DESC = "desc"
+
+
+class CountMode(str, Enum):
+    NONE = "none"
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: int, order: SortOrder) -> str:
+    payload = json.dumps([created_at.isoformat() if created_at else None, row_id, order.value], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, order: SortOrder) -> Tuple[datetime, int]:
+    """The (created_at, id) sort key in cursor; raises InvalidCursorError."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id, cursor_order = json.loads(raw)
+        created_at = datetime.fromisoformat(created_at)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor.") from e
+    if not isinstance(row_id, int) or isinstance(row_id, bool):
+        raise InvalidCursorError("Invalid cursor.")
+    if cursor_order != order.value:
+        raise InvalidCursorError(f"Cursor was issued for order={cursor_order}.")
+    return created_at, row_id
+
+
+def apply_keyset(stmt: Select, model, after: Optional[Tuple[datetime, int]], order: SortOrder) -> Select:
+    """Orders stmt by (created_at, id) and, with after, keeps the rows that follow that key."""
+    created_at, row_id = model.created_at, model.id
+    if after is not None:
+        after_created_at, after_id = after
+        # Expanded instead of a row-value comparison, which MySQL does not always turn into a range scan
+        if order == SortOrder.ASC:
+            stmt = stmt.where(or_(created_at > after_created_at, and_(created_at == after_created_at, row_id > after_id)))
+        else:
+            stmt = stmt.where(or_(created_at < after_created_at, and_(created_at == after_created_at, row_id < after_id)))
+    if order == SortOrder.ASC:
+        return stmt.order_by(created_at.asc(), row_id.asc())
+    return stmt.order_by(created_at.desc(), row_id.desc())
+
+
+def prefix_filter(column, prefix: str):
+    """column LIKE 'prefix%', with the LIKE wildcards in prefix escaped (served by an index on column)."""
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return column.like(escaped + "%", escape="\\")
+
+
+def created_range_filters(model, created_after: Optional[datetime], created_before: Optional[datetime]) -> list:
+    filters = []
+    if created_after is not None:
+        filters.append(model.created_at >= created_after)
+    if created_before is not None:
+        filters.append(model.created_at < created_before)
+    return filters
+
+
+class PageParams:
+    """Query parameters shared by the list endpoints (FastAPI dependency)."""
+
+    def __init__(
+        self,
+        limit: int = Query(100, ge=0, le=settings.PAGINATION_MAX_LIMIT),
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page."),
+        skip: int = Query(0, ge=0, description="Offset pagination, ignored when a cursor is given."),
+        order: SortOrder = Query(SortOrder.ASC, description="Sort order of (created_at, id)."),
+        count: CountMode = Query(CountMode.NONE, description="Add X-Total-Count (exact or estimated)."),
+        created_after: Optional[datetime] = Query(None, description="created_at >= this."),
+        created_before: Optional[datetime] = Query(None, description="created_at < this."),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.skip = skip
+        self.order = order
+        self.count = count
+        self.created_after = created_after
+        self.created_before = created_before
+
+
+@dataclass
+class Page:
+    items: List[Any]
+    next_cursor: Optional[str]
+    total: Optional[int] = None
+    total_estimated: bool = False
+
+    def headers(self, url: URL) -> Dict[str, str]:
+        headers = {}
+        if self.next_cursor:
+            headers["X-Next-Cursor"] = self.next_cursor
+            next_url = url.remove_query_params("skip").include_query_params(cursor=self.next_cursor)
+            headers["Link"] = f'<{next_url}>; rel="next"'
+        if self.total is not None:
+            headers["X-Total-Count"] = str(self.total)
+            headers["X-Total-Count-Estimated"] = "true" if self.total_estimated else "false"
+        return headers
+
+
+async def _table_row_estimate(db: AsyncSession, table_name: str) -> Optional[int]:
+    """Row count from the MySQL table statistics (InnoDB: approximate, no scan)."""
+    if db.get_bind().dialect.name != "mysql":
+        return None
+    result = await db.execute(
+        text("SELECT TABLE_ROWS FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table_name"),
+        {"table_name": table_name},
+    )
+    estimate = result.scalar_one_or_none()
+    return int(estimate) if estimate is not None else None
+
+
+async def _count(db: AsyncSession, model, filters: list, mode: CountMode) -> Tuple[Optional[int], bool]:
+    if mode == CountMode.NONE:
+        return None, False
+    if mode == CountMode.ESTIMATE:
+        if not filters:
+            estimate = await _table_row_estimate(db, model.__tablename__)
+            if estimate is not None:
+                return estimate, True
+        cap = settings.PAGINATION_COUNT_ESTIMATE_CAP
+        bounded = select(model.id).where(*filters).limit(cap).subquery()
+        total = (await db.execute(select(func.count()).select_from(bounded))).scalar_one()
+        return total, total >= cap
+    total = (await db.execute(select(func.count()).select_from(model).where(*filters))).scalar_one()
+    return total, False
+
+
+async def paginate(db: AsyncSession, model, filters: list, params: PageParams, options: tuple = (), stmt: Optional[Select] = None) -> Page:
+    """
+    One page of the model rows matching filters (plus the created_at range of params), loaded
+    with the given loader options. With stmt (a select of columns from model and its joins, which
+    must include model.id and model.created_at), the items are row mappings instead of model
+    instances. Raises HTTP 400 for an invalid cursor.
+    """
+    try:
+        after = decode_cursor(params.cursor, params.order) if params.cursor else None
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    filters = list(filters) + created_range_filters(model, params.created_after, params.created_before)
+    total, total_estimated = await _count(db, model, filters, params.count)
+
+    base = stmt if stmt is not None else select(model).options(*options)
+    page_stmt = apply_keyset(base.where(*filters), model, after, params.order)
+    if after is None and params.skip:
+        page_stmt = page_stmt.offset(params.skip)
+    # One extra row tells whether there is a next page
+    result = await db.execute(page_stmt.limit(params.limit + 1))
+    rows = result.scalars().all() if stmt is None else result.mappings().all()
+    items = list(rows[:params.limit])
+    next_cursor = None
+    if len(rows) > params.limit and items:
+        last = items[-1]
+        created_at, row_id = (last.created_at, last.id) if stmt is None else (last["created_at"], last["id"])
+        next_cursor = encode_cursor(created_at, row_id, params.order)
+    return Page(items, next_cursor, total, total_estimated)
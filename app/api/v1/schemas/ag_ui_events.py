@@ -7,6 +7,8 @@ class AgUiEventType(str, Enum):
     THOUGHT = "thought" # For intermediate steps or reasoning
     QUESTION_CHUNK = "question_chunk" # For streaming parts of a question
     QUESTION_GENERATED = "question_generated" # When a full question is ready
+    REPORT_CHUNK = "report_chunk" # For streaming parts of the report markdown
+    RADAR_DATA = "radar_data" # Capability assessment extracted from the report
     TASK_END = "task_end"
     ERROR = "error"
 
@@ -23,14 +25,21 @@ class AgUiThoughtData(AgUiBaseEventData):
 class AgUiQuestionChunkData(AgUiBaseEventData):
     chunk_text: str
     is_partial: bool = True
+    question_order: Optional[int] = None # 1-based order of the question this chunk belongs to
 
 class AgUiQuestionGeneratedData(AgUiBaseEventData):
     question_text: str
     question_order: Optional[int] = None
-    total_questions: int
+    total_questions: Optional[int] = None # Unknown while questions are still streaming
     category: Optional[str] = None
     # Potentially other metadata about the question
 
+class AgUiReportChunkData(AgUiBaseEventData):
+    chunk_text: str
+
+class AgUiRadarData(AgUiBaseEventData):
+    radar_data: Dict[str, Any]
+
 class QuestionDetail(BaseModel):
     text: str
     order: int
@@ -39,6 +48,7 @@ class AgUiTaskEndData(AgUiBaseEventData):
     status: str # e.g., "success", "failure"
     message: Optional[str] = None
     final_questions: Optional[List[QuestionDetail]] = None
+    report_id: Optional[int] = None
 
 class AgUiErrorData(AgUiBaseEventData):
     error_message: str
@@ -75,6 +85,14 @@ class AgUiQuestionGeneratedEvent(BaseModel):
     event: AgUiEventType = AgUiEventType.QUESTION_GENERATED
     data: AgUiQuestionGeneratedData
 
+class AgUiReportChunkEvent(BaseModel):
+    event: AgUiEventType = AgUiEventType.REPORT_CHUNK
+    data: AgUiReportChunkData
+
+class AgUiRadarDataEvent(BaseModel):
+    event: AgUiEventType = AgUiEventType.RADAR_DATA
+    data: AgUiRadarData
+
 class AgUiTaskEndEvent(BaseModel):
     event: AgUiEventType = AgUiEventType.TASK_END
     data: AgUiTaskEndData
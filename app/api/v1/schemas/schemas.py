@@ -1,7 +1,8 @@
 from pydantic import BaseModel, EmailStr, ConfigDict, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
-from app.db.models import SpeakerRole
+from enum import Enum
+from app.db.models import SpeakerRole, TaskStatus
 
 # --- Job Schemas ---
 class JobBase(BaseModel):
@@ -49,12 +50,35 @@ class CandidateUpdate(BaseModel):
 
 class CandidateInDBBase(CandidateBase):
     id: int
+    resume_summary: Optional[str] = None  # Structured summary of resume_text (set by the server)
     created_at: datetime
     model_config = ConfigDict(from_attributes=True)
 
 class Candidate(CandidateInDBBase): # Schema for returning a candidate
     pass 
 
+# --- Bulk resume ingestion ---
+class BulkIngestionItem(BaseModel):
+    index: int
+    filename: str
+    status: str # pending / parsing / created / duplicate / skipped / failed
+    email: Optional[str] = None
+    name: Optional[str] = None
+    candidate_id: Optional[int] = None
+    detail: Optional[str] = None
+
+class BulkIngestionJobSummary(BaseModel):
+    job_id: str
+    status: str # running / completed / failed / cancelled
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+    total: int
+    counts: Dict[str, int]
+
+class BulkIngestionJobStatus(BulkIngestionJobSummary):
+    items: List[BulkIngestionItem] = []
+
 # --- Question Schemas (used within Interview) ---
 class QuestionBase(BaseModel):
     question_text: str
@@ -72,6 +96,10 @@ class Question(QuestionInDBBase): # Schema for returning a question
     pass 
 
 # --- Report Schemas (forward declaration for Interview) ---
+class ReportEngine(str, Enum):
+    SINGLE = "single"  # One INTERVIEW_REPORT_GENERATION_PROMPT call over the (budgeted) transcript
+    SEGMENTED = "segmented"  # Per-answer scoring (cached per log entry) + a short reduce call
+
 class ReportBase(BaseModel):
     generated_text: str
     source_dialogue: Optional[str] = None
@@ -82,6 +110,7 @@ class ReportCreate(ReportBase):
 class Report(ReportBase): 
     id: int
     interview_id: int
+    prompt_stats: Optional[dict] = None  # Token counts / transcript compaction of the report prompt
     created_at: datetime
     updated_at: datetime
     model_config = ConfigDict(from_attributes=True)
@@ -94,7 +123,7 @@ class ReportUpdate(BaseModel):
 class InterviewLogBase(BaseModel):
     question_id: Optional[int] = None
     full_dialogue_text: Optional[str] = None
-    order_num: Optional[int] = None
+    order_num: Optional[int] = None # Assigned by the server; ignored on create
     speaker_role: Optional[SpeakerRole] = Field(default=SpeakerRole.SYSTEM)
     question_text_snapshot: Optional[str] = None
 
@@ -109,6 +138,12 @@ class InterviewLog(InterviewLogBase):
     interview_id: int
     created_at: datetime
 
+class InterviewLogBulkResult(BaseModel):
+    """Response of POST /interviews/{id}/logs/bulk: ids of the created entries, in body order."""
+    created_ids: List[int]
+    first_order_num: Optional[int] = None
+    last_order_num: Optional[int] = None
+
 # --- Interview Schemas ---
 class InterviewBase(BaseModel):
     job_id: int
@@ -143,6 +178,21 @@ class Interview(InterviewInDBBase):
 class InterviewWithQuestions(Interview):
     pass
 
+class InterviewSummary(BaseModel):
+    """Row of GET /interviews/summary: the interview with display names and counts, without its children."""
+    id: int
+    job_id: int
+    candidate_id: int
+    job_title: str
+    candidate_name: str
+    scheduled_at: Optional[datetime] = None
+    status: str
+    created_at: datetime
+    updated_at: datetime
+    question_count: int
+    log_count: int
+    has_report: bool
+
 class InterviewCreateWithData(BaseModel):
     job_title: str
     job_description: str
@@ -155,4 +205,21 @@ class InterviewCreateWithData(BaseModel):
 # ReportBase, ReportCreate, Report, ReportUpdate are already defined above.
 
 # Optional: If you need a schema for updating, though reports might be regenerated rather than partially updated
-# ReportUpdate is already defined above. 
\ No newline at end of file
+# ReportUpdate is already defined above.
+
+# --- Background Task Schemas ---
+class BackgroundTaskRead(BaseModel):
+    task_id: str = Field(validation_alias="task_uuid")
+    task_type: str
+    interview_id: Optional[int] = None
+    status: TaskStatus
+    attempts: int
+    max_attempts: int
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True)
+
+class BackgroundTaskWithResult(BackgroundTaskRead):
+    result: Optional[dict] = None
@@ -1,7 +1,7 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
-import logging
-import sys
+from typing import Dict, Optional
+
+from app.core.logging_setup import setup_logging
 
 class Settings(BaseSettings):
     OPENAI_API_KEY: str
@@ -13,51 +13,108 @@ class Settings(BaseSettings):
     OPENAI_TEMPERATURE_QUESTION_GENERATION: float = 0.7
     # OPENAI_MAX_TOKENS_QUESTION_GENERATION: int = 500 # Optional, can be added if needed
 
+    # Model used for the preprocessing steps (JD analysis, resume parsing).
+    # Part of the cache key for persisted analyses, so changing it invalidates them.
+    OPENAI_MODEL_NAME_ANALYSIS: str = "gpt-4o-mini"
+
+    # Shared HTTP connection pool for all LLM calls (see app/core/llm_gateway.py)
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 60.0
+    LLM_REQUEST_TIMEOUT_SECONDS: float = 60.0
+
+    # Structured output for questions, follow-ups and segment assessments (see app/core/structured_output.py):
+    # "json_schema" (schema-constrained), "json_object" (JSON mode) or "off"
+    LLM_STRUCTURED_OUTPUT: str = "json_schema"
+
+    # Outbound LLM call scheduling (see app/core/llm_scheduler.py)
+    LLM_MAX_CONCURRENCY: int = 8                    # Calls in flight per model
+    LLM_MODEL_CONCURRENCY: Dict[str, int] = {}      # Per-model overrides, e.g. {"gpt-4o-mini": 16}
+    LLM_TPM_LIMIT: int = 200_000                    # Estimated tokens per minute per model
+    LLM_MODEL_TPM_LIMITS: Dict[str, int] = {}       # Per-model overrides
+    LLM_DEFAULT_COMPLETION_TOKENS: int = 1024       # Reserved for calls without an explicit max_tokens
+    LLM_MAX_ATTEMPTS: int = 4                       # Including the first try (429 / 5xx / connection errors)
+    LLM_RETRY_BASE_DELAY_SECONDS: float = 1.0
+    LLM_RETRY_MAX_DELAY_SECONDS: float = 60.0
+
+    # LLM response cache (see app/services/llm_cache.py)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PERSISTENT: bool = True          # Also store responses in the llm_response_cache table
+    LLM_CACHE_MAX_ENTRIES: int = 512           # In-memory LRU size per worker
+    LLM_CACHE_DEFAULT_TTL_SECONDS: int = 3600
+    # Per task TTLs; 0 disables caching for that task. Set as JSON in the environment.
+    LLM_CACHE_TTL_SECONDS: Dict[str, int] = {
+        "resume_parsing": 30 * 24 * 3600,
+        "jd_analysis": 30 * 24 * 3600,
+        "question_generation": 24 * 3600,
+        "report_generation": 7 * 24 * 3600,
+        "followup_generation": 3600,
+        "transcript_summary": 7 * 24 * 3600,
+        "segment_assessment": 7 * 24 * 3600,
+    }
+
+    # Report prompt budgeting (see app/services/report_prompt.py)
+    TOKENIZER_FALLBACK_ENCODING: str = "cl100k_base"  # tiktoken encoding for models it does not know
+    REPORT_PROMPT_TOKEN_BUDGET: int = 12_000         # Max prompt tokens sent with INTERVIEW_REPORT_GENERATION_PROMPT
+    REPORT_CONTEXT_MAX_SHARE: float = 0.25           # JD analysis and resume summary are each cut to this share of the budget
+    REPORT_MIN_ANSWER_TOKENS: int = 150              # Below this per answer, compaction switches to summarization
+    REPORT_SUMMARY_CHUNK_TOKENS: int = 4_000         # Transcript tokens per summarization (map) call
+    REPORT_SUMMARY_MAX_TOKENS: int = 600             # Completion tokens per segment summary
+
+    # Report engine (see app/services/segmented_report.py)
+    REPORT_ENGINE: str = "single"                    # "single" prompt, or "segmented": per-answer scoring (map) + short report (reduce)
+    REPORT_SEGMENT_MAX_TOKENS: int = 400             # Completion tokens per segment assessment
+    # Incremental refresh (see app/services/report_refresh.py): above this share of changed
+    # transcript tokens the report is regenerated from scratch instead
+    REPORT_INCREMENTAL_MAX_DELTA_RATIO: float = 0.3
+
+    # Resume file extraction (PDF/DOCX parsing runs in a process pool, see app/services/resume_extraction.py)
+    RESUME_EXTRACTION_MAX_WORKERS: int = 2         # Parallel parser processes
+    RESUME_EXTRACTION_MAX_QUEUE: int = 16          # Uploads allowed to wait for a worker before rejecting with 503
+    RESUME_EXTRACTION_TIMEOUT_SECONDS: float = 30.0
+    RESUME_MAX_FILE_BYTES: int = 10 * 1024 * 1024  # 10 MB
+    RESUME_MAX_PDF_PAGES: int = 50
+
+    # Bulk resume ingestion (see app/services/bulk_ingestion.py)
+    BULK_INGEST_MAX_FILES: int = 1000
+    BULK_INGEST_MAX_UPLOAD_BYTES: int = 200 * 1024 * 1024  # Total request size (archives included)
+    BULK_INGEST_EXTRACT_CONCURRENCY: int = 2               # Keep <= RESUME_EXTRACTION_MAX_WORKERS + RESUME_EXTRACTION_MAX_QUEUE
+    BULK_INGEST_PARSE_CONCURRENCY: int = 4                 # Concurrent parse_resume LLM calls per job
+    BULK_INGEST_INSERT_BATCH_SIZE: int = 50
+    BULK_INGEST_MAX_RETAINED_JOBS: int = 50                # Finished job statuses kept in memory
+
+    # Bulk interview log ingestion (see app/services/log_ingestion.py)
+    LOG_BULK_MAX_ENTRIES: int = 5000
+    LOG_BULK_MAX_BYTES: int = 20 * 1024 * 1024
+
+    # Background task queue (see app/services/task_queue.py)
+    TASK_QUEUE_WORKERS: int = 2
+    TASK_MAX_ATTEMPTS: int = 3
+    TASK_RETRY_BASE_DELAY_SECONDS: float = 2.0  # Doubled after every failed attempt
+    TASK_LEASE_SECONDS: float = 120.0  # A RUNNING task whose lease was not renewed for this long is run again
+    TASK_HEARTBEAT_SECONDS: float = 30.0  # How often a running task renews its lease
+
+    # List endpoints (see app/api/v1/pagination.py)
+    PAGINATION_MAX_LIMIT: int = 1000
+    PAGINATION_COUNT_ESTIMATE_CAP: int = 10000  # count=estimate on a filtered listing counts at most this many rows
+
+    # Logging (see app/core/logging_setup.py)
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: Dict[str, str] = {}    # Per-logger overrides, e.g. {"app.services.llm_cache": "DEBUG"}
+    LOG_FORMAT: str = "text"           # "text" or "json" (one object per line)
+    LOG_ASYNC: bool = True             # Write records from a background thread (QueueHandler/QueueListener)
+    DB_ECHO: bool = False              # Log every SQL statement (SQLAlchemy echo)
+
     # model_config 用于配置 Pydantic-settings 的行为
     # 在这里，我们指定从 .env 文件加载环境变量
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding='utf-8', extra='ignore')
 
 settings = Settings()
 
-def setup_logging(level=logging.INFO):
-    """
-    Set up basic logging configuration.
-    Outputs to stdout, includes timestamp, level, logger name, and message.
-    """
-    # Check if handlers are already configured to avoid adding duplicate handlers
-    # if not logging.getLogger().hasHandlers(): # This check might be too broad
-    # A more specific check or a flag could be used if re-configuration is an issue.
-    # For now, basicConfig is idempotent if no handlers are set for root logger,
-    # but if called multiple times after handlers are set, it might add more.
-    # To be safe, especially if this module could be reloaded, consider a flag.
-    
-    # Let's try to make it safer for potential reloads or multiple calls.
-    # Get the root logger
-    root_logger = logging.getLogger()
-    
-    # Remove any existing handlers from the root logger to prevent duplication
-    # if this function is called multiple times (e.g., due to module reloads in tests)
-    # This is a bit aggressive but ensures a clean setup for our specific diagnostic case.
-    # In a production app, you might want a more nuanced approach.
-    if root_logger.hasHandlers():
-        for handler in root_logger.handlers[:]: # Iterate over a copy
-            root_logger.removeHandler(handler)
-            handler.close() # Close handler before removing
-
-    logging.basicConfig(
-        level=level,
-        format="%(asctime)s [%(levelname)-8s] %(name)-30s: %(message)s", # Adjusted format for better readability
-        datefmt="%Y-%m-%d %H:%M:%S",
-        handlers=[logging.StreamHandler(sys.stdout)] # Ensure logs go to stdout
-    )
-
-# Call it once when the module is imported.
-# For current diagnostics, set a low level like DEBUG.
-# In a real app, this might be INFO by default and configurable.
-setup_logging(level=logging.DEBUG)
-
-# Optional: Test if logging is working after setup
-# test_logger = logging.getLogger(__name__)
-# test_logger.debug("Core config logging initialized with DEBUG level for diagnostics from config.py.")
-# test_logger.info("Info test from config.py")
-# test_logger.warning("Warning test from config.py") 
\ No newline at end of file
+# Configure logging once when the settings are first imported (see app/core/logging_setup.py)
+setup_logging(
+    level=settings.LOG_LEVEL,
+    log_format=settings.LOG_FORMAT,
+    use_queue=settings.LOG_ASYNC,
+    logger_levels=settings.LOG_LEVELS,
+)
@@ -0,0 +1,130 @@
+# app/core/llm_gateway.py
+
+"""
+Single owner of the outbound connections to the LLM provider.
+
+Before, every parse_resume / analyze_jd / generate_interview_report call built a fresh
+``ChatOpenAI`` (and with it a new httpx client), so each request paid for its own TCP/TLS
+handshake. The gateway keeps:
+
+* one ``httpx.AsyncClient`` with a keep-alive connection pool (``LLM_HTTP_*`` settings),
+  shared by the raw ``AsyncOpenAI`` client and every LangChain model;
+* ``ChatOpenAI`` instances cached per (model, temperature);
+* ``prompt | llm | StrOutputParser()`` chains cached per (model, temperature, prompt, response
+  format), the latter for structured output (app/core/structured_output.py).
+
+Retries are left to app/core/llm_scheduler.py (``max_retries=0`` on both clients), which also
+reads the rate-limit headers of every response through a hook on the pool.
+
+Everything is created lazily on first use and released by ``close_llm_gateway()`` in the
+FastAPI lifespan; the next call after a close simply builds a new pool.
+"""
+
+import logging
+from typing import Dict, Optional, Tuple
+
+import httpx
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
+from langchain_openai import ChatOpenAI
+from openai import AsyncOpenAI
+
+from app.core.config import settings
+from app.core.llm_scheduler import llm_scheduler
+from app.core.structured_output import response_format_key
+
+logger = logging.getLogger(__name__)
+
+
+class LLMGateway:
+    """Shared HTTP pool + cached OpenAI/LangChain clients. Not thread-safe; use from the event loop."""
+
+    def __init__(self):
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._openai_client: Optional[AsyncOpenAI] = None
+        self._chat_models: Dict[Tuple[str, float], ChatOpenAI] = {}
+        self._chains: Dict[Tuple[str, float, str, Optional[str]], Runnable] = {}
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+                ),
+                timeout=httpx.Timeout(settings.LLM_REQUEST_TIMEOUT_SECONDS, connect=10.0),
+                event_hooks={"response": [llm_scheduler.observe_response]},
+            )
+            logger.info(
+                "LLM HTTP pool created (max_connections=%s, keepalive=%s).",
+                settings.LLM_HTTP_MAX_CONNECTIONS, settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            )
+        return self._http_client
+
+    def get_openai_client(self) -> AsyncOpenAI:
+        """The raw AsyncOpenAI client (chat.completions streaming etc.), on the shared pool."""
+        if self._openai_client is None:
+            self._openai_client = AsyncOpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                base_url=settings.OPENAI_API_BASE, # base_url can be None, AsyncOpenAI handles it
+                timeout=settings.LLM_REQUEST_TIMEOUT_SECONDS,
+                max_retries=0,
+                http_client=self.http_client,
+            )
+        return self._openai_client
+
+    def get_chat_model(self, model_name: str, temperature: Optional[float] = None) -> ChatOpenAI:
+        """Returns the cached ChatOpenAI for (model, temperature); temperature None = provider default."""
+        key = (model_name, temperature)
+        llm = self._chat_models.get(key)
+        if llm is None:
+            llm_params = {
+                "openai_api_key": settings.OPENAI_API_KEY,
+                "model_name": model_name,
+                "openai_api_base": settings.OPENAI_API_BASE,
+                "request_timeout": settings.LLM_REQUEST_TIMEOUT_SECONDS,
+                "max_retries": 0,
+                "http_async_client": self.http_client,
+            }
+            if temperature is not None:
+                llm_params["temperature"] = temperature
+            llm = ChatOpenAI(**llm_params)
+            self._chat_models[key] = llm
+        return llm
+
+    def get_chain(self, prompt_template: str, model_name: str, temperature: Optional[float] = None, response_format: Optional[dict] = None) -> Runnable:
+        """Returns the cached ``prompt | llm | StrOutputParser()`` chain for (model, temperature, prompt, response_format)."""
+        key = (model_name, temperature, prompt_template, response_format_key(response_format))
+        chain = self._chains.get(key)
+        if chain is None:
+            prompt = ChatPromptTemplate.from_template(prompt_template)
+            llm = self.get_chat_model(model_name, temperature)
+            if response_format is not None:
+                llm = llm.bind(response_format=response_format)
+            chain = prompt | llm | StrOutputParser()
+            self._chains[key] = chain
+        return chain
+
+    async def aclose(self) -> None:
+        """Closes the connection pool and drops every client built on it."""
+        http_client, self._http_client = self._http_client, None
+        self._openai_client = None
+        self._chat_models.clear()
+        self._chains.clear()
+        if http_client is not None and not http_client.is_closed:
+            await http_client.aclose()
+            logger.info("LLM HTTP pool closed.")
+
+
+llm_gateway = LLMGateway()
+
+
+def get_llm_chain(prompt_template: str, model_name: str, temperature: Optional[float] = None, response_format: Optional[dict] = None) -> Runnable:
+    return llm_gateway.get_chain(prompt_template, model_name, temperature, response_format)
+
+
+async def close_llm_gateway() -> None:
+    await llm_gateway.aclose()
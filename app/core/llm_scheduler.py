@@ -0,0 +1,427 @@
+# app/core/llm_scheduler.py
+
+"""
+Admission control for outbound LLM calls.
+
+Every call made through ai_services.py / ai_report_generator.py passes through
+``llm_scheduler.run()`` (or ``.stream()``), which per model enforces:
+
+* a concurrency limit (``LLM_MAX_CONCURRENCY`` / ``LLM_MODEL_CONCURRENCY``);
+* a token-per-minute budget (``LLM_TPM_LIMIT`` / ``LLM_MODEL_TPM_LIMITS``): each call reserves
+  its prompt tokens (tiktoken, see app/core/tokens.py) + completion tokens in a sliding 60 s window;
+* priority classes: waiting calls are admitted INTERACTIVE first, then STANDARD, then BATCH
+  (FIFO within a class), so a follow-up suggestion overtakes queued report jobs. A running
+  call is never interrupted. Background work sets its class with ``with llm_priority(...)``.
+
+The provider's rate-limit headers (``x-ratelimit-*``, seen on every response via an httpx hook
+on the gateway pool) tighten the budget and pause a model when its remaining tokens/requests
+run out. 429 / 5xx / connection errors are retried with tenacity, waiting for ``retry-after``
+(or the reset headers) when present and exponential backoff otherwise; the client libraries'
+own retries are disabled (see llm_gateway.py) so the scheduler sees every attempt.
+
+``get_metrics()`` reports per-model saturation (in flight, queued per class, window usage,
+wait times, 429 counts) for /api/v1/metrics.
+"""
+
+import asyncio
+import contextlib
+import enum
+import heapq
+import itertools
+import logging
+import re
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, TypeVar
+
+import httpx
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt
+
+from app.core.config import settings
+from app.core.tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+TPM_WINDOW_SECONDS = 60.0
+
+
+class LLMPriority(enum.IntEnum):
+    INTERACTIVE = 0  # A user is waiting on the screen (follow-ups, question generation)
+    STANDARD = 1     # Regular request/response work (report, analyses)
+    BATCH = 2        # Background tasks, bulk imports
+
+
+_priority_override: ContextVar[Optional[LLMPriority]] = ContextVar("llm_priority", default=None)
+_current_model: ContextVar[Optional[str]] = ContextVar("llm_current_model", default=None)
+
+
+@contextlib.contextmanager
+def llm_priority(priority: LLMPriority):
+    """Runs every LLM call made within the block (and tasks started from it) with the given priority."""
+    token = _priority_override.set(priority)
+    try:
+        yield
+    finally:
+        _priority_override.reset(token)
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parses OpenAI reset headers such as "20ms", "1s", "6m0s" into seconds."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    unit_seconds = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+    return sum(float(amount) * unit_seconds[unit] for amount, unit in parts)
+
+
+def retry_after_seconds(headers: httpx.Headers) -> Optional[float]:
+    """Delay requested by the provider, if any (retry-after-ms, retry-after, then reset headers)."""
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    if headers.get("retry-after"):
+        try:
+            return float(headers["retry-after"])
+        except ValueError:
+            pass
+    resets = [
+        parse_reset_duration(headers.get(name))
+        for name in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens")
+        if headers.get(name)
+    ]
+    resets = [r for r in resets if r is not None]
+    return max(resets) if resets else None
+
+
+def _is_transient(error: BaseException) -> bool:
+    if isinstance(error, (RateLimitError, InternalServerError)):
+        return True
+    # A timeout already waited LLM_REQUEST_TIMEOUT_SECONDS; retrying it only makes the caller wait longer
+    return isinstance(error, APIConnectionError) and not isinstance(error, APITimeoutError)
+
+
+class _ModelLimiter:
+    """Concurrency + TPM bookkeeping and the priority wait queue of one model."""
+
+    def __init__(self, model: str, max_concurrency: int, tpm_limit: int):
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.configured_tpm_limit = tpm_limit
+        self.tpm_limit = tpm_limit
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._window: Deque[Tuple[float, int]] = deque()  # (admitted at, reserved tokens)
+        self._window_tokens = 0
+        self._waiters: List[Tuple[int, int, int, asyncio.Future]] = []  # heap of (priority, seq, tokens, future)
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        # Metrics
+        self.admitted = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.max_queue_depth = 0
+        self._wait_seconds: Deque[float] = deque(maxlen=500)
+
+    def _expire_window(self, now: float) -> None:
+        while self._window and now - self._window[0][0] >= TPM_WINDOW_SECONDS:
+            _, tokens = self._window.popleft()
+            self._window_tokens -= tokens
+
+    def _blocked_for(self, tokens: int, now: float) -> Optional[float]:
+        """None if a call of `tokens` can start now, else seconds until the budget may allow it (0 = wait for a slot)."""
+        if self.in_flight >= self.max_concurrency:
+            return 0.0
+        if now < self.paused_until:
+            return self.paused_until - now
+        self._expire_window(now)
+        # A single call larger than the whole budget is admitted into an empty window instead of waiting forever
+        if self._window and self._window_tokens + tokens > self.tpm_limit:
+            return max(0.01, TPM_WINDOW_SECONDS - (now - self._window[0][0]))
+        return None
+
+    def _dispatch(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        while self._waiters:
+            priority, seq, tokens, future = self._waiters[0]
+            if future.done():  # Cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            now = time.monotonic()
+            blocked_for = self._blocked_for(tokens, now)
+            if blocked_for is not None:
+                if blocked_for > 0:
+                    self._wakeup = loop.call_later(blocked_for, self._dispatch)
+                return
+            heapq.heappop(self._waiters)
+            self._admit(tokens, now)
+            future.set_result(None)
+
+    def _admit(self, tokens: int, now: float) -> None:
+        self.in_flight += 1
+        self.admitted += 1
+        self._window.append((now, tokens))
+        self._window_tokens += tokens
+
+    async def acquire(self, tokens: int, priority: LLMPriority) -> None:
+        started = time.monotonic()
+        if not self._waiters and self._blocked_for(tokens, started) is None:
+            self._admit(tokens, started)
+            self._wait_seconds.append(0.0)
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._seq), tokens, future))
+        self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+        self._dispatch()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()  # Admitted just as we were cancelled
+            raise
+        self._wait_seconds.append(time.monotonic() - started)
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        if self._waiters:
+            self._dispatch()
+
+    def pause(self, seconds: float) -> None:
+        until = time.monotonic() + seconds
+        if until > self.paused_until:
+            self.paused_until = until
+            logger.warning("LLM scheduler: pausing model %s for %.2fs (provider rate limit)", self.model, seconds)
+
+    def observe_headers(self, headers: httpx.Headers) -> None:
+        limit_tokens = headers.get("x-ratelimit-limit-tokens")
+        if limit_tokens and limit_tokens.isdigit():
+            # Never budget above what the provider says this key may use
+            self.tpm_limit = min(self.configured_tpm_limit, int(limit_tokens))
+        for remaining_name, reset_name in (
+            ("x-ratelimit-remaining-requests", "x-ratelimit-reset-requests"),
+            ("x-ratelimit-remaining-tokens", "x-ratelimit-reset-tokens"),
+        ):
+            remaining = headers.get(remaining_name)
+            if remaining is not None and remaining.isdigit() and int(remaining) == 0:
+                reset = parse_reset_duration(headers.get(reset_name))
+                if reset:
+                    self.pause(reset)
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        self._expire_window(now)
+        waits = sorted(self._wait_seconds)
+        queued = {p.name.lower(): 0 for p in LLMPriority}
+        for priority, _, _, future in self._waiters:
+            if not future.done():
+                queued[LLMPriority(priority).name.lower()] += 1
+
+        def percentile(p: float) -> Optional[float]:
+            if not waits:
+                return None
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))], 4)
+        return {
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self.in_flight,
+            "concurrency_utilization": round(self.in_flight / self.max_concurrency, 4) if self.max_concurrency else None,
+            "queued": queued,
+            "max_queue_depth": self.max_queue_depth,
+            "tpm_limit": self.tpm_limit,
+            "tokens_in_window": self._window_tokens,
+            "tpm_utilization": round(self._window_tokens / self.tpm_limit, 4) if self.tpm_limit else None,
+            "paused_for_seconds": round(max(0.0, self.paused_until - now), 3),
+            "admitted": self.admitted,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "wait_seconds": {"p50": percentile(0.5), "p95": percentile(0.95), "max": round(waits[-1], 4) if waits else None},
+        }
+
+
+async def _aclose(stream) -> None:
+    if stream is not None and hasattr(stream, "aclose"):
+        await stream.aclose()
+
+
+class LLMScheduler:
+    def __init__(self):
+        self._limiters: Dict[str, _ModelLimiter] = {}
+
+    def _limiter(self, model: str) -> _ModelLimiter:
+        limiter = self._limiters.get(model)
+        if limiter is None:
+            limiter = _ModelLimiter(
+                model,
+                max_concurrency=settings.LLM_MODEL_CONCURRENCY.get(model, settings.LLM_MAX_CONCURRENCY),
+                tpm_limit=settings.LLM_MODEL_TPM_LIMITS.get(model, settings.LLM_TPM_LIMIT),
+            )
+            self._limiters[model] = limiter
+        return limiter
+
+    @staticmethod
+    def _resolve_priority(default: LLMPriority) -> LLMPriority:
+        override = _priority_override.get()
+        return override if override is not None else default
+
+    @contextlib.asynccontextmanager
+    async def slot(self, model: str, tokens: int, priority: LLMPriority = LLMPriority.STANDARD):
+        """Holds one admission for `model` for the duration of the block (no retries)."""
+        limiter = self._limiter(model)
+        await limiter.acquire(tokens, self._resolve_priority(priority))
+        model_token = _current_model.set(model)
+        try:
+            yield
+        finally:
+            _current_model.reset(model_token)
+            limiter.release()
+
+    def _retrying(self, model: str) -> AsyncRetrying:
+        limiter = self._limiter(model)
+
+        def wait(retry_state) -> float:
+            error = retry_state.outcome.exception()
+            backoff = min(
+                settings.LLM_RETRY_MAX_DELAY_SECONDS,
+                settings.LLM_RETRY_BASE_DELAY_SECONDS * (2 ** (retry_state.attempt_number - 1))
+            )
+            response = getattr(error, "response", None)
+            requested = retry_after_seconds(response.headers) if response is not None else None
+            delay = min(settings.LLM_RETRY_MAX_DELAY_SECONDS, max(backoff, requested or 0.0))
+            if isinstance(error, RateLimitError):
+                # Everyone queued for this model waits, not just this caller
+                limiter.pause(delay)
+            return delay
+
+        def before_sleep(retry_state) -> None:
+            limiter.retries += 1
+            logger.warning(
+                "LLM scheduler: %s attempt %s failed (%s), retrying in %.2fs",
+                model, retry_state.attempt_number, type(retry_state.outcome.exception()).__name__, retry_state.next_action.sleep,
+            )
+
+        return AsyncRetrying(
+            stop=stop_after_attempt(settings.LLM_MAX_ATTEMPTS),
+            wait=wait,
+            retry=retry_if_exception(_is_transient),
+            before_sleep=before_sleep,
+            reraise=True,
+        )
+
+    def _record_error(self, model: str, error: BaseException) -> None:
+        if isinstance(error, RateLimitError):
+            self._limiter(model).rate_limited += 1
+
+    async def run(
+        self,
+        model: str,
+        call: Callable[[], Awaitable[T]],
+        tokens: int,
+        priority: LLMPriority = LLMPriority.STANDARD
+    ) -> T:
+        """Awaits call() within the model's limits, retrying transient provider errors."""
+        async for attempt in self._retrying(model):
+            with attempt:
+                async with self.slot(model, tokens, priority):
+                    try:
+                        return await call()
+                    except Exception as e:
+                        self._record_error(model, e)
+                        raise
+
+    async def stream(
+        self,
+        model: str,
+        call: Callable[[], AsyncIterator[str]],
+        tokens: int,
+        priority: LLMPriority = LLMPriority.STANDARD
+    ) -> AsyncIterator[str]:
+        """
+        Streaming counterpart of run(): the slot is held until the stream ends. Failures before
+        the first chunk are retried; once output has been forwarded an error is raised as is.
+        """
+        limiter = self._limiter(model)
+        priority = self._resolve_priority(priority)
+        stream, first = None, None
+        async for attempt in self._retrying(model):
+            with attempt:
+                await limiter.acquire(tokens, priority)
+                model_token = _current_model.set(model)
+                try:
+                    stream = call()
+                    first = await stream.__anext__()
+                except StopAsyncIteration:
+                    pass  # Empty stream, still a successful call
+                except BaseException as e:
+                    self._record_error(model, e)
+                    await _aclose(stream)
+                    limiter.release()
+                    raise
+                finally:
+                    _current_model.reset(model_token)
+
+        try:
+            if first is not None:
+                yield first
+                async for chunk in stream:
+                    yield chunk
+        finally:
+            await _aclose(stream)
+            limiter.release()
+
+    async def observe_response(self, response: httpx.Response) -> None:
+        """httpx response hook (installed on the gateway pool): feeds rate-limit headers back to the limiter."""
+        model = _current_model.get()
+        if model is not None:
+            self._limiter(model).observe_headers(response.headers)
+
+    def get_metrics(self) -> dict:
+        return {model: limiter.snapshot() for model, limiter in self._limiters.items()}
+
+
+llm_scheduler = LLMScheduler()
+
+
+def _reserved_tokens(model: str, prompt: str, max_tokens: Optional[int]) -> int:
+    return max(1, count_tokens(prompt, model)) + (max_tokens or settings.LLM_DEFAULT_COMPLETION_TOKENS)
+
+
+def scheduled_call(
+    model: str,
+    prompt: str,
+    call: Callable[[], Awaitable[T]],
+    max_tokens: Optional[int] = None,
+    priority: LLMPriority = LLMPriority.STANDARD
+) -> Callable[[], Awaitable[T]]:
+    """Wraps call() so that it runs through the scheduler; the budget reserves prompt + max_tokens."""
+    return lambda: llm_scheduler.run(model, call, _reserved_tokens(model, prompt, max_tokens), priority)
+
+
+def scheduled_stream(
+    model: str,
+    prompt: str,
+    call: Callable[[], AsyncIterator[str]],
+    max_tokens: Optional[int] = None,
+    priority: LLMPriority = LLMPriority.STANDARD
+) -> Callable[[], AsyncIterator[str]]:
+    """Streaming counterpart of scheduled_call."""
+    return lambda: llm_scheduler.stream(model, call, _reserved_tokens(model, prompt, max_tokens), priority)
+
+
+def get_metrics() -> dict:
+    return llm_scheduler.get_metrics()
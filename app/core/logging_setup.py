@@ -0,0 +1,134 @@
+# app/core/logging_setup.py
+
+"""
+Logging pipeline of the API process, configured from the environment (``LOG_*`` settings):
+
+* ``LOG_LEVEL`` for the root logger (INFO by default) and ``LOG_LEVELS`` for per-logger
+  overrides, e.g. ``{"app.api.v1.endpoints.interviews": "DEBUG"}``. SQL statements are only
+  logged with ``DB_ECHO`` (see app/db/session.py).
+* ``LOG_ASYNC``: request handlers only put records on an in-memory queue (``QueueHandler``); a
+  ``QueueListener`` thread formats them and writes to stdout, so slow terminals or log
+  collectors do not stall the event loop.
+* ``LOG_FORMAT``: ``"text"`` (human readable) or ``"json"`` (one object per line, including the
+  ``extra={...}`` fields of the record) for log collectors.
+
+Hot paths log with ``%``-style arguments (``logger.debug("... %s", value)``) so that the
+message, and any large preview in it, is only built for records that pass the level check.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Dict, Optional
+
+TEXT_FORMAT = "%(asctime)s [%(levelname)-8s] %(name)-30s: %(message)s"
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Attributes every LogRecord has; anything else was passed through extra={...}
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, extra fields and exception."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record, DATE_FORMAT),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _RecordQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queues a copy of the record with only its message built. The stdlib prepare() formats the
+    record on the caller's thread and clears exc_info, so the listener's JSON formatter would never
+    see the exception.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        # Arguments may be mutable objects that change before the listener thread formats them
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def _parse_level(level) -> int:
+    if isinstance(level, int):
+        return level
+    parsed = logging.getLevelName(str(level).upper())
+    if not isinstance(parsed, int):
+        raise ValueError(f"Unknown log level: {level!r}")
+    return parsed
+
+
+def setup_logging(
+    level="INFO",
+    log_format: str = "text",
+    use_queue: bool = True,
+    logger_levels: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    (Re)configures the root logger. Safe to call more than once: the previous handlers and
+    queue listener are removed first.
+    """
+    global _listener, _queue_handler
+    shutdown_logging()
+
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+        handler.close()
+
+    output_handler = logging.StreamHandler(sys.stdout)
+    output_handler.setFormatter(JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_FORMAT, DATE_FORMAT))
+
+    if use_queue:
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _queue_handler = _RecordQueueHandler(log_queue)
+        root_logger.addHandler(_queue_handler)
+        _listener = logging.handlers.QueueListener(log_queue, output_handler, respect_handler_level=True)
+        _listener.start()
+    else:
+        root_logger.addHandler(output_handler)
+
+    root_logger.setLevel(_parse_level(level))
+    for logger_name, logger_level in (logger_levels or {}).items():
+        logging.getLogger(logger_name).setLevel(_parse_level(logger_level))
+
+
+def shutdown_logging() -> None:
+    """
+    Stops the queue listener after writing out the queued records. Later records are written by
+    the output handler directly instead of going to a queue nobody reads.
+    """
+    global _listener, _queue_handler
+    listener, _listener = _listener, None
+    queue_handler, _queue_handler = _queue_handler, None
+    if listener is None:
+        return
+    root_logger = logging.getLogger()
+    if queue_handler in root_logger.handlers:
+        # Swapped before the listener stops, so no record lands behind its stop sentinel
+        root_logger.removeHandler(queue_handler)
+        for output_handler in listener.handlers:
+            root_logger.addHandler(output_handler)
+    listener.stop()
+
+
+atexit.register(shutdown_logging)
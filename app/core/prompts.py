@@ -151,8 +151,160 @@ INTERVIEW_REPORT_GENERATION_PROMPT = """
 
 """
 
+# Map step for interview transcripts that do not fit the report prompt budget
+# (see app/services/report_prompt.py); the summaries replace the transcript in INTERVIEW_REPORT_GENERATION_PROMPT.
+TRANSCRIPT_SEGMENT_SUMMARY_PROMPT = """
+你是专业的面试记录整理助手。以下是一场面试记录中的一段（若干问答）。这段摘要将代替原始记录，用于后续生成候选人评估报告。
+
+**职位描述（JD）分析摘要**:
+```
+{analyzed_jd}
+```
+
+**面试记录片段**:
+```
+{conversation_segment}
+```
+
+**输出要求**：
+1.  按原有编号逐题整理（例如 "Q3: ..." / "A3 要点: ..."），保留问题原文的核心内容，不要合并或遗漏题目。
+2.  对每个回答提炼要点：候选人给出的具体事例、技术细节、数据与结果、思路与方法，以及明显的不足、回避或错误。
+3.  尽量保留能体现能力维度（专业技能、解决问题、沟通表达、团队协作、学习能力）的原话或关键表述。
+4.  只陈述记录中的事实，不要评分、不要给出结论，不要添加记录中没有的信息。
+5.  使用中文，直接输出整理结果，不要添加标题或额外说明。
+"""
+
+# Segmented report engine (see app/services/segmented_report.py): one call per question/answer
+# segment (map), then a short report over the segment assessments (reduce).
+SEGMENT_ASSESSMENT_PROMPT = """
+你是专业的面试评估专家。请根据职位描述（JD）分析，评估候选人对下面这一道面试题的回答。
+
+**职位描述（JD）分析摘要**:
+```
+{analyzed_jd}
+```
+
+**面试问题**:
+```
+{question}
+```
+
+**候选人回答**:
+```
+{answer}
+```
+
+**输出要求**：
+只输出一个JSON对象，不要添加任何其他文字或markdown标记，格式如下：
+{{
+  "scores": {{
+    "专业技能与知识": 4,
+    "解决问题的能力": 3,
+    "沟通表达能力": 4,
+    "团队协作倾向": null,
+    "学习能力与潜力": null
+  }},
+  "evidence": "一到三句话，概括回答中支撑评分的具体事例或表述",
+  "strengths": ["亮点1"],
+  "concerns": ["不足或风险1"]
+}}
+其中评分为1-5的整数（1=远未达到期望，3=基本达到期望，5=远超期望）；本题回答未能体现的维度请填 null，不要猜测。
+"""
+
+SEGMENTED_REPORT_PROMPT = """
+你是专业的面试评估专家。面试中的每一道题已经被单独评估过，请根据职位描述（JD）分析、候选人简历摘要以及下面的逐题评估结果，为候选人撰写一份全面的面试评估报告。
+
+**职位描述（JD）分析摘要**:
+```
+{analyzed_jd}
+```
+
+**候选人简历结构化摘要**:
+```
+{structured_resume}
+```
+
+**逐题评估结果**（每题包含各维度1-5分评分，null 表示该题未体现该维度）:
+```
+{segment_assessments}
+```
+
+**各维度平均分（仅供参考）**:
+```
+{aggregated_scores}
+```
+
+报告应包含以下部分：
+1.  **综合评估**: 对候选人与职位匹配度的总体看法，是否推荐进入下一轮或录用，并简要说明理由。
+2.  **能力维度分析**: 针对专业技能与知识、解决问题的能力、沟通表达能力、团队协作倾向、学习能力与潜力，结合逐题评估中的具体事例进行分析。
+3.  **亮点与优势**: 总结候选人的主要优点和突出表现。
+4.  **风险与待发展点**: 指出候选人可能存在的风险、不足或与职位要求尚有差距的地方，并尽可能提供具体建议。
+5.  **建议提问（如果进入下一轮）**:（可选）提出1-2个建议在后续面试中进一步考察的问题。
+
+**输出要求**：
+请严格按照以上报告结构进行组织，确保内容客观、具体、专业，用中文撰写。
+最终评分应综合各题表现（可参考平均分，但需结合题目的重要性与回答质量判断）。
+在报告的最后，请务必严格按照以下格式输出JSON块，其中每个能力维度的评分应为1-5的整数。不要在该JSON块前后添加任何其他描述性文字或标题：
+```json
+{{
+  "CANDIDATE_CAPABILITY_ASSESSMENT_JSON": {{
+    "专业技能与知识": 3,
+    "解决问题的能力": 4,
+    "沟通表达能力": 3,
+    "团队协作倾向": 4,
+    "学习能力与潜力": 5
+  }}
+}}
+```
+
+"""
+
+# Incremental report refresh (see app/services/report_refresh.py): only the changed part of the
+# interview log is sent, together with the previous report.
+REPORT_INCREMENTAL_UPDATE_PROMPT = """
+你是专业的面试评估专家。下面是一份已经生成的候选人面试评估报告，之后面试记录发生了少量变化（新增、修改或删除了部分问答）。请根据这些变化更新报告。
+
+**职位描述（JD）分析摘要**:
+```
+{analyzed_jd}
+```
+
+**已有评估报告**:
+```
+{previous_report}
+```
+
+**已有能力维度评分**:
+```
+{previous_scores}
+```
+
+**面试记录的变化**:
+```
+{transcript_delta}
+```
+
+**输出要求**：
+1.  输出完整的、更新后的评估报告（不是修改说明），保持已有报告的结构：综合评估、能力维度分析、亮点与优势、风险与待发展点、建议提问。
+2.  只根据上述变化调整相关内容；未受影响的结论和表述尽量保持原样。删除的问答不应再作为依据。
+3.  如果变化影响了某个能力维度，请相应调整评分，否则保持原评分。
+4.  请用中文撰写。
+在报告的最后，请务必严格按照以下格式输出JSON块，其中每个能力维度的评分应为1-5的整数。不要在该JSON块前后添加任何其他描述性文字或标题：
+```json
+{{
+  "CANDIDATE_CAPABILITY_ASSESSMENT_JSON": {{
+    "专业技能与知识": 3,
+    "解决问题的能力": 4,
+    "沟通表达能力": 3,
+    "团队协作倾向": 4,
+    "学习能力与潜力": 5
+  }}
+}}
+```
+
+"""
+
 # You can add more prompts here for other AI functionalities
-# e.g., a prompt for summarizing a long interview transcript, etc.
 
 COMMON_FOLLOW_UP_QUESTIONS = [
     "能否详细说明一下您在其中扮演的具体角色？",
@@ -0,0 +1,133 @@
+# app/core/schema_registry.py
+
+"""
+Registry of the JSON Schemas that LLM payloads are checked against (questions, follow-ups,
+segment assessments, the radar capability assessment).
+
+Each schema is checked and compiled into a Draft 2020-12 validator once, when it is registered
+(at import for the built-in ones), instead of per request. ``validate_payload`` takes the
+``is_valid`` fast path and only walks the errors of an invalid payload; the result is a list of
+``SchemaViolation`` with the JSON Pointer of each offending value, so callers can log or retry on
+specific paths. Validation counts and latency are kept per schema for /metrics.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from jsonschema import Draft202012Validator
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_INTERVIEW_QUESTIONS = "interview_questions"
+SCHEMA_FOLLOWUP_QUESTIONS = "followup_questions"
+SCHEMA_SEGMENT_ASSESSMENT = "segment_assessment"
+SCHEMA_CAPABILITY_ASSESSMENT = "capability_assessment"
+
+
+@dataclass(frozen=True)
+class SchemaViolation:
+    """One validation error: path is a JSON Pointer ("" for the payload itself)."""
+    path: str
+    message: str
+    validator: str
+
+    def as_dict(self) -> Dict[str, str]:
+        return {"path": self.path, "message": self.message, "validator": self.validator}
+
+
+def _json_pointer(parts) -> str:
+    return "".join("/" + str(part).replace("~", "~0").replace("/", "~1") for part in parts)
+
+
+class SchemaRegistry:
+    def __init__(self):
+        self._validators: Dict[str, Draft202012Validator] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def register(self, name: str, schema: dict) -> None:
+        """Checks and compiles schema; raises jsonschema.SchemaError if it is not a valid schema."""
+        Draft202012Validator.check_schema(schema)
+        self._validators[name] = Draft202012Validator(schema)
+        self._stats[name] = {"validations": 0, "failures": 0, "total_ms": 0.0, "max_ms": 0.0}
+
+    def schema(self, name: str) -> dict:
+        return self._validators[name].schema
+
+    def validate(self, name: str, instance: Any) -> List[SchemaViolation]:
+        """The violations of instance against schema name (empty when it is valid)."""
+        validator = self._validators[name]
+        started = time.perf_counter()
+        if validator.is_valid(instance):
+            violations = []
+        else:
+            violations = [
+                SchemaViolation(_json_pointer(error.absolute_path), error.message, str(error.validator))
+                for error in sorted(validator.iter_errors(instance), key=lambda error: list(map(str, error.absolute_path)))
+            ]
+        self._record(name, (time.perf_counter() - started) * 1000, bool(violations))
+        return violations
+
+    def is_valid(self, name: str, instance: Any) -> bool:
+        return not self.validate(name, instance)
+
+    def _record(self, name: str, elapsed_ms: float, failed: bool) -> None:
+        stats = self._stats[name]
+        stats["validations"] += 1
+        stats["failures"] += failed
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    def get_metrics(self) -> dict:
+        return {
+            name: {
+                "validations": int(stats["validations"]),
+                "failures": int(stats["failures"]),
+                "avg_ms": round(stats["total_ms"] / stats["validations"], 4) if stats["validations"] else None,
+                "max_ms": round(stats["max_ms"], 4),
+            }
+            for name, stats in self._stats.items()
+        }
+
+
+schema_registry = SchemaRegistry()
+
+
+def string_list_schema(key: str, strict: bool = False) -> dict:
+    """{key: [strings]}; strict forbids other keys (required by the provider's strict mode)."""
+    schema = {
+        "type": "object",
+        "properties": {key: {"type": "array", "items": {"type": "string"}}},
+        "required": [key],
+    }
+    if strict:
+        schema["additionalProperties"] = False
+    return schema
+
+
+# Parsed LLM outputs. Kept as loose as the consumers allow, so free-text outputs that parsed
+# before still do (extra keys are ignored, segment scores are range-checked by
+# app/services/segmented_report.py). What the provider is asked to produce is stricter, see
+# app/core/structured_output.py.
+schema_registry.register(SCHEMA_INTERVIEW_QUESTIONS, string_list_schema("questions"))
+schema_registry.register(SCHEMA_FOLLOWUP_QUESTIONS, string_list_schema("followup_questions"))
+schema_registry.register(SCHEMA_SEGMENT_ASSESSMENT, {
+    "type": "object",
+    "properties": {"scores": {"type": "object"}},
+    "required": ["scores"],
+})
+# Inner object of the CANDIDATE_CAPABILITY_ASSESSMENT_JSON block (stored as Interview.radar_data)
+schema_registry.register(SCHEMA_CAPABILITY_ASSESSMENT, {
+    "type": "object",
+    "minProperties": 1,
+    "additionalProperties": {"type": "number", "minimum": 1, "maximum": 5},
+})
+
+
+def validate_payload(name: str, instance: Any) -> List[SchemaViolation]:
+    return schema_registry.validate(name, instance)
+
+
+def get_metrics() -> dict:
+    return schema_registry.get_metrics()
@@ -0,0 +1,171 @@
+# app/core/structured_output.py
+
+"""
+Structured output for the LLM calls whose result is consumed as JSON: interview questions,
+follow-up questions and segment assessments.
+
+* The strict JSON Schemas sent to the provider live here; parsed outputs are validated against
+  the looser schemas of app/core/schema_registry.py.
+* ``LLM_STRUCTURED_OUTPUT`` selects what is asked of the provider: ``"json_schema"`` (strict,
+  schema-constrained decoding), ``"json_object"`` (JSON mode, the prompt still describes the
+  shape) or ``"off"`` (free text, as before).
+* OpenAI-compatible endpoints that reject ``response_format`` (older models, some proxies) get
+  the call repeated without it once; the model is then remembered and later calls go out plain.
+* ``parse_structured`` tries the whole output as JSON first (what a constrained response is),
+  then locates the object in free text (app/utils/json_parser.py); callers keep their
+  line-splitting fallback for the rare output that is neither. ``parse_structured_output`` also
+  returns the schema violations, for callers that retry.
+"""
+
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, TypeVar
+
+from jsonschema import Draft202012Validator
+from openai import BadRequestError
+
+from app.core.config import settings
+from app.core.schema_registry import (
+    SCHEMA_FOLLOWUP_QUESTIONS,
+    SCHEMA_INTERVIEW_QUESTIONS,
+    SCHEMA_SEGMENT_ASSESSMENT,
+    SchemaViolation,
+    string_list_schema,
+    validate_payload,
+)
+from app.utils.json_parser import find_json_object
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+STRUCTURED_OUTPUT_JSON_SCHEMA = "json_schema"
+STRUCTURED_OUTPUT_JSON_OBJECT = "json_object"
+STRUCTURED_OUTPUT_OFF = "off"
+
+# The five capability dimensions scored by the report prompts
+REPORT_DIMENSIONS = ("专业技能与知识", "解决问题的能力", "沟通表达能力", "团队协作倾向", "学习能力与潜力")
+
+
+# What the provider is asked to produce (parsed outputs are validated against the looser
+# schemas of the same name in app/core/schema_registry.py), within the strict-mode subset:
+# every property required, no additional properties
+_RESPONSE_SCHEMAS: Dict[str, dict] = {
+    SCHEMA_INTERVIEW_QUESTIONS: string_list_schema("questions", strict=True),
+    SCHEMA_FOLLOWUP_QUESTIONS: string_list_schema("followup_questions", strict=True),
+    SCHEMA_SEGMENT_ASSESSMENT: {
+        "type": "object",
+        "properties": {
+            "scores": {
+                "type": "object",
+                "properties": {dimension: {"type": ["integer", "null"]} for dimension in REPORT_DIMENSIONS},
+                "required": list(REPORT_DIMENSIONS),
+                "additionalProperties": False,
+            },
+            "evidence": {"type": "string"},
+            "strengths": {"type": "array", "items": {"type": "string"}},
+            "concerns": {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["scores", "evidence", "strengths", "concerns"],
+        "additionalProperties": False,
+    },
+}
+
+# Key that identifies the object when it has to be located in free text
+_ROOT_KEYS = {
+    SCHEMA_INTERVIEW_QUESTIONS: "questions",
+    SCHEMA_FOLLOWUP_QUESTIONS: "followup_questions",
+    SCHEMA_SEGMENT_ASSESSMENT: "scores",
+}
+
+for _schema in _RESPONSE_SCHEMAS.values():
+    Draft202012Validator.check_schema(_schema)
+
+_RESPONSE_FORMATS: Dict[str, dict] = {
+    name: {"type": "json_schema", "json_schema": {"name": name, "strict": True, "schema": schema}}
+    for name, schema in _RESPONSE_SCHEMAS.items()
+}
+_JSON_OBJECT_FORMAT = {"type": "json_object"}
+
+_unsupported_models: Set[str] = set()
+
+
+def response_format_for(schema_name: str, model: str) -> Optional[dict]:
+    """The response_format to send for schema_name, or None for a plain-text request."""
+    mode = settings.LLM_STRUCTURED_OUTPUT
+    if mode == STRUCTURED_OUTPUT_OFF or model in _unsupported_models:
+        return None
+    if mode == STRUCTURED_OUTPUT_JSON_OBJECT:
+        return _JSON_OBJECT_FORMAT
+    return _RESPONSE_FORMATS[schema_name]
+
+
+def response_format_key(response_format: Optional[dict]) -> Optional[str]:
+    """Hashable identity of a response_format (for client caches)."""
+    if response_format is None:
+        return None
+    return response_format.get("json_schema", {}).get("name", response_format["type"])
+
+
+def _is_response_format_rejection(error: BadRequestError) -> bool:
+    message = str(error).lower()
+    return "response_format" in message or "json_schema" in message or "json mode" in message
+
+
+async def call_with_structured_output(schema_name: str, model: str, call: Callable[[Optional[dict]], Awaitable[T]]) -> T:
+    """
+    Runs call(response_format). If the provider rejects the response_format, the model is
+    marked as unsupported and call(None) is made instead.
+    """
+    response_format = response_format_for(schema_name, model)
+    if response_format is None:
+        return await call(None)
+    try:
+        return await call(response_format)
+    except BadRequestError as e:
+        if not _is_response_format_rejection(e):
+            raise
+        _unsupported_models.add(model)
+        logger.warning("Model %s rejected response_format (%s); structured output disabled for it.", model, e)
+        return await call(None)
+
+
+def response_format_kwargs(response_format: Optional[dict]) -> Dict[str, Any]:
+    """Keyword arguments for chat.completions.create."""
+    return {"response_format": response_format} if response_format is not None else {}
+
+
+@dataclass
+class StructuredParseResult:
+    """value is the schema-valid object, or None; errors then say why (JSON Pointer paths)."""
+    value: Optional[dict]
+    errors: List[SchemaViolation] = field(default_factory=list)
+
+
+def parse_structured_output(schema_name: str, text: Optional[str]) -> StructuredParseResult:
+    """Finds the schema-valid object in text: the whole text first, then located in prose."""
+    if not text:
+        return StructuredParseResult(None, [SchemaViolation("", "Empty output.", "json")])
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        parsed = None
+    if parsed is not None:
+        errors = validate_payload(schema_name, parsed)
+        if not errors:
+            return StructuredParseResult(parsed)
+    match = find_json_object(text, _ROOT_KEYS[schema_name])
+    if match is not None:
+        errors = validate_payload(schema_name, match.value)
+        if not errors:
+            return StructuredParseResult(match.value)
+        return StructuredParseResult(None, errors)
+    if parsed is not None:
+        return StructuredParseResult(None, errors)
+    return StructuredParseResult(None, [SchemaViolation("", f"No JSON object with a \"{_ROOT_KEYS[schema_name]}\" key found.", "json")])
+
+
+def parse_structured(schema_name: str, text: Optional[str]) -> Optional[dict]:
+    """The schema-valid object in text, or None."""
+    return parse_structured_output(schema_name, text).value
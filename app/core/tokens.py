@@ -0,0 +1,80 @@
+# app/core/tokens.py
+
+"""
+Token counting for prompt budgeting (report prompt builder, LLM scheduler).
+
+Counts come from tiktoken with the encoding of the target model; models tiktoken does not know
+use ``TOKENIZER_FALLBACK_ENCODING``. tiktoken downloads encodings on first use, so when that is
+not possible (offline containers) counting falls back to ``estimate_tokens`` instead of failing
+the LLM call. The encoding actually used is reported by ``tokenizer_name`` and recorded with the
+counts.
+"""
+
+import logging
+from functools import lru_cache
+from typing import Optional
+
+import tiktoken
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+ESTIMATE_TOKENIZER = "estimate"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~3 UTF-8 bytes per token across English and Chinese text)."""
+    return max(1, len((text or "").encode("utf-8")) // 3)
+
+
+@lru_cache(maxsize=32)
+def _load_encoding(encoding_name: str) -> Optional[tiktoken.Encoding]:
+    try:
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as e:
+        logger.warning("tiktoken encoding '%s' unavailable, using byte-length estimates: %s", encoding_name, e)
+        return None
+
+
+@lru_cache(maxsize=64)
+def _encoding_name_for(model: Optional[str]) -> str:
+    if model:
+        try:
+            return tiktoken.encoding_name_for_model(model)
+        except KeyError:
+            pass
+    return settings.TOKENIZER_FALLBACK_ENCODING
+
+
+def get_encoding(model: Optional[str] = None) -> Optional[tiktoken.Encoding]:
+    """The tiktoken encoding for model, or None when it cannot be loaded."""
+    return _load_encoding(_encoding_name_for(model))
+
+
+def tokenizer_name(model: Optional[str] = None) -> str:
+    encoding = get_encoding(model)
+    return encoding.name if encoding is not None else ESTIMATE_TOKENIZER
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    if not text:
+        return 0
+    encoding = get_encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """Returns the longest prefix of text that fits in max_tokens."""
+    if max_tokens <= 0 or not text:
+        return ""
+    encoding = get_encoding(model)
+    if encoding is None:
+        return (text or "").encode("utf-8")[: max_tokens * 3].decode("utf-8", errors="ignore")
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    # Cutting tokens can split a multi-byte character; drop the partial bytes
+    return encoding.decode_bytes(tokens[:max_tokens]).decode("utf-8", errors="ignore")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func, TIMESTAMP, Enum as DBEnum, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, UniqueConstraint, func, TIMESTAMP, Enum as DBEnum, JSON
 from sqlalchemy.orm import relationship, declarative_base
 import enum
 
@@ -7,11 +7,16 @@ Base = declarative_base()
 # 职位模型
 class Job(Base):
     __tablename__ = "jobs"
+    # Keyset pagination of the list endpoint (app/api/v1/pagination.py)
+    __table_args__ = (Index("ix_jobs_created_at_id", "created_at", "id"),)
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    title = Column(String(100), nullable=False)
+    title = Column(String(100), nullable=False, index=True)  # Indexed for the title prefix filter
     description = Column(Text, nullable=False)
     analyzed_description = Column(Text, nullable=True)
+    # Cache key for analyzed_description: sha256 of `description` and the "<model>:<prompt digest>" it was produced with
+    analyzed_description_hash = Column(String(64), nullable=True)
+    analyzed_description_version = Column(String(100), nullable=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
@@ -20,12 +25,17 @@ class Job(Base):
 # 候选人模型
 class Candidate(Base):
     __tablename__ = "candidates"
+    # Keyset pagination of the list endpoint (app/api/v1/pagination.py)
+    __table_args__ = (Index("ix_candidates_created_at_id", "created_at", "id"),)
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    name = Column(String(100), nullable=False)
+    name = Column(String(100), nullable=False, index=True)  # Indexed for the name prefix filter
     email = Column(String(100), unique=True, index=True, nullable=False)
-    resume_text = Column(Text, nullable=False)
-    structured_resume_info = Column(JSON, nullable=True)
+    resume_text = Column(Text, nullable=False)  # Raw resume text (as submitted / extracted from the file)
+    resume_summary = Column(Text, nullable=True)  # Structured summary produced by parse_resume from resume_text
+    structured_resume_info = Column(JSON, nullable=True)  # Freshness envelope of resume_summary (content_hash, version)
+    # sha256 of the resume as submitted (extracted file text, or resume_text for JSON input); used to detect re-uploads
+    resume_content_hash = Column(String(64), nullable=True, index=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
@@ -48,6 +58,8 @@ class SpeakerRole(enum.Enum):
 # 新的 InterviewLog 模型
 class InterviewLog(Base):
     __tablename__ = "interview_logs"
+    # One position per entry within its interview; also serves the per-interview loads in order_num order (Interview.logs)
+    __table_args__ = (UniqueConstraint("interview_id", "order_num", name="uq_interview_logs_interview_id_order_num"),)
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     interview_id = Column(Integer, ForeignKey("interviews.id"), nullable=False)
@@ -65,7 +77,12 @@ class InterviewLog(Base):
     # For MVP, let's assume this holds a significant chunk of dialogue related to a question.
     full_dialogue_text = Column(Text, nullable=False) # Renamed from dialogue_turn_text for consistency with generator
 
-    order_num = Column(Integer, nullable=True) # Order of this log entry within the interview
+    # Order of this log entry within the interview: 1, 2, ... assigned by the server from
+    # Interview.last_log_order_num (see app/services/log_ingestion.py), never by the client
+    order_num = Column(Integer, nullable=False)
+    # Segmented report engine: assessment of this Q/A segment and the content hash it was computed from
+    segment_assessment = Column(JSON, nullable=True)
+    segment_assessment_hash = Column(String(64), nullable=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
     # updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now()) # If logs can be edited
 
@@ -80,6 +97,7 @@ class Report(Base):
     interview_id = Column(Integer, ForeignKey("interviews.id"), unique=True, nullable=False) # One report per interview
     generated_text = Column(Text, nullable=False)
     source_dialogue = Column(Text, nullable=True) # ADDED: To store the dialogue used for report generation
+    prompt_stats = Column(JSON, nullable=True) # Token counts of the report prompt and the transcript compaction applied
     # llm_model_used = Column(String(100), nullable=True) # Optional: track model used
     # report_version = Column(Integer, default=1) # Optional: if reports can be re-generated and versioned
     created_at = Column(TIMESTAMP, server_default=func.now())
@@ -90,6 +108,13 @@ class Report(Base):
 # 面试模型 - 更新
 class Interview(Base):
     __tablename__ = "interviews"
+    # Keyset pagination of the list endpoint (app/api/v1/pagination.py), and the per-job /
+    # per-candidate listings (filtered by status, ordered by creation)
+    __table_args__ = (
+        Index("ix_interviews_created_at_id", "created_at", "id"),
+        Index("ix_interviews_job_id_status_created_at", "job_id", "status", "created_at"),
+        Index("ix_interviews_candidate_id_created_at", "candidate_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     job_id = Column(Integer, ForeignKey("jobs.id"), nullable=False)
@@ -99,12 +124,14 @@ class Interview(Base):
     conversation_log = Column(Text, nullable=True) # ADDED (or uncommented) for MVP single log
     # report = Column(Text, nullable=True) # REMOVED
     radar_data = Column(JSON, nullable=True)
+    # Per-interview sequence of InterviewLog.order_num: the last number handed out
+    last_log_order_num = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now()) # ADDED
 
     job = relationship("Job", back_populates="interviews")
     candidate = relationship("Candidate", back_populates="interviews")
-    questions = relationship("Question", back_populates="interview", cascade="all, delete-orphan")
+    questions = relationship("Question", back_populates="interview", cascade="all, delete-orphan", order_by="Question.order_num")
     
     # 新的关联关系
     logs = relationship("InterviewLog", back_populates="interview", cascade="all, delete-orphan", order_by="InterviewLog.order_num")
@@ -113,6 +140,8 @@ class Interview(Base):
 # 面试问题模型
 class Question(Base):
     __tablename__ = "questions"
+    # Questions are loaded per interview in order_num order
+    __table_args__ = (Index("ix_questions_interview_id_order_num", "interview_id", "order_num"),)
     
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     interview_id = Column(Integer, ForeignKey("interviews.id"), nullable=False)
@@ -123,6 +152,50 @@ class Question(Base):
     # Optional: if you want to navigate from Question to its logs, though less common
     # logs = relationship("InterviewLog", back_populates="question") 
 
+# Define TaskStatus Enum for BackgroundTask
+class TaskStatus(enum.Enum):
+    PENDING = "PENDING"     # Waiting for a worker (also between retries)
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"       # Permanent error or retries exhausted
+
+# 后台任务模型 (long-running LLM work executed by app/services/task_queue.py)
+class BackgroundTask(Base):
+    __tablename__ = "background_tasks"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    task_uuid = Column(String(36), unique=True, index=True, nullable=False) # Public id used by the /tasks API
+    task_type = Column(String(50), nullable=False)
+    interview_id = Column(Integer, ForeignKey("interviews.id", ondelete="CASCADE"), nullable=True, index=True)
+    # "<task_type>:<interview_id>" while the task is PENDING/RUNNING, NULL once finished:
+    # at most one active task per (interview, task type)
+    idempotency_key = Column(String(100), unique=True, nullable=True)
+    status = Column(DBEnum(TaskStatus), nullable=False, default=TaskStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=3)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+    started_at = Column(TIMESTAMP, nullable=True)
+    finished_at = Column(TIMESTAMP, nullable=True)
+    # UTC time until which the worker running the task owns it; renewed while the task runs,
+    # so a RUNNING task past it was abandoned by a dead process and may be run again
+    lease_expires_at = Column(DateTime, nullable=True)
+
+# LLM 响应缓存 (persistent tier of app/services/llm_cache.py)
+class LLMResponseCache(Base):
+    __tablename__ = "llm_response_cache"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    cache_key = Column(String(64), unique=True, index=True, nullable=False) # sha256 of (model, temperature, rendered prompt)
+    task = Column(String(50), nullable=False) # e.g. "report_generation", decides the TTL
+    model = Column(String(100), nullable=False)
+    response = Column(Text, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
 # You might want to add __repr__ methods to your models for easier debugging, e.g.:
 # def __repr__(self):
 #     return f"<Job(id={self.id}, title='{self.title}')>" 
\ No newline at end of file
@@ -1,29 +1,28 @@
 import logging # Import logging
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 from app.db.models import Base # Import Base from models to create tables
 
-# Configure basic logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
-logger.info(f"Database URL from settings: {SQLALCHEMY_DATABASE_URL}")
+logger.info("Database URL from settings: %s", make_url(SQLALCHEMY_DATABASE_URL).render_as_string(hide_password=True))
 
 engine = None
 try:
     logger.info("Attempting to create SQLAlchemy engine...")
     engine = create_engine(
         SQLALCHEMY_DATABASE_URL,
-        echo=True,  # Enable SQLAlchemy engine logging for more verbosity
+        echo=settings.DB_ECHO,  # SQL statement logging, off unless DB_ECHO is set
         # connect_args={"check_same_thread": False} # Only needed for SQLite
     )
     logger.info("SQLAlchemy engine created successfully.")
 except Exception as e:
-    logger.error(f"Error creating SQLAlchemy engine: {e}", exc_info=True)
+    logger.error("Error creating SQLAlchemy engine: %s", e, exc_info=True)
     # Optionally re-raise or handle as appropriate for your application
     raise
 
@@ -50,7 +49,7 @@ def create_db_and_tables():
         Base.metadata.create_all(bind=engine)
         logger.info("Base.metadata.create_all() completed.")
     except Exception as e:
-        logger.error(f"Error during Base.metadata.create_all(): {e}", exc_info=True)
+        logger.error("Error during Base.metadata.create_all(): %s", e, exc_info=True)
         raise
 
 # Example of how you might call it in your main.py or a startup script:
@@ -65,11 +64,11 @@ def create_db_and_tables():
 logger.info("Attempting to create SQLAlchemy async engine...")
 ASYNC_DATABASE_URL = settings.DATABASE_URL.replace("mysql+pymysql://", "mysql+aiomysql://")
 # Or if using asyncpg for PostgreSQL: ASYNC_DATABASE_URL = settings.DATABASE_URL.replace("postgresql://", "postgresql+asyncpg://")
-logger.info(f"Async Database URL: {ASYNC_DATABASE_URL}")
+logger.info("Async Database URL: %s", make_url(ASYNC_DATABASE_URL).render_as_string(hide_password=True))
 
 
 try:
-    async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True, echo=settings.DB_ECHO)
     AsyncSessionLocal = async_sessionmaker(
         bind=async_engine, 
         class_=AsyncSession, 
@@ -79,7 +78,7 @@ try:
     )
     logger.info("SQLAlchemy async engine and AsyncSessionLocal created successfully.")
 except Exception as e:
-    logger.error(f"Error creating SQLAlchemy async engine or AsyncSessionLocal: {e}", exc_info=True)
+    logger.error("Error creating SQLAlchemy async engine or AsyncSessionLocal: %s", e, exc_info=True)
     async_engine = None
     AsyncSessionLocal = None # type: ignore
 
@@ -100,4 +99,14 @@ async def get_async_db() -> AsyncSession: # type: ignore
         # finally block not strictly needed if using 'async with'
         # as it handles closing, but can be added for explicit logging if desired.
         # finally:
-        #     await session.close() # Handled by 'async with' 
\ No newline at end of file
+        #     await session.close() # Handled by 'async with' 
+
+def get_async_session_factory() -> async_sessionmaker:
+    """
+    Dependency returning the session factory itself, for work that outlives the request
+    (e.g. bulk ingestion jobs) and therefore opens its own sessions.
+    """
+    if AsyncSessionLocal is None:
+        logger.error("AsyncSessionLocal is not initialized. Cannot provide async session factory.")
+        raise RuntimeError("Async database session factory not initialized.")
+    return AsyncSessionLocal
@@ -1,34 +1,15 @@
 import sys
 import os
+import asyncio
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Optional debug logs
-print(f"DEBUG main.py after load_dotenv: OPENAI_API_KEY is set: {bool(os.getenv('OPENAI_API_KEY'))}")
-print(f"DEBUG main.py after load_dotenv: OPENAI_API_BASE from env: {os.getenv('OPENAI_API_BASE')}")
-print(f"DEBUG main.py after load_dotenv: DATABASE_URL from env: {os.getenv('DATABASE_URL')}")
-
 import importlib.util
+import logging
 from contextlib import asynccontextmanager
 
-print("---- Uvicorn Python Environment ----")
-print(f"Python Executable: {sys.executable}")
-print(f"Python Version: {sys.version}")
-print("sys.path:")
-for p in sys.path:
-    print(f"  - {p}")
-
-print("\nAttempting to find mysqlclient spec:")
-mysqlclient_spec = importlib.util.find_spec("MySQLdb")
-if mysqlclient_spec:
-    print(f"MySQLdb (mysqlclient) spec found at: {mysqlclient_spec.origin}")
-else:
-    print("MySQLdb (mysqlclient) spec NOT found by importlib.util.find_spec.")
-
-print("----------------------------------")
-
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
@@ -36,7 +17,22 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.endpoints import jobs as jobs_router
 from app.api.v1.endpoints import candidates as candidates_router # Import candidates router
 from app.api.v1.endpoints import interviews as interviews_router # Import interviews router
-from app.db.session import create_db_and_tables, SQLALCHEMY_DATABASE_URL # For startup event
+from app.api.v1.endpoints import metrics as metrics_router
+from app.api.v1.endpoints import tasks as tasks_router
+from app.services.resume_extraction import shutdown_resume_extraction
+from app.services.bulk_ingestion import shutdown_bulk_ingestion
+from app.services.task_queue import recover_tasks, shutdown_task_queue
+from app.core.llm_gateway import close_llm_gateway
+from app.core.logging_setup import shutdown_logging
+from app.services.llm_cache import configure_llm_cache
+from app.db.session import create_db_and_tables, SQLALCHEMY_DATABASE_URL, AsyncSessionLocal # For startup event
+
+logger = logging.getLogger(__name__)
+
+# Optional debug logs (LOG_LEVELS={"app.main": "DEBUG"}); the database URL is covered by app/db/session.py
+logger.debug("OPENAI_API_KEY is set: %s, OPENAI_API_BASE from env: %s", bool(os.getenv('OPENAI_API_KEY')), os.getenv('OPENAI_API_BASE'))
+logger.debug("Python executable: %s, version: %s, sys.path: %s", sys.executable, sys.version, sys.path)
+logger.debug("MySQLdb (mysqlclient) spec: %s", getattr(importlib.util.find_spec("MySQLdb"), "origin", "NOT found"))
 
 # Create database tables on startup if they don't exist
 # In a production environment, you would typically use Alembic migrations.
@@ -55,10 +51,21 @@ async def lifespan(app_instance: FastAPI):
     # except Exception as e:
     #     print(f"Error creating database tables during startup: {e}") # Commented out
         # Handle error appropriately, maybe raise to stop app or log critical error
-    print("Application startup: Database schema management is now fully handled by Alembic.")
+    logger.debug("Application startup: database schema management is handled by Alembic.")
+    configure_llm_cache(AsyncSessionLocal) # Persistent tier of the LLM response cache
+    # Resume background tasks interrupted by the previous shutdown/crash
+    try:
+        await asyncio.wait_for(recover_tasks(AsyncSessionLocal), timeout=10)
+    except Exception as e:
+        logger.warning("Could not recover background tasks on startup: %r", e)
     yield
     # Code to run on shutdown (if any)
-    print("Application shutdown.")
+    await shutdown_bulk_ingestion() # Cancel running bulk resume imports
+    await shutdown_task_queue() # Unfinished tasks stay in the table and are recovered on next startup
+    shutdown_resume_extraction() # Stop the resume parser worker processes
+    await close_llm_gateway() # Close the shared keep-alive connections to the LLM API
+    logger.debug("Application shutdown.")
+    shutdown_logging() # Flush the log queue
 
 app = FastAPI(
     title="AI Interview Assistant API",
@@ -93,6 +100,8 @@ app.add_middleware(
 app.include_router(jobs_router.router, prefix="/api/v1/jobs", tags=["Jobs"])
 app.include_router(candidates_router.router, prefix="/api/v1/candidates", tags=["Candidates"]) # Include candidates router
 app.include_router(interviews_router.router, prefix="/api/v1/interviews", tags=["Interviews"]) # Include interviews router
+app.include_router(metrics_router.router, prefix="/api/v1/metrics", tags=["Metrics"])
+app.include_router(tasks_router.router, prefix="/api/v1/tasks", tags=["Tasks"])
 
 # app.mount("/static", StaticFiles(directory="static"), name="static") # Commented out as per user confirmation
 
@@ -1,10 +1,7 @@
 # app/services/ai_report_generator.py
 
 import os
-from typing import List, Dict, Any
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser # Added for LCEL
+from typing import List, Dict, Any, Optional
 # from langchain.chains import LLMChain # Removed LLMChain import
 # from dotenv import load_dotenv # Potentially use dotenv for local development API key management
 
@@ -23,14 +20,108 @@ import logging
 logger = logging.getLogger(__name__)
 
 # Import the centralized prompt
-from app.core.prompts import INTERVIEW_REPORT_GENERATION_PROMPT
+from app.core.prompts import (
+    INTERVIEW_REPORT_GENERATION_PROMPT,
+    REPORT_INCREMENTAL_UPDATE_PROMPT,
+    SEGMENT_ASSESSMENT_PROMPT,
+    SEGMENTED_REPORT_PROMPT,
+    TRANSCRIPT_SEGMENT_SUMMARY_PROMPT,
+)
+from app.core.config import settings
+from app.core.llm_gateway import get_llm_chain
+from app.core.llm_scheduler import scheduled_call, scheduled_stream
+from app.core.structured_output import SCHEMA_SEGMENT_ASSESSMENT, call_with_structured_output
+from app.services import llm_cache
+
+
+# Model used by the report endpoints; the report prompt builder budgets tokens for it
+REPORT_MODEL_NAME = "gpt-3.5-turbo"
+REPORT_TEMPERATURE = 0.3
+TRANSCRIPT_SUMMARY_TEMPERATURE = 0.2
+SEGMENT_ASSESSMENT_TEMPERATURE = 0.0  # Scores should not drift between re-runs of the same segment
+
+
+class ReportGenerationError(Exception):
+    """Raised by stream_interview_report when the report cannot be generated."""
+    pass
+
+
+def _build_report_chain(llm_model_name: str, temperature: float, prompt_template: str = INTERVIEW_REPORT_GENERATION_PROMPT):
+    """
+    Returns the prompt | llm | StrOutputParser chain used for report generation.
+    The chain (and its HTTP connection pool) is shared via the LLM gateway, so repeated
+    reports for the same (model, temperature) reuse warm connections.
+    Returns None if OPENAI_API_KEY is not configured.
+    """
+    if not settings.OPENAI_API_KEY:
+        logger.error("OPENAI_API_KEY is not configured.")
+        return None
+
+    return get_llm_chain(prompt_template, llm_model_name, temperature)
+
+
+async def _invoke_report_prompt(prompt_template: str, inputs: Dict[str, str], llm_model_name: str, temperature: float) -> str:
+    """Runs a report prompt through the LLM cache and scheduler. Returns an "Error: ..." string on failure."""
+    try:
+        chain = _build_report_chain(llm_model_name, temperature, prompt_template)
+        if chain is None:
+            return "Error: OPENAI_API_KEY not configured."
+
+        # Regenerating over unchanged inputs is served from the LLM response cache
+        prompt = prompt_template.format(**inputs)
+        response = await llm_cache.cached_llm_call(
+            llm_cache.TASK_REPORT_GENERATION, llm_model_name, temperature, prompt,
+            scheduled_call(llm_model_name, prompt, lambda: chain.ainvoke(inputs))
+        )
+        
+        generated_report = response # StrOutputParser directly returns the string
+        if not generated_report.strip():
+            logger.error("LLM generated an empty report.")
+            return "Error: AI service generated an empty report."
+
+        logger.info("Successfully generated interview report.")
+        return generated_report
+
+    except Exception as e:
+        # Catching a broad exception for now. In production, you'd want more specific error handling
+        # (e.g., openai.APIError, openai.RateLimitError, openai.AuthenticationError)
+        # LangChain might also wrap these errors.
+        logger.error("Error generating interview report: %s", e, exc_info=True)
+        return f"Error: Failed to generate AI report due to an internal error ({type(e).__name__}). Please try again later."
+
+
+async def _stream_report_prompt(prompt_template: str, inputs: Dict[str, str], llm_model_name: str, temperature: float):
+    """Streams a report prompt through the LLM cache and scheduler; failures raise ReportGenerationError."""
+    chain = _build_report_chain(llm_model_name, temperature, prompt_template)
+    if chain is None:
+        raise ReportGenerationError("OPENAI_API_KEY not configured.")
+
+    output_length = 0
+    try:
+        # Same cache entries as the non-streaming call; a hit is replayed as a single chunk
+        prompt = prompt_template.format(**inputs)
+        async for chunk in llm_cache.cached_llm_stream(
+            llm_cache.TASK_REPORT_GENERATION, llm_model_name, temperature, prompt,
+            scheduled_stream(llm_model_name, prompt, lambda: chain.astream(inputs))
+        ):
+            if chunk:
+                output_length += len(chunk)
+                yield chunk
+    except Exception as e:
+        logger.error("Error streaming interview report: %s", e, exc_info=True)
+        raise ReportGenerationError(f"Failed to generate AI report due to an internal error ({type(e).__name__}).") from e
+
+    if output_length == 0:
+        logger.error("LLM streamed an empty report.")
+        raise ReportGenerationError("AI service generated an empty report.")
+    logger.info("Successfully streamed interview report. Output length: %s", output_length)
 
 async def generate_interview_report(
     conversation_log_str: str,  # Changed from interview_dialogues: List[str]
     job_description: str,
     candidate_resume: str,
-    llm_model_name: str = "gpt-3.5-turbo", # Configurable model name
-    temperature: float = 0.3
+    llm_model_name: str = REPORT_MODEL_NAME, # Configurable model name
+    temperature: float = REPORT_TEMPERATURE
 ) -> str:
     """
     Generates an interview assessment report using an LLM.
@@ -60,59 +151,206 @@ async def generate_interview_report(
     # Removed the concatenation logic as conversation_log_str is now pre-formatted.
     # full_dialogue_string = "\\n\\n--- Next Question Dialogue ---\\n\\n".join(interview_dialogues)
 
+    logger.info("Generating report for interview. Dialogues length: %s, JD length: %s, Resume length: %s", len(conversation_log_str), len(job_description), len(candidate_resume))
+
+    # Invoke the chain with the required input variables that match the prompt template
+    inputs = {
+        "analyzed_jd": job_description,
+        "structured_resume": candidate_resume,
+        "conversation_log": conversation_log_str # Use the new parameter directly
+    }
+    return await _invoke_report_prompt(INTERVIEW_REPORT_GENERATION_PROMPT, inputs, llm_model_name, temperature)
+
+async def stream_interview_report(
+    conversation_log_str: str,
+    job_description: str,
+    candidate_resume: str,
+    llm_model_name: str = REPORT_MODEL_NAME,
+    temperature: float = REPORT_TEMPERATURE
+):
+    """
+    Streaming variant of generate_interview_report: yields the report text as the
+    LLM produces it (via chain.astream) instead of returning it at the end.
+
+    Unlike generate_interview_report, failures are raised as ReportGenerationError
+    (no "Error: ..." strings are ever yielded, so every chunk is report content).
+    """
+    if not conversation_log_str:
+        logger.warning("Cannot stream report: No interview dialogue string provided.")
+        raise ReportGenerationError("No interview dialogue string provided to generate the report.")
+    if not job_description:
+        logger.warning("Streaming report: Job description is missing.")
+        job_description = "Not provided."
+    if not candidate_resume:
+        logger.warning("Streaming report: Candidate resume is missing.")
+        candidate_resume = "Not provided."
+
+    logger.info("Streaming report for interview. Dialogues length: %s, JD length: %s, Resume length: %s", len(conversation_log_str), len(job_description), len(candidate_resume))
+    inputs = {
+        "analyzed_jd": job_description,
+        "structured_resume": candidate_resume,
+        "conversation_log": conversation_log_str
+    }
+    async for chunk in _stream_report_prompt(INTERVIEW_REPORT_GENERATION_PROMPT, inputs, llm_model_name, temperature):
+        yield chunk
+
+async def summarize_transcript_segment(
+    conversation_segment: str,
+    job_description: str,
+    llm_model_name: str = REPORT_MODEL_NAME
+) -> str:
+    """
+    Condenses a run of Q/A pairs for a report whose transcript exceeds the prompt budget
+    (map step of app/services/report_prompt.py). Returns an "Error: ..." string on failure.
+    """
+    if not settings.OPENAI_API_KEY:
+        logger.error("OPENAI_API_KEY is not configured.")
+        return "Error: OPENAI_API_KEY not configured."
+
+    chain = get_llm_chain(TRANSCRIPT_SEGMENT_SUMMARY_PROMPT, llm_model_name, TRANSCRIPT_SUMMARY_TEMPERATURE)
+    inputs = {
+        "analyzed_jd": job_description or "Not provided.",
+        "conversation_segment": conversation_segment
+    }
+    prompt = TRANSCRIPT_SEGMENT_SUMMARY_PROMPT.format(**inputs)
     try:
-        # Ensure OPENAI_API_KEY is set in the environment where this code runs
-        # If not using LangChain\'s auto-detection, you might need to pass it explicitly:
-        
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        openai_api_base = os.getenv("OPENAI_API_BASE") # Explicitly read OPENAI_API_BASE
+        summary = await llm_cache.cached_llm_call(
+            llm_cache.TASK_TRANSCRIPT_SUMMARY, llm_model_name, TRANSCRIPT_SUMMARY_TEMPERATURE, prompt,
+            scheduled_call(llm_model_name, prompt, lambda: chain.ainvoke(inputs), max_tokens=settings.REPORT_SUMMARY_MAX_TOKENS)
+        )
+    except Exception as e:
+        logger.error("Error summarizing transcript segment: %s", e, exc_info=True)
+        return f"Error: Failed to summarize transcript segment ({type(e).__name__})."
+    if not summary.strip():
+        return "Error: AI service generated an empty transcript summary."
+    return summary
 
-        if not openai_api_key:
-            logger.error("OPENAI_API_KEY not found in environment variables.")
-            return "Error: OPENAI_API_KEY not configured."
+async def assess_interview_segment(
+    question: str,
+    answer: str,
+    job_description: str,
+    llm_model_name: str = REPORT_MODEL_NAME
+) -> str:
+    """
+    Scores one question/answer segment against the JD (map step of the segmented report
+    engine, app/services/segmented_report.py). Returns the raw LLM output (a JSON object)
+    or an "Error: ..." string on failure.
+    """
+    if not settings.OPENAI_API_KEY:
+        logger.error("OPENAI_API_KEY is not configured.")
+        return "Error: OPENAI_API_KEY not configured."
 
-        llm_params = {
-            "model_name": llm_model_name,
-            "temperature": temperature,
-            "openai_api_key": openai_api_key # Explicitly pass api_key
-        }
-        if openai_api_base: # If OPENAI_API_BASE is set, pass it
-            llm_params["openai_api_base"] = openai_api_base
-            logger.info(f"Using OpenAI API Base: {openai_api_base}")
-        else:
-            logger.info("Using default OpenAI API Base.")
-            
-        llm = ChatOpenAI(**llm_params)
-        
-        # Use the imported prompt
-        prompt = ChatPromptTemplate.from_template(INTERVIEW_REPORT_GENERATION_PROMPT)
-        
-        # Using LCEL (LangChain Expression Language)
-        chain = prompt | llm | StrOutputParser()
-        
-        logger.info(f"Generating report for interview. Dialogues length: {{len(conversation_log_str)}}, JD length: {{len(job_description)}}, Resume length: {{len(candidate_resume)}}")
-
-        # Invoke the chain with the required input variables that match the prompt template
-        response = await chain.ainvoke({
-            "analyzed_jd": job_description,
-            "structured_resume": candidate_resume,
-            "conversation_log": conversation_log_str # Use the new parameter directly
-        })
-        
-        generated_report = response # StrOutputParser directly returns the string
-        if not generated_report.strip():
-            logger.error("LLM generated an empty report.")
-            return "Error: AI service generated an empty report."
+    inputs = {
+        "analyzed_jd": job_description or "Not provided.",
+        "question": question,
+        "answer": answer
+    }
+    prompt = SEGMENT_ASSESSMENT_PROMPT.format(**inputs)
 
-        logger.info("Successfully generated interview report.")
-        return generated_report
+    async def _invoke(response_format: Optional[dict]) -> str:
+        chain = get_llm_chain(SEGMENT_ASSESSMENT_PROMPT, llm_model_name, SEGMENT_ASSESSMENT_TEMPERATURE, response_format)
+        return await chain.ainvoke(inputs)
 
+    try:
+        assessment = await llm_cache.cached_llm_call(
+            llm_cache.TASK_SEGMENT_ASSESSMENT, llm_model_name, SEGMENT_ASSESSMENT_TEMPERATURE, prompt,
+            scheduled_call(
+                llm_model_name, prompt,
+                lambda: call_with_structured_output(SCHEMA_SEGMENT_ASSESSMENT, llm_model_name, _invoke),
+                max_tokens=settings.REPORT_SEGMENT_MAX_TOKENS
+            )
+        )
     except Exception as e:
-        # Catching a broad exception for now. In production, you'd want more specific error handling
-        # (e.g., openai.APIError, openai.RateLimitError, openai.AuthenticationError)
-        # LangChain might also wrap these errors.
-        logger.error(f"Error generating interview report: {e}", exc_info=True)
-        return f"Error: Failed to generate AI report due to an internal error ({type(e).__name__}). Please try again later."
+        logger.error("Error assessing interview segment: %s", e, exc_info=True)
+        return f"Error: Failed to assess interview segment ({type(e).__name__})."
+    if not assessment.strip():
+        return "Error: AI service generated an empty segment assessment."
+    return assessment
+
+def _segmented_report_inputs(segment_assessments: str, aggregated_scores: str, job_description: str, candidate_resume: str) -> Dict[str, str]:
+    return {
+        "analyzed_jd": job_description or "Not provided.",
+        "structured_resume": candidate_resume or "Not provided.",
+        "segment_assessments": segment_assessments,
+        "aggregated_scores": aggregated_scores or "N/A"
+    }
+
+async def generate_report_from_assessments(
+    segment_assessments: str,
+    aggregated_scores: str,
+    job_description: str,
+    candidate_resume: str,
+    llm_model_name: str = REPORT_MODEL_NAME,
+    temperature: float = REPORT_TEMPERATURE
+) -> str:
+    """
+    Reduce step of the segmented report engine: writes the report narrative and the
+    CANDIDATE_CAPABILITY_ASSESSMENT_JSON block from the per-segment assessments.
+    Same contract as generate_interview_report ("Error: ..." strings on failure).
+    """
+    if not segment_assessments:
+        return "Error: No segment assessments provided to generate the report."
+    logger.info("Generating report from segment assessments. Assessments length: %s", len(segment_assessments))
+    inputs = _segmented_report_inputs(segment_assessments, aggregated_scores, job_description, candidate_resume)
+    return await _invoke_report_prompt(SEGMENTED_REPORT_PROMPT, inputs, llm_model_name, temperature)
+
+async def stream_report_from_assessments(
+    segment_assessments: str,
+    aggregated_scores: str,
+    job_description: str,
+    candidate_resume: str,
+    llm_model_name: str = REPORT_MODEL_NAME,
+    temperature: float = REPORT_TEMPERATURE
+):
+    """Streaming variant of generate_report_from_assessments (failures raise ReportGenerationError)."""
+    if not segment_assessments:
+        raise ReportGenerationError("No segment assessments provided to generate the report.")
+    logger.info("Streaming report from segment assessments. Assessments length: %s", len(segment_assessments))
+    inputs = _segmented_report_inputs(segment_assessments, aggregated_scores, job_description, candidate_resume)
+    async for chunk in _stream_report_prompt(SEGMENTED_REPORT_PROMPT, inputs, llm_model_name, temperature):
+        yield chunk
+
+def _incremental_update_inputs(previous_report: str, previous_scores: str, transcript_delta: str, job_description: str) -> Dict[str, str]:
+    return {
+        "analyzed_jd": job_description or "Not provided.",
+        "previous_report": previous_report,
+        "previous_scores": previous_scores or "N/A",
+        "transcript_delta": transcript_delta
+    }
+
+async def update_interview_report(
+    previous_report: str,
+    previous_scores: str,
+    transcript_delta: str,
+    job_description: str,
+    llm_model_name: str = REPORT_MODEL_NAME,
+    temperature: float = REPORT_TEMPERATURE
+) -> str:
+    """
+    Incremental refresh (app/services/report_refresh.py): rewrites the previous report given only
+    the changed Q/A pairs. Same contract as generate_interview_report ("Error: ..." strings on failure).
+    """
+    if not previous_report or not transcript_delta:
+        return "Error: Previous report and transcript changes are required for an incremental update."
+    logger.info("Updating report incrementally. Previous report length: %s, delta length: %s", len(previous_report), len(transcript_delta))
+    inputs = _incremental_update_inputs(previous_report, previous_scores, transcript_delta, job_description)
+    return await _invoke_report_prompt(REPORT_INCREMENTAL_UPDATE_PROMPT, inputs, llm_model_name, temperature)
+
+async def stream_updated_interview_report(
+    previous_report: str,
+    previous_scores: str,
+    transcript_delta: str,
+    job_description: str,
+    llm_model_name: str = REPORT_MODEL_NAME,
+    temperature: float = REPORT_TEMPERATURE
+):
+    """Streaming variant of update_interview_report (failures raise ReportGenerationError)."""
+    if not previous_report or not transcript_delta:
+        raise ReportGenerationError("Previous report and transcript changes are required for an incremental update.")
+    logger.info("Streaming incremental report update. Previous report length: %s, delta length: %s", len(previous_report), len(transcript_delta))
+    inputs = _incremental_update_inputs(previous_report, previous_scores, transcript_delta, job_description)
+    async for chunk in _stream_report_prompt(REPORT_INCREMENTAL_UPDATE_PROMPT, inputs, llm_model_name, temperature):
+        yield chunk
 
 # Example Usage (for testing this service directly, not part of the FastAPI app)
 if __name__ == "__main__":
@@ -1,12 +1,8 @@
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-
 import logging
 import json
 import re
+from typing import Optional
 from openai import AsyncOpenAI, APITimeoutError, APIConnectionError
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 from app.core.config import settings
 from app.core.prompts import (
@@ -20,6 +16,16 @@ from app.core.prompts import (
     SYSTEM_PROMPT_FOR_QUESTION_GENERATION
 )
 from app.core.openai_client import get_openai_client
+from app.core.llm_gateway import get_llm_chain
+from app.core.llm_scheduler import LLMPriority, scheduled_call, scheduled_stream
+from app.services import llm_cache
+from app.core.structured_output import (
+    SCHEMA_FOLLOWUP_QUESTIONS,
+    SCHEMA_INTERVIEW_QUESTIONS,
+    call_with_structured_output,
+    parse_structured,
+    response_format_kwargs,
+)
 
 # Import AG UI Event schemas
 from app.api.v1.schemas import ag_ui_events as sse_schemas # Assuming this is the correct import path
@@ -45,29 +51,25 @@ async def parse_resume(resume_text: str) -> str:
     Returns:
         A string containing the structured information extracted by the LLM.
     """
-    logger.info(f"Starting resume parsing. Resume text length: {len(resume_text)}")
-    llm = ChatOpenAI(
-        openai_api_key=settings.OPENAI_API_KEY,
-        model_name="gpt-4o-mini",  # Changed model to match call_llm.py
-        openai_api_base=settings.OPENAI_API_BASE, # Added openai_api_base
-        request_timeout=60 # Added request_timeout
-    )
-    
-    prompt_template = ChatPromptTemplate.from_template(RESUME_ANALYSIS_PROMPT)
-    
-    # Using LCEL (LangChain Expression Language) to construct the chain
-    chain = prompt_template | llm | StrOutputParser()
+    logger.info("Starting resume parsing. Resume text length: %s", len(resume_text))
+    # LCEL chain (prompt | llm | StrOutputParser), built once and reused via the LLM gateway
+    chain = get_llm_chain(RESUME_ANALYSIS_PROMPT, settings.OPENAI_MODEL_NAME_ANALYSIS)
     
     try:
         logger.debug("Sending resume to LLM for parsing")
-        structured_resume_info = await chain.ainvoke({"resume_text": resume_text})
-        logger.info(f"Successfully parsed resume. Structured info length: {len(structured_resume_info)}")
+        inputs = {"resume_text": resume_text}
+        prompt = RESUME_ANALYSIS_PROMPT.format(**inputs)
+        structured_resume_info = await llm_cache.cached_llm_call(
+            llm_cache.TASK_RESUME_PARSING, settings.OPENAI_MODEL_NAME_ANALYSIS, None, prompt,
+            scheduled_call(settings.OPENAI_MODEL_NAME_ANALYSIS, prompt, lambda: chain.ainvoke(inputs))
+        )
+        logger.info("Successfully parsed resume. Structured info length: %s", len(structured_resume_info))
         return structured_resume_info
     except (APITimeoutError, APIConnectionError) as e: # More specific error handling
-        logger.error(f"Timeout or connection error parsing resume: {e}", exc_info=True)
+        logger.error("Timeout or connection error parsing resume: %s", e, exc_info=True)
         return "Error: AI service timeout or connection issue during resume parsing."
     except Exception as e:
-        logger.error(f"Error parsing resume: {e}", exc_info=True)
+        logger.error("Error parsing resume: %s", e, exc_info=True)
         return "Error: Could not parse resume."
 
 async def analyze_jd(jd_text: str) -> str:
@@ -80,28 +82,24 @@ async def analyze_jd(jd_text: str) -> str:
     Returns:
         A string containing the key requirements extracted by the LLM.
     """
-    logger.info(f"Starting JD analysis. JD text length: {len(jd_text)}")
-    llm = ChatOpenAI(
-        openai_api_key=settings.OPENAI_API_KEY,
-        model_name="gpt-4o-mini",
-        openai_api_base=settings.OPENAI_API_BASE,
-        request_timeout=60 # Added request_timeout
-    )
-    
-    prompt_template = ChatPromptTemplate.from_template(JD_ANALYSIS_PROMPT)
-    
-    chain = prompt_template | llm | StrOutputParser()
+    logger.info("Starting JD analysis. JD text length: %s", len(jd_text))
+    chain = get_llm_chain(JD_ANALYSIS_PROMPT, settings.OPENAI_MODEL_NAME_ANALYSIS)
     
     try:
         logger.debug("Sending JD to LLM for analysis")
-        analyzed_jd_info = await chain.ainvoke({"jd_text": jd_text})
-        logger.info(f"Successfully analyzed JD. Analyzed info length: {len(analyzed_jd_info)}")
+        inputs = {"jd_text": jd_text}
+        prompt = JD_ANALYSIS_PROMPT.format(**inputs)
+        analyzed_jd_info = await llm_cache.cached_llm_call(
+            llm_cache.TASK_JD_ANALYSIS, settings.OPENAI_MODEL_NAME_ANALYSIS, None, prompt,
+            scheduled_call(settings.OPENAI_MODEL_NAME_ANALYSIS, prompt, lambda: chain.ainvoke(inputs))
+        )
+        logger.info("Successfully analyzed JD. Analyzed info length: %s", len(analyzed_jd_info))
         return analyzed_jd_info
     except (APITimeoutError, APIConnectionError) as e: # More specific error handling
-        logger.error(f"Timeout or connection error analyzing JD: {e}", exc_info=True)
+        logger.error("Timeout or connection error analyzing JD: %s", e, exc_info=True)
         return "Error: AI service timeout or connection issue during JD analysis."
     except Exception as e:
-        logger.error(f"Error analyzing JD: {e}", exc_info=True)
+        logger.error("Error analyzing JD: %s", e, exc_info=True)
         return "Error: Could not analyze JD."
 
 async def generate_interview_questions(
@@ -110,33 +108,96 @@ async def generate_interview_questions(
     """
     Generates interview questions based on analyzed JD and structured resume.
     """
-    logger.info(f"Starting question generation. JD info length: {len(analyzed_jd_info)}, Resume info length: {len(structured_resume_info)}")
+    logger.info("Starting question generation. JD info length: %s, Resume info length: %s", len(analyzed_jd_info), len(structured_resume_info))
     
-    try:
-        logger.debug(f"Sending prompt to OpenAI for question generation")
-        response = await get_openai_client().chat.completions.create(
+    prompt = INTERVIEW_QUESTION_GENERATION_PROMPT.format(
+        analyzed_jd=analyzed_jd_info,
+        structured_resume=structured_resume_info
+    )
+
+    async def _create(response_format: Optional[dict]):
+        return await get_openai_client().chat.completions.create(
             model=settings.OPENAI_MODEL_NAME_QUESTION_GENERATION,
-            messages=[{
-                "role": "user", 
-                "content": INTERVIEW_QUESTION_GENERATION_PROMPT.format(
-                    analyzed_jd=analyzed_jd_info,
-                    structured_resume=structured_resume_info
-                )
-            }],
+            messages=[{"role": "user", "content": prompt}],
             temperature=settings.OPENAI_TEMPERATURE_QUESTION_GENERATION,
             max_tokens=512,
-            timeout=60.0 # Explicitly set timeout here too
+            timeout=60.0, # Explicitly set timeout here too
+            **response_format_kwargs(response_format)
+        )
+
+    async def _complete() -> str:
+        logger.debug("Sending prompt to OpenAI for question generation")
+        response = await call_with_structured_output(SCHEMA_INTERVIEW_QUESTIONS, settings.OPENAI_MODEL_NAME_QUESTION_GENERATION, _create)
+        return response.choices[0].message.content.strip()
+
+    try:
+        generated_questions_text = await llm_cache.cached_llm_call(
+            llm_cache.TASK_QUESTION_GENERATION, settings.OPENAI_MODEL_NAME_QUESTION_GENERATION,
+            settings.OPENAI_TEMPERATURE_QUESTION_GENERATION, prompt,
+            scheduled_call(settings.OPENAI_MODEL_NAME_QUESTION_GENERATION, prompt, _complete, max_tokens=512, priority=LLMPriority.INTERACTIVE)
         )
-        generated_questions_text = response.choices[0].message.content.strip()
-        logger.info(f"Question generation completed. Output length: {len(generated_questions_text)}")
+        logger.info("Question generation completed. Output length: %s", len(generated_questions_text))
         return generated_questions_text
     except (APITimeoutError, APIConnectionError) as e:
-        logger.error(f"Timeout or connection error during question generation: {e}", exc_info=True)
+        logger.error("Timeout or connection error during question generation: %s", e, exc_info=True)
         raise AIJsonParsingError(message=f"AI service timeout or connection issue during question generation: {str(e)}") from e
     except Exception as e:
-        logger.error(f"Error during question generation: {e}")
+        logger.error("Error during question generation: %s", e)
         raise
 
+async def stream_interview_questions(
+    analyzed_jd_info: str, structured_resume_info: str
+):
+    """
+    Streaming variant of generate_interview_questions.
+
+    Uses the OpenAI streaming API and yields the completion text as it arrives
+    (one string per received delta), so callers can surface questions before the
+    whole completion is done.
+    """
+    logger.info("Starting streaming question generation. JD info length: %s, Resume info length: %s", len(analyzed_jd_info), len(structured_resume_info))
+
+    prompt = INTERVIEW_QUESTION_GENERATION_PROMPT.format(
+        analyzed_jd=analyzed_jd_info,
+        structured_resume=structured_resume_info
+    )
+
+    async def _create_stream(response_format: Optional[dict]):
+        return await get_openai_client().chat.completions.create(
+            model=settings.OPENAI_MODEL_NAME_QUESTION_GENERATION,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=settings.OPENAI_TEMPERATURE_QUESTION_GENERATION,
+            max_tokens=512,
+            timeout=60.0,
+            stream=True,
+            **response_format_kwargs(response_format)
+        )
+
+    async def _stream_completion():
+        # Schema-constrained output is plain JSON, which the incremental question parser reads as it arrives
+        stream = await call_with_structured_output(SCHEMA_INTERVIEW_QUESTIONS, settings.OPENAI_MODEL_NAME_QUESTION_GENERATION, _create_stream)
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta_text = chunk.choices[0].delta.content
+            if delta_text:
+                yield delta_text
+
+    try:
+        output_length = 0
+        # Shares cache entries with generate_interview_questions (same model, temperature and prompt)
+        async for delta_text in llm_cache.cached_llm_stream(
+            llm_cache.TASK_QUESTION_GENERATION, settings.OPENAI_MODEL_NAME_QUESTION_GENERATION,
+            settings.OPENAI_TEMPERATURE_QUESTION_GENERATION, prompt,
+            scheduled_stream(settings.OPENAI_MODEL_NAME_QUESTION_GENERATION, prompt, _stream_completion, max_tokens=512, priority=LLMPriority.INTERACTIVE)
+        ):
+            output_length += len(delta_text)
+            yield delta_text
+        logger.info("Streaming question generation completed. Output length: %s", output_length)
+    except (APITimeoutError, APIConnectionError) as e:
+        logger.error("Timeout or connection error during streaming question generation: %s", e, exc_info=True)
+        raise AIJsonParsingError(message=f"AI service timeout or connection issue during question generation: {str(e)}") from e
+
 async def generate_interview_report(
     analyzed_jd_info: str, 
     structured_resume_info: str, 
@@ -153,29 +214,28 @@ async def generate_interview_report(
     Returns:
         A string containing the generated interview report.
     """
-    logger.info(f"Starting interview report generation. JD info length: {len(analyzed_jd_info)}, Resume info length: {len(structured_resume_info)}, Conversation log length: {len(conversation_log)}")
-    llm = ChatOpenAI(
-        openai_api_key=settings.OPENAI_API_KEY,
-        model_name="gpt-4o-mini", # Using gpt-4o-mini for potentially better summarization
-        openai_api_base=settings.OPENAI_API_BASE,
-        request_timeout=60 # Added request_timeout
-    )
-    prompt_template = ChatPromptTemplate.from_template(INTERVIEW_REPORT_GENERATION_PROMPT)
-    chain = prompt_template | llm | StrOutputParser()
+    logger.info("Starting interview report generation. JD info length: %s, Resume info length: %s, Conversation log length: %s", len(analyzed_jd_info), len(structured_resume_info), len(conversation_log))
+    # Using gpt-4o-mini for potentially better summarization
+    chain = get_llm_chain(INTERVIEW_REPORT_GENERATION_PROMPT, "gpt-4o-mini")
     try:
         logger.debug("Sending data to LLM for interview report generation")
-        report_text = await chain.ainvoke({
+        inputs = {
             "analyzed_jd": analyzed_jd_info,
             "structured_resume": structured_resume_info,
             "conversation_log": conversation_log
-        })
-        logger.info(f"Successfully generated interview report. Report length: {len(report_text)}. Preview: '{(report_text[:100] + '...') if report_text and len(report_text) > 100 else report_text}'")
+        }
+        prompt = INTERVIEW_REPORT_GENERATION_PROMPT.format(**inputs)
+        report_text = await llm_cache.cached_llm_call(
+            llm_cache.TASK_REPORT_GENERATION, "gpt-4o-mini", None, prompt,
+            scheduled_call("gpt-4o-mini", prompt, lambda: chain.ainvoke(inputs))
+        )
+        logger.info("Successfully generated interview report. Report length: %s. Preview: '%s'", len(report_text), (report_text[:100] + '...') if report_text and len(report_text) > 100 else report_text)
         return report_text
     except (APITimeoutError, APIConnectionError) as e: # More specific error handling
-        logger.error(f"Timeout or connection error generating interview report: {e}", exc_info=True)
+        logger.error("Timeout or connection error generating interview report: %s", e, exc_info=True)
         return "Error: AI service timeout or connection issue during report generation."
     except Exception as e:
-        logger.error(f"Error generating interview report: {e}", exc_info=True)
+        logger.error("Error generating interview report: %s", e, exc_info=True)
         return "Error: Could not generate interview report."
 
 async def generate_followup_questions_service(
@@ -189,8 +249,8 @@ async def generate_followup_questions_service(
     """
     Generates followup questions as an async stream of SSE-formatted events.
     """
-    logger_instance.info(f"Task {task_id}: Starting followup question generation stream. Original Q: '{original_question[:50]}...', Answer: '{candidate_answer[:50]}...'")
-    logger_instance.debug(f"Task {task_id}: JD info length (for followup): {len(analyzed_jd_info)}, Resume info length (for followup): {len(structured_resume_info)}")
+    logger_instance.info("Task %s: Starting followup question generation stream. Original Q: '%s...', Answer: '%s...'", task_id, original_question[:50], candidate_answer[:50])
+    logger_instance.debug("Task %s: JD info length (for followup): %s, Resume info length (for followup): %s", task_id, len(analyzed_jd_info), len(structured_resume_info))
 
     try:
         # Yield a thought event indicating the process is starting
@@ -199,67 +259,61 @@ async def generate_followup_questions_service(
             "data": json.dumps(sse_schemas.AgUiThoughtData(task_id=task_id, thought="正在根据最新交互生成追问问题...").model_dump())
         }
 
-        logger_instance.debug(f"Task {task_id}: Sending prompt to OpenAI for followup question generation")
-        response = await get_openai_client().chat.completions.create(
-            model=settings.OPENAI_MODEL_NAME_QUESTION_GENERATION, 
-            messages=[{
-                "role": "user", 
-                "content": FOLLOWUP_QUESTION_GENERATION_PROMPT.format(
-                    analyzed_jd=analyzed_jd_info if analyzed_jd_info else "N/A", # Ensure format keys match prompt
-                    structured_resume=structured_resume_info if structured_resume_info else "N/A", # Ensure format keys match prompt
-                    last_question=original_question, # Assuming prompt uses last_question
-                    candidate_answer=candidate_answer
-                )
-            }],
-            temperature=settings.OPENAI_TEMPERATURE_QUESTION_GENERATION, 
-            max_tokens=300,
-            timeout=60.0
+        followup_prompt = FOLLOWUP_QUESTION_GENERATION_PROMPT.format(
+            analyzed_jd=analyzed_jd_info if analyzed_jd_info else "N/A", # Ensure format keys match prompt
+            structured_resume=structured_resume_info if structured_resume_info else "N/A", # Ensure format keys match prompt
+            last_question=original_question, # Assuming prompt uses last_question
+            candidate_answer=candidate_answer
+        )
+
+        async def _create(response_format: Optional[dict]):
+            return await get_openai_client().chat.completions.create(
+                model=settings.OPENAI_MODEL_NAME_QUESTION_GENERATION, 
+                messages=[{"role": "user", "content": followup_prompt}],
+                temperature=settings.OPENAI_TEMPERATURE_QUESTION_GENERATION, 
+                max_tokens=300,
+                timeout=60.0,
+                **response_format_kwargs(response_format)
+            )
+
+        async def _complete() -> str:
+            logger_instance.debug("Task %s: Sending prompt to OpenAI for followup question generation", task_id)
+            response = await call_with_structured_output(SCHEMA_FOLLOWUP_QUESTIONS, settings.OPENAI_MODEL_NAME_QUESTION_GENERATION, _create)
+            return response.choices[0].message.content.strip()
+
+        # Clicking "suggest follow-ups" twice on the same log entry is served from the cache
+        generated_followups_text = await llm_cache.cached_llm_call(
+            llm_cache.TASK_FOLLOWUP_GENERATION, settings.OPENAI_MODEL_NAME_QUESTION_GENERATION,
+            settings.OPENAI_TEMPERATURE_QUESTION_GENERATION, followup_prompt,
+            # Interactive: overtakes queued report/batch calls for the same model
+            scheduled_call(settings.OPENAI_MODEL_NAME_QUESTION_GENERATION, followup_prompt, _complete, max_tokens=300, priority=LLMPriority.INTERACTIVE)
         )
-        generated_followups_text = response.choices[0].message.content.strip()
-        logger_instance.info(f"Task {task_id}: Followup question raw LLM output received (length: {len(generated_followups_text)}). Output: '{generated_followups_text[:100]}...'")
+        logger_instance.debug("Task %s: Followup question raw LLM output received (length: %s). Output: '%s...'", task_id, len(generated_followups_text), generated_followups_text[:100])
 
         # --- Improved Parsing Logic for Followup Questions ---
         followup_questions = []
         # By default, assume the raw text is what we might need to parse line-by-line in fallback
         text_for_fallback_parsing = generated_followups_text
         
-        json_str_to_parse = None
-
-        # 1. Try to extract JSON from markdown code block
-        # Regex to find ```json (...) ``` and capture the content inside
-        # Corrected Regex:
-        markdown_match = re.search(r"```json\s*([\s\S]+?)\s*```", generated_followups_text, re.DOTALL)
-        
-        if markdown_match:
-            json_str_to_parse = markdown_match.group(1).strip()
-            logger_instance.info(f"Task {task_id}: Extracted JSON from markdown: '{json_str_to_parse[:100]}...'")
+        # 1. The {"followup_questions": [...]} object: the whole output in structured mode, else located in the text
+        parsed_data = parse_structured(SCHEMA_FOLLOWUP_QUESTIONS, generated_followups_text)
+        if parsed_data is not None:
+            followup_questions = [q.strip() for q in parsed_data["followup_questions"] if q.strip()]
+            logger_instance.info("Task %s: Parsed %s followup questions from dict's 'followup_questions' key.", task_id, len(followup_questions))
         else:
-            # 2. If no markdown, try to use the stripped raw text directly if it looks like JSON
+            # 2. Otherwise try to use the stripped raw text directly if it is a JSON list
             stripped_text = generated_followups_text.strip()
-            if (stripped_text.startswith("{") and stripped_text.endswith("}")) or \
-               (stripped_text.startswith("[") and stripped_text.endswith("]")):
-                json_str_to_parse = stripped_text
-                logger_instance.info(f"Task {task_id}: Using stripped raw text as potential JSON: '{json_str_to_parse[:100]}...'")
-
-        if json_str_to_parse:
-            try:
-                parsed_data = json.loads(json_str_to_parse)
-                if isinstance(parsed_data, dict) and "followup_questions" in parsed_data and isinstance(parsed_data["followup_questions"], list):
-                    followup_questions = [str(q).strip() for q in parsed_data["followup_questions"] if str(q).strip()]
-                    logger_instance.info(f"Task {task_id}: Parsed {len(followup_questions)} followup questions from dict's 'followup_questions' key.")
-                elif isinstance(parsed_data, list):
-                    followup_questions = [str(q).strip() for q in parsed_data if str(q).strip()]
-                    logger_instance.info(f"Task {task_id}: Parsed {len(followup_questions)} followup questions from direct JSON list.")
-                else:
-                    logger_instance.warning(f"Task {task_id}: Parsed JSON from '{json_str_to_parse[:100]}...' is not a recognized list or dict structure. Will attempt fallback line parsing on original text.")
-                    # No followup_questions extracted here, so fallback will be triggered if this path is taken
-            except json.JSONDecodeError as e:
-                logger_instance.warning(f"Task {task_id}: JSON parsing failed for extracted/direct string '{json_str_to_parse[:100]}...'. Reason: {e}. Will attempt fallback line parsing on original text.")
-                # Fallback will be triggered as followup_questions is still empty
+            if stripped_text.startswith("[") and stripped_text.endswith("]"):
+                try:
+                    parsed_list = json.loads(stripped_text)
+                    followup_questions = [str(q).strip() for q in parsed_list if str(q).strip()]
+                    logger_instance.info("Task %s: Parsed %s followup questions from direct JSON list.", task_id, len(followup_questions))
+                except json.JSONDecodeError as e:
+                    logger_instance.warning("Task %s: JSON parsing failed for direct string '%s...'. Reason: %s. Will attempt fallback line parsing on original text.", task_id, stripped_text[:100], e)
 
         # 3. Fallback to line splitting if JSON parsing failed or didn't yield questions
         if not followup_questions:
-            logger_instance.info(f"Task {task_id}: Entering fallback parsing for: '{text_for_fallback_parsing[:100]}...'")
+            logger_instance.info("Task %s: Entering fallback parsing for: '%s...'", task_id, text_for_fallback_parsing[:100])
             potential_questions = text_for_fallback_parsing.split('\\n')
             temp_questions = []
             for line in potential_questions:
@@ -288,11 +342,11 @@ async def generate_followup_questions_service(
                     temp_questions.append(cleaned_line)
             
             followup_questions = temp_questions
-            logger_instance.info(f"Task {task_id}: Fallback line splitting yielded {len(followup_questions)} potential questions.")
+            logger_instance.info("Task %s: Fallback line splitting yielded %s potential questions.", task_id, len(followup_questions))
         # --- End of Improved Parsing Logic ---
 
         if not followup_questions:
-            logger_instance.info(f"Task {task_id}: No followup questions were generated or parsed successfully.")
+            logger_instance.info("Task %s: No followup questions were generated or parsed successfully.", task_id)
             yield {
                 "event": sse_schemas.AgUiEventType.THOUGHT.value,
                 "data": json.dumps(sse_schemas.AgUiThoughtData(task_id=task_id, thought="No actionable followup questions generated.").model_dump())
@@ -315,30 +369,30 @@ async def generate_followup_questions_service(
                         total_questions=len(followup_questions)
                     ).model_dump())
                 }
-                logger_instance.info(f"Task {task_id}: Yielded followup question {i+1}: {q_text[:50]}...")
+                logger_instance.info("Task %s: Yielded followup question %s: %s...", task_id, i+1, q_text[:50])
         
-        logger_instance.info(f"Task {task_id}: Followup question generation stream completed within service.")
+        logger_instance.info("Task %s: Followup question generation stream completed within service.", task_id)
 
     except (APITimeoutError, APIConnectionError) as e:
-        logger_instance.error(f"Task {task_id}: Timeout or connection error during followup question generation: {e}", exc_info=True)
+        logger_instance.error("Task %s: Timeout or connection error during followup question generation: %s", task_id, e, exc_info=True)
         yield {
             "event": sse_schemas.AgUiEventType.ERROR.value,
             "data": json.dumps(sse_schemas.AgUiErrorData(task_id=task_id, error_message=f"AI service timeout or connection issue: {str(e)}").model_dump())
         }
     except AIJsonParsingError as e: # Catch if LLM call itself raises this for some reason (e.g. invalid API key response)
-        logger_instance.error(f"Task {task_id}: AIJsonParsingError during followup: {e.message}", exc_info=True)
+        logger_instance.error("Task %s: AIJsonParsingError during followup: %s", task_id, e.message, exc_info=True)
         yield {
             "event": sse_schemas.AgUiEventType.ERROR.value,
             "data": json.dumps(sse_schemas.AgUiErrorData(task_id=task_id, error_message=e.message, raw_ai_output=e.raw_output).model_dump())
         }
     except Exception as e:
-        logger_instance.error(f"Task {task_id}: Unexpected error during followup question generation stream: {e}", exc_info=True)
+        logger_instance.error("Task %s: Unexpected error during followup question generation stream: %s", task_id, e, exc_info=True)
         yield {
             "event": sse_schemas.AgUiEventType.ERROR.value,
             "data": json.dumps(sse_schemas.AgUiErrorData(task_id=task_id, error_message=f"Unexpected server error in followup generation: {str(e)}").model_dump())
         }
     finally:
-        logger_instance.info(f"Task {task_id}: generate_followup_questions_service finished.")
+        logger_instance.info("Task %s: generate_followup_questions_service finished.", task_id)
 
 # Example usage (for local testing, can be removed or commented out later)
 async def main_test():
@@ -0,0 +1,147 @@
+# app/services/analysis_cache.py
+
+"""
+Persistent, content-hash keyed cache for the LLM preprocessing steps.
+
+The analysis of a job description only depends on the JD text, the model and the
+prompt used, so it is computed once per JD version and stored on the Job row
+(``analyzed_description`` + ``analyzed_description_hash`` + ``analyzed_description_version``).
+Every question/report path reads it through ``get_or_create_jd_analysis``.
+
+Resume parsing follows the same scheme: ``Candidate.resume_text`` keeps the raw resume, the
+structured summary is stored in ``Candidate.resume_summary`` and ``Candidate.structured_resume_info``
+holds its small JSON envelope (``content_hash`` of the raw text, ``version``). Prompts that need
+the structured resume read it through ``get_or_create_resume_summary``.
+"""
+
+import hashlib
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.prompts import JD_ANALYSIS_PROMPT, RESUME_ANALYSIS_PROMPT
+from app.db import models
+from app.services.ai_services import analyze_jd, parse_resume
+
+logger = logging.getLogger(__name__)
+
+
+def compute_content_hash(text: str) -> str:
+    """Returns the hex sha256 digest of the given text (UTF-8)."""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def _prompt_version(prompt_template: str) -> str:
+    # A short digest of the template itself: editing the prompt automatically
+    # invalidates every analysis produced with the previous wording.
+    return compute_content_hash(prompt_template)[:12]
+
+
+JD_ANALYSIS_PROMPT_VERSION = _prompt_version(JD_ANALYSIS_PROMPT)
+RESUME_ANALYSIS_PROMPT_VERSION = _prompt_version(RESUME_ANALYSIS_PROMPT)
+
+
+def jd_analysis_version() -> str:
+    """Version tag stored next to a JD analysis: '<model>:<prompt digest>'."""
+    return f"{settings.OPENAI_MODEL_NAME_ANALYSIS}:{JD_ANALYSIS_PROMPT_VERSION}"
+
+
+def is_jd_analysis_fresh(job: models.Job) -> bool:
+    """True if the stored analysis was produced from the current JD text, model and prompt."""
+    return bool(
+        job.analyzed_description
+        and job.analyzed_description_hash == compute_content_hash(job.description)
+        and job.analyzed_description_version == jd_analysis_version()
+    )
+
+
+def invalidate_jd_analysis(job: models.Job) -> None:
+    """Clears the cached analysis, e.g. when the JD text changes."""
+    job.analyzed_description = None
+    job.analyzed_description_hash = None
+    job.analyzed_description_version = None
+
+
+async def get_or_create_jd_analysis(db: AsyncSession, job: models.Job) -> str:
+    """
+    Returns the analyzed JD for the given job, running analyze_jd only on a cache miss.
+
+    On a miss the result is staged on the Job row so subsequent interviews for the
+    same job reuse it; the caller commits. No database I/O happens here, so several
+    lookups can run concurrently against one session. AI errors ("Error: ..." strings)
+    are returned to the caller unchanged and never cached.
+    """
+    if is_jd_analysis_fresh(job):
+        logger.info("JD analysis cache hit for job %s", job.id)
+        return job.analyzed_description
+
+    logger.info("JD analysis cache miss for job %s. Running analyze_jd.", job.id)
+    analyzed_jd_text = await analyze_jd(jd_text=job.description)
+    if analyzed_jd_text.startswith("Error:"):
+        return analyzed_jd_text
+
+    job.analyzed_description = analyzed_jd_text
+    job.analyzed_description_hash = compute_content_hash(job.description)
+    job.analyzed_description_version = jd_analysis_version()
+    db.add(job)
+    logger.info("Staged JD analysis for job %s (version %s)", job.id, job.analyzed_description_version)
+    return analyzed_jd_text
+
+
+def resume_summary_version() -> str:
+    """Version tag stored next to a resume summary: '<model>:<prompt digest>'."""
+    return f"{settings.OPENAI_MODEL_NAME_ANALYSIS}:{RESUME_ANALYSIS_PROMPT_VERSION}"
+
+
+def build_resume_summary_entry(resume_text: str) -> dict:
+    """Builds the JSON envelope persisted in Candidate.structured_resume_info for a summary of resume_text."""
+    return {
+        "content_hash": compute_content_hash(resume_text),
+        "version": resume_summary_version(),
+    }
+
+
+def set_resume_summary(candidate: models.Candidate, summary: str) -> None:
+    """Stores a parse_resume result for the candidate's current (raw) resume_text."""
+    candidate.resume_summary = summary
+    candidate.structured_resume_info = build_resume_summary_entry(candidate.resume_text)
+
+
+def is_resume_summary_fresh(candidate: models.Candidate) -> bool:
+    """True if resume_summary was produced from the current resume_text, model and prompt."""
+    entry = candidate.structured_resume_info
+    return bool(
+        candidate.resume_summary
+        and isinstance(entry, dict)
+        and entry.get("content_hash") == compute_content_hash(candidate.resume_text)
+        and entry.get("version") == resume_summary_version()
+    )
+
+
+def invalidate_resume_summary(candidate: models.Candidate) -> None:
+    """Clears the cached structured resume, e.g. when resume_text changes."""
+    candidate.resume_summary = None
+    candidate.structured_resume_info = None
+
+
+async def get_or_create_resume_summary(db: AsyncSession, candidate: models.Candidate) -> str:
+    """
+    Returns the structured resume summary for the candidate, running parse_resume only on a cache miss.
+
+    Mirrors get_or_create_jd_analysis: misses are staged on the session for the caller
+    to commit, AI errors ("Error: ..." strings) are returned unchanged and never cached.
+    """
+    if is_resume_summary_fresh(candidate):
+        logger.info("Resume summary cache hit for candidate %s", candidate.id)
+        return candidate.resume_summary
+
+    logger.info("Resume summary cache miss for candidate %s. Running parse_resume.", candidate.id)
+    parsed_resume_text = await parse_resume(resume_text=candidate.resume_text)
+    if parsed_resume_text.startswith("Error:"):
+        return parsed_resume_text
+
+    set_resume_summary(candidate, parsed_resume_text)
+    db.add(candidate)
+    logger.info("Staged resume summary for candidate %s (version %s)", candidate.id, resume_summary_version())
+    return parsed_resume_text
@@ -0,0 +1,477 @@
+# app/services/bulk_ingestion.py
+
+"""
+Bulk resume ingestion: turns a zip archive or a list of uploaded files into candidates.
+
+Each file flows through a staged pipeline:
+
+    extraction ──> deduplication ──> LLM parsing ──> batched insert
+    (process pool)  (email + content   (parse_resume)  (one commit per
+                     hash, in-batch     bounded         BULK_INGEST_INSERT_BATCH_SIZE rows)
+                     and against DB)
+
+Extraction and parsing run with bounded concurrency (BULK_INGEST_EXTRACT_CONCURRENCY /
+BULK_INGEST_PARSE_CONCURRENCY), so a 500-file archive neither floods the resume extraction
+pool nor the LLM API. Duplicate checks against the database are done for groups of files
+with one IN query.
+
+Jobs run as asyncio tasks in this process and their status lives in memory (the most recent
+BULK_INGEST_MAX_RETAINED_JOBS jobs are kept). Progress can be polled via ``get_job`` or
+streamed with ``subscribe``.
+"""
+
+import asyncio
+import io
+import logging
+import re
+import threading
+import uuid
+import zipfile
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import PurePosixPath
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from pydantic import EmailStr, TypeAdapter, ValidationError
+from sqlalchemy import select, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.core.llm_scheduler import LLMPriority, llm_priority
+from app.db import models
+from app.services.ai_services import parse_resume
+from app.services.analysis_cache import compute_content_hash, set_resume_summary
+from app.services.resume_extraction import SUPPORTED_EXTENSIONS, ResumeExtractionError, extract_resume_text
+
+logger = logging.getLogger(__name__)
+
+# Item states
+ITEM_PENDING = "pending"
+ITEM_PARSING = "parsing"
+ITEM_CREATED = "created"
+ITEM_DUPLICATE = "duplicate"
+ITEM_SKIPPED = "skipped"
+ITEM_FAILED = "failed"
+FINAL_ITEM_STATES = (ITEM_CREATED, ITEM_DUPLICATE, ITEM_SKIPPED, ITEM_FAILED)
+
+# Job states
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+_EMAIL_PATTERN = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+_email_adapter = TypeAdapter(EmailStr)
+_DONE = object()  # End-of-stream marker between pipeline stages
+
+
+class BulkIngestionError(Exception):
+    """The upload cannot be turned into a job (bad archive, too many files...)."""
+
+
+class BulkIngestionItem:
+    """One resume file of a bulk ingestion job."""
+
+    def __init__(self, index: int, filename: str, load_content: Callable[[], bytes], precheck_error: Optional[str] = None):
+        self.index = index
+        self.filename = filename
+        self.status = ITEM_PENDING
+        self.email: Optional[str] = None
+        self.name: Optional[str] = None
+        self.candidate_id: Optional[int] = None
+        self.detail: Optional[str] = None
+        # Pipeline state, not part of the public status
+        self.load_content = load_content
+        self.precheck_error = precheck_error
+        self.text: Optional[str] = None
+        self.content_hash: Optional[str] = None
+        self.parsed_text: Optional[str] = None
+
+    def to_dict(self) -> dict:
+        return {
+            "index": self.index,
+            "filename": self.filename,
+            "status": self.status,
+            "email": self.email,
+            "name": self.name,
+            "candidate_id": self.candidate_id,
+            "detail": self.detail,
+        }
+
+
+class BulkIngestionJob:
+    """In-memory state of one bulk ingestion run, with fan-out to progress subscribers."""
+
+    def __init__(self, items: List[BulkIngestionItem]):
+        self.id = str(uuid.uuid4())
+        self.status = JOB_RUNNING
+        self.created_at = datetime.now(timezone.utc)
+        self.finished_at: Optional[datetime] = None
+        self.error: Optional[str] = None
+        self.items = items
+        self.task: Optional[asyncio.Task] = None
+        self._subscribers: List[asyncio.Queue] = []
+
+    @property
+    def done(self) -> bool:
+        return self.status != JOB_RUNNING
+
+    def counts(self) -> Dict[str, int]:
+        counts = {state: 0 for state in (ITEM_PENDING, ITEM_PARSING) + FINAL_ITEM_STATES}
+        for item in self.items:
+            counts[item.status] += 1
+        return counts
+
+    def summary(self) -> dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "total": len(self.items),
+            "counts": self.counts(),
+        }
+
+    def snapshot(self) -> dict:
+        return {**self.summary(), "items": [item.to_dict() for item in self.items]}
+
+    def update_item(self, item: BulkIngestionItem, status: str, detail: Optional[str] = None) -> None:
+        item.status = status
+        if detail is not None:
+            item.detail = detail
+        self._publish("progress", {**self.summary(), "item": item.to_dict()})
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        self.status = status
+        self.error = error
+        self.finished_at = datetime.now(timezone.utc)
+        self._publish("complete", self.summary())
+        self._subscribers.clear()
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue()
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def _publish(self, event: str, data: dict) -> None:
+        for queue in self._subscribers:
+            queue.put_nowait((event, data))
+
+
+_jobs: "OrderedDict[str, BulkIngestionJob]" = OrderedDict()
+
+
+def _register_job(job: BulkIngestionJob) -> None:
+    _jobs[job.id] = job
+    # Forget the oldest finished jobs beyond the retention limit
+    while len(_jobs) > settings.BULK_INGEST_MAX_RETAINED_JOBS:
+        oldest_id = next((job_id for job_id, old_job in _jobs.items() if old_job.done), None)
+        if oldest_id is None:
+            break
+        del _jobs[oldest_id]
+
+
+def get_job(job_id: str) -> Optional[BulkIngestionJob]:
+    return _jobs.get(job_id)
+
+
+# --- Stage 0: turn the upload into items ---
+
+def _is_ignored_archive_entry(info: zipfile.ZipInfo) -> bool:
+    path = PurePosixPath(info.filename)
+    return info.is_dir() or "__MACOSX" in path.parts or path.name.startswith(".")
+
+
+def _read_archive_entry(archive: zipfile.ZipFile, info: zipfile.ZipInfo, lock: threading.Lock) -> bytes:
+    # Entries are read in worker threads and a ZipFile is not thread-safe
+    with lock:
+        return archive.read(info)
+
+
+def build_items(uploads: List[Tuple[str, bytes]]) -> List[BulkIngestionItem]:
+    """
+    Expands the uploaded files (plain resumes and/or .zip archives) into job items.
+    Archive entries are decompressed lazily by the pipeline, in a worker thread. Raises BulkIngestionError.
+    """
+    items: List[BulkIngestionItem] = []
+
+    def add_item(filename: str, load_content: Callable[[], bytes], precheck_error: Optional[str] = None) -> None:
+        if len(items) >= settings.BULK_INGEST_MAX_FILES:
+            raise BulkIngestionError(f"Too many files: at most {settings.BULK_INGEST_MAX_FILES} resumes per upload.")
+        items.append(BulkIngestionItem(len(items), filename, load_content, precheck_error))
+
+    for filename, content in uploads:
+        if not (filename or "").lower().endswith(".zip"):
+            add_item(filename, lambda content=content: content)
+            continue
+        try:
+            archive = zipfile.ZipFile(io.BytesIO(content))
+        except zipfile.BadZipFile as e:
+            raise BulkIngestionError(f"'{filename}' is not a valid zip archive.") from e
+        archive_lock = threading.Lock()
+        for info in archive.infolist():
+            if _is_ignored_archive_entry(info):
+                continue
+            entry_name = f"{filename}/{info.filename}"
+            precheck_error = None
+            if info.file_size > settings.RESUME_MAX_FILE_BYTES:
+                # Never decompress oversized entries (zip bombs); the item is reported as failed
+                precheck_error = f"File is {info.file_size} bytes, the limit is {settings.RESUME_MAX_FILE_BYTES} bytes."
+            add_item(entry_name, lambda archive=archive, info=info, lock=archive_lock: _read_archive_entry(archive, info, lock), precheck_error)
+
+    if not items:
+        raise BulkIngestionError("No resume files found in the upload.")
+    return items
+
+
+def _find_email(text: str) -> Optional[str]:
+    for match in _EMAIL_PATTERN.finditer(text):
+        try:
+            return str(_email_adapter.validate_python(match.group(0))).lower()
+        except ValidationError:
+            continue
+    return None
+
+
+def _guess_name(text: str, filename: str) -> str:
+    # The first short line without an email address is usually the candidate's name
+    for line in text.splitlines():
+        line = line.strip()
+        if line and "@" not in line and len(line) <= 60:
+            return line
+    return PurePosixPath(filename).stem[:100]
+
+
+# --- Pipeline ---
+
+async def _extract(job: BulkIngestionJob, item: BulkIngestionItem, semaphore: asyncio.Semaphore) -> bool:
+    if not item.filename.lower().endswith(SUPPORTED_EXTENSIONS):
+        job.update_item(item, ITEM_SKIPPED, "Unsupported file type.")
+        return False
+    if item.precheck_error:
+        job.update_item(item, ITEM_FAILED, item.precheck_error)
+        return False
+    async with semaphore:
+        try:
+            # Decompressing an archive entry would block the event loop
+            content = await asyncio.to_thread(item.load_content)
+            text = await extract_resume_text(content, item.filename)
+        except (ResumeExtractionError, zipfile.BadZipFile, OSError) as e:
+            job.update_item(item, ITEM_FAILED, str(e))
+            return False
+    text = text.strip()
+    email = _find_email(text)
+    if not text or not email:
+        job.update_item(item, ITEM_SKIPPED, "No text extracted." if not text else "No email address found in resume.")
+        return False
+    item.text = text
+    item.email = email
+    item.name = _guess_name(text, item.filename)
+    item.content_hash = compute_content_hash(text)
+    return True
+
+
+async def _mark_duplicates(
+    job: BulkIngestionJob,
+    group: List[BulkIngestionItem],
+    session_factory: async_sessionmaker,
+    seen_emails: set,
+    seen_hashes: set
+) -> List[BulkIngestionItem]:
+    """Returns the items of the group that are new, marking the others as duplicates."""
+    async with session_factory() as session:
+        result = await session.execute(
+            select(models.Candidate.email, models.Candidate.resume_content_hash).where(or_(
+                models.Candidate.email.in_([item.email for item in group]),
+                models.Candidate.resume_content_hash.in_([item.content_hash for item in group])
+            ))
+        )
+        existing = result.all()
+    existing_emails = {email.lower() for email, _ in existing}
+    existing_hashes = {content_hash for _, content_hash in existing if content_hash}
+
+    unique_items = []
+    for item in group:
+        if item.email in existing_emails or item.content_hash in existing_hashes:
+            job.update_item(item, ITEM_DUPLICATE, "A candidate with this email or resume already exists.")
+        elif item.email in seen_emails or item.content_hash in seen_hashes:
+            job.update_item(item, ITEM_DUPLICATE, "Duplicate of another file in this upload.")
+        else:
+            seen_emails.add(item.email)
+            seen_hashes.add(item.content_hash)
+            unique_items.append(item)
+    return unique_items
+
+
+async def _parse(job: BulkIngestionJob, item: BulkIngestionItem, semaphore: asyncio.Semaphore) -> None:
+    async with semaphore:
+        job.update_item(item, ITEM_PARSING)
+        try:
+            parsed_resume_text = await parse_resume(resume_text=item.text)
+        except Exception as e:
+            parsed_resume_text = f"Error: {e}"
+    if parsed_resume_text.startswith("Error:"):
+        # Keep the raw text; the structured summary is produced lazily on first use (analysis_cache)
+        logger.warning("Bulk job %s: parse_resume failed for '%s', storing raw text. %s", job.id, item.filename, parsed_resume_text)
+        item.parsed_text = None
+    else:
+        item.parsed_text = parsed_resume_text
+
+
+def _new_candidate(item: BulkIngestionItem) -> models.Candidate:
+    candidate = models.Candidate(
+        name=item.name,
+        email=item.email,
+        resume_text=item.text,
+        resume_content_hash=item.content_hash
+    )
+    if item.parsed_text:
+        set_resume_summary(candidate, item.parsed_text)
+    return candidate
+
+
+async def _insert_batch(job: BulkIngestionJob, batch: List[BulkIngestionItem], session_factory: async_sessionmaker) -> None:
+    async with session_factory() as session:
+        candidates = [_new_candidate(item) for item in batch]
+        session.add_all(candidates)
+        try:
+            await session.commit()
+        except IntegrityError:
+            # A concurrent upload created one of these emails meanwhile: fall back to row-by-row inserts
+            await session.rollback()
+            logger.warning("Bulk job %s: batch insert hit a unique constraint, retrying %s rows one by one.", job.id, len(batch))
+            for item in batch:
+                candidate = _new_candidate(item)
+                session.add(candidate)
+                try:
+                    await session.commit()
+                except IntegrityError:
+                    await session.rollback()
+                    job.update_item(item, ITEM_DUPLICATE, "A candidate with this email already exists.")
+                else:
+                    item.candidate_id = candidate.id
+                    job.update_item(item, ITEM_CREATED)
+                item.text = item.parsed_text = None  # Done with this item either way
+            return
+    for item, candidate in zip(batch, candidates):
+        item.candidate_id = candidate.id
+        item.text = item.parsed_text = None  # Stored now, no need to keep 500 resumes in memory
+        job.update_item(item, ITEM_CREATED)
+    logger.info("Bulk job %s: inserted %s candidates.", job.id, len(batch))
+
+
+async def _run_pipeline(job: BulkIngestionJob, session_factory: async_sessionmaker) -> None:
+    extract_semaphore = asyncio.Semaphore(settings.BULK_INGEST_EXTRACT_CONCURRENCY)
+    parse_semaphore = asyncio.Semaphore(settings.BULK_INGEST_PARSE_CONCURRENCY)
+    batch_size = settings.BULK_INGEST_INSERT_BATCH_SIZE
+    dedupe_queue: asyncio.Queue = asyncio.Queue()
+    insert_queue: asyncio.Queue = asyncio.Queue()
+
+    async def extract_stage():
+        async def extract_one(item):
+            if await _extract(job, item, extract_semaphore):
+                await dedupe_queue.put(item)
+        async with asyncio.TaskGroup() as extract_tasks:
+            for item in job.items:
+                extract_tasks.create_task(extract_one(item))
+        await dedupe_queue.put(_DONE)
+
+    async def dedupe_and_parse_stage():
+        seen_emails, seen_hashes = set(), set()
+
+        async def parse_one(item):
+            await _parse(job, item, parse_semaphore)
+            await insert_queue.put(item)
+
+        async with asyncio.TaskGroup() as parse_tasks:
+            finished = False
+            while not finished:
+                # Take whatever has been extracted so far (up to one batch) and check it with one query
+                group = [await dedupe_queue.get()]
+                while len(group) < batch_size and not dedupe_queue.empty():
+                    group.append(dedupe_queue.get_nowait())
+                if group[-1] is _DONE:
+                    finished = True
+                    group.pop()
+                if group:
+                    for item in await _mark_duplicates(job, group, session_factory, seen_emails, seen_hashes):
+                        parse_tasks.create_task(parse_one(item))
+        await insert_queue.put(_DONE)
+
+    async def insert_stage():
+        batch = []
+        while True:
+            item = await insert_queue.get()
+            if item is _DONE:
+                break
+            batch.append(item)
+            if len(batch) >= batch_size:
+                await _insert_batch(job, batch, session_factory)
+                batch = []
+        if batch:
+            await _insert_batch(job, batch, session_factory)
+
+    # A failing stage cancels the others
+    async with asyncio.TaskGroup() as stages:
+        stages.create_task(extract_stage())
+        stages.create_task(dedupe_and_parse_stage())
+        stages.create_task(insert_stage())
+
+
+async def _run_job(job: BulkIngestionJob, session_factory: async_sessionmaker) -> None:
+    logger.info("Bulk job %s: started with %s file(s).", job.id, len(job.items))
+    try:
+        # parse_resume calls of an import queue behind interactive/regular LLM work
+        with llm_priority(LLMPriority.BATCH):
+            await _run_pipeline(job, session_factory)
+    except asyncio.CancelledError:
+        job.finish(JOB_CANCELLED, "Job was cancelled.")
+        raise
+    except Exception as e:
+        if isinstance(e, ExceptionGroup):
+            e = e.exceptions[0]
+        logger.error("Bulk job %s: pipeline failed: %s", job.id, e, exc_info=True)
+        job.finish(JOB_FAILED, str(e))
+        return
+    job.finish(JOB_COMPLETED)
+    logger.info("Bulk job %s: finished, counts: %s", job.id, job.counts())
+
+
+def start_job(uploads: List[Tuple[str, bytes]], session_factory: async_sessionmaker) -> BulkIngestionJob:
+    """Validates the upload and starts its ingestion in the background. Raises BulkIngestionError."""
+    job = BulkIngestionJob(build_items(uploads))
+    _register_job(job)
+    job.task = asyncio.create_task(_run_job(job, session_factory))
+    return job
+
+
+async def subscribe(job: BulkIngestionJob) -> AsyncIterator[Tuple[str, dict]]:
+    """Yields ("progress", ...) events until the job finishes, then one ("complete", summary) event."""
+    if job.done:
+        yield "complete", job.summary()
+        return
+    queue = job.subscribe()
+    try:
+        yield "progress", job.summary()
+        while True:
+            event, data = await queue.get()
+            yield event, data
+            if event == "complete":
+                return
+    finally:
+        job.unsubscribe(queue)
+
+
+async def shutdown_bulk_ingestion() -> None:
+    """Cancels running jobs (application shutdown)."""
+    tasks = [job.task for job in _jobs.values() if job.task is not None and not job.task.done()]
+    for task in tasks:
+        task.cancel()
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,314 @@
+# app/services/llm_cache.py
+
+"""
+Content-addressed cache for LLM responses, in front of every call in ai_services.py and
+ai_report_generator.py.
+
+The key is sha256 over (model, temperature, rendered prompt): asking for the same follow-ups
+of the same log entry twice, or regenerating a report over unchanged logs, returns the stored
+response instead of calling the model again.
+
+Two tiers:
+
+* an in-memory LRU (``LLM_CACHE_MAX_ENTRIES`` entries) per API worker;
+* the ``llm_response_cache`` table, shared by all workers and surviving restarts. It is only
+  used once ``configure(session_factory)`` has been called (see the lifespan in app/main.py);
+  errors there are logged and treated as a miss, the cache never fails an LLM call.
+
+Entries expire after the TTL of their task (``LLM_CACHE_TTL_SECONDS``, falling back to
+``LLM_CACHE_DEFAULT_TTL_SECONDS``; 0 disables caching for that task). Inside
+``with bypass_llm_cache():`` lookups are skipped but fresh responses are still stored, which is
+how endpoints implement ``?regenerate=true``. AI error strings ("Error: ...") and empty
+responses are never cached.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.db import models
+
+logger = logging.getLogger(__name__)
+
+# Task names (TTL lookup + metrics breakdown)
+TASK_RESUME_PARSING = "resume_parsing"
+TASK_JD_ANALYSIS = "jd_analysis"
+TASK_QUESTION_GENERATION = "question_generation"
+TASK_REPORT_GENERATION = "report_generation"
+TASK_FOLLOWUP_GENERATION = "followup_generation"
+TASK_TRANSCRIPT_SUMMARY = "transcript_summary"
+TASK_SEGMENT_ASSESSMENT = "segment_assessment"
+
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+@contextlib.contextmanager
+def bypass_llm_cache(enabled: bool = True):
+    """Within this block cached responses are ignored (and overwritten by the fresh ones)."""
+    token = _bypass.set(enabled)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def compute_cache_key(model: str, temperature: Optional[float], prompt: str) -> str:
+    payload = json.dumps({"model": model, "temperature": temperature, "prompt": prompt}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _is_cacheable(response: Optional[str]) -> bool:
+    return bool(response and response.strip()) and not response.startswith("Error:")
+
+
+def _utcnow() -> datetime:
+    # Naive UTC, matching how the TIMESTAMP/DateTime columns are stored
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class LLMResponseCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.session_factory: Optional[async_sessionmaker] = None
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()  # key -> (expires_at epoch, response)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self.evictions = 0
+        self.persistent_errors = 0
+
+    def configure(self, session_factory: Optional[async_sessionmaker]) -> None:
+        """Enables (or with None disables) the SQL tier."""
+        self.session_factory = session_factory if settings.LLM_CACHE_PERSISTENT else None
+
+    @staticmethod
+    def ttl_for(task: str) -> int:
+        return settings.LLM_CACHE_TTL_SECONDS.get(task, settings.LLM_CACHE_DEFAULT_TTL_SECONDS)
+
+    def _count(self, task: str, counter: str) -> None:
+        stats = self._stats.setdefault(task, {"hits_memory": 0, "hits_persistent": 0, "misses": 0, "bypassed": 0, "stores": 0})
+        stats[counter] += 1
+
+    # --- Memory tier ---
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, response = entry
+        if expires_at <= time.time():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return response
+
+    def _memory_put(self, key: str, response: str, ttl: int) -> None:
+        self._memory[key] = (time.time() + ttl, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    # --- SQL tier ---
+
+    async def _persistent_get(self, key: str) -> Optional[Tuple[str, float]]:
+        """Returns (response, remaining ttl seconds) or None."""
+        if self.session_factory is None:
+            return None
+        try:
+            async with self.session_factory() as db:
+                result = await db.execute(select(models.LLMResponseCache).where(models.LLMResponseCache.cache_key == key))
+                row = result.scalar_one_or_none()
+                if row is None:
+                    return None
+                remaining = (row.expires_at - _utcnow()).total_seconds()
+                if remaining <= 0:
+                    await db.execute(delete(models.LLMResponseCache).where(models.LLMResponseCache.id == row.id))
+                    await db.commit()
+                    return None
+                return row.response, remaining
+        except Exception as e:
+            self.persistent_errors += 1
+            logger.warning("LLM cache: persistent lookup failed, treating as miss: %s", e)
+            return None
+
+    async def _persistent_put(self, key: str, task: str, model: str, response: str, ttl: int) -> None:
+        if self.session_factory is None:
+            return
+        expires_at = _utcnow() + timedelta(seconds=ttl)
+        try:
+            async with self.session_factory() as db:
+                result = await db.execute(select(models.LLMResponseCache).where(models.LLMResponseCache.cache_key == key))
+                row = result.scalar_one_or_none()
+                if row is None:
+                    row = models.LLMResponseCache(cache_key=key, task=task, model=model)
+                    db.add(row)
+                row.response = response
+                row.expires_at = expires_at
+                try:
+                    await db.commit()
+                except IntegrityError:
+                    await db.rollback()  # Stored concurrently by another worker, keep theirs
+        except Exception as e:
+            self.persistent_errors += 1
+            logger.warning("LLM cache: persistent store failed: %s", e)
+
+    # --- Public API ---
+
+    async def lookup(self, task: str, key: str) -> Optional[str]:
+        response = self._memory_get(key)
+        if response is not None:
+            self._count(task, "hits_memory")
+            return response
+        stored = await self._persistent_get(key)
+        if stored is not None:
+            response, remaining = stored
+            self._memory_put(key, response, int(remaining))
+            self._count(task, "hits_persistent")
+            return response
+        self._count(task, "misses")
+        return None
+
+    async def store(self, task: str, key: str, model: str, response: str) -> None:
+        ttl = self.ttl_for(task)
+        if ttl <= 0 or not _is_cacheable(response):
+            return
+        self._memory_put(key, response, ttl)
+        await self._persistent_put(key, task, model, response, ttl)
+        self._count(task, "stores")
+
+    def _skip_lookup(self, task: str) -> bool:
+        if not settings.LLM_CACHE_ENABLED or self.ttl_for(task) <= 0:
+            return True
+        if _bypass.get():
+            self._count(task, "bypassed")
+            return True
+        return False
+
+    async def get_or_call(
+        self,
+        task: str,
+        model: str,
+        temperature: Optional[float],
+        prompt: str,
+        call: Callable[[], Awaitable[str]]
+    ) -> str:
+        """
+        Returns the cached response for (model, temperature, prompt) or awaits ``call()`` and
+        caches its result. Identical concurrent calls share one in-flight request.
+        """
+        key = compute_cache_key(model, temperature, prompt)
+        if self._skip_lookup(task):
+            response = await call()
+            if settings.LLM_CACHE_ENABLED:
+                await self.store(task, key, model, response)
+            return response
+
+        cached = await self.lookup(task, key)
+        if cached is not None:
+            logger.info("LLM cache hit (%s, key %s)", task, key[:12])
+            return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            logger.info("LLM cache: joining in-flight request (%s, key %s)", task, key[:12])
+            await asyncio.wait({inflight})
+            if not inflight.cancelled() and inflight.exception() is None:
+                return inflight.result()
+            # The shared request failed; make our own attempt (and report our own error)
+            return await call()
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await call()
+            await self.store(task, key, model, response)
+            future.set_result(response)
+            return response
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved: nobody may be waiting on it
+            raise
+        finally:
+            if not future.done():
+                future.cancel()
+            self._inflight.pop(key, None)
+
+    async def stream_or_call(
+        self,
+        task: str,
+        model: str,
+        temperature: Optional[float],
+        prompt: str,
+        call: Callable[[], AsyncIterator[str]]
+    ) -> AsyncIterator[str]:
+        """
+        Streaming counterpart of get_or_call: a hit yields the stored response as one chunk,
+        a miss forwards the chunks of ``call()`` and caches the text once the stream completed.
+        """
+        key = compute_cache_key(model, temperature, prompt)
+        skip = self._skip_lookup(task)
+        if not skip:
+            cached = await self.lookup(task, key)
+            if cached is not None:
+                logger.info("LLM cache hit (%s, key %s), replaying stored response", task, key[:12])
+                yield cached
+                return
+
+        chunks = []
+        async for chunk in call():
+            chunks.append(chunk)
+            yield chunk
+        if settings.LLM_CACHE_ENABLED:
+            await self.store(task, key, model, "".join(chunks))
+
+    def get_metrics(self) -> dict:
+        totals = {"hits_memory": 0, "hits_persistent": 0, "misses": 0, "bypassed": 0, "stores": 0}
+        for stats in self._stats.values():
+            for name, value in stats.items():
+                totals[name] += value
+        lookups = totals["hits_memory"] + totals["hits_persistent"] + totals["misses"]
+        return {
+            "enabled": settings.LLM_CACHE_ENABLED,
+            "persistent": self.session_factory is not None,
+            "memory_entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "evictions": self.evictions,
+            "persistent_errors": self.persistent_errors,
+            "hit_ratio": round((totals["hits_memory"] + totals["hits_persistent"]) / lookups, 4) if lookups else None,
+            **totals,
+            "by_task": {task: dict(stats) for task, stats in self._stats.items()},
+        }
+
+    def clear_memory(self) -> None:
+        self._memory.clear()
+
+
+llm_response_cache = LLMResponseCache(max_entries=settings.LLM_CACHE_MAX_ENTRIES)
+
+
+async def cached_llm_call(task: str, model: str, temperature: Optional[float], prompt: str, call: Callable[[], Awaitable[str]]) -> str:
+    return await llm_response_cache.get_or_call(task, model, temperature, prompt, call)
+
+
+def cached_llm_stream(task: str, model: str, temperature: Optional[float], prompt: str, call: Callable[[], AsyncIterator[str]]) -> AsyncIterator[str]:
+    return llm_response_cache.stream_or_call(task, model, temperature, prompt, call)
+
+
+def configure_llm_cache(session_factory: Optional[async_sessionmaker]) -> None:
+    llm_response_cache.configure(session_factory)
+
+
+def get_metrics() -> dict:
+    return llm_response_cache.get_metrics()
@@ -0,0 +1,225 @@
+# app/services/log_ingestion.py
+
+"""
+Creation of interview log entries: single entries (POST /logs) and bulk ingestion (a recorded
+transcript, or the turns of a chat session) in one request instead of one POST /logs per entry.
+
+* The body is a JSON array of entries, or NDJSON (one entry per line), which is parsed as it is
+  received. Entries are InterviewLogCreate objects; their order in the body is the transcript
+  order, any order_num they carry is ignored.
+* The whole batch is validated first (at most LOG_BULK_MAX_ENTRIES entries and
+  LOG_BULK_MAX_BYTES, every entry with a text, every question_id belonging to the interview,
+  checked with one IN query), so it is inserted completely or not at all.
+* order_num is assigned server-side, for single entries (POST /logs) too: each interview keeps
+  a counter (Interview.last_log_order_num) that is advanced by the batch size with one atomic
+  UPDATE. Concurrent writers of one interview (two interviewers, an import racing the UI, live
+  transcription) get disjoint ranges without a read-modify-write; the row lock only covers that
+  interview's row, for one short transaction, so other interviews are not contended. The unique
+  (interview_id, order_num) constraint backs this up.
+* The rows are written with one executemany INSERT (multi-row on MySQL) in one transaction and
+  their ids read back by (interview_id, order_num).
+"""
+
+import json
+import logging
+from dataclasses import dataclass
+from typing import AsyncIterator, List, Optional
+
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.v1 import schemas
+from app.core.config import settings
+from app.db import models
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines")
+
+_entry_adapter = TypeAdapter(schemas.InterviewLogCreate)
+
+
+class LogIngestionError(Exception):
+    pass
+
+
+class InvalidLogEntriesError(LogIngestionError):
+    """The body or some entries are invalid; errors lists them (entry index, message)."""
+
+    def __init__(self, errors: List[dict]):
+        super().__init__(f"{len(errors)} invalid log entr{'y' if len(errors) == 1 else 'ies'}.")
+        self.errors = errors
+
+
+class LogBatchTooLargeError(LogIngestionError):
+    pass
+
+
+class InterviewNotFoundError(LogIngestionError):
+    pass
+
+
+class UnknownQuestionsError(LogIngestionError):
+    def __init__(self, question_ids: List[int]):
+        super().__init__(f"Question(s) {question_ids} not found for this interview.")
+        self.question_ids = question_ids
+
+
+@dataclass
+class IngestedLogs:
+    ids: List[int]
+    first_order_num: Optional[int]
+    last_order_num: Optional[int]
+
+
+def is_ndjson(content_type: Optional[str]) -> bool:
+    return (content_type or "").split(";")[0].strip().lower() in NDJSON_MEDIA_TYPES
+
+
+def _validate_entry(index: int, raw, errors: List[dict]) -> Optional[schemas.InterviewLogCreate]:
+    try:
+        entry = _entry_adapter.validate_python(raw)
+    except ValidationError as e:
+        errors.append({"index": index, "errors": e.errors(include_url=False, include_context=False)})
+        return None
+    if entry.full_dialogue_text is None:
+        errors.append({"index": index, "errors": [{"loc": ["full_dialogue_text"], "msg": "Field required"}]})
+        return None
+    return entry
+
+
+def _check_count(count: int) -> None:
+    if count > settings.LOG_BULK_MAX_ENTRIES:
+        raise LogBatchTooLargeError(f"At most {settings.LOG_BULK_MAX_ENTRIES} log entries per request.")
+
+
+async def read_limited(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Passes the chunks through; raises LogBatchTooLargeError past LOG_BULK_MAX_BYTES."""
+    received = 0
+    async for chunk in chunks:
+        received += len(chunk)
+        if received > settings.LOG_BULK_MAX_BYTES:
+            raise LogBatchTooLargeError(f"Request body larger than {settings.LOG_BULK_MAX_BYTES} bytes.")
+        yield chunk
+
+
+def parse_json_entries(body: bytes) -> List[schemas.InterviewLogCreate]:
+    """Entries of a JSON array body. Raises InvalidLogEntriesError / LogBatchTooLargeError."""
+    try:
+        raw_entries = json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise InvalidLogEntriesError([{"index": None, "errors": [{"msg": f"Invalid JSON: {e}"}]}])
+    if not isinstance(raw_entries, list):
+        raise InvalidLogEntriesError([{"index": None, "errors": [{"msg": "Expected a JSON array of log entries."}]}])
+    _check_count(len(raw_entries))
+    errors: List[dict] = []
+    entries = [_validate_entry(index, raw, errors) for index, raw in enumerate(raw_entries)]
+    if errors:
+        raise InvalidLogEntriesError(errors)
+    return entries
+
+
+async def parse_ndjson_entries(chunks: AsyncIterator[bytes]) -> List[schemas.InterviewLogCreate]:
+    """Entries of an NDJSON body, parsed line by line as the chunks arrive (blank lines are skipped)."""
+    entries: List[schemas.InterviewLogCreate] = []
+    errors: List[dict] = []
+    index = 0
+
+    def parse_line(line: bytes) -> None:
+        nonlocal index
+        if not line.strip():
+            return
+        _check_count(index + 1)
+        try:
+            raw = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            errors.append({"index": index, "errors": [{"msg": f"Invalid JSON: {e}"}]})
+        else:
+            entry = _validate_entry(index, raw, errors)
+            if entry is not None:
+                entries.append(entry)
+        index += 1
+
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            parse_line(line)
+    parse_line(pending)
+    if errors:
+        raise InvalidLogEntriesError(errors)
+    return entries
+
+
+async def allocate_log_order_nums(db: AsyncSession, interview_id: int, count: int) -> Optional[int]:
+    """
+    Reserves count consecutive order_nums for the interview and returns the first one (None if
+    the interview does not exist). The counter UPDATE row-locks the interview until the
+    transaction ends, so call it right before inserting and commit promptly.
+    """
+    result = await db.execute(
+        update(models.Interview)
+        .where(models.Interview.id == interview_id)
+        .values(last_log_order_num=models.Interview.last_log_order_num + count)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        return None
+    last = (await db.execute(select(models.Interview.last_log_order_num).where(models.Interview.id == interview_id))).scalar_one()
+    return last - count + 1
+
+
+async def ingest_log_entries(db: AsyncSession, interview_id: int, entries: List[schemas.InterviewLogCreate]) -> IngestedLogs:
+    """
+    Inserts entries, in order, after the interview's last log entry, and commits.
+    Raises InterviewNotFoundError / UnknownQuestionsError (nothing is inserted then).
+    """
+    if not entries:
+        if await db.get(models.Interview, interview_id) is None:
+            raise InterviewNotFoundError("Interview not found")
+        return IngestedLogs([], None, None)
+
+    # Taken first: the counter's row lock is what orders concurrent writers of this interview (the
+    # FK checks of the INSERT only take shared locks on it, which would deadlock if taken before)
+    first_order_num = await allocate_log_order_nums(db, interview_id, len(entries))
+    if first_order_num is None:
+        raise InterviewNotFoundError("Interview not found")
+    last_order_num = first_order_num + len(entries) - 1
+
+    question_ids = {entry.question_id for entry in entries if entry.question_id}
+    question_texts = {}
+    if question_ids:
+        result = await db.execute(
+            select(models.Question.id, models.Question.question_text)
+            .where(models.Question.interview_id == interview_id, models.Question.id.in_(question_ids))
+        )
+        question_texts = dict(result.all())
+        missing = sorted(question_ids - question_texts.keys())
+        if missing:
+            await db.rollback()
+            raise UnknownQuestionsError(missing)
+
+    rows = [
+        {
+            "interview_id": interview_id,
+            "question_id": entry.question_id,
+            "speaker_role": entry.speaker_role or models.SpeakerRole.SYSTEM,
+            # Like POST /logs: the question's text when only its id is given
+            "question_text_snapshot": entry.question_text_snapshot or question_texts.get(entry.question_id),
+            "full_dialogue_text": entry.full_dialogue_text,
+            "order_num": first_order_num + offset,
+        }
+        for offset, entry in enumerate(entries)
+    ]
+    await db.execute(insert(models.InterviewLog), rows)
+    created = await db.execute(
+        select(models.InterviewLog.id)
+        .where(models.InterviewLog.interview_id == interview_id, models.InterviewLog.order_num.between(first_order_num, last_order_num))
+        .order_by(models.InterviewLog.order_num)
+    )
+    ids = list(created.scalars().all())
+    await db.commit()
+    logger.info("Interview %s: ingested %s log entries (order_num %s-%s)", interview_id, len(ids), first_order_num, last_order_num)
+    return IngestedLogs(ids, first_order_num, last_order_num)
@@ -0,0 +1,62 @@
+# app/services/question_pipeline.py
+
+"""
+Stage graph for interview question generation.
+
+    jd_analysis ─────┐
+                     ├──> question_generation
+    resume_parsing ──┘
+
+JD analysis and resume parsing are independent LLM calls (each backed by the
+persistent cache in analysis_cache), so they run concurrently; question
+generation starts once both are available.
+"""
+
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import models
+from app.services.analysis_cache import get_or_create_jd_analysis, get_or_create_resume_summary
+
+logger = logging.getLogger(__name__)
+
+STAGE_JD_ANALYSIS = "jd_analysis"
+STAGE_RESUME_PARSING = "resume_parsing"
+
+
+async def iter_preprocessing_stages(
+    db: AsyncSession, job: models.Job, candidate: models.Candidate
+) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Runs the independent preprocessing stages concurrently and yields
+    (stage_name, result) in completion order.
+
+    Results may be "Error: ..." strings (see ai_services); the caller decides whether
+    to abort. Stages still running when the consumer stops iterating are cancelled.
+    """
+    tasks = {
+        asyncio.create_task(get_or_create_jd_analysis(db, job)): STAGE_JD_ANALYSIS,
+        asyncio.create_task(get_or_create_resume_summary(db, candidate)): STAGE_RESUME_PARSING,
+    }
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield tasks[task], task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def run_preprocessing_stages(
+    db: AsyncSession, job: models.Job, candidate: models.Candidate
+) -> Dict[str, str]:
+    """Runs all preprocessing stages concurrently and returns {stage_name: result}."""
+    results = {}
+    async for stage_name, result in iter_preprocessing_stages(db, job, candidate):
+        results[stage_name] = result
+    return results
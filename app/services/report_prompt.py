@@ -0,0 +1,262 @@
+# app/services/report_prompt.py
+
+"""
+Token-aware assembly of the inputs of INTERVIEW_REPORT_GENERATION_PROMPT.
+
+The report prompt used to receive every InterviewLog verbatim, so a long interview could exceed
+the model context (or simply cost far more than needed). ``build_report_prompt_inputs`` measures
+the template, JD analysis, resume summary and transcript with tiktoken (app/core/tokens.py) and
+keeps the prompt within ``REPORT_PROMPT_TOKEN_BUDGET``:
+
+1. The JD analysis and resume summary are each cut to ``REPORT_CONTEXT_MAX_SHARE`` of the budget.
+2. A transcript that fits the remaining budget is sent as is (compaction "none").
+3. Otherwise every answer gets a share of the budget (short answers keep their full text, the
+   rest is split evenly) and longer answers are compacted extractively: their opening and
+   closing sentences are kept and the middle is elided (compaction "extractive").
+4. When even that would leave less than ``REPORT_MIN_ANSWER_TOKENS`` per answer, the Q/A pairs
+   are grouped into segments of ``REPORT_SUMMARY_CHUNK_TOKENS`` and summarized concurrently by the
+   LLM (map); the segment summaries, in interview order, become the transcript of the report call
+   (reduce). A segment whose summary fails falls back to extractive compaction ("map_reduce").
+
+The token counts and the compaction applied are returned as ``stats`` and stored on the Report.
+"""
+
+import asyncio
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.prompts import INTERVIEW_REPORT_GENERATION_PROMPT
+from app.core.tokens import count_tokens, tokenizer_name, truncate_to_tokens
+from app.services.ai_report_generator import REPORT_MODEL_NAME, summarize_transcript_segment
+
+logger = logging.getLogger(__name__)
+
+COMPACTION_NONE = "none"
+COMPACTION_EXTRACTIVE = "extractive"
+COMPACTION_MAP_REDUCE = "map_reduce"
+
+_ELISION_MARKER = "……（省略 {count} 句）……"
+_TRUNCATION_MARKER = "……（已截断）"
+# Sentence boundaries: CJK/ASCII terminators, or line breaks. "." only counts when followed by
+# whitespace so decimals and version numbers stay intact.
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[。！？!?；;])|(?<=\.)\s+|\n+")
+
+
+@dataclass
+class TranscriptEntry:
+    """One question/answer pair of the transcript. question is None for a free-form conversation_log."""
+    question: Optional[str]
+    answer: str
+
+
+@dataclass
+class ReportPromptInputs:
+    job_description: str
+    candidate_resume: str
+    conversation_log: str
+    stats: dict = field(default_factory=dict)
+
+
+def _format_entry(number: int, entry: TranscriptEntry) -> str:
+    if entry.question is None:
+        return entry.answer
+    return f"Q{number}: {entry.question}\nA{number}: {entry.answer}"
+
+
+def format_transcript(entries: List[TranscriptEntry]) -> str:
+    """The dialogue string sent to the report prompt (and stored as Report.source_dialogue)."""
+    return "\n\n".join(_format_entry(number, entry) for number, entry in enumerate(entries, start=1))
+
+
+def _split_sentences(text: str) -> List[str]:
+    return [part.strip() for part in _SENTENCE_BOUNDARY.split(text) if part and part.strip()]
+
+
+def compact_text(text: str, max_tokens: int, model: Optional[str] = None) -> Tuple[str, bool]:
+    """
+    Extractive compaction: keeps the opening and closing sentences of text (alternating, so both
+    the context and the conclusion of an answer survive) within max_tokens and elides the middle.
+    Returns (text, compacted).
+    """
+    if count_tokens(text, model) <= max_tokens:
+        return text, False
+
+    sentences = _split_sentences(text)
+    used = count_tokens(_ELISION_MARKER.format(count=len(sentences)), model)
+    head: List[str] = []
+    tail: List[str] = []
+    first, last = 0, len(sentences) - 1
+    while first <= last:
+        take_head = len(head) <= len(tail)
+        sentence = sentences[first] if take_head else sentences[last]
+        cost = count_tokens(sentence, model) + 1
+        if used + cost > max_tokens:
+            break
+        used += cost
+        if take_head:
+            head.append(sentence)
+            first += 1
+        else:
+            tail.append(sentence)
+            last -= 1
+
+    if not head:
+        # Not even the first sentence fits: cut it
+        marker_tokens = count_tokens(_TRUNCATION_MARKER, model)
+        return truncate_to_tokens(text, max_tokens - marker_tokens, model) + _TRUNCATION_MARKER, True
+    omitted = len(sentences) - len(head) - len(tail)
+    return " ".join(head + [_ELISION_MARKER.format(count=omitted)] + tail[::-1]), True
+
+
+def allocate_budget(sizes: List[int], total: int) -> List[int]:
+    """
+    Splits total across items of the given sizes: items smaller than an even share keep their
+    full size and what they leave unused is shared by the larger ones.
+    """
+    allocations = [0] * len(sizes)
+    remaining = total
+    order = sorted(range(len(sizes)), key=lambda index: sizes[index])
+    for position, index in enumerate(order):
+        share = remaining // (len(sizes) - position)
+        allocations[index] = min(sizes[index], share)
+        remaining -= allocations[index]
+    return allocations
+
+
+def _cap_context(text: str, max_tokens: int, model: str) -> Tuple[str, bool]:
+    if count_tokens(text, model) <= max_tokens:
+        return text, False
+    return compact_text(text, max_tokens, model)
+
+
+def _safety_margin(tokens: int) -> int:
+    # Token counts of the parts do not add up exactly once joined; keep a little headroom
+    return max(16, tokens // 50)
+
+
+def _compact_entries(entries: List[TranscriptEntry], available: int, model: str) -> Optional[Tuple[List[TranscriptEntry], int]]:
+    """Per-answer extractive compaction into `available` tokens, or None if answers would get too short."""
+    overheads = [count_tokens(_format_entry(number, TranscriptEntry(entry.question, "")), model) + 2 for number, entry in enumerate(entries, start=1)]
+    answer_budget = available - _safety_margin(available) - sum(overheads)
+    sizes = [count_tokens(entry.answer, model) for entry in entries]
+    if answer_budget < settings.REPORT_MIN_ANSWER_TOKENS * len(entries):
+        return None
+
+    compacted_entries = []
+    compacted_count = 0
+    for entry, allocation in zip(entries, allocate_budget(sizes, answer_budget)):
+        answer, compacted = compact_text(entry.answer, allocation, model)
+        compacted_count += compacted
+        compacted_entries.append(TranscriptEntry(entry.question, answer))
+    return compacted_entries, compacted_count
+
+
+def _segment_transcript(entries: List[TranscriptEntry], model: str) -> List[str]:
+    """Groups the formatted Q/A pairs (keeping their numbers) into segments of at most REPORT_SUMMARY_CHUNK_TOKENS."""
+    chunk_tokens = settings.REPORT_SUMMARY_CHUNK_TOKENS
+    segments: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for number, entry in enumerate(entries, start=1):
+        text = _format_entry(number, entry)
+        tokens = count_tokens(text, model)
+        if tokens > chunk_tokens:
+            text, _ = compact_text(text, chunk_tokens, model)
+            tokens = chunk_tokens
+        if current and current_tokens + tokens > chunk_tokens:
+            segments.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        segments.append("\n\n".join(current))
+    return segments
+
+
+async def _summarize_transcript(entries: List[TranscriptEntry], job_description: str, available: int, model: str) -> Tuple[str, dict]:
+    """Map-reduce compaction: segment summaries in interview order, fitted into `available` tokens."""
+    segments = _segment_transcript(entries, model)
+    logger.info("Report prompt: summarizing transcript in %s segment(s)", len(segments))
+    summaries = await asyncio.gather(
+        *(summarize_transcript_segment(segment, job_description, llm_model_name=model) for segment in segments)
+    )
+
+    target = available - _safety_margin(available)
+    share = target // len(segments)
+    parts = []
+    failed = 0
+    for segment, summary in zip(segments, summaries):
+        if summary.startswith("Error:"):
+            logger.warning("Report prompt: segment summary failed, compacting it extractively instead. %s", summary)
+            failed += 1
+            parts.append(compact_text(segment, share, model)[0])
+        else:
+            parts.append(summary.strip())
+
+    # Reduce: the summaries normally fit; if not, compact the longest ones
+    sizes = [count_tokens(part, model) for part in parts]
+    if sum(sizes) > target:
+        parts = [compact_text(part, allocation, model)[0] for part, allocation in zip(parts, allocate_budget(sizes, target))]
+    return "\n\n".join(parts), {"segments_summarized": len(segments) - failed, "segments_failed": failed}
+
+
+async def build_report_prompt_inputs(
+    job_description: str,
+    candidate_resume: str,
+    entries: List[TranscriptEntry],
+    model: str = REPORT_MODEL_NAME
+) -> ReportPromptInputs:
+    """Fits JD analysis, resume summary and transcript into REPORT_PROMPT_TOKEN_BUDGET (see module docstring)."""
+    budget = settings.REPORT_PROMPT_TOKEN_BUDGET
+    template_tokens = count_tokens(INTERVIEW_REPORT_GENERATION_PROMPT.format(analyzed_jd="", structured_resume="", conversation_log=""), model)
+    context_cap = int(budget * settings.REPORT_CONTEXT_MAX_SHARE)
+
+    context_truncated = []
+    job_description, truncated = _cap_context(job_description or "", context_cap, model)
+    if truncated:
+        context_truncated.append("job_description")
+    candidate_resume, truncated = _cap_context(candidate_resume or "", context_cap, model)
+    if truncated:
+        context_truncated.append("resume")
+    job_description_tokens = count_tokens(job_description, model)
+    resume_tokens = count_tokens(candidate_resume, model)
+    available = budget - template_tokens - job_description_tokens - resume_tokens
+
+    conversation_log = format_transcript(entries)
+    original_tokens = count_tokens(conversation_log, model)
+    stats = {
+        "model": model,
+        "tokenizer": tokenizer_name(model),
+        "budget": budget,
+        "template_tokens": template_tokens,
+        "job_description_tokens": job_description_tokens,
+        "resume_tokens": resume_tokens,
+        "transcript_tokens_original": original_tokens,
+        "context_truncated": context_truncated,
+        "entries": len(entries),
+        "entries_compacted": 0,
+        "compaction": COMPACTION_NONE,
+    }
+
+    if original_tokens > available:
+        compacted = _compact_entries(entries, available, model)
+        if compacted is not None:
+            compacted_entries, stats["entries_compacted"] = compacted
+            conversation_log = format_transcript(compacted_entries)
+            stats["compaction"] = COMPACTION_EXTRACTIVE
+        else:
+            conversation_log, summary_stats = await _summarize_transcript(entries, job_description, available, model)
+            stats.update(summary_stats)
+            stats["compaction"] = COMPACTION_MAP_REDUCE
+
+    stats["transcript_tokens"] = count_tokens(conversation_log, model)
+    stats["prompt_tokens"] = template_tokens + job_description_tokens + resume_tokens + stats["transcript_tokens"]
+    if stats["compaction"] != COMPACTION_NONE:
+        logger.info(
+            "Report prompt: transcript compacted (%s) from %s to %s tokens, prompt %s/%s tokens",
+            stats["compaction"], original_tokens, stats["transcript_tokens"], stats["prompt_tokens"], budget,
+        )
+    return ReportPromptInputs(job_description, candidate_resume, conversation_log, stats)
@@ -0,0 +1,161 @@
+# app/services/report_refresh.py
+
+"""
+Incremental report refresh: after log entries are appended (or edited / removed), the report is
+updated from the previous report plus the changed Q/A pairs instead of being rewritten from the
+whole transcript.
+
+* The transcript a report was written from is stored as ``Report.source_dialogue``
+  (``format_transcript`` output). ``parse_transcript`` turns it back into entries; dialogues it
+  cannot reproduce exactly (legacy free-form conversation logs) are treated as unknown.
+* ``diff_transcripts`` aligns the previous and current entries (difflib) into added, changed and
+  removed Q/A pairs; ``format_transcript_delta`` renders them for REPORT_INCREMENTAL_UPDATE_PROMPT.
+* ``plan_report_refresh`` decides between "unchanged" (the existing report is returned without an
+  LLM call), "incremental" and "full". A full regeneration is used when there is no usable
+  previous report or when the changed text exceeds ``REPORT_INCREMENTAL_MAX_DELTA_RATIO`` of the
+  transcript: past that point patching the report tends to drift from what a fresh report says.
+"""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.tokens import count_tokens
+from app.db import models
+from app.services.ai_report_generator import REPORT_MODEL_NAME
+from app.services.report_prompt import TranscriptEntry, format_transcript
+
+logger = logging.getLogger(__name__)
+
+REFRESH_UNCHANGED = "unchanged"
+REFRESH_INCREMENTAL = "incremental"
+REFRESH_FULL = "full"
+
+
+@dataclass
+class TranscriptDelta:
+    """Numbered Q/A pairs that differ between two transcripts (added/changed use the current numbering)."""
+    added: List[Tuple[int, TranscriptEntry]] = field(default_factory=list)
+    changed: List[Tuple[int, TranscriptEntry, TranscriptEntry]] = field(default_factory=list)  # (number, old, new)
+    removed: List[Tuple[int, TranscriptEntry]] = field(default_factory=list)  # previous numbering
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.changed or self.removed)
+
+
+@dataclass
+class RefreshPlan:
+    mode: str
+    reason: str
+    delta_text: str = ""
+    stats: dict = field(default_factory=dict)
+
+
+def parse_transcript(dialogue: Optional[str]) -> Optional[List[TranscriptEntry]]:
+    """
+    Inverse of format_transcript for Q/A transcripts. Entries are numbered consecutively, so each
+    answer runs up to the next "\\n\\nQ{n+1}: " header. None when dialogue is not such a transcript.
+    """
+    if not dialogue or not dialogue.startswith("Q1: "):
+        return None
+    entries = []
+    rest = dialogue
+    number = 1
+    while True:
+        header = re.match(rf"Q{number}: (.*?)\nA{number}: ", rest, re.DOTALL)
+        if not header:
+            return None
+        rest = rest[header.end():]
+        next_header = rest.find(f"\n\nQ{number + 1}: ")
+        answer = rest if next_header == -1 else rest[:next_header]
+        entries.append(TranscriptEntry(header.group(1), answer))
+        if next_header == -1:
+            break
+        rest = rest[next_header + 2:]
+        number += 1
+    # Answers or questions containing the separators make the split ambiguous: only trust a round trip
+    return entries if format_transcript(entries) == dialogue else None
+
+
+def diff_transcripts(previous: List[TranscriptEntry], current: List[TranscriptEntry]) -> TranscriptDelta:
+    """Aligns the entries on (question, answer); a replaced entry with the same question counts as changed."""
+    delta = TranscriptDelta()
+    keys_previous = [(entry.question, entry.answer) for entry in previous]
+    keys_current = [(entry.question, entry.answer) for entry in current]
+    matcher = SequenceMatcher(None, keys_previous, keys_current, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        old_block = list(range(i1, i2))
+        new_block = list(range(j1, j2))
+        if tag == "replace":
+            paired = 0
+            for old_index, new_index in zip(old_block, new_block):
+                if previous[old_index].question != current[new_index].question:
+                    break
+                delta.changed.append((new_index + 1, previous[old_index], current[new_index]))
+                paired += 1
+            old_block, new_block = old_block[paired:], new_block[paired:]
+        delta.removed.extend((index + 1, previous[index]) for index in old_block)
+        delta.added.extend((index + 1, current[index]) for index in new_block)
+    return delta
+
+
+def format_transcript_delta(delta: TranscriptDelta) -> str:
+    sections = []
+    if delta.added:
+        sections.append("【新增问答】\n" + "\n\n".join(f"Q{n}: {entry.question}\nA{n}: {entry.answer}" for n, entry in delta.added))
+    if delta.changed:
+        sections.append("【修改的问答】\n" + "\n\n".join(
+            f"Q{n}: {new.question}\n原回答: {old.answer}\n新回答: {new.answer}" for n, old, new in delta.changed
+        ))
+    if delta.removed:
+        sections.append("【删除的问答（原编号）】\n" + "\n\n".join(f"Q{n}: {entry.question}\nA{n}: {entry.answer}" for n, entry in delta.removed))
+    return "\n\n".join(sections)
+
+
+def plan_report_refresh(
+    previous_report: Optional[models.Report],
+    transcript: List[TranscriptEntry],
+    model: str = REPORT_MODEL_NAME
+) -> RefreshPlan:
+    """Chooses how to bring previous_report up to date with transcript (see module docstring)."""
+    # A failure message saved as the report (before such results were rejected) is no report at all
+    if previous_report is None or not previous_report.generated_text or previous_report.generated_text.startswith("Error:"):
+        return RefreshPlan(REFRESH_FULL, "no_previous_report", stats={"refresh": REFRESH_FULL, "reason": "no_previous_report"})
+    if any(entry.question is None for entry in transcript):
+        return RefreshPlan(REFRESH_FULL, "unstructured_transcript", stats={"refresh": REFRESH_FULL, "reason": "unstructured_transcript"})
+    previous = parse_transcript(previous_report.source_dialogue)
+    if previous is None:
+        return RefreshPlan(REFRESH_FULL, "unknown_previous_transcript", stats={"refresh": REFRESH_FULL, "reason": "unknown_previous_transcript"})
+
+    delta = diff_transcripts(previous, transcript)
+    if delta.is_empty:
+        return RefreshPlan(REFRESH_UNCHANGED, "unchanged", stats={"refresh": REFRESH_UNCHANGED, "reason": "unchanged"})
+
+    delta_text = format_transcript_delta(delta)
+    delta_tokens = count_tokens(delta_text, model)
+    transcript_tokens = count_tokens(format_transcript(transcript), model)
+    ratio = round(delta_tokens / max(transcript_tokens, 1), 3)
+    stats = {
+        "entries": len(transcript),
+        "entries_added": len(delta.added),
+        "entries_changed": len(delta.changed),
+        "entries_removed": len(delta.removed),
+        "delta_tokens": delta_tokens,
+        "transcript_tokens": transcript_tokens,
+        "delta_ratio": ratio,
+        "max_delta_ratio": settings.REPORT_INCREMENTAL_MAX_DELTA_RATIO,
+    }
+    if ratio > settings.REPORT_INCREMENTAL_MAX_DELTA_RATIO:
+        logger.info("Report refresh: delta is %.0f%% of the transcript, regenerating the full report", ratio * 100)
+        return RefreshPlan(REFRESH_FULL, "delta_too_large", delta_text, {"refresh": REFRESH_FULL, "reason": "delta_too_large", **stats})
+    logger.info(
+        "Report refresh: incremental update with %s added, %s changed, %s removed entries (%s/%s tokens)",
+        len(delta.added), len(delta.changed), len(delta.removed), delta_tokens, transcript_tokens,
+    )
+    return RefreshPlan(REFRESH_INCREMENTAL, "incremental", delta_text, {"refresh": REFRESH_INCREMENTAL, "reason": "incremental", **stats})
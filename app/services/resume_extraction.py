@@ -0,0 +1,272 @@
+# app/services/resume_extraction.py
+
+"""
+Text extraction for uploaded resume files (.txt / .pdf / .docx).
+
+PDF (PyMuPDF) and DOCX (python-docx) parsing is CPU-bound and holds the GIL, so running it
+inside an ``async def`` handler freezes every other request on the worker. Here it runs in a
+bounded process pool instead:
+
+* at most ``RESUME_EXTRACTION_MAX_WORKERS`` files are parsed at the same time;
+* at most ``RESUME_EXTRACTION_MAX_QUEUE`` more wait for a worker, further uploads are rejected
+  (``ResumeExtractionBusyError``) instead of piling up;
+* files larger than ``RESUME_MAX_FILE_BYTES`` or PDFs with more than ``RESUME_MAX_PDF_PAGES`` pages
+  are rejected (``ResumeTooLargeError``);
+* a parse that exceeds ``RESUME_EXTRACTION_TIMEOUT_SECONDS`` fails with ``ResumeExtractionTimeoutError``.
+  A running task cannot be cancelled in a process pool, so the pool is recycled (its workers
+  are terminated) and recreated on the next upload.
+
+Queue depth and parse times are exposed via ``get_metrics()`` (see /api/v1/metrics).
+"""
+
+import asyncio
+import io
+import logging
+import multiprocessing
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+import docx  # For .docx parsing
+import fitz  # PyMuPDF for .pdf parsing
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = (".txt", ".pdf", ".docx")
+
+
+class ResumeExtractionError(Exception):
+    """The resume file could not be turned into text."""
+
+
+class UnsupportedResumeFormatError(ResumeExtractionError):
+    """Unknown extension, or a .txt file in an unsupported encoding."""
+
+
+class ResumeTooLargeError(ResumeExtractionError):
+    """The file exceeds the configured size or page limit."""
+
+
+class ResumeExtractionTimeoutError(ResumeExtractionError):
+    """Parsing took longer than RESUME_EXTRACTION_TIMEOUT_SECONDS."""
+
+
+class ResumeExtractionBusyError(ResumeExtractionError):
+    """All workers are busy and the wait queue is full."""
+
+
+# --- Worker functions (run in the pool processes, must stay module-level/picklable) ---
+
+def _extract_pdf_text(content: bytes, max_pages: int) -> str:
+    pdf_document = fitz.open(stream=content, filetype="pdf")
+    try:
+        page_count = len(pdf_document)
+        if page_count > max_pages:
+            raise ResumeTooLargeError(f"PDF has {page_count} pages, the limit is {max_pages}.")
+        return "\n".join(pdf_document.load_page(page_num).get_text() for page_num in range(page_count))
+    finally:
+        pdf_document.close()
+
+
+def _extract_docx_text(content: bytes) -> str:
+    # python-docx needs a file-like object that supports seek, so use io.BytesIO
+    doc = docx.Document(io.BytesIO(content))
+    return "\n".join(para.text for para in doc.paragraphs)
+
+
+def _decode_txt(content: bytes, filename: str) -> str:
+    try:
+        return content.decode("utf-8")
+    except UnicodeDecodeError:
+        try:
+            return content.decode("latin-1")
+        except UnicodeDecodeError as e:
+            raise UnsupportedResumeFormatError(
+                f"Could not decode .txt file '{filename}'. Please ensure it's UTF-8 or a common Western encoding."
+            ) from e
+
+
+class _ExtractionMetrics:
+    """In-process counters and recent parse durations for the pool."""
+
+    def __init__(self, window: int = 200):
+        self._lock = threading.Lock()
+        self._durations = deque(maxlen=window)  # seconds, successful pool parses only
+        self.in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.max_parse_seconds = 0.0
+
+    def record_duration(self, seconds: float) -> None:
+        with self._lock:
+            self._durations.append(seconds)
+            self.max_parse_seconds = max(self.max_parse_seconds, seconds)
+
+    def snapshot(self, max_workers: int, max_queue: int) -> dict:
+        with self._lock:
+            durations = sorted(self._durations)
+        def percentile(p: float) -> Optional[float]:
+            if not durations:
+                return None
+            return round(durations[min(len(durations) - 1, int(p * len(durations)))], 4)
+        return {
+            "max_workers": max_workers,
+            "max_queue": max_queue,
+            "in_flight": self.in_flight,
+            "running": min(self.in_flight, max_workers),
+            "queue_depth": max(0, self.in_flight - max_workers),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "parse_seconds": {
+                "count": len(durations),
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(self.max_parse_seconds, 4),
+            },
+        }
+
+
+class ResumeExtractor:
+    """
+    Runs PDF/DOCX extraction in a lazily created ProcessPoolExecutor.
+    All bookkeeping happens on the event loop thread, so plain counters are enough.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, max_file_bytes: int, max_pdf_pages: int, timeout_seconds: float):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_file_bytes = max_file_bytes
+        self.max_pdf_pages = max_pdf_pages
+        self.timeout_seconds = timeout_seconds
+        self.metrics = _ExtractionMetrics()
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs an event loop and DB connection pools is not safe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info("Resume extraction pool started with %s worker(s).", self.max_workers)
+        return self._executor
+
+    def _recycle_executor(self) -> None:
+        # Terminates the workers of the current pool (e.g. one stuck on a pathological PDF).
+        # Other tasks running in it fail with BrokenProcessPool; the next upload starts a fresh pool.
+        executor, self._executor = self._executor, None
+        if executor is None:
+            return
+        logger.warning("Recycling resume extraction pool.")
+        if hasattr(executor, "terminate_workers"):  # Python 3.14+
+            executor.terminate_workers()
+        else:
+            for process in list((getattr(executor, "_processes", None) or {}).values()):
+                process.terminate()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def extract_text(self, content: bytes, filename: str) -> str:
+        """
+        Returns the plain text of an uploaded resume.
+        Raises a ResumeExtractionError subclass for limit violations, timeouts, a full queue
+        and unparseable files.
+        """
+        filename_lower = (filename or "").lower()
+        if not filename_lower.endswith(SUPPORTED_EXTENSIONS):
+            raise UnsupportedResumeFormatError(f"Unsupported file type: {filename}. Please upload .txt, .pdf, or .docx.")
+        if len(content) > self.max_file_bytes:
+            raise ResumeTooLargeError(f"File '{filename}' is {len(content)} bytes, the limit is {self.max_file_bytes} bytes.")
+
+        if filename_lower.endswith(".txt"):
+            # Decoding is cheap, no need for a worker process
+            return _decode_txt(content, filename)
+
+        if self.metrics.in_flight >= self.max_workers + self.max_queue:
+            self.metrics.rejected += 1
+            logger.warning("Resume extraction queue full (%s in flight), rejecting '%s'.", self.metrics.in_flight, filename)
+            raise ResumeExtractionBusyError("Resume extraction is busy, please retry shortly.")
+
+        if filename_lower.endswith(".pdf"):
+            worker, args = _extract_pdf_text, (content, self.max_pdf_pages)
+        else:
+            worker, args = _extract_docx_text, (content,)
+
+        self.metrics.in_flight += 1
+        self.metrics.submitted += 1
+        started = time.perf_counter()
+        try:
+            executor = self._get_executor()
+            future = asyncio.get_running_loop().run_in_executor(executor, worker, *args)
+            try:
+                text = await asyncio.wait_for(future, timeout=self.timeout_seconds)
+            except asyncio.TimeoutError:
+                self.metrics.timeouts += 1
+                if self._executor is executor:
+                    self._recycle_executor()
+                raise ResumeExtractionTimeoutError(
+                    f"Parsing '{filename}' took longer than {self.timeout_seconds}s."
+                )
+        except ResumeExtractionError:
+            self.metrics.failed += 1
+            raise
+        except BrokenProcessPool as e:
+            self.metrics.failed += 1
+            if self._executor is not None and self._executor is executor:
+                self._executor = None
+            logger.error("Resume extraction pool broke while parsing '%s': %s", filename, e)
+            raise ResumeExtractionError(f"Resume extraction worker crashed while parsing '{filename}'.") from e
+        except Exception as e:
+            self.metrics.failed += 1
+            logger.error("Error parsing resume file %s: %s", filename, e, exc_info=True)
+            raise ResumeExtractionError(f"Error processing file '{filename}': {e}") from e
+        finally:
+            self.metrics.in_flight -= 1
+
+        elapsed = time.perf_counter() - started
+        self.metrics.completed += 1
+        self.metrics.record_duration(elapsed)
+        logger.info("Extracted %s characters from '%s' in %.3fs.", len(text), filename, elapsed)
+        return text
+
+    def get_metrics(self) -> dict:
+        return self.metrics.snapshot(self.max_workers, self.max_queue)
+
+    def shutdown(self) -> None:
+        """Stops the worker processes (application shutdown)."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+            logger.info("Resume extraction pool shut down.")
+
+
+resume_extractor = ResumeExtractor(
+    max_workers=settings.RESUME_EXTRACTION_MAX_WORKERS,
+    max_queue=settings.RESUME_EXTRACTION_MAX_QUEUE,
+    max_file_bytes=settings.RESUME_MAX_FILE_BYTES,
+    max_pdf_pages=settings.RESUME_MAX_PDF_PAGES,
+    timeout_seconds=settings.RESUME_EXTRACTION_TIMEOUT_SECONDS,
+)
+
+
+async def extract_resume_text(content: bytes, filename: str) -> str:
+    """Extracts the text of an uploaded resume using the shared extraction pool."""
+    return await resume_extractor.extract_text(content, filename)
+
+
+def get_metrics() -> dict:
+    return resume_extractor.get_metrics()
+
+
+def shutdown_resume_extraction() -> None:
+    resume_extractor.shutdown()
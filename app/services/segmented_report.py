@@ -0,0 +1,189 @@
+# app/services/segmented_report.py
+
+"""
+Segmented (map-reduce) report engine, the alternative to the single INTERVIEW_REPORT_GENERATION_PROMPT call.
+
+* Map: every question/answer segment (one InterviewLog) is scored against the JD analysis by
+  its own, short LLM call (``assess_interview_segment``); the calls run concurrently, bounded by
+  the LLM scheduler.
+* Each result is stored on its log row (``segment_assessment``) next to a content hash of what it
+  was computed from (question, answer, JD analysis, model, prompt). Regenerating the report after
+  adding or editing one log entry therefore re-scores only that segment.
+* A segment whose output does not match the schema (app/core/schema_registry.py) is scored once
+  more, bypassing the LLM cache; segments that still fail are passed to the reduce step raw.
+* Reduce: one short call writes the narrative and the CANDIDATE_CAPABILITY_ASSESSMENT_JSON block
+  from the segment assessments (``generate_report_from_assessments``). The per-dimension mean of
+  the segment scores is passed along as a reference and used as radar data if the reduce output
+  has no JSON block.
+
+Like app/services/analysis_cache.py, new assessments are only staged on the log rows; the caller
+commits them together with the report.
+"""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from app.core.prompts import SEGMENT_ASSESSMENT_PROMPT
+from app.core.schema_registry import SchemaViolation
+from app.core.structured_output import REPORT_DIMENSIONS, SCHEMA_SEGMENT_ASSESSMENT, parse_structured, parse_structured_output
+from app.db import models
+from app.services.ai_report_generator import REPORT_MODEL_NAME, assess_interview_segment
+from app.services.analysis_cache import compute_content_hash
+from app.services.llm_cache import bypass_llm_cache
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_ASSESSMENT_PROMPT_VERSION = compute_content_hash(SEGMENT_ASSESSMENT_PROMPT)[:12]
+
+
+@dataclass
+class SegmentedReportInputs:
+    """Inputs of the reduce step, plus the stats stored on the Report."""
+    segment_assessments: str
+    aggregated_scores: Dict[str, int]
+    stats: dict = field(default_factory=dict)
+
+
+def segment_content_hash(log: models.InterviewLog, analyzed_jd: str, model: str) -> str:
+    """Hash of everything a segment assessment depends on."""
+    payload = json.dumps(
+        [SEGMENT_ASSESSMENT_PROMPT_VERSION, model, compute_content_hash(analyzed_jd), _question(log), _answer(log)],
+        ensure_ascii=False
+    )
+    return compute_content_hash(payload)
+
+
+def _question(log: models.InterviewLog) -> str:
+    return log.question_text_snapshot or "(Ad-hoc Question)"
+
+
+def _answer(log: models.InterviewLog) -> str:
+    return log.full_dialogue_text or "(No answer recorded)"
+
+
+def parse_segment_assessment(raw_output: str) -> Optional[dict]:
+    """Validates the JSON object returned by SEGMENT_ASSESSMENT_PROMPT; None if it is unusable."""
+    parsed = parse_structured(SCHEMA_SEGMENT_ASSESSMENT, raw_output)
+    return _normalize_assessment(parsed) if parsed is not None else None
+
+
+def _normalize_assessment(parsed: dict) -> dict:
+    scores = {}
+    for dimension in REPORT_DIMENSIONS:
+        value = parsed["scores"].get(dimension)
+        scores[dimension] = value if isinstance(value, int) and not isinstance(value, bool) and 1 <= value <= 5 else None
+    return {
+        "scores": scores,
+        "evidence": str(parsed.get("evidence") or ""),
+        "strengths": [str(item) for item in parsed.get("strengths") or [] if item],
+        "concerns": [str(item) for item in parsed.get("concerns") or [] if item],
+    }
+
+
+def is_segment_assessment_fresh(log: models.InterviewLog, content_hash: str) -> bool:
+    return bool(log.segment_assessment) and log.segment_assessment_hash == content_hash
+
+
+def aggregate_scores(assessments: List[Optional[dict]]) -> Dict[str, int]:
+    """Per-dimension mean (rounded) of the segment scores; dimensions no segment evidenced are left out."""
+    aggregated = {}
+    for dimension in REPORT_DIMENSIONS:
+        values = [a["scores"][dimension] for a in assessments if a and a["scores"].get(dimension) is not None]
+        if values:
+            aggregated[dimension] = int(sum(values) / len(values) + 0.5)
+    return aggregated
+
+
+def _format_segment(number: int, log: models.InterviewLog, assessment: Optional[dict]) -> str:
+    if assessment is None:
+        # Scoring failed: hand the reduce step the raw segment instead of dropping it
+        return f"Q{number}: {_question(log)}\n（本题未能单独评估，原始回答如下）\nA{number}: {_answer(log)}"
+    scores = ", ".join(f"{dimension}: {score if score is not None else 'null'}" for dimension, score in assessment["scores"].items())
+    lines = [f"Q{number}: {_question(log)}", f"评分: {scores}"]
+    if assessment["evidence"]:
+        lines.append(f"依据: {assessment['evidence']}")
+    if assessment["strengths"]:
+        lines.append(f"亮点: {'；'.join(assessment['strengths'])}")
+    if assessment["concerns"]:
+        lines.append(f"不足: {'；'.join(assessment['concerns'])}")
+    return "\n".join(lines)
+
+
+@dataclass
+class _SegmentOutput:
+    value: Optional[dict]
+    errors: List[SchemaViolation]
+    raw_error: bool  # The call itself failed ("Error: ..."), retrying is the scheduler's job
+
+
+async def _assess_segments(logs: List[models.InterviewLog], indexes: List[int], analyzed_jd: str, model: str) -> Dict[int, _SegmentOutput]:
+    raw_outputs = await asyncio.gather(
+        *(assess_interview_segment(_question(logs[index]), _answer(logs[index]), analyzed_jd, llm_model_name=model) for index in indexes)
+    )
+    outputs = {}
+    for index, raw_output in zip(indexes, raw_outputs):
+        if raw_output.startswith("Error:"):
+            outputs[index] = _SegmentOutput(None, [], raw_error=True)
+            logger.warning("Segmented report: could not assess log %s: %s", logs[index].id, raw_output[:200])
+            continue
+        result = parse_structured_output(SCHEMA_SEGMENT_ASSESSMENT, raw_output)
+        if result.errors:
+            logger.warning(
+                "Segmented report: invalid assessment for log %s: %s",
+                logs[index].id, [violation.as_dict() for violation in result.errors[:5]],
+            )
+        outputs[index] = _SegmentOutput(result.value, result.errors, raw_error=False)
+    return outputs
+
+
+async def prepare_segmented_report(
+    logs: List[models.InterviewLog],
+    analyzed_jd: str,
+    model: str = REPORT_MODEL_NAME,
+    force: bool = False
+) -> SegmentedReportInputs:
+    """
+    Scores the segments whose assessment is missing or stale (all of them with force=True),
+    concurrently, and stages the new assessments on the log rows. Returns the reduce inputs.
+    """
+    hashes = [segment_content_hash(log, analyzed_jd, model) for log in logs]
+    pending = [index for index, log in enumerate(logs) if force or not is_segment_assessment_fresh(log, hashes[index])]
+    logger.info("Segmented report: %s segment(s), %s to score, %s reused", len(logs), len(pending), len(logs) - len(pending))
+
+    parsed_outputs = await _assess_segments(logs, pending, analyzed_jd, model)
+    # An output that does not match the schema is requested once more, past the LLM cache
+    # (which would otherwise keep serving the same unusable response)
+    invalid = [index for index in pending if parsed_outputs[index].errors and not parsed_outputs[index].raw_error]
+    if invalid:
+        logger.info("Segmented report: re-scoring %s segment(s) with invalid output", len(invalid))
+        with bypass_llm_cache():
+            parsed_outputs.update(await _assess_segments(logs, invalid, analyzed_jd, model))
+
+    assessments: List[Optional[dict]] = [log.segment_assessment if index not in pending else None for index, log in enumerate(logs)]
+    failed = 0
+    for index in pending:
+        result = parsed_outputs[index]
+        if result.value is None:
+            failed += 1
+            continue
+        assessment = _normalize_assessment(result.value)
+        logs[index].segment_assessment = assessment
+        logs[index].segment_assessment_hash = hashes[index]
+        assessments[index] = assessment
+
+    aggregated = aggregate_scores(assessments)
+    segment_text = "\n\n".join(_format_segment(number, log, assessment) for number, (log, assessment) in enumerate(zip(logs, assessments), start=1))
+    stats = {
+        "engine": "segmented",
+        "model": model,
+        "segments": len(logs),
+        "segments_scored": len(pending) - failed,
+        "segments_reused": len(logs) - len(pending),
+        "segments_failed": failed,
+        "segments_retried": len(invalid),
+        "aggregated_scores": aggregated,
+    }
+    return SegmentedReportInputs(segment_text, aggregated, stats)
@@ -0,0 +1,341 @@
+# app/services/task_queue.py
+
+"""
+In-process execution of long-running LLM work (question / report generation) with a
+SQL-backed task table (``models.BackgroundTask``).
+
+* ``submit_task`` records the task and hands its id to the asyncio workers; the HTTP request
+  returns right away and a client disconnect no longer throws the work away.
+* Idempotency: while a task is PENDING/RUNNING it holds the key "<task_type>:<interview_id>"
+  (unique column), so submitting the same work twice returns the existing task.
+* Retries: a failing handler is retried up to ``max_attempts`` times with exponential backoff,
+  unless it raises ``PermanentTaskError`` (e.g. the interview has no JD).
+* The table is the source of truth, shared by every API process: a worker claims a task with a
+  conditional UPDATE (PENDING -> RUNNING), so a task scheduled by two processes still runs once,
+  and holds a lease on it that is renewed while the handler runs. ``recover_tasks`` re-schedules
+  the PENDING tasks at startup and, then periodically, the RUNNING ones whose lease expired
+  (their process died mid-attempt); tasks another live process is running are left alone.
+
+Handlers are registered per task type with ``register_handler`` and receive their own
+AsyncSession plus the task row; the returned dict is stored as the task result.
+"""
+
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import or_, select, func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.core.llm_scheduler import LLMPriority, llm_priority
+from app.db import models
+
+logger = logging.getLogger(__name__)
+
+TaskHandler = Callable[[AsyncSession, models.BackgroundTask], Awaitable[dict]]
+
+_handlers: Dict[str, TaskHandler] = {}
+
+
+class PermanentTaskError(Exception):
+    """Raised by a handler for errors that retrying cannot fix."""
+
+
+def register_handler(task_type: str, handler: TaskHandler) -> None:
+    _handlers[task_type] = handler
+
+
+def idempotency_key(task_type: str, interview_id: Optional[int]) -> str:
+    return f"{task_type}:{interview_id}"
+
+
+def _utcnow() -> datetime:
+    # Naive UTC, like the DateTime column it is compared with
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _lease_expiry() -> datetime:
+    return _utcnow() + timedelta(seconds=settings.TASK_LEASE_SECONDS)
+
+
+class TaskRunner:
+    """A fixed set of asyncio workers consuming task ids from an in-memory queue."""
+
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: Set[asyncio.Task] = set()
+        self._retry_timers: Set[asyncio.Task] = set()
+        self._reaper: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.running = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.retried = 0
+
+    def _ensure_started(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._workers:
+            return
+        # (Re)start the workers on the current loop
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._workers = {loop.create_task(self._worker(n)) for n in range(self.concurrency)}
+        logger.info("Task queue started with %s worker(s).", self.concurrency)
+
+    def enqueue(self, task_id: int, session_factory: async_sessionmaker) -> None:
+        self._ensure_started()
+        self._queue.put_nowait((task_id, session_factory))
+
+    def _enqueue_later(self, task_id: int, session_factory: async_sessionmaker, delay: float) -> None:
+        async def _timer():
+            await asyncio.sleep(delay)
+            self.enqueue(task_id, session_factory)
+        timer = asyncio.get_running_loop().create_task(_timer())
+        self._retry_timers.add(timer)
+        timer.add_done_callback(self._retry_timers.discard)
+
+    async def _worker(self, worker_number: int) -> None:
+        while True:
+            task_id, session_factory = await self._queue.get()
+            self.running += 1
+            try:
+                await self._execute(task_id, session_factory)
+            except Exception as e:
+                # Bookkeeping itself failed (e.g. DB unavailable); the row stays PENDING/RUNNING
+                # and is picked up again by recover_tasks on the next start.
+                logger.error("Task queue worker %s: error executing task %s: %s", worker_number, task_id, e, exc_info=True)
+            finally:
+                self.running -= 1
+                self._queue.task_done()
+
+    async def _execute(self, task_id: int, session_factory: async_sessionmaker) -> None:
+        async with session_factory() as db:
+            if not await _claim(db, task_id):
+                return  # Finished, running, or claimed first by another worker or process
+            task = await db.get(models.BackgroundTask, task_id)
+            logger.info("Task %s (%s, interview %s): attempt %s/%s", task.task_uuid, task.task_type, task.interview_id, task.attempts, task.max_attempts)
+
+            handler = _handlers.get(task.task_type)
+            try:
+                if handler is None:
+                    raise PermanentTaskError(f"No handler registered for task type '{task.task_type}'.")
+                with llm_priority(LLMPriority.BATCH):  # Interactive requests go first
+                    result = await self._with_heartbeat(handler(db, task), task_id, session_factory)
+            except Exception as e:
+                await db.rollback()
+                await db.refresh(task)
+                task.error = str(e) or type(e).__name__
+                if isinstance(e, PermanentTaskError) or task.attempts >= task.max_attempts:
+                    logger.error("Task %s failed permanently after %s attempt(s): %s", task.task_uuid, task.attempts, task.error)
+                    self._finish(task, models.TaskStatus.FAILED)
+                    self.failed += 1
+                    await db.commit()
+                    return
+                delay = settings.TASK_RETRY_BASE_DELAY_SECONDS * (2 ** (task.attempts - 1))
+                logger.warning("Task %s attempt %s failed (%s), retrying in %.1fs", task.task_uuid, task.attempts, task.error, delay)
+                task.status = models.TaskStatus.PENDING
+                task.lease_expires_at = None
+                await db.commit()
+                self.retried += 1
+                self._enqueue_later(task_id, session_factory, delay)
+                return
+
+            task.result = result
+            task.error = None
+            self._finish(task, models.TaskStatus.SUCCEEDED)
+            await db.commit()
+            self.succeeded += 1
+            logger.info("Task %s succeeded.", task.task_uuid)
+
+    async def _with_heartbeat(self, work: Awaitable[dict], task_id: int, session_factory: async_sessionmaker) -> dict:
+        heartbeat = asyncio.get_running_loop().create_task(self._heartbeat(task_id, session_factory))
+        try:
+            return await work
+        finally:
+            heartbeat.cancel()
+
+    @staticmethod
+    async def _heartbeat(task_id: int, session_factory: async_sessionmaker) -> None:
+        """Renews the lease of a running task (own session: the handler's is busy) until cancelled."""
+        while True:
+            await asyncio.sleep(settings.TASK_HEARTBEAT_SECONDS)
+            try:
+                async with session_factory() as db:
+                    await db.execute(
+                        update(models.BackgroundTask)
+                        .where(models.BackgroundTask.id == task_id, models.BackgroundTask.status == models.TaskStatus.RUNNING)
+                        .values(lease_expires_at=_lease_expiry())
+                        .execution_options(synchronize_session=False)
+                    )
+                    await db.commit()
+            except Exception as e:
+                logger.warning("Task %s: could not renew its lease: %s", task_id, e)
+
+    def start_reaper(self, session_factory: async_sessionmaker) -> None:
+        """Periodically re-schedules RUNNING tasks whose lease expired (e.g. a sibling process died)."""
+        if self._reaper is not None and not self._reaper.done():
+            return
+
+        async def _reap():
+            while True:
+                await asyncio.sleep(settings.TASK_LEASE_SECONDS)
+                try:
+                    for task_id in await _release_expired_leases(session_factory):
+                        self.enqueue(task_id, session_factory)
+                except Exception as e:
+                    logger.warning("Task queue: could not check for expired task leases: %s", e)
+
+        self._reaper = asyncio.get_running_loop().create_task(_reap())
+
+    @staticmethod
+    def _finish(task: models.BackgroundTask, final_status: models.TaskStatus) -> None:
+        task.status = final_status
+        task.finished_at = func.now()
+        task.lease_expires_at = None
+        task.idempotency_key = None  # Allow the same work to be requested again
+
+    def get_metrics(self) -> dict:
+        return {
+            "workers": len(self._workers),
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "running": self.running,
+            "waiting_retry": len(self._retry_timers),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "retried": self.retried,
+        }
+
+    async def shutdown(self) -> None:
+        tasks = self._workers | self._retry_timers | ({self._reaper} if self._reaper is not None else set())
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = set()
+        self._retry_timers = set()
+        self._reaper = None
+        self._queue = None
+
+
+task_runner = TaskRunner(concurrency=settings.TASK_QUEUE_WORKERS)
+
+
+async def submit_task(
+    db: AsyncSession,
+    session_factory: async_sessionmaker,
+    task_type: str,
+    interview_id: Optional[int]
+) -> Tuple[models.BackgroundTask, bool]:
+    """
+    Records a task and schedules it. Returns (task, created); created is False when an
+    active task for the same (task_type, interview_id) already exists and was returned instead.
+    """
+    key = idempotency_key(task_type, interview_id)
+    existing = await _get_active_task(db, key)
+    if existing is not None:
+        return existing, False
+
+    task = models.BackgroundTask(
+        task_uuid=str(uuid.uuid4()),
+        task_type=task_type,
+        interview_id=interview_id,
+        idempotency_key=key,
+        status=models.TaskStatus.PENDING,
+        attempts=0,
+        max_attempts=settings.TASK_MAX_ATTEMPTS
+    )
+    db.add(task)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Lost a race against an identical submission
+        await db.rollback()
+        existing = await _get_active_task(db, key)
+        if existing is None:
+            raise
+        return existing, False
+    await db.refresh(task)
+    task_runner.enqueue(task.id, session_factory)
+    logger.info("Submitted task %s (%s, interview %s)", task.task_uuid, task_type, interview_id)
+    return task, True
+
+
+async def _get_active_task(db: AsyncSession, key: str) -> Optional[models.BackgroundTask]:
+    result = await db.execute(select(models.BackgroundTask).where(models.BackgroundTask.idempotency_key == key))
+    return result.scalar_one_or_none()
+
+
+async def get_task(db: AsyncSession, task_uuid: str) -> Optional[models.BackgroundTask]:
+    result = await db.execute(select(models.BackgroundTask).where(models.BackgroundTask.task_uuid == task_uuid))
+    return result.scalar_one_or_none()
+
+
+async def _claim(db: AsyncSession, task_id: int) -> bool:
+    """PENDING -> RUNNING with a fresh lease, in one conditional UPDATE; False if it was not PENDING."""
+    result = await db.execute(
+        update(models.BackgroundTask)
+        .where(models.BackgroundTask.id == task_id, models.BackgroundTask.status == models.TaskStatus.PENDING)
+        .values(
+            status=models.TaskStatus.RUNNING,
+            attempts=models.BackgroundTask.attempts + 1,
+            started_at=func.now(),
+            lease_expires_at=_lease_expiry(),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+
+async def _release_expired_leases(session_factory: async_sessionmaker) -> List[int]:
+    """Moves the RUNNING tasks whose lease expired (or that have none) back to PENDING; returns their ids."""
+    expired = [
+        models.BackgroundTask.status == models.TaskStatus.RUNNING,
+        or_(models.BackgroundTask.lease_expires_at.is_(None), models.BackgroundTask.lease_expires_at < _utcnow()),
+    ]
+    async with session_factory() as db:
+        task_ids = list((await db.execute(select(models.BackgroundTask.id).where(*expired))).scalars().all())
+        if not task_ids:
+            return []
+        # Conditional again: a task whose lease was renewed in the meantime is not taken over
+        await db.execute(
+            update(models.BackgroundTask)
+            .where(models.BackgroundTask.id.in_(task_ids), *expired)
+            .values(status=models.TaskStatus.PENDING, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    logger.info("Released %s background task(s) whose lease expired.", len(task_ids))
+    return task_ids
+
+
+async def recover_tasks(session_factory: async_sessionmaker) -> int:
+    """
+    Re-schedules the unfinished tasks at startup: the PENDING ones and the RUNNING ones whose
+    lease expired. Tasks still running in another process are left alone (and picked up by the
+    periodic check if that process dies). Returns how many were scheduled.
+    """
+    await _release_expired_leases(session_factory)
+    async with session_factory() as db:
+        result = await db.execute(select(models.BackgroundTask.id).where(models.BackgroundTask.status == models.TaskStatus.PENDING))
+        task_ids = result.scalars().all()
+    for task_id in task_ids:
+        task_runner.enqueue(task_id, session_factory)
+    task_runner.start_reaper(session_factory)
+    if task_ids:
+        logger.info("Recovered %s unfinished background task(s).", len(task_ids))
+    return len(task_ids)
+
+
+def get_metrics() -> dict:
+    return task_runner.get_metrics()
+
+
+async def shutdown_task_queue() -> None:
+    """Stops the workers (application shutdown). Unfinished tasks stay in the table for recover_tasks."""
+    await task_runner.shutdown()
@@ -1,104 +1,429 @@
 import json
 import re
 import logging
-from typing import Optional
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+CAPABILITY_ASSESSMENT_KEY = "CANDIDATE_CAPABILITY_ASSESSMENT_JSON"
+
+
+@dataclass
+class JsonMatch:
+    """
+    A JSON object located in LLM output. start/end delimit the object itself; block_start/block_end
+    also cover a surrounding ```json fence when there is one (fenced is then True).
+    """
+    value: dict
+    start: int
+    end: int
+    block_start: int
+    block_end: int
+    fenced: bool
+
+
+class JsonObjectLocator:
+    """
+    Single-pass locator for JSON objects that contain a given key, in complete text or in a token
+    stream (feed() the chunks as they arrive; positions are offsets into the whole stream, and
+    block_end only covers a closing fence that had arrived when the object closed).
+
+    Open braces and brackets are kept on a stack and string contents (with escapes) are skipped,
+    so the object is found whether it is fenced, bare, surrounded by prose or nested, and stray
+    braces in the prose only leave an unclosed frame behind. A raw newline inside a string or a
+    backtick outside one cannot be JSON, so they drop the open frames and the scan restarts at the
+    next brace: a stray brace and quote in the prose cannot hide a later object. The text is kept
+    as a list of chunks, so a fed chunk costs its own length even while an object stays open; the
+    only other work is one json.loads per object that has the key.
+    """
+
+    _STRUCTURAL = re.compile(r'[{}\[\]":`]')
+    _STRING_SPECIAL = re.compile(r'["\\\n]')
+    _FENCE_OPEN = "```json"
+    _FENCE_CLOSE = "```"
+    _FENCE_LOOKBEHIND = 64  # Text kept before the open objects so a fence before them is still seen
+
+    def __init__(self, key: str):
+        self._key = key
+        self._chunks: List[str] = []  # Retained text, the chunks since stream position self._chunk_starts[0]
+        self._chunk_starts: List[int] = []
+        self._length = 0          # Stream length fed so far
+        self._pos = 0             # Scan position (stream position, like all the positions below)
+        self._stack = []          # Frames: [opening char, start, has key, last string is the key]
+        self._open = {"{": 0, "[": 0}
+        self._invalid_depth = 0   # Frames below this depth enclose invalid JSON and are not parsed
+        self._string_start = None # Set while inside a string
+        self.matches: List[JsonMatch] = []
+
+    def feed(self, chunk: str) -> List[JsonMatch]:
+        """Adds a chunk of text; returns the objects completed by it."""
+        if not chunk:
+            return []
+        found = list(self._feed(chunk))
+        self._trim()
+        return found
+
+    def _feed(self, chunk: str) -> Iterator[JsonMatch]:
+        self._chunks.append(chunk)
+        self._chunk_starts.append(self._length)
+        self._length += len(chunk)
+        # Usually just the chunk: the scan only stops early before an escape that is not complete
+        base = self._pos
+        yield from self._scan(self._slice(base, self._length), base)
+
+    def _slice(self, start: int, end: int) -> str:
+        """Retained text between two stream positions."""
+        if start >= end:
+            return ""
+        first = bisect_right(self._chunk_starts, start) - 1
+        last = bisect_left(self._chunk_starts, end)
+        text = "".join(self._chunks[first:last])
+        offset = self._chunk_starts[first]
+        return text[start - offset:end - offset]
+
+    def _scan(self, text: str, base: int) -> Iterator[JsonMatch]:
+        i = self._pos - base
+        while True:
+            if self._string_start is not None:
+                special = self._STRING_SPECIAL.search(text, i)
+                if special is None:
+                    self._pos = base + len(text)
+                    return
+                char = special.group()
+                if char == "\\":
+                    if special.end() >= len(text):
+                        self._pos = base + special.start()  # The escaped character has not arrived yet
+                        return
+                    i = special.end() + 1
+                    continue
+                if char == "\n":
+                    self._reset()
+                    i = special.end()
+                    continue
+                end = base + special.start()
+                self._stack[-1][3] = end - self._string_start == len(self._key) and self._slice(self._string_start, end) == self._key
+                self._string_start = None
+                i = special.end()
+            elif not self._stack:
+                brace = text.find("{", i)
+                if brace == -1:
+                    self._pos = base + len(text)
+                    return
+                self._push("{", base + brace)
+                i = brace + 1
+            else:
+                token = self._STRUCTURAL.search(text, i)
+                if token is None:
+                    self._pos = base + len(text)
+                    return
+                char = token.group()
+                i = token.end()
+                frame = self._stack[-1]
+                if char == '"':
+                    self._string_start = base + i
+                elif char == ":":
+                    if frame[0] == "{" and frame[3]:
+                        frame[2] = True
+                elif char == "`":
+                    self._reset()
+                    continue
+                elif char in "{[":
+                    self._push(char, base + i - 1)
+                else:
+                    match = self._close(char, base + i)
+                    if match is not None:
+                        self.matches.append(match)
+                        yield match
+                if self._stack and char != '"':
+                    self._stack[-1][3] = False
+
+    def _push(self, char: str, start: int) -> None:
+        self._stack.append([char, start, False, False])
+        self._open[char] += 1
+
+    def _pop(self) -> list:
+        frame = self._stack.pop()
+        self._open[frame[0]] -= 1
+        return frame
+
+    def _reset(self) -> None:
+        # Text that cannot be JSON (e.g. prose after a stray brace and quote): nothing open is an object
+        self._stack.clear()
+        self._open = {"{": 0, "[": 0}
+        self._invalid_depth = 0
+        self._string_start = None
+
+    def _close(self, char: str, end: int) -> Optional[JsonMatch]:
+        opening = "{" if char == "}" else "["
+        if not self._open[opening]:
+            return None  # Unbalanced closing character: ignore it
+        valid = True
+        # Malformed JSON: frames left open inside this one are dropped
+        while self._stack[-1][0] != opening:
+            self._pop()
+            valid = False
+        _, start, has_key, _ = self._pop()
+        if len(self._stack) < self._invalid_depth:
+            valid = False
+        if not valid:
+            # Whatever encloses invalid JSON is invalid too, so the enclosing frames are not parsed either
+            self._invalid_depth = len(self._stack)
+            return None
+        if not has_key:
+            return None
+        try:
+            value = json.loads(self._slice(start, end))
+        except (json.JSONDecodeError, RecursionError):
+            self._invalid_depth = len(self._stack)
+            return None
+        if not isinstance(value, dict) or self._key not in value:
+            return None
+        return self._match(value, start, end)
+
+    def _match(self, value: dict, start: int, end: int) -> JsonMatch:
+        block_start, block_end, fenced = start, end, False
+        lookbehind_start = max(self._chunk_starts[0], start - self._FENCE_LOOKBEHIND)
+        before = self._slice(lookbehind_start, start).rstrip()
+        if before[-len(self._FENCE_OPEN):].lower() == self._FENCE_OPEN:
+            fenced = True
+            block_start = lookbehind_start + len(before) - len(self._FENCE_OPEN)
+            after = self._slice(end, min(self._length, end + self._FENCE_LOOKBEHIND))
+            if after.lstrip().startswith(self._FENCE_CLOSE):
+                block_end = end + len(after) - len(after.lstrip()) + len(self._FENCE_CLOSE)
+        return JsonMatch(value, start, end, block_start, block_end, fenced)
+
+    def _trim(self) -> None:
+        # Only the open objects and a short lookbehind for their fence are still needed
+        keep_from = (self._stack[0][1] if self._stack else self._pos) - self._FENCE_LOOKBEHIND
+        drop = bisect_right(self._chunk_starts, keep_from) - 1
+        if drop > 0:
+            del self._chunks[:drop]
+            del self._chunk_starts[:drop]
+
+
+def find_json_object(text: str, key: str) -> Optional[JsonMatch]:
+    """The first JSON object in text (fenced or bare) that has the given key, or None."""
+    if not text:
+        return None
+    return next(JsonObjectLocator(key)._feed(text), None)
+
+
+def split_capability_assessment(report_text: str) -> Tuple[str, Optional[dict]]:
+    """
+    Splits a report into (text without the assessment block, inner assessment dict).
+    The text is returned unchanged with None when there is no usable assessment.
+    """
+    if not report_text:
+        return report_text, None
+    for match in JsonObjectLocator(CAPABILITY_ASSESSMENT_KEY)._feed(report_text):
+        assessment = match.value[CAPABILITY_ASSESSMENT_KEY]
+        if isinstance(assessment, dict):
+            remaining = report_text[:match.block_start] + report_text[match.block_end:]
+            return remaining.strip(), assessment
+        logger.warning("Found %s, but its value is a %s, not an object.", CAPABILITY_ASSESSMENT_KEY, type(assessment).__name__)
+    logger.info("%s block not found in report.", CAPABILITY_ASSESSMENT_KEY)
+    return report_text, None
+
+
 def extract_capability_assessment_json(report_text: str) -> Optional[dict]:
     """Extracts the CANDIDATE_CAPABILITY_ASSESSMENT_JSON block from the report text, 
-       even if wrapped in markdown json code blocks or with minor formatting issues."""
+       whether it is wrapped in a markdown json code block or written inline."""
     if not report_text:
         logger.warning("extract_capability_assessment_json called with empty report_text.")
         return None
-    
-    json_string_to_parse = None
-    try:
-        # 1. Try to find it within a markdown ```json ... ``` block
-        # This regex captures the content between the outermost curly braces of the target JSON structure.
-        # It looks for the specific key "CANDIDATE_CAPABILITY_ASSESSMENT_JSON"
-        # and ensures it's part of a larger JSON object within the markdown block.
-        # The captured group (group 1) should be the complete JSON string like: '{ "CANDIDATE_CAPABILITY_ASSESSMENT_JSON": { ... } }'
-        match = re.search(r'```json\s*({(?:[^{}]|{[^{}]*})*?"CANDIDATE_CAPABILITY_ASSESSMENT_JSON"(?:[^{}]|{[^{}]*})*?})\s*```', report_text, re.DOTALL | re.IGNORECASE)
-        
-        if match:
-            json_string_to_parse = match.group(1).strip()
-            logger.debug(f"Method 1 (Markdown Block): Successfully extracted JSON string: {json_string_to_parse[:200]}...")
-        else:
-            logger.debug("Method 1 (Markdown Block): No match found. Trying fallback methods.")
-            # Fallback 2: Try to find the JSON object directly if not in markdown
-            # This looks for '{ "CANDIDATE_CAPABILITY_ASSESSMENT_JSON": ... }' structure
-            # It tries to be robust to some leading/trailing non-JSON content around the specific block
-            # by looking for the start of the JSON structure containing the key.
-            
-            # Correctly find the start of the JSON object that contains our key
-            # The key itself might be nested, but the structure we expect from the prompt is
-            # { "CANDIDATE_CAPABILITY_ASSESSMENT_JSON": { <ratings> } }
-            # So we look for the start of this entire object.
-            
-            # Regex to find the start of '{"CANDIDATE_CAPABILITY_ASSESSMENT_JSON":' possibly with some whitespace
-            # then try to match the full object based on brace counting.
-            # This is a simplified version of brace matching; a full parser would be more robust here.
-            
-            outer_json_match = re.search(r'({\s*"CANDIDATE_CAPABILITY_ASSESSMENT_JSON"\s*:\s*{.*?}\s*})', report_text, re.DOTALL | re.IGNORECASE)
-            if outer_json_match:
-                json_string_to_parse = outer_json_match.group(1).strip()
-                logger.debug(f"Method 2 (Direct Regex on Object): Successfully extracted JSON string: {json_string_to_parse[:200]}...")
-            else:
-                logger.debug("Method 2 (Direct Regex on Object): No match. Trying simpler key-based search with brace counting.")
-                # Fallback 3: Simpler key-based search + brace counting (original fallback logic)
-                key_marker = '"CANDIDATE_CAPABILITY_ASSESSMENT_JSON":' # Case sensitive as it's a JSON key
-                key_start_index = report_text.find(key_marker)
-                if key_start_index != -1:
-                    # Search backwards for the opening brace of the object containing this key
-                    json_object_start_index = report_text.rfind('{', 0, key_start_index)
-                    if json_object_start_index != -1:
-                        open_braces = 0
-                        json_content_buffer = []
-                        found_object = False
-                        for char in report_text[json_object_start_index:]:
-                            json_content_buffer.append(char)
-                            if char == '{':
-                                open_braces += 1
-                            elif char == '}':
-                                open_braces -= 1
-                                if open_braces == 0:
-                                    json_string_to_parse = "".join(json_content_buffer)
-                                    logger.debug(f"Method 3 (Key + Brace Counting): Successfully extracted JSON string: {json_string_to_parse[:200]}...")
-                                    found_object = True
-                                    break
-                        if not found_object:
-                             logger.warning("Method 3 (Key + Brace Counting): Found key but failed to balance braces.")       
-                    else:
-                        logger.warning(f"Method 3 (Key + Brace Counting): Found key '{key_marker}' but no preceding '{{'.")
+    return split_capability_assessment(report_text)[1]
+
+
+class StreamingJsonStringArrayParser:
+    """
+    Incrementally extracts the string items of a JSON array from a token stream, e.g. the
+    "questions" list of {"questions": ["...", "..."]} while the LLM is still writing it.
+
+    feed() returns a list of events, in order:
+      ("chunk", index, text)  - newly decoded characters of item `index` (0-based)
+      ("item", index, text)   - item `index` is complete; `text` is the full decoded string
+    Anything before the key (e.g. a ```json fence) and after the closing bracket is ignored.
+    Non-string array elements are skipped.
+    """
+
+    _SIMPLE_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+    def __init__(self, array_key: str):
+        self._key_marker = f'"{array_key}"'
+        self._state = "seek_key"  # seek_key -> seek_array -> in_array <-> in_string -> done
+        self._pending = ""        # undecided tail while seeking the key
+        self._escape = None       # partial escape sequence inside a string, e.g. "\\u00"
+        self._current = []
+        self._raw = []            # undecoded item text, used for the exact final value
+        self.items = []
+
+    @property
+    def done(self) -> bool:
+        return self._state == "done"
+
+    def feed(self, chunk: str) -> list:
+        events = []
+        if not chunk or self._state == "done":
+            return events
+
+        if self._state == "seek_key":
+            text = self._pending + chunk
+            key_index = text.find(self._key_marker)
+            if key_index == -1:
+                # Keep just enough of the tail to match a key split across chunks
+                self._pending = text[-(len(self._key_marker) - 1):]
+                return events
+            self._pending = ""
+            self._state = "seek_array"
+            chunk = text[key_index + len(self._key_marker):]
+
+        delta = []
+        for char in chunk:
+            if self._state == "seek_array":
+                if char == "[":
+                    self._state = "in_array"
+            elif self._state == "in_array":
+                if char == '"':
+                    self._state = "in_string"
+                    self._current = []
+                    self._raw = []
+                elif char == "]":
+                    self._state = "done"
+                    break
+            elif self._state == "in_string":
+                if char != '"' or self._escape is not None:
+                    self._raw.append(char)
+                if self._escape is not None:
+                    self._escape += char
+                    decoded = self._decode_escape(self._escape)
+                    if decoded is not None:
+                        self._escape = None
+                        self._current.append(decoded)
+                        delta.append(decoded)
+                elif char == "\\":
+                    self._escape = ""
+                elif char == '"':
+                    if delta:
+                        events.append(("chunk", len(self.items), "".join(delta)))
+                        delta = []
+                    try:
+                        item_text = json.loads('"' + "".join(self._raw) + '"')
+                    except json.JSONDecodeError:
+                        item_text = "".join(self._current)
+                    events.append(("item", len(self.items), item_text))
+                    self.items.append(item_text)
+                    self._state = "in_array"
                 else:
-                    logger.info("All methods failed: CANDIDATE_CAPABILITY_ASSESSMENT_JSON key marker not found in report.")
-
-        if json_string_to_parse:
-            # Sanitize before parsing: e.g. remove trailing commas if any (though a good LLM shouldn't produce them in strict JSON)
-            # For now, assume json.loads can handle it or the prompt ensures good JSON.
-            parsed_data = json.loads(json_string_to_parse) 
-            
-            # The prompt requests the structure: { "CANDIDATE_CAPABILITY_ASSESSMENT_JSON": { ...ratings... } }
-            # So, we directly return the inner dictionary containing the ratings.
-            if isinstance(parsed_data, dict) and "CANDIDATE_CAPABILITY_ASSESSMENT_JSON" in parsed_data and isinstance(parsed_data["CANDIDATE_CAPABILITY_ASSESSMENT_JSON"], dict):
-                logger.info("Successfully parsed and extracted CANDIDATE_CAPABILITY_ASSESSMENT_JSON block.")
-                return parsed_data.get("CANDIDATE_CAPABILITY_ASSESSMENT_JSON")
-            else:
-                logger.warning(
-                    f"Parsed JSON, but it does not match the expected structure. "
-                    f"Expected a dict with key 'CANDIDATE_CAPABILITY_ASSESSMENT_JSON' whose value is also a dict. "
-                    f"Got: {type(parsed_data)}, Keys (if dict): {list(parsed_data.keys()) if isinstance(parsed_data, dict) else 'N/A'}"
-                )
-                return None 
-        else:
-            logger.info("CANDIDATE_CAPABILITY_ASSESSMENT_JSON content string not successfully extracted from report.")
+                    self._current.append(char)
+                    delta.append(char)
+
+        if delta:
+            events.append(("chunk", len(self.items), "".join(delta)))
+        return events
+
+    def _decode_escape(self, sequence: str) -> Optional[str]:
+        # Returns the decoded character once the escape sequence is complete, else None.
+        if sequence[0] != "u":
+            return self._SIMPLE_ESCAPES.get(sequence[0], sequence[0])
+        if len(sequence) < 5:
             return None
+        try:
+            return chr(int(sequence[1:5], 16))
+        except ValueError:
+            return sequence
 
-    except json.JSONDecodeError as e:
-        json_snippet = json_string_to_parse[:200] + "..." if json_string_to_parse else "N/A"
-        logger.error(f"JSONDecodeError: Failed to parse JSON from report - {e}. Extracted string snippet: '{json_snippet}'", exc_info=True)
-        return None
-    except Exception as e:
-        logger.error(f"Unexpected error during JSON extraction: {e}", exc_info=True)
-        return None 
\ No newline at end of file
+
+class StreamingReportSplitter:
+    """
+    Splits a streamed interview report into its markdown narrative and the
+    CANDIDATE_CAPABILITY_ASSESSMENT_JSON object while tokens arrive. The object is found by a
+    JsonObjectLocator, so the stream accepts what split_capability_assessment accepts on the
+    complete text: a fenced or a bare object, and the same text is left as markdown.
+
+    feed() / finish() return a list of events, in order:
+      ("markdown", text)  - report text that is safe to display
+      ("radar", dict)     - the parsed capability assessment (inner dict), once its object closes
+    Text that could still become part of the assessment block (an open object and a ```json
+    fence before it) is held back until it is decided; finish() flushes whatever is left.
+    """
+
+    _FENCE_OPEN = JsonObjectLocator._FENCE_OPEN
+    _FENCE_CLOSE = JsonObjectLocator._FENCE_CLOSE
+
+    def __init__(self):
+        self._locator = JsonObjectLocator(CAPABILITY_ASSESSMENT_KEY)
+        self._pending = ""        # Text not emitted yet, starting at stream position self._emitted
+        self._emitted = 0
+        self._fence_close_due = False  # The assessment was fenced and its closing fence has not arrived
+        self._markdown = []
+        self.radar_data = None
+
+    @property
+    def markdown(self) -> str:
+        """All markdown emitted so far (the report without the assessment block)."""
+        return "".join(self._markdown)
+
+    def feed(self, chunk: str) -> list:
+        events = []
+        if not chunk:
+            return events
+        self._pending += chunk
+        for match in self._locator.feed(chunk):
+            assessment = match.value[CAPABILITY_ASSESSMENT_KEY]
+            if self.radar_data is not None or not isinstance(assessment, dict):
+                continue  # Left in the markdown, as split_capability_assessment does
+            self._emit_markdown(self._take(match.block_start), events)
+            self._take(match.block_end)
+            self._fence_close_due = match.fenced and match.block_end == match.end
+            self.radar_data = assessment
+            events.append(("radar", assessment))
+        if self._fence_close_due and not self._drop_fence_close():
+            return events
+        self._emit_markdown(self._take(self._hold_from()), events)
+        return events
+
+    def finish(self) -> list:
+        """Flushes held-back text."""
+        events = []
+        self._emit_markdown(self._take(self._emitted + len(self._pending)), events)
+        return events
+
+    def _take(self, end: int) -> str:
+        # Removes the pending text before stream position `end` and returns it
+        cut = max(0, end - self._emitted)
+        text, self._pending = self._pending[:cut], self._pending[cut:]
+        self._emitted += len(text)
+        return text
+
+    def _drop_fence_close(self) -> bool:
+        """Drops the closing fence of the assessment block; False while it may still be arriving."""
+        stripped = self._pending.lstrip()
+        if stripped.startswith(self._FENCE_CLOSE):
+            self._take(self._emitted + len(self._pending) - len(stripped) + len(self._FENCE_CLOSE))
+        elif self._FENCE_CLOSE.startswith(stripped):
+            return False
+        self._fence_close_due = False
+        return True
+
+    def _hold_from(self) -> int:
+        """Stream position from which the pending text may still belong to the assessment block."""
+        stack = self._locator._stack
+        # An object enclosing the assessment may still be open after the assessment was taken out
+        end = max(stack[0][1], self._emitted) if stack else self._emitted + len(self._pending)
+        text = self._pending[:end - self._emitted]
+        stripped = text.rstrip()
+        if stripped[-len(self._FENCE_OPEN):].lower() == self._FENCE_OPEN:
+            return self._emitted + len(stripped) - len(self._FENCE_OPEN)
+        if not stack and text == stripped:
+            # The beginning of a fence split across chunks
+            for length in range(min(len(text), len(self._FENCE_OPEN) - 1), 0, -1):
+                if self._FENCE_OPEN.startswith(text[-length:].lower()):
+                    return end - length
+        return end
+
+    def _emit_markdown(self, text: str, events: list) -> None:
+        if text:
+            self._markdown.append(text)
+            events.append(("markdown", text))
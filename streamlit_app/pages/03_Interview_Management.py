@@ -1,5 +1,5 @@
 import streamlit as st
-from streamlit_app.utils.api_client import APIError, get_jobs, get_candidates, create_interview, get_interviews, generate_interview_questions_for_interview, get_questions_for_interview, update_interview_api, delete_interview_api
+from streamlit_app.utils.api_client import APIError, get_jobs, get_candidates, create_interview, get_interview_summaries, generate_interview_questions_for_interview, get_questions_for_interview, update_interview_api, delete_interview_api
 from streamlit_app.utils.logger_config import get_logger
 from streamlit_app.utils.ui_helpers import get_status_display_name_zh, InterviewStatusKey, INTERVIEW_STATUS_MAP_ZH
 from datetime import datetime, date, time # Added date and time for input combination
@@ -243,24 +243,8 @@ def show_interview_management_page():
     st.subheader("📋 现有面试列表")
     
     try:
-        interviews = get_interviews()
-        # We already have jobs_data and candidates_data from the "Arrange New Interview" section loading
-        # If that section failed, we would have returned.
-        # However, to be safe, or if the sections are more independent later, fetch them again or pass them.
-        # For now, assuming jobs_data and candidates_data are available if this point is reached.
-        
-        if not jobs_data: # Re-check in case logic changes, or fetch again if needed
-             logger.warning("jobs_data is not available for listing interviews.")
-             st.warning("无法加载职位数据，面试列表可能不完整。")
-             jobs_data = [] # Avoid error later
-        if not candidates_data: # Re-check
-             logger.warning("candidates_data is not available for listing interviews.")
-             st.warning("无法加载候选人数据，面试列表可能不完整。")
-             candidates_data = [] # Avoid error later
-
-
-        job_map = {job['id']: job['title'] for job in jobs_data}
-        candidate_map = {cand['id']: cand['name'] for cand in candidates_data}
+        # Each row already carries the job title and candidate name (GET /interviews/summary)
+        interviews = get_interview_summaries()
 
         if not interviews:
             st.info("目前没有已安排的面试。")
@@ -279,8 +263,8 @@ def show_interview_management_page():
                 cols_data = st.columns([1, 2, 2, 2.5, 4, 3.5]) 
                 interview_id = interview.get('id')
                 
-                job_title = job_map.get(interview.get('job_id'), f"未知职位 (ID: {interview.get('job_id')})")
-                candidate_name = candidate_map.get(interview.get('candidate_id'), f"未知候选人 (ID: {interview.get('candidate_id')})")
+                job_title = interview.get('job_title') or f"未知职位 (ID: {interview.get('job_id')})"
+                candidate_name = interview.get('candidate_name') or f"未知候选人 (ID: {interview.get('candidate_id')})"
                 
                 scheduled_at_str = interview.get('scheduled_at')
                 display_scheduled_time = "未安排"
@@ -392,12 +376,14 @@ def show_interview_management_page():
                     # This message will appear below the current interview row
                     status_placeholder = st.empty()
                     # Use candidate_name in the message
-                    display_name_for_message = candidate_map.get(interview.get('candidate_id'), f"ID {interview_id}")
+                    display_name_for_message = interview.get('candidate_name') or f"ID {interview_id}"
                     status_placeholder.info(f"正在为候选人 \"{display_name_for_message}\" (面试ID: {interview_id}) 生成AI面试问题，请稍候...", icon="⏳")
 
                     try:
                         logger.info(f"Now actually generating questions for interview ID: {interview_id} (Candidate: {display_name_for_message})")
-                        response = generate_interview_questions_for_interview(interview_id)
+                        # Questions that already exist were served from the LLM cache otherwise: ask for a fresh set
+                        regenerate = (interview.get('question_count') or 0) > 0
+                        response = generate_interview_questions_for_interview(interview_id, regenerate=regenerate)
                         num_questions = len(response.get('questions', []))
                         status_placeholder.success(f"成功为候选人 \"{display_name_for_message}\" (面试ID: {interview_id}) 生成了 {num_questions} 个问题。状态已更新！", icon="🎉")
                         logger.info(f"Successfully generated {num_questions} questions for interview {interview_id} (Candidate: {display_name_for_message}). API Response: {response}")
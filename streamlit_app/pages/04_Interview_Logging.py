@@ -92,11 +92,10 @@ def add_message_and_save(interview_id: int, role: str, content: str, speaker_rol
 
     st.session_state.messages.append(new_message_for_display)
 
-    # Prepare payload for API
+    # Prepare payload for API (order_num is assigned by the backend)
     log_payload = {
         "full_dialogue_text": content,
         "question_id": question_id, 
-        "order_num": order_num,
         "speaker_role": speaker_role_value # ADDED speaker_role for backend
     }
     if question_text_snapshot_override:
@@ -111,6 +110,7 @@ def add_message_and_save(interview_id: int, role: str, content: str, speaker_rol
         for msg in reversed(st.session_state.messages):
             if msg.get('interview_id') == interview_id and msg.get('order_num') == order_num and msg.get('log_id') is None:
                 msg['log_id'] = created_log_entry.get('id')
+                msg['order_num'] = created_log_entry.get('order_num', order_num) # The position the backend assigned
                 logger.debug(f"Updated newly added message in session_state with log_id: {created_log_entry.get('id')}")
                 break
     except APIError as e:
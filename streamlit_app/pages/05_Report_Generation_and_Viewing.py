@@ -6,7 +6,8 @@ from streamlit_app.utils.api_client import (
     get_candidates, # For candidate_map
     get_interview_details, # Now using this
     get_interview_logs, # <<< ADDED THIS IMPORT
-    generate_report_for_interview_api # Now using this
+    generate_report_for_interview_api, # Blocking variant, kept for other callers
+    stream_report_for_interview_api # Report page streams the report as it is written
 )
 from streamlit_app.utils.logger_config import get_logger
 from datetime import datetime
@@ -364,31 +365,43 @@ def show_report_generation_page():
                 else:
                     logger.info(f"User initiated GENERATION of report for interview ID: {selected_interview_id}")
                 
-                # Use display_candidate_name and selected_interview_id in the spinner message
-                spinner_message = "正在为候选人 " + str(display_candidate_name) + " (面试ID: " + str(selected_interview_id) + ") 生成AI评估报告，请稍候..."
-                with st.spinner(spinner_message):
-                    try:
-                        logger.info(f"Calling generate_report_for_interview_api for interview ID: {selected_interview_id}")
-                        api_response = generate_report_for_interview_api(selected_interview_id)
-                        updated_report = api_response.get("generated_text")
-                        st.session_state[f"report_text_{selected_interview_id}"] = updated_report
-                        # Update status in session state from API response if it's part of it
-                        # For now, assume generate_report_for_interview_api returns the full interview object
-                        if api_response.get("status"):
-                            st.session_state[f"interview_status_{selected_interview_id}"] = api_response.get("status")
-
-                        st.session_state[f"report_error_{selected_interview_id}"] = None
-                        logger.info(f"Successfully generated/re-generated report for interview {selected_interview_id}")
-                        st.success("AI评估报告已成功处理！")
-                        st.rerun() 
-                    except APIError as e:
-                        logger.error(f"APIError generating/re-generating report for interview {selected_interview_id}: {e.details or e.message}", exc_info=True)
-                        st.session_state[f"report_error_{selected_interview_id}"] = f"处理报告失败：{e.details or e.message}"
-                        st.error(st.session_state[f"report_error_{selected_interview_id}"])
-                    except Exception as e:
-                        logger.error(f"Unexpected error generating/re-generating report for interview {selected_interview_id}: {e}", exc_info=True)
-                        st.session_state[f"report_error_{selected_interview_id}"] = f"处理报告时发生意外错误：{str(e)}"
-                        st.error(st.session_state[f"report_error_{selected_interview_id}"])
+                # Stream the report: markdown is rendered as it arrives, the radar chart when its data arrives
+                st.caption("正在为候选人 " + str(display_candidate_name) + " (面试ID: " + str(selected_interview_id) + ") 生成AI评估报告...")
+                report_placeholder = st.empty()
+                radar_placeholder = st.empty()
+                streamed_report_parts = []
+                stream_error = None
+                try:
+                    logger.info(f"Calling stream_report_for_interview_api for interview ID: {selected_interview_id}")
+                    # Regenerating must bypass the LLM cache, which would return the current report again
+                    regenerate = bool(current_report and current_status_str == "REPORT_GENERATED")
+                    for event_name, event_data in stream_report_for_interview_api(selected_interview_id, regenerate=regenerate):
+                        if event_name == "report_chunk":
+                            streamed_report_parts.append(event_data.get("chunk_text", ""))
+                            report_placeholder.markdown("".join(streamed_report_parts) + " ▌")
+                        elif event_name == "radar_data":
+                            radar_fig = create_radar_chart_simple(event_data.get("radar_data") or {})
+                            if radar_fig:
+                                radar_placeholder.plotly_chart(radar_fig, use_container_width=True)
+                        elif event_name == "error":
+                            stream_error = event_data.get("error_message") or "未知错误"
+                except APIError as e:
+                    logger.error(f"APIError generating/re-generating report for interview {selected_interview_id}: {e.details or e.message}", exc_info=True)
+                    stream_error = e.details or e.message
+                except Exception as e:
+                    logger.error(f"Unexpected error generating/re-generating report for interview {selected_interview_id}: {e}", exc_info=True)
+                    stream_error = f"意外错误：{str(e)}"
+
+                if stream_error:
+                    st.session_state[f"report_error_{selected_interview_id}"] = f"处理报告失败：{stream_error}"
+                    st.error(st.session_state[f"report_error_{selected_interview_id}"])
+                else:
+                    st.session_state[f"report_text_{selected_interview_id}"] = "".join(streamed_report_parts).strip()
+                    st.session_state[f"interview_status_{selected_interview_id}"] = "REPORT_GENERATED"
+                    st.session_state[f"report_error_{selected_interview_id}"] = None
+                    logger.info(f"Successfully generated/re-generated report for interview {selected_interview_id}")
+                    st.success("AI评估报告已成功处理！")
+                    st.rerun()
             
         elif st.session_state.get(f"report_error_{selected_interview_id}"): # Check if there's a stored error for this interview
              st.error(st.session_state[f"report_error_{selected_interview_id}"]) 
@@ -1,6 +1,7 @@
 # streamlit_app/utils/api_client.py
 import streamlit as st # Required for st.error
 import requests
+import json
 from streamlit_app.core_ui_config import BACKEND_API_URL
 from streamlit_app.utils.logger_config import get_logger
 from io import BytesIO
@@ -366,12 +367,70 @@ def get_interviews(skip: int = 0, limit: int = 100) -> list:
         logger.error(f"JSON decoding error occurred while fetching interviews: {ve}", exc_info=True)
         raise APIError(message="获取面试列表失败: 服务器返回无效的数据格式")
 
-def generate_interview_questions_for_interview(interview_id: int) -> dict:
+# ETag and rows of the last response per summary page request, for If-None-Match revalidation
+_interview_summary_cache: Dict[tuple, tuple] = {}
+
+def get_interview_summaries(page_size: int = 200, max_pages: int = 50) -> list:
+    """
+    All interviews with job title, candidate name, question/log counts and report presence
+    (GET /interviews/summary), following X-Next-Cursor. Unchanged pages are revalidated with
+    their ETag (304 Not Modified, no body and no cursor: both are kept with the ETag) instead of
+    being downloaded again.
+    """
+    endpoint_path = "v1/interviews/summary"
+    full_url = urljoin(BACKEND_API_URL, endpoint_path)
+    summaries = []
+    cursor = None
+    try:
+        for _ in range(max_pages):
+            params = {"limit": page_size}
+            if cursor:
+                params["cursor"] = cursor
+            cache_key = (page_size, cursor)
+            cached = _interview_summary_cache.get(cache_key)
+            headers = {"If-None-Match": cached[0]} if cached else {}
+            response = requests.get(full_url, params=params, headers=headers, timeout=10)
+            if response.status_code == 304 and cached:
+                _, rows, next_cursor = cached
+            else:
+                response.raise_for_status()
+                rows = response.json()
+                next_cursor = response.headers.get("X-Next-Cursor")
+                if response.headers.get("ETag"):
+                    _interview_summary_cache[cache_key] = (response.headers["ETag"], rows, next_cursor)
+            summaries.extend(rows)
+            cursor = next_cursor
+            if not cursor:
+                break
+        logger.info(f"Fetched {len(summaries)} interview summaries.")
+        return summaries
+    except requests.exceptions.HTTPError as http_err:
+        logger.error(f"HTTP error on get_interview_summaries: {http_err.response.status_code} - {http_err.response.text}", exc_info=True)
+        error_detail = http_err.response.text
+        try:
+            error_detail = http_err.response.json().get("detail", http_err.response.text)
+        except ValueError:
+            pass # Keep original text if not JSON
+        raise APIError(
+            message=f"获取面试列表失败: 服务器返回错误",
+            status_code=http_err.response.status_code,
+            details=error_detail
+        )
+    except requests.exceptions.RequestException as e:
+        logger.error(f"API request failed for get_interview_summaries: {e}", exc_info=True)
+        raise APIError(message=f"获取面试列表失败: {e}")
+    except ValueError as ve: # Includes JSONDecodeError
+        logger.error(f"JSON decoding error occurred while fetching interview summaries: {ve}", exc_info=True)
+        raise APIError(message="获取面试列表失败: 服务器返回无效的数据格式")
+
+def generate_interview_questions_for_interview(interview_id: int, regenerate: bool = False) -> dict:
+    """regenerate=True asks the backend for a fresh set instead of the cached one."""
     endpoint_path = f"v1/interviews/{interview_id}/generate-questions"
     full_url = urljoin(BACKEND_API_URL, endpoint_path)
-    logger.info(f"Attempting to generate interview questions for interview ID {interview_id} at {full_url}")
+    logger.info(f"Attempting to generate interview questions for interview ID {interview_id} at {full_url} (regenerate={regenerate})")
     try:
-        response = requests.post(full_url, timeout=60) # Increased timeout for potentially long AI generation
+        params = {"regenerate": "true"} if regenerate else None
+        response = requests.post(full_url, params=params, timeout=60) # Increased timeout for potentially long AI generation
         response.raise_for_status()
         result_data = response.json()
         logger.info(f"Successfully triggered question generation for interview ID {interview_id}. Response: {result_data}")
@@ -520,12 +579,14 @@ def get_interview_details(interview_id: int) -> dict:
         logger.error(f"JSON decoding error occurred while fetching details for interview ID {interview_id}: {ve}", exc_info=True)
         raise APIError(message="获取面试详情失败: 服务器返回无效的数据格式")
 
-def generate_report_for_interview_api(interview_id: int) -> dict:
+def generate_report_for_interview_api(interview_id: int, regenerate: bool = False) -> dict:
+    """regenerate=True bypasses the backend's LLM cache (a cached report is returned otherwise)."""
     endpoint_path = f"v1/interviews/{interview_id}/generate-report"
     full_url = urljoin(BACKEND_API_URL, endpoint_path)
-    logger.info(f"Attempting to trigger report generation for interview ID: {interview_id} at {full_url}")
+    logger.info(f"Attempting to trigger report generation for interview ID: {interview_id} at {full_url} (regenerate={regenerate})")
     try:
-        response = requests.post(full_url, timeout=180) # Increased timeout for potentially long AI generation
+        params = {"regenerate": "true"} if regenerate else None
+        response = requests.post(full_url, params=params, timeout=180) # Increased timeout for potentially long AI generation
         response.raise_for_status()
         report_data = response.json()
         logger.info(f"Successfully triggered report generation for interview ID: {interview_id}. Report data: {report_data}")
@@ -546,6 +607,48 @@ def generate_report_for_interview_api(interview_id: int) -> dict:
         logger.error(f"An unexpected error occurred while triggering report generation for interview ID {interview_id}: {e}", exc_info=True)
         raise APIError(message=f"调用生成AI评估报告接口时发生意外错误: {e}")
 
+def stream_report_for_interview_api(interview_id: int, regenerate: bool = False):
+    """
+    Streams report generation from the SSE endpoint; regenerate=True bypasses the backend's LLM cache.
+    Yields (event_name, data_dict) tuples, e.g. ("report_chunk", {"chunk_text": ...}),
+    ("radar_data", {"radar_data": {...}}), ("task_end", {"report_id": ...}) or ("error", {...}).
+    """
+    endpoint_path = f"v1/interviews/{interview_id}/generate-report-stream"
+    full_url = urljoin(BACKEND_API_URL, endpoint_path)
+    logger.info(f"Attempting to stream report generation for interview ID: {interview_id} at {full_url}")
+    try:
+        # (connect timeout, read timeout): the read timeout only applies between events, not to the whole report
+        params = {"regenerate": "true"} if regenerate else None
+        with requests.post(full_url, params=params, stream=True, timeout=(10, 60)) as response:
+            response.raise_for_status()
+            event_name, data_lines = None, []
+            for line in response.iter_lines(decode_unicode=True):
+                if line is None:
+                    continue
+                line = line.rstrip("\r")
+                if not line: # Empty line terminates an event
+                    if event_name and data_lines:
+                        try:
+                            yield event_name, json.loads("\n".join(data_lines))
+                        except ValueError:
+                            logger.warning(f"Skipping undecodable SSE data for report stream of interview {interview_id}: {data_lines}")
+                    event_name, data_lines = None, []
+                elif line.startswith("event:"):
+                    event_name = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data_lines.append(line[len("data:"):].strip())
+    except requests.exceptions.HTTPError as http_err:
+        error_detail = http_err.response.text
+        logger.error(f"HTTP error occurred while streaming report for interview ID {interview_id}: {http_err} - Detail: {error_detail}")
+        raise APIError(
+            message=f"生成AI评估报告失败: {error_detail}",
+            status_code=http_err.response.status_code,
+            details=error_detail
+        )
+    except requests.exceptions.RequestException as e:
+        logger.error(f"An unexpected error occurred while streaming report for interview ID {interview_id}: {e}", exc_info=True)
+        raise APIError(message=f"调用生成AI评估报告流式接口时发生意外错误: {e}")
+
 # --- Interview Log API Functions ---
 def get_interview_logs_api(interview_id: int) -> list:
     endpoint_path = f"v1/interviews/{interview_id}/logs"
@@ -1,5 +1,14 @@
 from fastapi.testclient import TestClient
 from fastapi import status
+from unittest.mock import patch, AsyncMock
+import io
+import time
+import zipfile
+
+import docx
+import fitz
+
+from app.services import resume_extraction
 
 # client fixture is automatically available from tests/conftest.py
 
@@ -164,6 +173,20 @@ def test_update_candidate_partial(client: TestClient):
     assert updated_data["resume_text"] == initial_data["resume_text"] # Resume text should be unchanged
     assert updated_data["email"] == initial_data["email"] # Email should be unchanged
 
+def test_update_candidate_resume_invalidates_structured_resume(client: TestClient):
+    """Changing resume_text clears the cached structured resume; a name-only update keeps it."""
+    cached_entry = {"summary": "Cached summary", "content_hash": "abc", "version": "v"}
+    initial_data = {"name": "Cache Cand", "email": "resume.cache@example.com", "resume_text": "Resume v1", "structured_resume_info": cached_entry}
+    candidate_id = client.post("/api/v1/candidates/", json=initial_data).json()["id"]
+    client.put(f"/api/v1/candidates/{candidate_id}", json={"structured_resume_info": cached_entry})
+
+    response_name = client.put(f"/api/v1/candidates/{candidate_id}", json={"name": "Cache Cand Renamed"})
+    assert response_name.json()["structured_resume_info"] == cached_entry
+
+    response_resume = client.put(f"/api/v1/candidates/{candidate_id}", json={"resume_text": "Resume v2"})
+    assert response_resume.status_code == status.HTTP_200_OK
+    assert response_resume.json()["structured_resume_info"] is None
+
 def test_update_candidate_not_found(client: TestClient):
     """Test updating a candidate that does not exist."""
     non_existent_id = 777666
@@ -196,4 +219,155 @@ def test_delete_candidate_not_found(client: TestClient):
     assert response.json() == {"detail": "Candidate not found"}
 
 # All CRUD for Candidate now have basic tests.
-# Further tests could include more complex scenarios or edge cases if needed. 
\ No newline at end of file
+# Further tests could include more complex scenarios or edge cases if needed.
+
+# --- Resume upload (text extraction runs in the resume extraction process pool) ---
+
+def make_docx_bytes(*paragraphs: str) -> bytes:
+    document = docx.Document()
+    for paragraph in paragraphs:
+        document.add_paragraph(paragraph)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def make_pdf_bytes(page_count: int) -> bytes:
+    document = fitz.open()
+    for page_num in range(page_count):
+        document.new_page().insert_text((72, 72), f"Resume page {page_num + 1}")
+    content = document.tobytes()
+    document.close()
+    return content
+
+def test_upload_resume_docx_extracts_text_in_pool(client: TestClient):
+    """DOCX text is extracted by the worker pool, handed to the AI parser, and counted in /metrics."""
+    docx_bytes = make_docx_bytes("Jane Doe", "Senior Python Engineer")
+    completed_before = client.get("/api/v1/metrics/").json()["resume_extraction"]["completed"]
+
+    with patch("app.api.v1.endpoints.candidates.parse_resume", AsyncMock(return_value="Structured: Jane Doe")) as mock_parse:
+        response = client.post(
+            "/api/v1/candidates/upload-resume/",
+            data={"name": "Jane Doe", "email": "jane.upload@example.com"},
+            files={"resume_file": ("resume.docx", docx_bytes, "application/vnd.openxmlformats-officedocument.wordprocessingml.document")}
+        )
+
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    assert response.json()["resume_text"] == "Jane Doe\nSenior Python Engineer" # Raw text is kept
+    assert response.json()["resume_summary"] == "Structured: Jane Doe"
+    assert mock_parse.call_args.kwargs["resume_text"] == "Jane Doe\nSenior Python Engineer"
+
+    metrics = client.get("/api/v1/metrics/").json()["resume_extraction"]
+    assert metrics["completed"] == completed_before + 1
+    assert metrics["in_flight"] == 0
+    assert metrics["parse_seconds"]["count"] >= 1
+
+def test_upload_resume_pdf_over_page_limit(client: TestClient):
+    """A PDF with more pages than RESUME_MAX_PDF_PAGES is rejected with 413 (checked inside the worker)."""
+    with patch.object(resume_extraction.resume_extractor, "max_pdf_pages", 2), \
+         patch("app.api.v1.endpoints.candidates.parse_resume", AsyncMock()) as mock_parse:
+        response = client.post(
+            "/api/v1/candidates/upload-resume/",
+            data={"name": "Long Pdf", "email": "long.pdf@example.com"},
+            files={"resume_file": ("resume.pdf", make_pdf_bytes(3), "application/pdf")}
+        )
+
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    assert "3 pages" in response.json()["detail"]
+    mock_parse.assert_not_called()
+
+def test_upload_resume_file_too_large(client: TestClient):
+    """Files above RESUME_MAX_FILE_BYTES are rejected before any parsing."""
+    with patch.object(resume_extraction.resume_extractor, "max_file_bytes", 16), \
+         patch("app.api.v1.endpoints.candidates.parse_resume", AsyncMock()) as mock_parse:
+        response = client.post(
+            "/api/v1/candidates/upload-resume/",
+            data={"name": "Big File", "email": "big.file@example.com"},
+            files={"resume_file": ("resume.txt", b"x" * 64, "text/plain")}
+        )
+
+    assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    mock_parse.assert_not_called()
+
+def test_upload_resume_unsupported_type(client: TestClient):
+    response = client.post(
+        "/api/v1/candidates/upload-resume/",
+        data={"name": "Old Format", "email": "old.format@example.com"},
+        files={"resume_file": ("resume.doc", b"binary", "application/msword")}
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+# --- Bulk resume ingestion ---
+
+def make_zip_bytes(files: dict) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+def wait_for_bulk_job(client: TestClient, job_id: str, timeout: float = 30.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job_status = client.get(f"/api/v1/candidates/bulk-upload/{job_id}").json()
+        if job_status["status"] != "running":
+            return job_status
+        time.sleep(0.1)
+    raise AssertionError(f"Bulk ingestion job {job_id} did not finish within {timeout}s")
+
+def test_bulk_upload_zip_dedupes_and_creates_candidates(client: TestClient):
+    """Archive entries are extracted, deduplicated (in-batch and against the DB), parsed and inserted."""
+    existing = client.post("/api/v1/candidates/", json={"name": "Existing", "email": "existing@example.com", "resume_text": "Already here"})
+    assert existing.status_code == status.HTTP_201_CREATED
+
+    archive = make_zip_bytes({
+        "alice.txt": "Alice Smith\nalice@example.com\nPython developer",
+        "bob.docx": make_docx_bytes("Bob Jones", "Contact: bob@example.com", "Data engineer"),
+        "alice_again.txt": "Alice S.\nALICE@example.com\nUpdated resume",
+        "existing.txt": "Existing Person\nexisting@example.com",
+        "notes.md": "not a resume",
+        "no_email.txt": "Carol\nNo contact details here",
+        "__MACOSX/._alice.txt": "resource fork",
+    })
+
+    async def fake_parse_resume(resume_text: str) -> str:
+        return f"Structured: {resume_text.splitlines()[0]}"
+
+    with patch("app.services.bulk_ingestion.parse_resume", AsyncMock(side_effect=fake_parse_resume)) as mock_parse:
+        response = client.post(
+            "/api/v1/candidates/bulk-upload/",
+            files=[("files", ("resumes.zip", archive, "application/zip"))]
+        )
+        assert response.status_code == status.HTTP_202_ACCEPTED, response.text
+        job_id = response.json()["job_id"]
+        assert response.headers["location"].endswith(f"/bulk-upload/{job_id}")
+        job_status = wait_for_bulk_job(client, job_id)
+
+    assert job_status["status"] == "completed", job_status
+    assert job_status["total"] == 6 # __MACOSX entries are ignored
+    assert job_status["counts"]["created"] == 2
+    assert job_status["counts"]["duplicate"] == 2
+    assert job_status["counts"]["skipped"] == 2
+    assert mock_parse.await_count == 2 # Duplicates never reach the LLM
+
+    created = {item["email"]: item for item in job_status["items"] if item["status"] == "created"}
+    assert set(created) == {"alice@example.com", "bob@example.com"}
+    bob = client.get(f"/api/v1/candidates/{created['bob@example.com']['candidate_id']}").json()
+    assert bob["name"] == "Bob Jones"
+    assert bob["resume_text"].startswith("Bob Jones")
+    assert bob["resume_summary"] == "Structured: Bob Jones"
+
+    # The SSE stream of a finished job sends the final summary right away
+    with client.stream("GET", f"/api/v1/candidates/bulk-upload/{job_id}/events") as sse_response:
+        body = "".join(sse_response.iter_text())
+    assert "event: complete" in body
+
+def test_bulk_upload_invalid_archive(client: TestClient):
+    response = client.post(
+        "/api/v1/candidates/bulk-upload/",
+        files=[("files", ("resumes.zip", b"not a zip", "application/zip"))]
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+def test_bulk_upload_job_not_found(client: TestClient):
+    response = client.get("/api/v1/candidates/bulk-upload/unknown-job")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
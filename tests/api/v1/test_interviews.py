@@ -1,17 +1,29 @@
 from fastapi.testclient import TestClient
 from fastapi import status
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import pytest
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
 from sqlalchemy.orm import Session
 
 import httpx # Added for SSE client
 import json # Added for parsing SSE data
+import asyncio
+import time
 
 from app.db.models import InterviewStatus # Added for status comparison
 
 # client fixture is automatically available from tests/conftest.py
 
+# Helper to mock stream_interview_questions: returns a MagicMock whose calls produce an
+# async generator yielding the given token chunks (and optionally raising afterwards)
+def mock_question_token_stream(*chunks: str, error: Exception = None) -> MagicMock:
+    async def _token_stream(*args, **kwargs):
+        for chunk in chunks:
+            yield chunk
+        if error is not None:
+            raise error
+    return MagicMock(side_effect=_token_stream)
+
 # Helper function to create a job and return its ID
 def create_test_job(client: TestClient, title: str = "Test Job for Interview", desc: str = "Job for interview test") -> int:
     response = client.post("/api/v1/jobs/", json={"title": title, "description": desc})
@@ -185,6 +197,127 @@ def test_read_interviews_with_data_and_pagination(client: TestClient):
     assert response_no_results.status_code == status.HTTP_200_OK
     assert response_no_results.json() == []
 
+    # Test filtering by status, and the cursor of a filtered listing
+    response_status_filter = client.get("/api/v1/interviews/?status=PENDING_QUESTIONS&limit=2")
+    assert response_status_filter.status_code == status.HTTP_200_OK
+    assert len(response_status_filter.json()) == 2
+    next_page = client.get("/api/v1/interviews/", params={"status": "PENDING_QUESTIONS", "limit": 2, "cursor": response_status_filter.headers["X-Next-Cursor"]})
+    assert len(next_page.json()) == 1
+    assert "X-Next-Cursor" not in next_page.headers
+    assert client.get("/api/v1/interviews/?status=REPORT_GENERATED").json() == []
+
+def test_read_interview_summaries(client: TestClient):
+    """Test the denormalized interview list: names, counts, report presence and ETag revalidation."""
+    job_id = create_test_job(client, title="Summary Job")
+    cand_id = create_test_candidate(client, email="summary@example.com", name="Summary Candidate")
+    first_id = client.post("/api/v1/interviews/", json={"job_id": job_id, "candidate_id": cand_id}).json()["id"]
+    second_id = client.post("/api/v1/interviews/", json={"job_id": job_id, "candidate_id": cand_id}).json()["id"]
+    for text in ("First answer.", "Second answer."):
+        client.post(f"/api/v1/interviews/{first_id}/logs", json={"full_dialogue_text": text, "speaker_role": "CANDIDATE"})
+
+    response = client.get("/api/v1/interviews/summary")
+    assert response.status_code == status.HTTP_200_OK
+    rows = {row["id"]: row for row in response.json()}
+    assert rows.keys() == {first_id, second_id}
+    assert rows[first_id]["job_title"] == "Summary Job"
+    assert rows[first_id]["candidate_name"] == "Summary Candidate"
+    assert rows[first_id]["log_count"] == 2
+    assert rows[first_id]["question_count"] == 0
+    assert rows[first_id]["has_report"] is False
+    assert rows[second_id]["log_count"] == 0
+    assert rows[first_id]["status"] == "PENDING_QUESTIONS"
+
+    etag = response.headers["ETag"]
+    # Revalidation only runs the aggregate query, not the page query
+    with patch("app.api.v1.endpoints.interviews.paginate") as mock_paginate:
+        not_modified = client.get("/api/v1/interviews/summary", headers={"If-None-Match": etag})
+    assert not_modified.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+    mock_paginate.assert_not_called()
+    # The ETag covers the query parameters
+    assert client.get("/api/v1/interviews/summary?limit=1", headers={"If-None-Match": etag}).status_code == status.HTTP_200_OK
+
+    # A new log entry changes the content, so the old ETag no longer matches
+    client.post(f"/api/v1/interviews/{second_id}/logs", json={"full_dialogue_text": "Late answer.", "speaker_role": "CANDIDATE"})
+    changed = client.get("/api/v1/interviews/summary", headers={"If-None-Match": etag})
+    assert changed.status_code == status.HTTP_200_OK
+    assert changed.headers["ETag"] != etag
+
+    # Same cursor pagination as GET /interviews/
+    first_page = client.get("/api/v1/interviews/summary?limit=1")
+    assert [row["id"] for row in first_page.json()] == [first_id]
+    second_page = client.get("/api/v1/interviews/summary", params={"limit": 1, "cursor": first_page.headers["X-Next-Cursor"]})
+    assert [row["id"] for row in second_page.json()] == [second_id]
+
+def test_create_interview_logs_bulk(client: TestClient):
+    """Test bulk log ingestion: JSON array and NDJSON bodies, server-side order_num, all-or-nothing validation."""
+    job_id = create_test_job(client, title="Bulk Log Job")
+    cand_id = create_test_candidate(client, email="bulk.logs@example.com")
+    interview_id = client.post("/api/v1/interviews/", json={"job_id": job_id, "candidate_id": cand_id}).json()["id"]
+    client.post(f"/api/v1/interviews/{interview_id}/logs", json={"full_dialogue_text": "Existing entry.", "order_num": 1, "speaker_role": "CANDIDATE"})
+
+    entries = [
+        {"question_text_snapshot": "Q1", "full_dialogue_text": "A1", "speaker_role": "CANDIDATE", "order_num": 99},
+        {"question_text_snapshot": "Q2", "full_dialogue_text": "A2", "speaker_role": "CANDIDATE"},
+    ]
+    response = client.post(f"/api/v1/interviews/{interview_id}/logs/bulk", json=entries)
+    assert response.status_code == status.HTTP_201_CREATED
+    result = response.json()
+    assert len(result["created_ids"]) == 2
+    assert (result["first_order_num"], result["last_order_num"]) == (2, 3)
+
+    ndjson = "\n".join(json.dumps({"full_dialogue_text": f"Line {i}", "speaker_role": "CANDIDATE"}) for i in range(3)) + "\n\n"
+    response = client.post(
+        f"/api/v1/interviews/{interview_id}/logs/bulk",
+        content=ndjson.encode(),
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.json()["first_order_num"] == 4
+
+    logs = client.get(f"/api/v1/interviews/{interview_id}/logs").json()
+    assert [log["full_dialogue_text"] for log in logs] == ["Existing entry.", "A1", "A2", "Line 0", "Line 1", "Line 2"]
+    assert [log["order_num"] for log in logs] == [1, 2, 3, 4, 5, 6]
+    assert [log["id"] for log in logs[1:3]] == result["created_ids"]
+
+    # One invalid entry, or a question of another interview, rejects the whole batch
+    response = client.post(f"/api/v1/interviews/{interview_id}/logs/bulk", json=[{"full_dialogue_text": "ok"}, {"speaker_role": "NOBODY"}])
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+    assert [error["index"] for error in response.json()["detail"]] == [1]
+    response = client.post(f"/api/v1/interviews/{interview_id}/logs/bulk", json=[{"full_dialogue_text": "ok", "question_id": 987654}])
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert len(client.get(f"/api/v1/interviews/{interview_id}/logs").json()) == 6
+
+    assert client.post("/api/v1/interviews/987654/logs/bulk", json=entries).status_code == status.HTTP_404_NOT_FOUND
+
+@pytest.mark.asyncio
+async def test_concurrent_log_appends_get_distinct_order_nums(async_app_client: httpx.AsyncClient, client: TestClient, db_session_test: Session):
+    """Concurrent single and bulk appends to one interview get gap-free, unique order_nums; client order_num is ignored."""
+    job_id = create_test_job(client, title="Concurrent Logs Job")
+    cand_id = create_test_candidate(client, email="concurrent.logs@example.com")
+    interview_id = client.post("/api/v1/interviews/", json={"job_id": job_id, "candidate_id": cand_id}).json()["id"]
+
+    singles = [
+        async_app_client.post(f"/api/v1/interviews/{interview_id}/logs", json={"full_dialogue_text": f"Single {i}", "order_num": 1, "speaker_role": "CANDIDATE"})
+        for i in range(10)
+    ]
+    bulks = [
+        async_app_client.post(f"/api/v1/interviews/{interview_id}/logs/bulk", json=[{"full_dialogue_text": f"Bulk {i}.{j}"} for j in range(5)])
+        for i in range(3)
+    ]
+    responses = await asyncio.gather(*singles, *bulks)
+    assert all(response.status_code == status.HTTP_201_CREATED for response in responses)
+
+    logs = client.get(f"/api/v1/interviews/{interview_id}/logs").json()
+    assert [log["order_num"] for log in logs] == list(range(1, 26))
+    # Each batch occupies a contiguous range, in body order
+    for response in responses[10:]:
+        result = response.json()
+        batch = [log for log in logs if result["first_order_num"] <= log["order_num"] <= result["last_order_num"]]
+        assert [log["id"] for log in batch] == result["created_ids"]
+        assert len({log["full_dialogue_text"].split(".")[0] for log in batch}) == 1
+
 # TODO: Add test for update_interview (PUT /{interview_id})
 def test_update_interview_success(client: TestClient):
     """Test successfully updating an interview."""
@@ -322,8 +455,8 @@ async def test_generate_questions_for_interview_success(client: TestClient, db_s
     mock_questions_str = "\n".join(mock_questions_list)
 
     # Patch the AI service calls
-    with patch('app.api.v1.endpoints.interviews.analyze_jd', new_callable=AsyncMock, return_value="Analyzed JD for GenQ") as mock_analyze_jd, \
-         patch('app.api.v1.endpoints.interviews.parse_resume', new_callable=AsyncMock, return_value="Parsed Resume for GenQ") as mock_parse_resume, \
+    with patch('app.services.analysis_cache.analyze_jd', new_callable=AsyncMock, return_value="Analyzed JD for GenQ") as mock_analyze_jd, \
+         patch('app.services.analysis_cache.parse_resume', new_callable=AsyncMock, return_value="Parsed Resume for GenQ") as mock_parse_resume, \
          patch('app.api.v1.endpoints.interviews.generate_interview_questions', new_callable=AsyncMock, return_value=mock_questions_str) as mock_gen_questions:
 
         response_generate = client.post(f"/api/v1/interviews/{interview_id}/generate-questions")
@@ -345,16 +478,17 @@ async def test_generate_questions_for_interview_success(client: TestClient, db_s
     mock_questions_regenerated_list = ["Regenerated Q1?", "Regenerated Q2?", "Regenerated Q3?"]
     mock_questions_regenerated_str = "\n".join(mock_questions_regenerated_list)
     
-    with patch('app.api.v1.endpoints.interviews.analyze_jd', new_callable=AsyncMock, return_value="Analyzed JD for Regen") as mock_analyze_jd_regen, \
-         patch('app.api.v1.endpoints.interviews.parse_resume', new_callable=AsyncMock, return_value="Parsed Resume for Regen") as mock_parse_resume_regen, \
+    with patch('app.services.analysis_cache.analyze_jd', new_callable=AsyncMock, return_value="Analyzed JD for Regen") as mock_analyze_jd_regen, \
+         patch('app.services.analysis_cache.parse_resume', new_callable=AsyncMock, return_value="Parsed Resume for Regen") as mock_parse_resume_regen, \
          patch('app.api.v1.endpoints.interviews.generate_interview_questions', new_callable=AsyncMock, return_value=mock_questions_regenerated_str) as mock_gen_questions_regenerate:
 
         response_regenerate = client.post(f"/api/v1/interviews/{interview_id}/generate-questions")
         assert response_regenerate.status_code == status.HTTP_201_CREATED
         
-        mock_analyze_jd_regen.assert_called_once_with(jd_text="JD for GenQ") 
-        mock_parse_resume_regen.assert_called_once_with(resume_text="Resume for GenQ")
-        mock_gen_questions_regenerate.assert_called_once_with(analyzed_jd_info="Analyzed JD for Regen", structured_resume_info="Parsed Resume for Regen")
+        # JD analysis and structured resume are persisted, so regeneration must not call the LLM for them again
+        mock_analyze_jd_regen.assert_not_called()
+        mock_parse_resume_regen.assert_not_called()
+        mock_gen_questions_regenerate.assert_called_once_with(analyzed_jd_info="Analyzed JD for GenQ", structured_resume_info="Parsed Resume for GenQ")
 
         data_regenerated = response_regenerate.json()
         assert len(data_regenerated["questions"]) == len(mock_questions_regenerated_list)
@@ -362,6 +496,29 @@ async def test_generate_questions_for_interview_success(client: TestClient, db_s
             assert q_data["question_text"] == mock_questions_regenerated_list[i]
             assert q_data["order_num"] == i + 1
 
+def test_generate_questions_reuses_uploaded_resume_summary(client: TestClient):
+    """The summary computed at upload time is used as-is: no second parse_resume round trip."""
+    job_id = create_test_job(client, title="Job For Upload Summary", desc="JD for upload summary")
+    with patch("app.api.v1.endpoints.candidates.parse_resume", AsyncMock(return_value="Structured: Uma Upload")):
+        response_upload = client.post(
+            "/api/v1/candidates/upload-resume/",
+            data={"name": "Uma Upload", "email": "uma.upload@example.com"},
+            files={"resume_file": ("resume.txt", b"Uma Upload\nBackend developer", "text/plain")}
+        )
+    assert response_upload.status_code == status.HTTP_201_CREATED, response_upload.text
+    assert response_upload.json()["resume_text"] == "Uma Upload\nBackend developer"
+    candidate_id = response_upload.json()["id"]
+    interview_id = client.post("/api/v1/interviews/", json={"job_id": job_id, "candidate_id": candidate_id}).json()["id"]
+
+    with patch('app.services.analysis_cache.analyze_jd', new_callable=AsyncMock, return_value="Analyzed JD for upload summary"), \
+         patch('app.services.analysis_cache.parse_resume', new_callable=AsyncMock) as mock_parse_resume, \
+         patch('app.api.v1.endpoints.interviews.generate_interview_questions', new_callable=AsyncMock, return_value="Q1?") as mock_gen_questions:
+        response_generate = client.post(f"/api/v1/interviews/{interview_id}/generate-questions")
+
+    assert response_generate.status_code == status.HTTP_201_CREATED, response_generate.text
+    mock_parse_resume.assert_not_called()
+    mock_gen_questions.assert_called_once_with(analyzed_jd_info="Analyzed JD for upload summary", structured_resume_info="Structured: Uma Upload")
+
 @pytest.mark.asyncio
 async def test_generate_questions_interview_not_found(client: TestClient, app_lifespan_mock):
     """Test generating questions for a non-existent interview."""
@@ -416,8 +573,8 @@ async def test_generate_questions_ai_service_fails(client: TestClient, db_sessio
     interview_id = response_create.json()["id"]
 
     # Mock all three AI services. Let generate_interview_questions fail.
-    with patch('app.api.v1.endpoints.interviews.analyze_jd', new_callable=AsyncMock, return_value="Analyzed JD for AI Fail") as mock_analyze_jd, \
-         patch('app.api.v1.endpoints.interviews.parse_resume', new_callable=AsyncMock, return_value="Parsed Resume for AI Fail") as mock_parse_resume, \
+    with patch('app.services.analysis_cache.analyze_jd', new_callable=AsyncMock, return_value="Analyzed JD for AI Fail") as mock_analyze_jd, \
+         patch('app.services.analysis_cache.parse_resume', new_callable=AsyncMock, return_value="Parsed Resume for AI Fail") as mock_parse_resume, \
          patch('app.api.v1.endpoints.interviews.generate_interview_questions', new_callable=AsyncMock, side_effect=Exception("AI service exploded")) as mock_gen_questions_fail:
         
         response = client.post(f"/api/v1/interviews/{interview_id}/generate-questions")
@@ -439,8 +596,8 @@ async def test_generate_questions_ai_returns_empty_list(client: TestClient, db_s
     assert response_create.status_code == status.HTTP_201_CREATED
     interview_id = response_create.json()["id"]
 
-    with patch('app.api.v1.endpoints.interviews.analyze_jd', new_callable=AsyncMock, return_value="Analyzed JD for empty q test") as mock_analyze_jd, \
-         patch('app.api.v1.endpoints.interviews.parse_resume', new_callable=AsyncMock, return_value="Parsed Resume for empty q test") as mock_parse_resume, \
+    with patch('app.services.analysis_cache.analyze_jd', new_callable=AsyncMock, return_value="Analyzed JD for empty q test") as mock_analyze_jd, \
+         patch('app.services.analysis_cache.parse_resume', new_callable=AsyncMock, return_value="Parsed Resume for empty q test") as mock_parse_resume, \
          patch('app.api.v1.endpoints.interviews.generate_interview_questions', new_callable=AsyncMock, return_value="") as mock_gen_questions_empty:
         
         response_gen_q = client.post(f"/api/v1/interviews/{interview_id}/generate-questions")
@@ -470,8 +627,8 @@ def test_get_questions_for_interview_success(client: TestClient):
     mock_generated_questions_list = ["Question A?", "Question B?"]
     mock_generated_questions_str = "\n".join(mock_generated_questions_list)
     
-    with patch('app.api.v1.endpoints.interviews.analyze_jd', new_callable=AsyncMock, return_value="Analyzed JD for GetQ") as mock_analyze_jd, \
-         patch('app.api.v1.endpoints.interviews.parse_resume', new_callable=AsyncMock, return_value="Parsed Resume for GetQ") as mock_parse_resume, \
+    with patch('app.services.analysis_cache.analyze_jd', new_callable=AsyncMock, return_value="Analyzed JD for GetQ") as mock_analyze_jd, \
+         patch('app.services.analysis_cache.parse_resume', new_callable=AsyncMock, return_value="Parsed Resume for GetQ") as mock_parse_resume, \
          patch('app.api.v1.endpoints.interviews.generate_interview_questions', new_callable=AsyncMock, return_value=mock_generated_questions_str) as mock_ai_generate:
         
         response_post_gen = client.post(f"/api/v1/interviews/{interview_id}/generate-questions")
@@ -502,6 +659,7 @@ def test_get_questions_for_interview_not_found(client: TestClient):
 # For now, we'll use string literals.
 AG_UI_EVENT_TYPE_TASK_START = "task_start"
 AG_UI_EVENT_TYPE_THOUGHT = "thought"
+AG_UI_EVENT_TYPE_QUESTION_CHUNK = "question_chunk"
 AG_UI_EVENT_TYPE_QUESTION_GENERATED = "question_generated"
 AG_UI_EVENT_TYPE_TASK_END = "task_end"
 AG_UI_EVENT_TYPE_ERROR = "error" # Although not used in success test, good to have
@@ -526,11 +684,11 @@ async def test_generate_questions_stream_success(async_app_client: httpx.AsyncCl
     # 2. Mock AI Service calls
     mock_analyzed_jd = "Analyzed JD: Key skills - Python, FastAPI, SSE. Experience needed."
     mock_parsed_resume = "Parsed Resume: Candidate has Python and SSE experience."
-    mock_generated_questions_text = (
-        "What is SSE?\\n"
-        "How does FastAPI support streaming responses?\\n"
-        "Explain a use case for SSE."
-    )
+    # Token-sized chunks; string boundaries deliberately fall mid-question and mid-escape
+    mock_generated_questions_chunks = [
+        '```json\n{"ques', 'tions": ["What is', ' SSE?", "How does FastAPI support ',
+        'streaming responses?", "Explain a use \\u00', '63ase for SSE."]}\n```'
+    ]
     expected_questions = [
         "What is SSE?",
         "How does FastAPI support streaming responses?",
@@ -539,9 +697,9 @@ async def test_generate_questions_stream_success(async_app_client: httpx.AsyncCl
 
     # Ensure the paths in patch match the actual location of these functions
     # as used by the generate_question_events_stream generator.
-    with patch("app.api.v1.endpoints.interviews.analyze_jd", AsyncMock(return_value=mock_analyzed_jd)) as mock_ai_jd, \
-         patch("app.api.v1.endpoints.interviews.parse_resume", AsyncMock(return_value=mock_parsed_resume)) as mock_ai_resume, \
-         patch("app.api.v1.endpoints.interviews.generate_interview_questions", AsyncMock(return_value=mock_generated_questions_text)) as mock_ai_questions:
+    with patch("app.services.analysis_cache.analyze_jd", AsyncMock(return_value=mock_analyzed_jd)) as mock_ai_jd, \
+         patch("app.services.analysis_cache.parse_resume", AsyncMock(return_value=mock_parsed_resume)) as mock_ai_resume, \
+         patch("app.api.v1.endpoints.interviews.stream_interview_questions", mock_question_token_stream(*mock_generated_questions_chunks)) as mock_ai_questions:
 
         # 3. Call the SSE endpoint using the new async_app_client fixture
         # async with httpx.AsyncClient(app=client.app, base_url="http://testserver") as async_client:
@@ -583,7 +741,15 @@ async def test_generate_questions_stream_success(async_app_client: httpx.AsyncCl
         for i, q_event in enumerate(sorted(question_generated_events, key=lambda x: x["payload"]["question_order"])):
             assert q_event["payload"]["question_text"] == expected_questions[i]
             assert q_event["payload"]["question_order"] == i + 1
-            assert q_event["payload"]["total_questions"] == len(expected_questions)
+
+        # Partial question text is streamed before each question completes
+        question_chunk_events = [e for e in received_events if e.get("event_type") == AG_UI_EVENT_TYPE_QUESTION_CHUNK and e.get("payload", {}).get("task_id") == task_id]
+        assert len(question_chunk_events) > len(expected_questions)
+        first_question_completed_at = received_events.index(question_generated_events[0])
+        assert received_events.index(question_chunk_events[0]) < first_question_completed_at
+        for i, expected_question in enumerate(expected_questions):
+            streamed_text = "".join(e["payload"]["chunk_text"] for e in question_chunk_events if e["payload"]["question_order"] == i + 1)
+            assert streamed_text == expected_question
 
         task_end_event = next((e for e in received_events if e.get("event_type") == AG_UI_EVENT_TYPE_TASK_END and e.get("payload", {}).get("task_id") == task_id), None)
         assert task_end_event is not None, "TASK_END event not found"
@@ -599,7 +765,7 @@ async def test_generate_questions_stream_success(async_app_client: httpx.AsyncCl
         mock_ai_jd.assert_awaited_once()
         mock_ai_resume.assert_awaited_once()
         # Check arguments passed to the mock AI question generation
-        mock_ai_questions.assert_awaited_once_with(
+        mock_ai_questions.assert_called_once_with(
             analyzed_jd_info=mock_analyzed_jd, 
             structured_resume_info=mock_parsed_resume
         )
@@ -773,7 +939,7 @@ async def test_generate_questions_stream_missing_resume(
     # Mock analyze_jd as it should be called before the resume check fails
     mock_analyzed_jd_return_value = "Analyzed JD: Key skills - Python. Experience required."
     # Patch the correct path for analyze_jd within the interviews endpoint module
-    with patch("app.api.v1.endpoints.interviews.analyze_jd", AsyncMock(return_value=mock_analyzed_jd_return_value)) as mock_ai_analyze_jd:
+    with patch("app.services.analysis_cache.analyze_jd", AsyncMock(return_value=mock_analyzed_jd_return_value)) as mock_ai_analyze_jd:
         
         # 2. Call SSE endpoint
         response = await async_app_client.post(f"/api/v1/interviews/{interview_id}/generate-questions-stream")
@@ -821,7 +987,7 @@ async def test_generate_questions_stream_missing_resume(
         # 6. Assert AI service calls
         mock_ai_analyze_jd.assert_awaited_once()
         mock_ai_parse_resume.assert_not_awaited() # Should not be called
-        mock_ai_generate_questions.assert_not_awaited() # Should not be called
+        mock_ai_generate_questions.assert_not_called() # Should not be called
 
         # Ensure no QUESTION_GENERATED or successful TASK_END for this task_id
         question_generated_events = [e for e in received_events if e.get("event_type") == AG_UI_EVENT_TYPE_QUESTION_GENERATED and e.get("payload", {}).get("task_id") == task_id]
@@ -866,9 +1032,9 @@ async def test_generate_questions_stream_ai_parse_resume_fails(
     ai_error_message_resume = "Error: Resume parsing module failed spectacularly."
 
     # 2. Mock AI services: analyze_jd succeeds, parse_resume fails.
-    with patch("app.api.v1.endpoints.interviews.analyze_jd", AsyncMock(return_value=mock_analyzed_jd_success)) as mock_ai_analyze_jd, \
-         patch("app.api.v1.endpoints.interviews.parse_resume", AsyncMock(return_value=ai_error_message_resume)) as mock_ai_parse_resume, \
-         patch("app.api.v1.endpoints.interviews.generate_interview_questions", AsyncMock()) as mock_ai_generate_questions:
+    with patch("app.services.analysis_cache.analyze_jd", AsyncMock(return_value=mock_analyzed_jd_success)) as mock_ai_analyze_jd, \
+         patch("app.services.analysis_cache.parse_resume", AsyncMock(return_value=ai_error_message_resume)) as mock_ai_parse_resume, \
+         patch("app.api.v1.endpoints.interviews.stream_interview_questions", mock_question_token_stream()) as mock_ai_generate_questions:
 
         # 3. Call SSE endpoint
         response = await async_app_client.post(f"/api/v1/interviews/{interview_id}/generate-questions-stream")
@@ -909,7 +1075,7 @@ async def test_generate_questions_stream_ai_parse_resume_fails(
         # 6. Assert AI service calls
         mock_ai_analyze_jd.assert_awaited_once()
         mock_ai_parse_resume.assert_awaited_once()
-        mock_ai_generate_questions.assert_not_awaited() # Should not be called
+        mock_ai_generate_questions.assert_not_called() # Should not be called
 
         # Ensure no QUESTION_GENERATED or successful TASK_END
         question_generated_events = [e for e in received_events if e.get("event_type") == AG_UI_EVENT_TYPE_QUESTION_GENERATED and e.get("payload", {}).get("task_id") == task_id]
@@ -955,9 +1121,9 @@ async def test_generate_questions_stream_ai_generate_questions_fails(
     ai_exception_message_gen_q = "Question generation engine malfunction."
 
     # 2. Mock AI services: analyze_jd and parse_resume succeed, generate_interview_questions raises an exception.
-    with patch("app.api.v1.endpoints.interviews.analyze_jd", AsyncMock(return_value=mock_analyzed_jd_success)) as mock_ai_analyze_jd, \
-         patch("app.api.v1.endpoints.interviews.parse_resume", AsyncMock(return_value=mock_parsed_resume_success)) as mock_ai_parse_resume, \
-         patch("app.api.v1.endpoints.interviews.generate_interview_questions", AsyncMock(side_effect=Exception(ai_exception_message_gen_q))) as mock_ai_generate_questions:
+    with patch("app.services.analysis_cache.analyze_jd", AsyncMock(return_value=mock_analyzed_jd_success)) as mock_ai_analyze_jd, \
+         patch("app.services.analysis_cache.parse_resume", AsyncMock(return_value=mock_parsed_resume_success)) as mock_ai_parse_resume, \
+         patch("app.api.v1.endpoints.interviews.stream_interview_questions", mock_question_token_stream(error=Exception(ai_exception_message_gen_q))) as mock_ai_generate_questions:
 
         # 3. Call SSE endpoint
         response = await async_app_client.post(f"/api/v1/interviews/{interview_id}/generate-questions-stream")
@@ -1002,7 +1168,7 @@ async def test_generate_questions_stream_ai_generate_questions_fails(
         # 6. Assert AI service calls
         mock_ai_analyze_jd.assert_awaited_once()
         mock_ai_parse_resume.assert_awaited_once()
-        mock_ai_generate_questions.assert_awaited_once() # It was called and it raised an exception
+        mock_ai_generate_questions.assert_called_once() # It was called and it raised an exception
 
         # Ensure no QUESTION_GENERATED or successful TASK_END
         question_generated_events = [e for e in received_events if e.get("event_type") == AG_UI_EVENT_TYPE_QUESTION_GENERATED and e.get("payload", {}).get("task_id") == task_id]
@@ -1046,9 +1212,9 @@ async def test_generate_questions_stream_ai_returns_empty_questions(
     mock_empty_questions_text = "" # AI returns empty string, meaning no questions
 
     # 2. Mock AI services to succeed but return no questions
-    with patch("app.api.v1.endpoints.interviews.analyze_jd", AsyncMock(return_value=mock_analyzed_jd_success)) as mock_ai_analyze_jd, \
-         patch("app.api.v1.endpoints.interviews.parse_resume", AsyncMock(return_value=mock_parsed_resume_success)) as mock_ai_parse_resume, \
-         patch("app.api.v1.endpoints.interviews.generate_interview_questions", AsyncMock(return_value=mock_empty_questions_text)) as mock_ai_generate_questions:
+    with patch("app.services.analysis_cache.analyze_jd", AsyncMock(return_value=mock_analyzed_jd_success)) as mock_ai_analyze_jd, \
+         patch("app.services.analysis_cache.parse_resume", AsyncMock(return_value=mock_parsed_resume_success)) as mock_ai_parse_resume, \
+         patch("app.api.v1.endpoints.interviews.stream_interview_questions", mock_question_token_stream(mock_empty_questions_text)) as mock_ai_generate_questions:
 
         # 3. Call SSE endpoint
         response = await async_app_client.post(f"/api/v1/interviews/{interview_id}/generate-questions-stream")
@@ -1096,7 +1262,7 @@ async def test_generate_questions_stream_ai_returns_empty_questions(
         # 6. Assert AI service calls
         mock_ai_analyze_jd.assert_awaited_once()
         mock_ai_parse_resume.assert_awaited_once()
-        mock_ai_generate_questions.assert_awaited_once()
+        mock_ai_generate_questions.assert_called_once()
 
     # 7. Assert Database state
     # Status should be updated to QUESTIONS_FAILED as per current stream logic
@@ -1110,4 +1276,645 @@ async def test_generate_questions_stream_ai_returns_empty_questions(
     assert response_get_questions.json() == [] # No questions created
 
 # Ensure models is imported if used for status comparison directly (e.g. models.InterviewStatus.QUESTIONS_GENERATED)
-# from app.db import models # Would typically be at the top of the file 
\ No newline at end of file
+# from app.db import models # Would typically be at the top of the file 
+@pytest.mark.asyncio
+async def test_generate_questions_stream_runs_preprocessing_concurrently(async_app_client: httpx.AsyncClient, client: TestClient, db_session_test: Session):
+    """
+    JD analysis and resume parsing run concurrently, and their THOUGHT events
+    arrive in completion order (the faster resume parsing first).
+    """
+    job_id = create_test_job(client, title="Concurrent Stages Job", desc="JD for concurrent stages")
+    candidate_id = create_test_candidate(client, email="concurrent.stages@example.com", resume_text="Resume for concurrent stages")
+    interview_id = client.post("/api/v1/interviews/", json={"job_id": job_id, "candidate_id": candidate_id}).json()["id"]
+
+    async def slow_analyze_jd(jd_text: str) -> str:
+        await asyncio.sleep(0.6)
+        return "Analyzed JD (slow)"
+
+    async def fast_parse_resume(resume_text: str) -> str:
+        await asyncio.sleep(0.3)
+        return "Parsed Resume (fast)"
+
+    with patch("app.services.analysis_cache.analyze_jd", AsyncMock(side_effect=slow_analyze_jd)), \
+         patch("app.services.analysis_cache.parse_resume", AsyncMock(side_effect=fast_parse_resume)), \
+         patch("app.api.v1.endpoints.interviews.stream_interview_questions", mock_question_token_stream('{"questions": ["Q1?"]}')):
+        started = time.monotonic()
+        response = await async_app_client.post(f"/api/v1/interviews/{interview_id}/generate-questions-stream")
+        body = response.text
+        elapsed = time.monotonic() - started
+
+    assert response.status_code == status.HTTP_200_OK
+    # Sequential execution would take at least 0.9s
+    assert elapsed < 0.85, f"Preprocessing stages did not run concurrently (took {elapsed:.2f}s)"
+    assert body.index("Resume parsing complete") < body.index("JD analysis complete")
+
+
+def parse_sse_events(body: str) -> list:
+    """Parses an SSE body into a list of (event_name, data_dict) tuples."""
+    events = []
+    for block in body.replace("\r\n", "\n").split("\n\n"):
+        event_name, data_lines = None, []
+        for line in block.split("\n"):
+            if line.startswith("event:"):
+                event_name = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data_lines.append(line[len("data:"):].strip())
+        if event_name and data_lines:
+            events.append((event_name, json.loads("\n".join(data_lines))))
+    return events
+
+@pytest.mark.asyncio
+async def test_generate_report_stream_emits_markdown_then_radar(client: TestClient, async_app_client: httpx.AsyncClient):
+    """
+    The report stream forwards markdown as report_chunk events, sends the trailing
+    CANDIDATE_CAPABILITY_ASSESSMENT_JSON block as a single radar_data event, and
+    persists the report (without the JSON block) plus radar_data once at the end.
+    """
+    job_id = create_test_job(client, title="Report Stream Job", desc="Report stream JD")
+    candidate_id = create_test_candidate(client, email="report.stream@example.com", resume_text="Report stream resume")
+    interview_id = client.post("/api/v1/interviews/", json={"job_id": job_id, "candidate_id": candidate_id}).json()["id"]
+    log_response = client.post(
+        f"/api/v1/interviews/{interview_id}/logs",
+        json={"question_text_snapshot": "Tell me about SSE.", "full_dialogue_text": "It streams events.", "speaker_role": "CANDIDATE"}
+    )
+    assert log_response.status_code == status.HTTP_201_CREATED
+
+    # The JSON fence is split across chunks to exercise the incremental detection
+    report_chunks = [
+        "# Interview Report\n", "Strong streaming knowledge.\n\n`", "``js",
+        'on\n{"CANDIDATE_CAPABILITY_ASSESSMENT_JSON": {"technical_skills": 4, ',
+        '"communication": 3}}\n```\n'
+    ]
+
+    async def _report_token_stream(*args, **kwargs):
+        for chunk in report_chunks:
+            yield chunk
+
+    with patch("app.services.analysis_cache.analyze_jd", AsyncMock(return_value="Analyzed JD for report")), \
+         patch("app.services.analysis_cache.parse_resume", AsyncMock(return_value="Parsed resume for report")), \
+         patch("app.api.v1.endpoints.interviews.stream_interview_report", MagicMock(side_effect=_report_token_stream)) as mock_stream_report:
+        response = await async_app_client.post(f"/api/v1/interviews/{interview_id}/generate-report-stream")
+
+    assert response.status_code == status.HTTP_200_OK
+    events = parse_sse_events(response.text)
+    event_names = [name for name, _ in events]
+    assert event_names[0] == "task_start"
+    assert event_names[-1] == "task_end", events
+
+    markdown = "".join(data["chunk_text"] for name, data in events if name == "report_chunk")
+    assert markdown.strip() == "# Interview Report\nStrong streaming knowledge."
+    assert "CANDIDATE_CAPABILITY_ASSESSMENT_JSON" not in markdown
+
+    radar_events = [data for name, data in events if name == "radar_data"]
+    assert len(radar_events) == 1
+    assert radar_events[0]["radar_data"] == {"technical_skills": 4, "communication": 3}
+    assert event_names.index("radar_data") > event_names.index("report_chunk")
+    assert events[-1][1]["report_id"] is not None
+
+    mock_stream_report.assert_called_once()
+    assert mock_stream_report.call_args.kwargs["job_description"] == "Analyzed JD for report"
+    assert mock_stream_report.call_args.kwargs["candidate_resume"] == "Parsed resume for report"
+
+    interview_details = client.get(f"/api/v1/interviews/{interview_id}").json()
+    assert interview_details["status"] == "REPORT_GENERATED"
+    assert interview_details["radar_data"] == {"technical_skills": 4, "communication": 3}
+    assert interview_details["generated_report"]["generated_text"] == "# Interview Report\nStrong streaming knowledge."
+
+@pytest.mark.asyncio
+async def test_parallel_question_streams_do_not_serialize(client: TestClient, async_app_client: httpx.AsyncClient):
+    """
+    Several question streams run in parallel, each on its own AsyncSession. Their awaits
+    (AI calls and DB I/O) interleave on the event loop instead of running one stream after another.
+    """
+    stream_count = 4
+    ai_delay = 0.4
+    interview_ids = []
+    for i in range(stream_count):
+        job_id = create_test_job(client, title=f"Parallel Job {i}", desc=f"JD for parallel stream {i}")
+        candidate_id = create_test_candidate(client, email=f"parallel.{i}@example.com", resume_text=f"Resume for parallel stream {i}")
+        interview_ids.append(client.post("/api/v1/interviews/", json={"job_id": job_id, "candidate_id": candidate_id}).json()["id"])
+
+    async def slow_analyze_jd(jd_text: str) -> str:
+        await asyncio.sleep(ai_delay)
+        return f"Analyzed {jd_text}"
+
+    async def slow_parse_resume(resume_text: str) -> str:
+        await asyncio.sleep(ai_delay)
+        return f"Parsed {resume_text}"
+
+    with patch("app.services.analysis_cache.analyze_jd", AsyncMock(side_effect=slow_analyze_jd)), \
+         patch("app.services.analysis_cache.parse_resume", AsyncMock(side_effect=slow_parse_resume)), \
+         patch("app.api.v1.endpoints.interviews.stream_interview_questions", mock_question_token_stream('{"questions": ["Parallel Q1?", "Parallel Q2?"]}')):
+        started = time.monotonic()
+        responses = await asyncio.gather(*[
+            async_app_client.post(f"/api/v1/interviews/{interview_id}/generate-questions-stream")
+            for interview_id in interview_ids
+        ])
+        elapsed = time.monotonic() - started
+
+    for response in responses:
+        assert response.status_code == status.HTTP_200_OK
+        assert AG_UI_EVENT_TYPE_TASK_END in response.text
+        assert AG_UI_EVENT_TYPE_ERROR not in response.text
+    # Serialized streams would take at least stream_count * ai_delay (1.6s)
+    assert elapsed < stream_count * ai_delay / 2, f"Parallel streams were serialized (took {elapsed:.2f}s)"
+
+    for interview_id in interview_ids:
+        questions = client.get(f"/api/v1/interviews/{interview_id}/questions").json()
+        assert [q["question_text"] for q in questions] == ["Parallel Q1?", "Parallel Q2?"]
+        assert client.get(f"/api/v1/interviews/{interview_id}").json()["status"] == "QUESTIONS_GENERATED"
+
+# --- Background execution (?background=true + /api/v1/tasks) ---
+
+def wait_for_task(client: TestClient, task_id: str, timeout: float = 15.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        task = client.get(f"/api/v1/tasks/{task_id}").json()
+        if task["status"] in ("SUCCEEDED", "FAILED"):
+            return task
+        time.sleep(0.05)
+    raise AssertionError(f"Task {task_id} did not finish within {timeout}s")
+
+def test_generate_questions_background_is_idempotent_and_completes(client: TestClient):
+    """background=true returns 202 at once; a second submission while running returns the same task."""
+    job_id = create_test_job(client, title="Background Job", desc="JD for background generation")
+    candidate_id = create_test_candidate(client, email="background.questions@example.com", resume_text="Resume for background generation")
+    interview_id = client.post("/api/v1/interviews/", json={"job_id": job_id, "candidate_id": candidate_id}).json()["id"]
+
+    async def slow_generate_questions(**kwargs) -> str:
+        await asyncio.sleep(0.5)
+        return '{"questions": ["Background Q1?", "Background Q2?"]}'
+
+    with patch("app.services.analysis_cache.analyze_jd", AsyncMock(return_value="Analyzed JD")), \
+         patch("app.services.analysis_cache.parse_resume", AsyncMock(return_value="Parsed resume")), \
+         patch("app.api.v1.endpoints.interviews.generate_interview_questions", AsyncMock(side_effect=slow_generate_questions)) as mock_generate:
+        first = client.post(f"/api/v1/interviews/{interview_id}/generate-questions?background=true")
+        second = client.post(f"/api/v1/interviews/{interview_id}/generate-questions?background=true")
+
+        assert first.status_code == status.HTTP_202_ACCEPTED
+        assert second.status_code == status.HTTP_202_ACCEPTED
+        task_id = first.json()["task_id"]
+        assert second.json()["task_id"] == task_id
+        assert first.headers["location"] == f"/api/v1/tasks/{task_id}"
+
+        task = wait_for_task(client, task_id)
+
+    assert task["status"] == "SUCCEEDED", task
+    assert task["attempts"] == 1
+    mock_generate.assert_called_once()
+    result = client.get(f"/api/v1/tasks/{task_id}/result")
+    assert result.status_code == status.HTTP_200_OK
+    assert [q["question_text"] for q in result.json()["questions"]] == ["Background Q1?", "Background Q2?"]
+    assert client.get(f"/api/v1/interviews/{interview_id}").json()["status"] == "QUESTIONS_GENERATED"
+
+    # Once finished, the same work can be requested again
+    with patch("app.api.v1.endpoints.interviews.generate_interview_questions", AsyncMock(return_value='{"questions": ["Again?"]}')):
+        again = client.post(f"/api/v1/interviews/{interview_id}/generate-questions?background=true")
+        assert again.status_code == status.HTTP_202_ACCEPTED
+        assert again.json()["task_id"] != task_id
+        assert wait_for_task(client, again.json()["task_id"])["status"] == "SUCCEEDED"
+
+def test_background_task_retries_transient_errors(client: TestClient):
+    job_id = create_test_job(client, title="Retry Job", desc="JD for retries")
+    candidate_id = create_test_candidate(client, email="background.retry@example.com", resume_text="Resume for retries")
+    interview_id = client.post("/api/v1/interviews/", json={"job_id": job_id, "candidate_id": candidate_id}).json()["id"]
+
+    flaky_generate = AsyncMock(side_effect=[RuntimeError("model overloaded"), '{"questions": ["After retry?"]}'])
+    with patch("app.services.analysis_cache.analyze_jd", AsyncMock(return_value="Analyzed JD")), \
+         patch("app.services.analysis_cache.parse_resume", AsyncMock(return_value="Parsed resume")), \
+         patch("app.api.v1.endpoints.interviews.generate_interview_questions", flaky_generate), \
+         patch("app.services.task_queue.settings.TASK_RETRY_BASE_DELAY_SECONDS", 0.01):
+        response = client.post(f"/api/v1/interviews/{interview_id}/generate-questions?background=true")
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        task = wait_for_task(client, response.json()["task_id"])
+
+    assert task["status"] == "SUCCEEDED", task
+    assert task["attempts"] == 2
+    assert task["result"]["questions"][0]["question_text"] == "After retry?"
+
+def test_background_task_retries_report_service_errors(client: TestClient):
+    """An "Error: ..." result from the report service is a 500 in _generate_report, so the task retries it instead of saving it."""
+    interview_id = _create_long_interview(client, "background.report.retry@example.com", entry_count=2, answer_sentences=2)
+
+    flaky_report = AsyncMock(side_effect=["Error: AI service request timed out (APITimeoutError).", "# Report\nAfter retry."])
+    with patch("app.services.analysis_cache.analyze_jd", AsyncMock(return_value="Analyzed JD")), \
+         patch("app.services.analysis_cache.parse_resume", AsyncMock(return_value="Parsed resume")), \
+         patch("app.api.v1.endpoints.interviews.generate_interview_report", flaky_report), \
+         patch("app.services.task_queue.settings.TASK_RETRY_BASE_DELAY_SECONDS", 0.01):
+        response = client.post(f"/api/v1/interviews/{interview_id}/generate-report?background=true")
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        task = wait_for_task(client, response.json()["task_id"])
+
+    assert task["status"] == "SUCCEEDED", task
+    assert task["attempts"] == 2
+    assert task["result"]["interview_id"] == interview_id
+    assert flaky_report.await_count == 2
+    interview_details = client.get(f"/api/v1/interviews/{interview_id}").json()
+    assert interview_details["status"] == "REPORT_GENERATED"
+    assert interview_details["generated_report"]["generated_text"] == "# Report\nAfter retry."
+
+def test_background_task_permanent_error_is_not_retried(client: TestClient):
+    """A 4xx condition (no interview logs for the report) fails the task on the first attempt."""
+    job_id = create_test_job(client, title="No Logs Job", desc="JD without logs")
+    candidate_id = create_test_candidate(client, email="background.nologs@example.com", resume_text="Resume without logs")
+    interview_id = client.post("/api/v1/interviews/", json={"job_id": job_id, "candidate_id": candidate_id}).json()["id"]
+
+    response = client.post(f"/api/v1/interviews/{interview_id}/generate-report?background=true")
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    task = wait_for_task(client, response.json()["task_id"])
+
+    assert task["status"] == "FAILED"
+    assert task["attempts"] == 1
+    assert client.get(f"/api/v1/tasks/{task['task_id']}/result").status_code == status.HTTP_409_CONFLICT
+
+def test_background_task_interview_not_found(client: TestClient):
+    response = client.post("/api/v1/interviews/999999/generate-questions?background=true")
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert client.get("/api/v1/tasks/unknown-task").status_code == status.HTTP_404_NOT_FOUND
+
+@pytest.mark.asyncio
+async def test_background_task_claim_is_exclusive_and_recovery_respects_leases(client: TestClient, db_session_test: Session):
+    """Two workers claiming one task: only one runs it. Recovery only takes over RUNNING tasks whose lease expired."""
+    from app.db import models
+    from app.db.session import get_async_session_factory
+    from app.services import task_queue
+
+    session_factory = client.app.dependency_overrides[get_async_session_factory]()
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    def make_task(name: str, task_status: models.TaskStatus, lease_expires_at=None) -> models.BackgroundTask:
+        return models.BackgroundTask(task_uuid=name, task_type="test", status=task_status, attempts=0, max_attempts=3, lease_expires_at=lease_expires_at)
+    pending = make_task("lease-pending", models.TaskStatus.PENDING)
+    live = make_task("lease-live", models.TaskStatus.RUNNING, now + timedelta(minutes=5))
+    abandoned = make_task("lease-abandoned", models.TaskStatus.RUNNING, now - timedelta(minutes=5))
+    db_session_test.add_all([pending, live, abandoned])
+    db_session_test.commit()
+
+    async def claim():
+        async with session_factory() as db:
+            return await task_queue._claim(db, pending.id)
+    assert sorted(await asyncio.gather(claim(), claim())) == [False, True]
+
+    with patch.object(task_queue.task_runner, "enqueue") as enqueue, patch.object(task_queue.task_runner, "start_reaper"):
+        assert await task_queue.recover_tasks(session_factory) == 1
+    assert [call.args[0] for call in enqueue.call_args_list] == [abandoned.id]
+
+    db_session_test.expire_all()
+    assert (pending.status, pending.attempts) == (models.TaskStatus.RUNNING, 1)
+    assert live.status == models.TaskStatus.RUNNING
+    assert (abandoned.status, abandoned.lease_expires_at) == (models.TaskStatus.PENDING, None)
+
+# --- LLM response cache (app/services/llm_cache.py) ---
+
+def _mock_chat_completion(text: str) -> MagicMock:
+    response = MagicMock()
+    response.choices = [MagicMock()]
+    response.choices[0].message.content = text
+    return response
+
+def test_generate_questions_uses_llm_response_cache(client: TestClient):
+    """A second generation over the same JD/resume is served from the cache; regenerate=true calls the model again."""
+    from app.services.llm_cache import llm_response_cache
+
+    job_id = create_test_job(client, title="Cache Job", desc="JD for the LLM cache test")
+    candidate_id = create_test_candidate(client, email="llm.cache@example.com", resume_text="Resume for the LLM cache test")
+    interview_id = client.post("/api/v1/interviews/", json={"job_id": job_id, "candidate_id": candidate_id}).json()["id"]
+
+    mock_client = MagicMock()
+    mock_client.chat.completions.create = AsyncMock(side_effect=[
+        _mock_chat_completion('{"questions": ["Cached Q1?", "Cached Q2?"]}'),
+        _mock_chat_completion('{"questions": ["Fresh Q1?"]}'),
+    ])
+    before = client.get("/api/v1/metrics/").json()["llm_cache"]
+
+    # Memory tier only: keep the test independent of the persistent table
+    with patch.object(llm_response_cache, "session_factory", None), \
+         patch("app.services.analysis_cache.analyze_jd", AsyncMock(return_value="Analyzed JD for the LLM cache test")), \
+         patch("app.services.analysis_cache.parse_resume", AsyncMock(return_value="Parsed resume for the LLM cache test")), \
+         patch("app.services.ai_services.get_openai_client", return_value=mock_client):
+        first = client.post(f"/api/v1/interviews/{interview_id}/generate-questions")
+        second = client.post(f"/api/v1/interviews/{interview_id}/generate-questions")
+        regenerated = client.post(f"/api/v1/interviews/{interview_id}/generate-questions?regenerate=true")
+
+    assert first.status_code == status.HTTP_201_CREATED, first.text
+    assert [q["question_text"] for q in second.json()["questions"]] == [q["question_text"] for q in first.json()["questions"]]
+    assert [q["question_text"] for q in regenerated.json()["questions"]] == ["Fresh Q1?"]
+    assert mock_client.chat.completions.create.await_count == 2
+
+    after = client.get("/api/v1/metrics/").json()["llm_cache"]
+    assert after["hits_memory"] - before["hits_memory"] == 1
+    assert after["misses"] - before["misses"] == 1
+    assert after["bypassed"] - before["bypassed"] == 1
+    assert after["by_task"]["question_generation"]["stores"] >= 2
+
+def test_generate_questions_requests_structured_output(client: TestClient):
+    """Questions are requested with a JSON schema response_format; a provider that rejects it gets plain requests from then on."""
+    from openai import BadRequestError
+    from app.core import structured_output
+    from app.services.llm_cache import llm_response_cache
+
+    job_id = create_test_job(client, title="Structured Output Job", desc="JD for the structured output test")
+    candidate_id = create_test_candidate(client, email="structured.output@example.com", resume_text="Resume for the structured output test")
+    interview_id = client.post("/api/v1/interviews/", json={"job_id": job_id, "candidate_id": candidate_id}).json()["id"]
+
+    rejected = BadRequestError(
+        "Invalid parameter: 'response_format' of type 'json_schema' is not supported with this model.",
+        response=httpx.Response(400, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions")),
+        body=None
+    )
+    mock_client = MagicMock()
+    mock_client.chat.completions.create = AsyncMock(side_effect=[
+        _mock_chat_completion('{"questions": ["Structured Q1?", "Structured Q2?"]}'),
+        rejected,
+        _mock_chat_completion('Sure!\n```json\n{"questions": ["Plain Q1?"]}\n```'),
+        _mock_chat_completion('{"questions": ["Plain Q2?"]}'),
+    ])
+
+    with patch.object(llm_response_cache, "session_factory", None), \
+         patch.object(structured_output, "_unsupported_models", set()), \
+         patch("app.services.analysis_cache.analyze_jd", AsyncMock(return_value="Analyzed JD for the structured output test")), \
+         patch("app.services.analysis_cache.parse_resume", AsyncMock(return_value="Parsed resume for the structured output test")), \
+         patch("app.services.ai_services.get_openai_client", return_value=mock_client):
+        structured = client.post(f"/api/v1/interviews/{interview_id}/generate-questions?regenerate=true")
+        fallback = client.post(f"/api/v1/interviews/{interview_id}/generate-questions?regenerate=true")
+        plain = client.post(f"/api/v1/interviews/{interview_id}/generate-questions?regenerate=true")
+
+    assert [q["question_text"] for q in structured.json()["questions"]] == ["Structured Q1?", "Structured Q2?"]
+    assert [q["question_text"] for q in fallback.json()["questions"]] == ["Plain Q1?"]
+    assert [q["question_text"] for q in plain.json()["questions"]] == ["Plain Q2?"]
+    sent_formats = [call.kwargs.get("response_format") for call in mock_client.chat.completions.create.await_args_list]
+    assert sent_formats[0]["type"] == "json_schema"
+    assert sent_formats[0]["json_schema"]["schema"]["required"] == ["questions"]
+    assert sent_formats[1] == sent_formats[0] # Rejected ...
+    assert sent_formats[2:] == [None, None]   # ... then retried, and later calls, without it
+
+def test_generate_questions_retries_provider_rate_limit(client: TestClient):
+    """A 429 from the provider is retried by the LLM scheduler (honouring retry-after) instead of failing the request."""
+    from openai import RateLimitError
+    from app.core.config import settings
+    from app.services.llm_cache import llm_response_cache
+
+    job_id = create_test_job(client, title="Rate Limit Job", desc="JD for the rate limit test")
+    candidate_id = create_test_candidate(client, email="rate.limit@example.com", resume_text="Resume for the rate limit test")
+    interview_id = client.post("/api/v1/interviews/", json={"job_id": job_id, "candidate_id": candidate_id}).json()["id"]
+
+    rate_limited = RateLimitError(
+        "Rate limit reached",
+        response=httpx.Response(429, headers={"retry-after-ms": "20"}, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions")),
+        body=None
+    )
+    mock_client = MagicMock()
+    mock_client.chat.completions.create = AsyncMock(side_effect=[rate_limited, _mock_chat_completion('{"questions": ["After 429?"]}')])
+
+    with patch.object(llm_response_cache, "session_factory", None), \
+         patch.object(settings, "LLM_RETRY_BASE_DELAY_SECONDS", 0.01), \
+         patch("app.services.analysis_cache.analyze_jd", AsyncMock(return_value="Analyzed JD for the rate limit test")), \
+         patch("app.services.analysis_cache.parse_resume", AsyncMock(return_value="Parsed resume for the rate limit test")), \
+         patch("app.services.ai_services.get_openai_client", return_value=mock_client):
+        response = client.post(f"/api/v1/interviews/{interview_id}/generate-questions?regenerate=true")
+
+    assert response.status_code == status.HTTP_201_CREATED, response.text
+    assert [q["question_text"] for q in response.json()["questions"]] == ["After 429?"]
+    assert mock_client.chat.completions.create.await_count == 2
+    scheduler_metrics = client.get("/api/v1/metrics/").json()["llm_scheduler"][settings.OPENAI_MODEL_NAME_QUESTION_GENERATION]
+    assert scheduler_metrics["rate_limited"] >= 1
+    assert scheduler_metrics["in_flight"] == 0
+
+# --- Report prompt token budgeting (app/services/report_prompt.py) ---
+
+def _create_long_interview(client: TestClient, email: str, entry_count: int, answer_sentences: int) -> int:
+    job_id = create_test_job(client, title="Long Interview Job", desc="JD for a long interview")
+    candidate_id = create_test_candidate(client, email=email, resume_text="Resume for a long interview")
+    interview_id = client.post("/api/v1/interviews/", json={"job_id": job_id, "candidate_id": candidate_id}).json()["id"]
+    for i in range(entry_count):
+        answer = " ".join(f"Answer {i} sentence {n} about distributed systems and caching." for n in range(answer_sentences))
+        response = client.post(
+            f"/api/v1/interviews/{interview_id}/logs",
+            json={"question_text_snapshot": f"Long question {i}?", "full_dialogue_text": answer, "speaker_role": "CANDIDATE"}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+    return interview_id
+
+def test_generate_report_compacts_transcript_over_budget(client: TestClient):
+    """Answers are compacted extractively to fit the prompt budget; the full dialogue and the token counts are stored on the report."""
+    from app.core.config import settings
+    from app.core.tokens import count_tokens
+
+    interview_id = _create_long_interview(client, "long.extractive@example.com", entry_count=4, answer_sentences=150)
+    mock_report = AsyncMock(return_value="Compact report.")
+    with patch.object(settings, "REPORT_PROMPT_TOKEN_BUDGET", 4000), \
+         patch("app.services.analysis_cache.analyze_jd", AsyncMock(return_value="Analyzed JD")), \
+         patch("app.services.analysis_cache.parse_resume", AsyncMock(return_value="Parsed resume")), \
+         patch("app.api.v1.endpoints.interviews.generate_interview_report", mock_report):
+        response = client.post(f"/api/v1/interviews/{interview_id}/generate-report")
+
+    assert response.status_code == status.HTTP_200_OK, response.text
+    report = response.json()
+    stats = report["prompt_stats"]
+    assert stats["compaction"] == "extractive"
+    assert stats["entries"] == 4 and stats["entries_compacted"] == 4
+    assert stats["transcript_tokens"] < stats["transcript_tokens_original"]
+    assert stats["prompt_tokens"] <= 4000
+
+    sent_log = mock_report.call_args.kwargs["conversation_log_str"]
+    assert count_tokens(sent_log, stats["model"]) == stats["transcript_tokens"]
+    assert "Q4: Long question 3?" in sent_log
+    assert "Answer 3 sentence 0 " in sent_log and "Answer 3 sentence 149 " in sent_log # Opening and closing sentences are kept
+    assert "省略" in sent_log
+    assert "Answer 3 sentence 75 " in report["source_dialogue"] # The stored source is the full dialogue
+
+def test_generate_report_does_not_save_service_errors(client: TestClient):
+    """An "Error: ..." result of the report service is a 500; no report is stored and the status is unchanged."""
+    interview_id = _create_long_interview(client, "report.error@example.com", entry_count=2, answer_sentences=2)
+    with patch("app.services.analysis_cache.analyze_jd", AsyncMock(return_value="Analyzed JD")), \
+         patch("app.services.analysis_cache.parse_resume", AsyncMock(return_value="Parsed resume")), \
+         patch("app.api.v1.endpoints.interviews.generate_interview_report", AsyncMock(return_value="Error: Failed to generate AI report due to an internal error (APITimeoutError).")):
+        response = client.post(f"/api/v1/interviews/{interview_id}/generate-report")
+
+    assert response.status_code == status.HTTP_500_INTERNAL_SERVER_ERROR
+    assert "APITimeoutError" in response.json()["detail"]
+    interview_details = client.get(f"/api/v1/interviews/{interview_id}").json()
+    assert interview_details["generated_report"] is None
+    assert interview_details["status"] != "REPORT_GENERATED"
+
+def test_generate_report_summarizes_transcript_far_over_budget(client: TestClient):
+    """When compaction would leave too little per answer, segments are summarized (map) and the summaries feed the report (reduce)."""
+    from app.core.config import settings
+
+    interview_id = _create_long_interview(client, "long.mapreduce@example.com", entry_count=40, answer_sentences=40)
+
+    async def fake_summary(conversation_segment: str, job_description: str, llm_model_name: str = None) -> str:
+        first_question = conversation_segment.split(":", 1)[0]
+        return f"Summary starting at {first_question}."
+
+    mock_report = AsyncMock(return_value="Summarized report.")
+    with patch.object(settings, "REPORT_PROMPT_TOKEN_BUDGET", 3000), \
+         patch("app.services.analysis_cache.analyze_jd", AsyncMock(return_value="Analyzed JD")), \
+         patch("app.services.analysis_cache.parse_resume", AsyncMock(return_value="Parsed resume")), \
+         patch("app.services.report_prompt.summarize_transcript_segment", AsyncMock(side_effect=fake_summary)) as mock_summary, \
+         patch("app.api.v1.endpoints.interviews.generate_interview_report", mock_report):
+        response = client.post(f"/api/v1/interviews/{interview_id}/generate-report")
+
+    assert response.status_code == status.HTTP_200_OK, response.text
+    stats = response.json()["prompt_stats"]
+    assert stats["compaction"] == "map_reduce"
+    assert stats["segments_summarized"] == mock_summary.await_count > 1
+    assert stats["segments_failed"] == 0
+    assert stats["prompt_tokens"] <= 3000
+
+    sent_log = mock_report.call_args.kwargs["conversation_log_str"]
+    assert sent_log.startswith("Summary starting at Q1.")
+    summarized_segments = [call.args[0] for call in mock_summary.await_args_list]
+    assert "Q40: Long question 39?" in summarized_segments[-1] # Every Q/A pair reaches a segment, in order
+
+# --- Segmented report engine (app/services/segmented_report.py) ---
+
+def test_generate_report_segmented_rescores_only_new_segments(client: TestClient):
+    """engine=segmented scores each answer separately; after adding one log entry only that segment is scored again."""
+    job_id = create_test_job(client, title="Segmented Job", desc="JD for the segmented report")
+    candidate_id = create_test_candidate(client, email="segmented.report@example.com", resume_text="Resume for the segmented report")
+    interview_id = client.post("/api/v1/interviews/", json={"job_id": job_id, "candidate_id": candidate_id}).json()["id"]
+
+    def add_log(question: str, answer: str):
+        response = client.post(
+            f"/api/v1/interviews/{interview_id}/logs",
+            json={"question_text_snapshot": question, "full_dialogue_text": answer, "speaker_role": "CANDIDATE"}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+    add_log("Describe a cache you built.", "An LRU in front of the database.")
+    add_log("How do you debug latency?", "Profiling first, then tracing.")
+
+    async def fake_assessment(question: str, answer: str, job_description: str, llm_model_name: str = None) -> str:
+        score = 5 if "LRU" in answer else 3
+        return json.dumps({"scores": {"专业技能与知识": score, "沟通表达能力": 4}, "evidence": answer, "strengths": ["clear"], "concerns": []})
+
+    mock_assess = AsyncMock(side_effect=fake_assessment)
+    mock_reduce = AsyncMock(return_value="# Segmented report\nSolid answers.") # No JSON block: radar data falls back to the mean scores
+    with patch("app.services.analysis_cache.analyze_jd", AsyncMock(return_value="Analyzed JD")), \
+         patch("app.services.analysis_cache.parse_resume", AsyncMock(return_value="Parsed resume")), \
+         patch("app.services.segmented_report.assess_interview_segment", mock_assess), \
+         patch("app.api.v1.endpoints.interviews.generate_report_from_assessments", mock_reduce):
+        first = client.post(f"/api/v1/interviews/{interview_id}/generate-report?engine=segmented")
+        assert first.status_code == status.HTTP_200_OK, first.text
+        assert mock_assess.await_count == 2
+        assert first.json()["prompt_stats"]["segments_scored"] == 2
+
+        add_log("Tell me about a failure.", "A migration that locked a table.")
+        second = client.post(f"/api/v1/interviews/{interview_id}/generate-report?engine=segmented")
+
+    assert second.status_code == status.HTTP_200_OK, second.text
+    assert mock_assess.await_count == 3 # Only the new segment was scored
+    assert mock_assess.await_args.args[1] == "A migration that locked a table."
+    stats = second.json()["prompt_stats"]
+    assert stats["engine"] == "segmented"
+    assert (stats["segments"], stats["segments_scored"], stats["segments_reused"], stats["segments_failed"]) == (3, 1, 2, 0)
+
+    reduce_kwargs = mock_reduce.await_args.kwargs
+    assert "Q3: Tell me about a failure." in reduce_kwargs["segment_assessments"]
+    assert json.loads(reduce_kwargs["aggregated_scores"]) == {"专业技能与知识": 4, "沟通表达能力": 4}
+
+    interview_details = client.get(f"/api/v1/interviews/{interview_id}").json()
+    assert interview_details["radar_data"] == {"专业技能与知识": 4, "沟通表达能力": 4}
+    assert interview_details["generated_report"]["generated_text"] == "# Segmented report\nSolid answers."
+
+def test_generate_report_segmented_retries_invalid_assessment(client: TestClient):
+    """A segment assessment that fails schema validation is requested once more; its scores then count."""
+    job_id = create_test_job(client, title="Segment Retry Job", desc="JD for the segment retry test")
+    candidate_id = create_test_candidate(client, email="segment.retry@example.com", resume_text="Resume for the segment retry test")
+    interview_id = client.post("/api/v1/interviews/", json={"job_id": job_id, "candidate_id": candidate_id}).json()["id"]
+    response = client.post(
+        f"/api/v1/interviews/{interview_id}/logs",
+        json={"question_text_snapshot": "Describe a cache you built.", "full_dialogue_text": "An LRU in front of the database.", "speaker_role": "CANDIDATE"}
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+
+    mock_assess = AsyncMock(side_effect=[
+        '{"score": 5, "evidence": "typo in the key"}', # No "scores" object
+        json.dumps({"scores": {"专业技能与知识": 5}, "evidence": "LRU", "strengths": [], "concerns": []}),
+    ])
+    with patch("app.services.analysis_cache.analyze_jd", AsyncMock(return_value="Analyzed JD")), \
+         patch("app.services.analysis_cache.parse_resume", AsyncMock(return_value="Parsed resume")), \
+         patch("app.services.segmented_report.assess_interview_segment", mock_assess), \
+         patch("app.api.v1.endpoints.interviews.generate_report_from_assessments", AsyncMock(return_value="# Report")):
+        response = client.post(f"/api/v1/interviews/{interview_id}/generate-report?engine=segmented")
+
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert mock_assess.await_count == 2
+    stats = response.json()["prompt_stats"]
+    assert (stats["segments_scored"], stats["segments_failed"], stats["segments_retried"]) == (1, 0, 1)
+    assert stats["aggregated_scores"] == {"专业技能与知识": 5}
+
+    schema_metrics = client.get("/api/v1/metrics/").json()["schema_validation"]["segment_assessment"]
+    assert schema_metrics["validations"] >= 2 and schema_metrics["failures"] >= 1
+
+# --- Incremental report refresh (app/services/report_refresh.py) ---
+
+def test_generate_report_incremental_replaces_a_saved_error_report(client: TestClient, db_session_test: Session):
+    """A stored "Error: ..." report (saved before such results were rejected) is not returned as up to date."""
+    from app.db import models
+
+    interview_id = _create_long_interview(client, "incremental.error@example.com", entry_count=2, answer_sentences=2)
+    mock_full = AsyncMock(return_value="# Report\nRecovered.")
+    with patch("app.services.analysis_cache.analyze_jd", AsyncMock(return_value="Analyzed JD")), \
+         patch("app.services.analysis_cache.parse_resume", AsyncMock(return_value="Parsed resume")), \
+         patch("app.api.v1.endpoints.interviews.generate_interview_report", mock_full):
+        assert client.post(f"/api/v1/interviews/{interview_id}/generate-report").status_code == status.HTTP_200_OK
+        db_session_test.query(models.Report).filter(models.Report.interview_id == interview_id).update({"generated_text": "Error: AI service generated an empty report."})
+        db_session_test.commit()
+
+        response = client.post(f"/api/v1/interviews/{interview_id}/generate-report?incremental=true")
+
+    assert response.status_code == status.HTTP_200_OK, response.text
+    assert mock_full.await_count == 2
+    assert response.json()["prompt_stats"]["refresh"]["reason"] == "no_previous_report"
+    assert response.json()["generated_text"] == "# Report\nRecovered."
+
+def test_generate_report_incremental_sends_only_new_entries(client: TestClient):
+    """incremental=true updates the previous report from the appended log entries; without changes no LLM call is made."""
+    from app.core.config import settings
+
+    job_id = create_test_job(client, title="Incremental Job", desc="JD for the incremental report")
+    candidate_id = create_test_candidate(client, email="incremental.report@example.com", resume_text="Resume for the incremental report")
+    interview_id = client.post("/api/v1/interviews/", json={"job_id": job_id, "candidate_id": candidate_id}).json()["id"]
+
+    def add_log(question: str, answer: str):
+        response = client.post(
+            f"/api/v1/interviews/{interview_id}/logs",
+            json={"question_text_snapshot": question, "full_dialogue_text": answer, "speaker_role": "CANDIDATE"}
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+
+    for i in range(4):
+        add_log(f"Question {i} about system design?", f"A detailed answer {i} about queues, caches and failure handling.")
+
+    first_report = "# Report\nGood fundamentals.\n```json\n{\"CANDIDATE_CAPABILITY_ASSESSMENT_JSON\": {\"专业技能与知识\": 3}}\n```"
+    mock_full = AsyncMock(return_value=first_report)
+    mock_update = AsyncMock(return_value="# Report\nGood fundamentals, strong on incidents.")
+    with patch.object(settings, "REPORT_INCREMENTAL_MAX_DELTA_RATIO", 0.5), \
+         patch("app.services.analysis_cache.analyze_jd", AsyncMock(return_value="Analyzed JD")), \
+         patch("app.services.analysis_cache.parse_resume", AsyncMock(return_value="Parsed resume")), \
+         patch("app.api.v1.endpoints.interviews.generate_interview_report", mock_full), \
+         patch("app.api.v1.endpoints.interviews.update_interview_report", mock_update):
+        first = client.post(f"/api/v1/interviews/{interview_id}/generate-report?incremental=true")
+        assert first.status_code == status.HTTP_200_OK, first.text
+        assert first.json()["prompt_stats"]["refresh"]["reason"] == "no_previous_report"
+
+        unchanged = client.post(f"/api/v1/interviews/{interview_id}/generate-report?incremental=true")
+        assert unchanged.status_code == status.HTTP_200_OK, unchanged.text
+        assert mock_full.await_count == 1 and mock_update.await_count == 0
+
+        add_log("Tell me about an incident.", "A cache stampede.")
+        second = client.post(f"/api/v1/interviews/{interview_id}/generate-report?incremental=true")
+
+    assert second.status_code == status.HTTP_200_OK, second.text
+    assert mock_full.await_count == 1
+    update_kwargs = mock_update.await_args.kwargs
+    assert "Q5: Tell me about an incident.\nA5: A cache stampede." in update_kwargs["transcript_delta"]
+    assert "Question 0" not in update_kwargs["transcript_delta"]
+    assert update_kwargs["previous_report"] == "# Report\nGood fundamentals."
+    stats = second.json()["prompt_stats"]
+    assert (stats["engine"], stats["entries_added"], stats["entries_changed"], stats["entries_removed"]) == ("incremental", 1, 0, 0)
+
+    interview_details = client.get(f"/api/v1/interviews/{interview_id}").json()
+    assert interview_details["radar_data"] == {"专业技能与知识": 3} # No JSON block in the update: previous scores are kept
+    assert interview_details["generated_report"]["generated_text"] == "# Report\nGood fundamentals, strong on incidents."
@@ -110,6 +110,21 @@ def test_update_job_partial(client: TestClient):
     assert updated_job_data["title"] == update_payload["title"]
     assert updated_job_data["description"] == initial_job_data["description"] # Description should remain unchanged
 
+def test_update_job_description_invalidates_jd_analysis(client: TestClient):
+    """Changing the JD text clears the cached analysis; a title-only update keeps it."""
+    response_create = client.post("/api/v1/jobs/", json={"title": "ML Engineer", "description": "Builds models."})
+    job_id = response_create.json()["id"]
+
+    # Simulate a previously cached analysis
+    client.put(f"/api/v1/jobs/{job_id}", json={"analyzed_description": "Cached analysis"})
+
+    response_title = client.put(f"/api/v1/jobs/{job_id}", json={"title": "Senior ML Engineer"})
+    assert response_title.json()["analyzed_description"] == "Cached analysis"
+
+    response_desc = client.put(f"/api/v1/jobs/{job_id}", json={"description": "Builds and deploys models."})
+    assert response_desc.status_code == status.HTTP_200_OK
+    assert response_desc.json()["analyzed_description"] is None
+
 def test_update_job_not_found(client: TestClient):
     """Test updating a job that does not exist."""
     non_existent_job_id = 88888
@@ -191,6 +206,41 @@ def test_read_jobs_pagination(client: TestClient):
     assert response.status_code == status.HTTP_200_OK
     assert response.json() == []
 
+def test_read_jobs_cursor_pagination(client: TestClient):
+    """Test walking the job list with X-Next-Cursor, the title prefix filter and counts."""
+    created_job_ids = []
+    for i in range(5):
+        response = client.post("/api/v1/jobs/", json={"title": f"Cursor Job {i}", "description": "Test cursor pagination"})
+        created_job_ids.append(response.json()["id"])
+    client.post("/api/v1/jobs/", json={"title": "Other_Job 100%", "description": "Not matched by the prefix"})
+
+    seen_ids = []
+    response = client.get("/api/v1/jobs/?limit=2&title_prefix=Cursor&count=exact")
+    assert response.headers["X-Total-Count"] == "5"
+    while True:
+        assert response.status_code == status.HTTP_200_OK
+        seen_ids.extend(job["id"] for job in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        assert 'rel="next"' in response.headers["Link"]
+        response = client.get("/api/v1/jobs/", params={"limit": 2, "title_prefix": "Cursor", "cursor": cursor})
+    assert seen_ids == created_job_ids
+
+    # Newest first
+    response = client.get("/api/v1/jobs/?order=desc&limit=1&title_prefix=Cursor")
+    assert [job["id"] for job in response.json()] == [created_job_ids[-1]]
+    # LIKE wildcards in the prefix are matched literally
+    response = client.get("/api/v1/jobs/", params={"title_prefix": "Other_Job 100%"})
+    assert len(response.json()) == 1
+    response = client.get("/api/v1/jobs/", params={"title_prefix": "Cursor%"})
+    assert response.json() == []
+
+    # A cursor of the other sort order, or a malformed one, is rejected
+    cursor = client.get("/api/v1/jobs/?limit=1").headers["X-Next-Cursor"]
+    assert client.get("/api/v1/jobs/", params={"cursor": cursor, "order": "desc"}).status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get("/api/v1/jobs/?cursor=not-a-cursor").status_code == status.HTTP_400_BAD_REQUEST
+
 # TODO: Further tests could include invalid skip/limit values (e.g., negative)
 # if the API has specific error handling for them, though FastAPI often handles this with validation errors.
 
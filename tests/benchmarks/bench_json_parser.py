@@ -0,0 +1,75 @@
+"""
+Benchmark for the JSON locator in app/utils/json_parser.py on multi-hundred-KB adversarial
+LLM outputs, next to the regex the capability assessment used to be extracted with.
+
+    python tests/benchmarks/bench_json_parser.py [size_kb]
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from app.utils.json_parser import CAPABILITY_ASSESSMENT_KEY, JsonObjectLocator, extract_capability_assessment_json  # noqa: E402
+
+# Former first two extraction passes (nested quantifiers, lazy scans to the end of the text)
+LEGACY_PATTERNS = (
+    re.compile(
+        r'```json\s*({(?:[^{}]|{[^{}]*})*?"CANDIDATE_CAPABILITY_ASSESSMENT_JSON"(?:[^{}]|{[^{}]*})*?})\s*```',
+        re.DOTALL | re.IGNORECASE,
+    ),
+    re.compile(r'({\s*"CANDIDATE_CAPABILITY_ASSESSMENT_JSON"\s*:\s*{.*?}\s*})', re.DOTALL | re.IGNORECASE),
+)
+LEGACY_PREFIX_CHARS = 50_000  # The legacy regexes only get a prefix: they are quadratic on several of these inputs
+
+ASSESSMENT_BLOCK = '```json\n{"CANDIDATE_CAPABILITY_ASSESSMENT_JSON": {"专业技能与知识": 4, "沟通表达能力": 3}}\n```'
+
+
+def build_inputs(size: int) -> dict:
+    prose = "候选人回答清晰 {示例} \"引用\" 。" * (size // 24)
+    return {
+        "report_with_block": prose[:size] + "\n" + ASSESSMENT_BLOCK,
+        "unterminated_fence": "```json {" + "a" * size,
+        "open_braces": "```json " + "{" * size,
+        "nested_keys": f'{{"{CAPABILITY_ASSESSMENT_KEY}":' * (size // 40) + "}" * (size // 40),
+        "unterminated_string": '{"x": "' + "\\\"" * (size // 2),
+        "many_fences": ("```json {\"a\": 1}```\n" * (size // 20)) + ASSESSMENT_BLOCK,
+        "unclosed_fences": "```json {候选人回答清晰 " * (size // 16),
+        "unclosed_keys": f'{{"{CAPABILITY_ASSESSMENT_KEY}": {{"a": 1 ' * (size // 48),
+        # An object left open by a stray brace for the whole stream: feeding must not recopy the buffer
+        "stray_brace_report": "报告 { 备注 " + "候选人回答清晰，示例充分。" * (size // 13) + "\n" + ASSESSMENT_BLOCK,
+    }
+
+
+def timed(function, *args) -> float:
+    started = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - started
+
+
+def legacy_search(text: str) -> None:
+    for pattern in LEGACY_PATTERNS:
+        if pattern.search(text):
+            return
+
+
+def stream(text: str, chunk_size: int = 16) -> None:
+    locator = JsonObjectLocator(CAPABILITY_ASSESSMENT_KEY)
+    for i in range(0, len(text), chunk_size):
+        locator.feed(text[i:i + chunk_size])
+
+
+def main() -> None:
+    size = int(sys.argv[1]) * 1024 if len(sys.argv) > 1 else 500 * 1024
+    print(f"{'input':<22}{'chars':>10}{'locator s':>12}{'streamed s':>12}{'legacy s (50K prefix)':>24}")
+    for name, text in build_inputs(size).items():
+        locator_seconds = timed(extract_capability_assessment_json, text)
+        stream_seconds = timed(stream, text)
+        legacy_seconds = timed(legacy_search, text[:LEGACY_PREFIX_CHARS])
+        print(f"{name:<22}{len(text):>10}{locator_seconds:>12.3f}{stream_seconds:>12.3f}{legacy_seconds:>24.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark of offset pagination against the keyset pagination of app/api/v1/pagination.py on the
+jobs table: time to fetch one page at increasing depths.
+
+    python tests/benchmarks/bench_pagination.py [rows] [database_url]
+
+Defaults to 1,000,000 rows in a temporary SQLite file. Pass a MySQL URL (an empty database, the
+jobs table is created and filled there) to measure the production setup. Offset pages get slower
+with depth, as every skipped row is read; keyset pages stay flat (one index range scan).
+
+No reference results are recorded yet. The output (database version, then one line per depth
+with both timings and their ratio) is meant to be pasted below for the 1M-row MySQL run.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+# app.core.config requires these; the benchmark does not call the LLM or use the app database
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.api.v1.pagination import SortOrder, apply_keyset  # noqa: E402
+from app.db.models import Base, Job  # noqa: E402
+
+PAGE_SIZE = 100
+BATCH_SIZE = 10_000
+ROWS_PER_SECOND = 20  # created_at ties, as with bulk imports (MySQL TIMESTAMP has second precision)
+REPEATS = 5
+
+
+def seed(engine, rows: int) -> None:
+    Base.metadata.create_all(engine, tables=[Job.__table__])
+    start = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        for offset in range(0, rows, BATCH_SIZE):
+            connection.execute(insert(Job), [
+                {"title": f"Job {i}", "description": "-", "created_at": start + timedelta(seconds=i // ROWS_PER_SECOND)}
+                for i in range(offset, min(offset + BATCH_SIZE, rows))
+            ])
+
+
+def best_of(function) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    url = sys.argv[2] if len(sys.argv) > 2 else f"sqlite:///{tempfile.mkdtemp()}/bench_pagination.db"
+    engine = create_engine(url)
+
+    started = time.perf_counter()
+    seed(engine, rows)
+    with engine.connect() as connection:
+        server_version = ".".join(map(str, connection.dialect.server_version_info or ()))
+    print(f"Seeded {rows:,} jobs in {time.perf_counter() - started:.1f}s ({engine.dialect.name} {server_version})\n")
+
+    ordered = apply_keyset(select(Job), Job, None, SortOrder.ASC)
+    print(f"{'depth':>10}  {'offset ms':>10}  {'keyset ms':>10}  {'ratio':>7}")
+    with Session(engine) as session:
+        for depth in (0, 1_000, 10_000, 100_000, rows // 2, rows - PAGE_SIZE):
+            offset_page = lambda: session.execute(ordered.offset(depth).limit(PAGE_SIZE)).scalars().all()
+            # The cursor a client would hold at this depth: the key of the previous page's last row
+            previous = session.execute(ordered.offset(depth - 1).limit(1)).scalars().first() if depth else None
+            after = (previous.created_at, previous.id) if previous else None
+            keyset_page = lambda: session.execute(apply_keyset(select(Job), Job, after, SortOrder.ASC).limit(PAGE_SIZE)).scalars().all()
+
+            assert [job.id for job in offset_page()] == [job.id for job in keyset_page()]
+            offset_seconds, keyset_seconds = best_of(offset_page), best_of(keyset_page)
+            print(f"{depth:>10,}  {offset_seconds * 1000:>10.2f}  {keyset_seconds * 1000:>10.2f}  {offset_seconds / keyset_seconds:>6.1f}x")
+            session.expunge_all()
+
+
+if __name__ == "__main__":
+    main()
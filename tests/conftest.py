@@ -2,6 +2,8 @@ import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import NullPool
 import importlib
 import sys
 import logging # Import logging
@@ -49,7 +51,7 @@ logger = logging.getLogger(__name__) # Logger for conftest itself
 # from app.api.v1.endpoints import candidates as candidates_router_module # REMOVE
 import app.main as main_module
 
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db, get_async_session_factory
 from app.db.models import Base
 
 # --- Test Database Setup ---
@@ -66,6 +68,19 @@ engine_test = create_engine(
 )
 SessionTesting = sessionmaker(autocommit=False, autoflush=False, bind=engine_test)
 
+# Async engine for routers that depend on get_async_db. NullPool: TestClient / LifespanManager may
+# run requests on different event loops, and pooled aiomysql connections are bound to their loop.
+async_engine_test = create_async_engine(
+    SQLALCHEMY_DATABASE_URL_TEST.replace("mysql+pymysql://", "mysql+aiomysql://"),
+    poolclass=NullPool
+)
+AsyncSessionTesting = async_sessionmaker(bind=async_engine_test, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+
+async def override_get_async_db_for_testing():
+    # One session per request, like the real get_async_db, so concurrent requests do not share a connection
+    async with AsyncSessionTesting() as session:
+        yield session
+
 # --- Pytest Fixture for Database Session ---
 # This fixture will be responsible for:
 # 1. Creating all database tables before a test runs.
@@ -156,6 +171,8 @@ def client(db_session_test):
             pass
 
     current_app.dependency_overrides[get_db] = override_get_db_for_testing
+    current_app.dependency_overrides[get_async_db] = override_get_async_db_for_testing
+    current_app.dependency_overrides[get_async_session_factory] = lambda: AsyncSessionTesting
     
     logger.debug("---- Registered Routes (in conftest.py client fixture after fresh import) ----")
     for route_idx, route in enumerate(current_app.routes):
@@ -216,6 +233,8 @@ async def app_lifespan_context(db_session_test): # Depends on db_session_test to
             pass # db_session_test handles its own close
             
     the_app.dependency_overrides[get_db] = override_get_db_for_lifespan
+    the_app.dependency_overrides[get_async_db] = override_get_async_db_for_testing
+    the_app.dependency_overrides[get_async_session_factory] = lambda: AsyncSessionTesting
     logger.debug("Applied dependency_overrides for app_lifespan_context.")
 
     async with LifespanManager(the_app) as manager:
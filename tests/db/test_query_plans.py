@@ -0,0 +1,94 @@
+"""
+Query-plan regression tests: the hot query shapes must be served by the composite indexes of
+app/db/models.py (index lookup or range scan, no filesort), not by table scans.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+JOBS = 10
+CANDIDATES = 20
+INTERVIEWS_PER_JOB = 30
+ENTRIES_PER_INTERVIEW = 15
+
+
+@pytest.fixture()
+def seeded_db(db_session_test: Session) -> Session:
+    db = db_session_test
+    jobs = [models.Job(title=f"Job {i}", description="-") for i in range(JOBS)]
+    candidates = [models.Candidate(name=f"Candidate {i}", email=f"plan{i}@example.com", resume_text="-") for i in range(CANDIDATES)]
+    db.add_all(jobs + candidates)
+    db.flush()
+
+    statuses = list(models.InterviewStatus)
+    start = datetime(2024, 1, 1)
+    interviews = []
+    for job_index, job in enumerate(jobs):
+        for i in range(INTERVIEWS_PER_JOB):
+            interviews.append(models.Interview(
+                job_id=job.id,
+                candidate_id=candidates[(job_index + i) % CANDIDATES].id,
+                status=statuses[i % len(statuses)],
+                created_at=start + timedelta(minutes=job_index * INTERVIEWS_PER_JOB + i),
+            ))
+    db.add_all(interviews)
+    db.flush()
+
+    for interview in interviews:
+        for order_num in range(1, ENTRIES_PER_INTERVIEW + 1):
+            db.add(models.Question(interview_id=interview.id, question_text=f"Q{order_num}", order_num=order_num))
+            db.add(models.InterviewLog(
+                interview_id=interview.id,
+                speaker_role=models.SpeakerRole.CANDIDATE,
+                full_dialogue_text=f"A{order_num}",
+                order_num=order_num,
+            ))
+    db.commit()
+    for table in ("jobs", "candidates", "interviews", "questions", "interview_logs"):
+        db.execute(text(f"ANALYZE TABLE {table}"))
+    return db
+
+
+def _explain(db: Session, stmt) -> dict:
+    """The EXPLAIN row of the (single-table) statement."""
+    sql = str(stmt.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}))
+    return dict(db.execute(text(f"EXPLAIN {sql}")).mappings().one())
+
+
+def _assert_index_scan(plan: dict, index_name: str) -> None:
+    assert plan["key"] == index_name, plan
+    assert plan["type"] in ("ref", "range", "eq_ref", "const"), plan
+    assert "filesort" not in (plan["Extra"] or ""), plan
+
+
+def test_interview_children_load_with_index_range_scan(seeded_db: Session):
+    interview_id = seeded_db.execute(select(models.Interview.id).limit(1)).scalar_one()
+
+    logs = select(models.InterviewLog).where(models.InterviewLog.interview_id == interview_id).order_by(models.InterviewLog.order_num)
+    _assert_index_scan(_explain(seeded_db, logs), "uq_interview_logs_interview_id_order_num")
+
+    questions = select(models.Question).where(models.Question.interview_id == interview_id).order_by(models.Question.order_num)
+    _assert_index_scan(_explain(seeded_db, questions), "ix_questions_interview_id_order_num")
+
+
+def test_interview_listings_use_composite_indexes(seeded_db: Session):
+    job_id, candidate_id = seeded_db.execute(select(models.Interview.job_id, models.Interview.candidate_id).limit(1)).one()
+
+    by_job_and_status = (
+        select(models.Interview)
+        .where(models.Interview.job_id == job_id, models.Interview.status == models.InterviewStatus.REPORT_GENERATED)
+        .order_by(models.Interview.created_at, models.Interview.id)
+    )
+    _assert_index_scan(_explain(seeded_db, by_job_and_status), "ix_interviews_job_id_status_created_at")
+
+    by_candidate = (
+        select(models.Interview)
+        .where(models.Interview.candidate_id == candidate_id)
+        .order_by(models.Interview.created_at, models.Interview.id)
+    )
+    _assert_index_scan(_explain(seeded_db, by_candidate), "ix_interviews_candidate_id_created_at")
@@ -0,0 +1,101 @@
+import time
+
+from app.utils.json_parser import (
+    CAPABILITY_ASSESSMENT_KEY,
+    JsonObjectLocator,
+    StreamingReportSplitter,
+    extract_capability_assessment_json,
+    find_json_object,
+    split_capability_assessment,
+)
+
+REPORT = (
+    "# 评估报告\nUses {braces} and \"quotes\" in prose.\n\n"
+    "```json\n{\n  \"CANDIDATE_CAPABILITY_ASSESSMENT_JSON\": {\"专业技能与知识\": 4, \"note\": \"a } and \\\" inside\"}\n}\n```\n"
+    "Trailing text."
+)
+
+
+def test_split_capability_assessment_removes_fenced_block():
+    text, assessment = split_capability_assessment(REPORT)
+    assert assessment == {"专业技能与知识": 4, "note": "a } and \" inside"}
+    assert text == "# 评估报告\nUses {braces} and \"quotes\" in prose.\n\n\nTrailing text."
+
+
+def test_extract_capability_assessment_bare_nested_and_missing():
+    assert extract_capability_assessment_json('Scores: {"CANDIDATE_CAPABILITY_ASSESSMENT_JSON": {"a": 1}} end') == {"a": 1}
+    # A stray opening brace in the prose does not hide the object
+    assert extract_capability_assessment_json('{ unclosed {"CANDIDATE_CAPABILITY_ASSESSMENT_JSON": {"a": 2}}') == {"a": 2}
+    # Nor does a stray brace followed by a quote, which the scan would otherwise read as an open string
+    stray = 'Report { note: he said "great job\n```json\n{"CANDIDATE_CAPABILITY_ASSESSMENT_JSON": {"a": 1}}\n```\n'
+    assert split_capability_assessment(stray) == ('Report { note: he said "great job', {"a": 1})
+    locator = JsonObjectLocator(CAPABILITY_ASSESSMENT_KEY)
+    assert [match.value for char in stray for match in locator.feed(char)] == [{CAPABILITY_ASSESSMENT_KEY: {"a": 1}}]
+    assert extract_capability_assessment_json('{"CANDIDATE_CAPABILITY_ASSESSMENT_JSON": 3}') is None
+    assert extract_capability_assessment_json("No scores here.") is None
+    assert extract_capability_assessment_json("") is None
+
+
+def test_find_json_object_by_key():
+    match = find_json_object('Here you go:\n```JSON\n{"questions": ["Q1?", "Q2?"]}\n```', "questions")
+    assert match.value == {"questions": ["Q1?", "Q2?"]}
+    assert match.fenced
+    assert find_json_object('{"other": 1}', "questions") is None
+    assert find_json_object('{"text": "questions", "n": 1}', "questions") is None # A string value is not a key
+
+
+def test_locator_streaming_chunks_match_complete_text():
+    complete = find_json_object(REPORT, CAPABILITY_ASSESSMENT_KEY)
+    for chunk_size in (1, 2, 7):
+        locator = JsonObjectLocator(CAPABILITY_ASSESSMENT_KEY)
+        matches = []
+        for i in range(0, len(REPORT), chunk_size):
+            matches += locator.feed(REPORT[i:i + chunk_size])
+        assert len(matches) == 1
+        assert (matches[0].value, matches[0].start, matches[0].end, matches[0].block_start) == \
+            (complete.value, complete.start, complete.end, complete.block_start)
+
+
+def test_streaming_report_splitter_matches_blocking_split():
+    """Fenced, bare and nested assessments stream to the same text and radar data as split_capability_assessment."""
+    reports = [
+        REPORT,
+        "# Report\nSolid answers.\n" + '{"CANDIDATE_CAPABILITY_ASSESSMENT_JSON": {"a": 2}}',
+        'Pre {"wrap": {"CANDIDATE_CAPABILITY_ASSESSMENT_JSON": {"a": 3}}} post',
+        "# Report\n```json\n{\"other\": 1}\n```\nNo scores, `code` and ``` here.",
+    ]
+    for report in reports:
+        text, assessment = split_capability_assessment(report)
+        for chunk_size in (1, 3, 7):
+            splitter = StreamingReportSplitter()
+            events = []
+            for i in range(0, len(report), chunk_size):
+                events += splitter.feed(report[i:i + chunk_size])
+            events += splitter.finish()
+            assert splitter.radar_data == assessment
+            assert [value for kind, value in events if kind == "radar"] == ([assessment] if assessment else [])
+            assert "".join(value for kind, value in events if kind == "markdown") == splitter.markdown
+            assert (splitter.markdown.strip() if assessment else splitter.markdown) == text
+
+
+def test_streaming_report_splitter_emits_markdown_before_the_block_closes():
+    splitter = StreamingReportSplitter()
+    assert splitter.feed("# Report\nGood.\n```js") == [("markdown", "# Report\nGood.\n")]
+    assert splitter.feed("on\n{\"CANDIDATE_CAPABILITY_ASSESSMENT_JSON\": {\"a\"") == []
+    assert splitter.feed(": 1}}\n`") == [("radar", {"a": 1})]
+    assert splitter.feed("``\nAfter.") == [("markdown", "\nAfter.")]
+
+
+def test_locator_is_linear_on_adversarial_input():
+    """Inputs that made the previous regexes backtrack are handled in well under a second each (see tests/benchmarks)."""
+    size = 200_000
+    inputs = [
+        "```json {" + "a" * size,
+        "```json " + "{" * size,
+        '{"CANDIDATE_CAPABILITY_ASSESSMENT_JSON":' * (size // 40) + "}" * (size // 40),
+        '{"x": "' + "\\" * size,
+    ]
+    for text in inputs:
+        started = time.perf_counter()
+        assert extract_capability_assessment_json(text) is None
+        assert time.perf_counter() - started < 2.0
@@ -0,0 +1,63 @@
+import json
+import logging
+import logging.handlers
+
+import pytest
+
+from app.core import logging_setup
+from app.core.logging_setup import JsonFormatter, _parse_level, setup_logging, shutdown_logging
+
+
+@pytest.fixture
+def isolated_root_logger(monkeypatch):
+    """Lets a test reconfigure logging without stopping the listener of the app configuration."""
+    root_logger = logging.getLogger()
+    handlers, level = root_logger.handlers[:], root_logger.level
+    monkeypatch.setattr(logging_setup, "_listener", None)
+    monkeypatch.setattr(logging_setup, "_queue_handler", None)
+    yield
+    shutdown_logging()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
+    for handler in handlers:
+        root_logger.addHandler(handler)
+    root_logger.setLevel(level)
+
+
+def test_json_formatter_includes_extra_fields():
+    record = logging.LogRecord("app.test", logging.WARNING, __file__, 1, "Interview %s: %s", (7, "done"), None)
+    record.interview_id = 7
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["level"] == "WARNING"
+    assert entry["logger"] == "app.test"
+    assert entry["message"] == "Interview 7: done"
+    assert entry["interview_id"] == 7
+    assert "exception" not in entry
+
+
+def test_parse_level():
+    assert _parse_level("debug") == logging.DEBUG
+    assert _parse_level(logging.ERROR) == logging.ERROR
+    with pytest.raises(ValueError):
+        _parse_level("verbose")
+
+
+def test_queued_json_records_keep_the_exception(isolated_root_logger, capsys):
+    setup_logging("INFO", log_format="json", use_queue=True)
+    details = {"state": "before"}
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logging.getLogger("app.test").exception("Interview %s failed: %s", 7, details, extra={"interview_id": 7})
+    details["state"] = "after" # The message is built when the record is queued
+    shutdown_logging()
+
+    entry = json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+    assert entry["message"] == "Interview 7 failed: {'state': 'before'}"
+    assert entry["interview_id"] == 7
+    assert "ValueError: boom" in entry["exception"]
+
+    # After shutdown, records are written directly instead of going to a queue nobody reads
+    assert not any(isinstance(handler, logging.handlers.QueueHandler) for handler in logging.getLogger().handlers)
+    logging.getLogger("app.test").warning("After shutdown")
+    assert json.loads(capsys.readouterr().out)["message"] == "After shutdown"